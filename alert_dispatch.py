@@ -0,0 +1,656 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Powiadomienia o zagrożeniach i anomaliach
+Trafienia reguł, wyniki detektorów i istotne zmiany częstości są zamieniane
+na powiadomienia wysyłane partiami do odbiorców (webhook, SMTP, syslog, plik)
+z deduplikacją i ograniczaniem częstości - burza zdarzeń 4625 daje jedno
+zagregowane powiadomienie zamiast tysięcy żądań
+"""
+
+import json
+import smtplib
+import socket
+import threading
+import time
+import urllib.request
+from collections import OrderedDict
+from datetime import datetime
+from email.message import EmailMessage
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+
+# Poziomy ważności (EventSeverity) używane przez reguły domyślne
+CRITICAL_SEVERITY = 1
+
+# Poziomy ważności powiadomień (od najpoważniejszego) i odpowiadające im poziomy syslog
+ALERT_SEVERITIES = ('critical', 'error', 'warning', 'info')
+SYSLOG_SEVERITIES = {'critical': 2, 'error': 3, 'warning': 4, 'info': 6}
+
+SEVERITY_NAMES = {
+    'critical': "KRYTYCZNY",
+    'error': "BŁĄD",
+    'warning': "OSTRZEŻENIE",
+    'info': "INFORMACJA",
+}
+
+
+def _format_time(value: Optional[datetime]) -> Optional[str]:
+    return value.strftime('%Y-%m-%d %H:%M:%S') if value else None
+
+
+class Alert:
+    """Powiadomienie - zagregowane trafienia jednego klucza (reguła, konto, Event ID, ...)"""
+
+    def __init__(self, key: str, title: str, severity: str = 'warning', time: datetime = None,
+                 count: int = 1, details: Dict = None, source: str = 'rule'):
+        """
+        Args:
+            key: Klucz deduplikacji i ograniczania częstości, np. "rule:failed_logon"
+            title: Krótki opis dla odbiorcy
+            severity: critical, error, warning lub info
+            time: Czas trafienia (domyślnie teraz)
+            count: Liczba trafień reprezentowanych przez powiadomienie
+            details: Dodatkowe informacje (wartości serializowalne do JSON)
+            source: Pochodzenie - rule, security lub anomaly
+        """
+        if severity not in SYSLOG_SEVERITIES:
+            raise ValueError(f"Nieznany poziom ważności powiadomienia: {severity}")
+        time = time or datetime.now()
+        self.key = key
+        self.title = title
+        self.severity = severity
+        self.first_seen = time
+        self.last_seen = time
+        self.count = count
+        self.details = dict(details or {})
+        self.source = source
+        self.host = socket.gethostname()
+
+    def absorb(self, other: 'Alert'):
+        """Dolicza trafienia innego powiadomienia o tym samym kluczu"""
+        self.count += other.count
+        self.first_seen = min(self.first_seen, other.first_seen)
+        if other.last_seen >= self.last_seen:
+            self.last_seen = other.last_seen
+            # Szczegóły z najnowszego trafienia
+            self.details.update(other.details)
+        if ALERT_SEVERITIES.index(other.severity) < ALERT_SEVERITIES.index(self.severity):
+            self.severity = other.severity
+
+    def format_text(self) -> str:
+        """Jednowierszowy opis (syslog, temat wiadomości, konsola)"""
+        period = _format_time(self.first_seen)
+        if self.last_seen != self.first_seen:
+            period += f" - {_format_time(self.last_seen)}"
+        return f"[{SEVERITY_NAMES[self.severity]}] {self.title} ({self.count}x, {period}) {self.key}"
+
+    def to_dict(self) -> Dict:
+        return {
+            'key': self.key,
+            'title': self.title,
+            'severity': self.severity,
+            'source': self.source,
+            'host': self.host,
+            'count': self.count,
+            'first_seen': _format_time(self.first_seen),
+            'last_seen': _format_time(self.last_seen),
+            'details': self.details,
+        }
+
+
+class AlertRule:
+    """
+    Reguła zamieniająca pasujące zdarzenia na trafienia
+
+    Trafienia o tym samym kluczu (nazwa reguły i wartości key_fields zdarzenia)
+    są agregowane w jedno powiadomienie. Zdarzenie trafia tylko do pierwszej
+    pasującej reguły z listy, więc reguły ogólne (np. critical_event) powinny
+    być na jej końcu.
+    """
+
+    def __init__(self, name: str, title: str, severity: str = 'warning', event_ids: Iterable[int] = None,
+                 logs: Iterable[str] = None, max_severity: int = None,
+                 key_fields: Sequence[str] = ('event_id',), exclude_logs: Iterable[str] = ()):
+        """
+        Args:
+            name: Nazwa reguły (część klucza powiadomienia)
+            title: Opis powiadomienia
+            severity: Ważność powiadomienia (critical, error, warning, info)
+            event_ids: Dopasowywane Event ID (None - wszystkie)
+            logs: Dopasowywane dzienniki (None - wszystkie)
+            max_severity: Największy poziom ważności zdarzenia (np. 1 - tylko krytyczne)
+            key_fields: Pola zdarzenia rozróżniające powiadomienia jednej reguły
+            exclude_logs: Pomijane dzienniki
+        """
+        self.name = name
+        self.title = title
+        self.severity = severity
+        self.event_ids = frozenset(event_ids) if event_ids is not None else None
+        self.logs = frozenset(logs) if logs is not None else None
+        self.max_severity = max_severity
+        self.key_fields = tuple(key_fields)
+        self.exclude_logs = frozenset(exclude_logs)
+
+    def matches(self, event: Dict) -> bool:
+        return ((self.event_ids is None or event['event_id'] in self.event_ids)
+                and (self.logs is None or event['log_name'] in self.logs)
+                and (self.max_severity is None or event['severity'] <= self.max_severity)
+                and event['log_name'] not in self.exclude_logs)
+
+    def key(self, event: Dict) -> str:
+        return ':'.join(['rule', self.name] + [str(event.get(field)) for field in self.key_fields])
+
+
+# Od reguł szczegółowych do ogólnej - zdarzenie trafia do pierwszej pasującej.
+# Niepowodzenia inspekcji (Security) mają ważność krytyczną, więc reguła zdarzeń
+# krytycznych pomija dziennik Security - inaczej każde 4625 dałoby dwa powiadomienia
+DEFAULT_RULES = (
+    AlertRule('failed_logon', "Nieudane próby logowania", 'warning', event_ids=(4625,), logs=('Security',),
+              key_fields=()),
+    AlertRule('disk_error', "Błędy dysku", 'error', event_ids=(7, 51, 153, 154), logs=('System',)),
+    AlertRule('unexpected_shutdown', "Nieoczekiwane wyłączenie systemu", 'critical',
+              event_ids=(41, 6008), logs=('System',)),
+    AlertRule('critical_event', "Zdarzenie krytyczne", 'critical', max_severity=CRITICAL_SEVERITY,
+              key_fields=('log_name', 'event_id'), exclude_logs=('Security',)),
+)
+
+# Ważność powiadomień o zagrożeniach według typu (security_detectors.SecurityFinding)
+FINDING_SEVERITIES = {
+    'brute_force': 'error',
+    'brute_force_success': 'critical',
+    'password_spray': 'error',
+    'new_admin_logon': 'warning',
+}
+
+
+def alerts_from_findings(findings: Iterable) -> List[Alert]:
+    """Powiadomienia o zagrożeniach wykrytych przez detektory (SecurityFinding)"""
+    return [Alert(f"security:{finding.type}:{finding.key}", finding.name,
+                  FINDING_SEVERITIES.get(finding.type, 'warning'), time=finding.time, count=finding.count,
+                  details={'description': finding.description}, source='security')
+            for finding in findings]
+
+
+def alerts_from_comparison(comparison, limit: int = 20) -> List[Alert]:
+    """Powiadomienia o anomaliach - istotnych wzrostach częstości i nowych Event ID (SummaryComparison)"""
+    alerts = []
+    now = comparison.current.generated_at
+    for change in comparison.increases[:limit]:
+        alerts.append(Alert(f"anomaly:rate:{change.event_id}",
+                            f"Wzrost częstości Event ID {change.event_id} ({change.ratio:.1f}x)",
+                            'warning', time=now, count=change.current_count,
+                            details=change.to_dict(), source='anomaly'))
+    for event_id, count in comparison.new_event_ids[:limit]:
+        alerts.append(Alert(f"anomaly:new_event_id:{event_id}", f"Nowy Event ID {event_id}",
+                            'info', time=now, count=count, details={'event_id': event_id}, source='anomaly'))
+    return alerts
+
+
+class AlertSink:
+    """Odbiorca powiadomień - send otrzymuje całą partię, błąd zgłasza wyjątkiem"""
+
+    name = 'sink'
+
+    def send(self, alerts: List[Alert]):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class FileSink(AlertSink):
+    """Powiadomienia dopisywane do pliku JSON Lines (jedno w wierszu)"""
+
+    name = 'file'
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def send(self, alerts: List[Alert]):
+        with open(self.path, 'a', encoding='utf-8') as f:
+            for alert in alerts:
+                f.write(json.dumps(alert.to_dict(), ensure_ascii=False) + '\n')
+
+
+class WebhookSink(AlertSink):
+    """Partia powiadomień wysyłana jednym żądaniem POST z treścią JSON"""
+
+    name = 'webhook'
+
+    def __init__(self, url: str, timeout: float = 10.0, headers: Dict[str, str] = None):
+        self.url = url
+        self.timeout = timeout
+        self.headers = dict(headers or {})
+
+    def send(self, alerts: List[Alert]):
+        body = json.dumps({
+            'source': 'windows-event-analyzer',
+            'count': len(alerts),
+            'alerts': [alert.to_dict() for alert in alerts],
+        }, ensure_ascii=False).encode('utf-8')
+        request = urllib.request.Request(self.url, data=body, method='POST',
+                                         headers=dict(self.headers, **{'Content-Type': 'application/json'}))
+        # Status inny niż 2xx zgłasza urllib.error.HTTPError
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+
+class SyslogSink(AlertSink):
+    """
+    Powiadomienia w formacie RFC 5424 przez UDP lub TCP (ramki z długością, RFC 6587)
+
+    Przez UDP każde powiadomienie jest osobnym datagramem, przez TCP cała
+    partia jest wysyłana jednym połączeniem.
+    """
+
+    name = 'syslog'
+
+    # Facility local0
+    FACILITY = 16
+    APP_NAME = 'windows-event-analyzer'
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 514, protocol: str = 'udp', timeout: float = 10.0):
+        if protocol not in ('udp', 'tcp'):
+            raise ValueError("Protokół syslog: udp lub tcp")
+        self.host = host
+        self.port = port
+        self.protocol = protocol
+        self.timeout = timeout
+
+    def format(self, alert: Alert) -> bytes:
+        priority = self.FACILITY * 8 + SYSLOG_SEVERITIES[alert.severity]
+        timestamp = alert.last_seen.astimezone().isoformat(timespec='seconds')
+        data = json.dumps(alert.details, ensure_ascii=False, separators=(',', ':'))
+        # BOM oznacza treść UTF-8 (RFC 5424, sekcja 6.4)
+        return (f"<{priority}>1 {timestamp} {alert.host} {self.APP_NAME} - {alert.source} - ".encode('utf-8')
+                + b'\xef\xbb\xbf' + f"{alert.format_text()} {data}".encode('utf-8'))
+
+    def send(self, alerts: List[Alert]):
+        messages = [self.format(alert) for alert in alerts]
+        if self.protocol == 'udp':
+            with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+                for message in messages:
+                    sock.sendto(message, (self.host, self.port))
+            return
+        with socket.create_connection((self.host, self.port), timeout=self.timeout) as sock:
+            sock.sendall(b''.join(str(len(message)).encode('ascii') + b' ' + message for message in messages))
+
+
+class SmtpSink(AlertSink):
+    """Partia powiadomień jako jedna wiadomość e-mail"""
+
+    name = 'smtp'
+
+    def __init__(self, host: str, recipients: Sequence[str], port: int = 25, sender: str = None,
+                 username: str = None, password: str = None, starttls: bool = False,
+                 timeout: float = 10.0, subject_prefix: str = '[Analizator zdarzeń]'):
+        self.host = host
+        self.port = port
+        self.recipients = list(recipients)
+        self.sender = sender or f"windows-event-analyzer@{socket.gethostname()}"
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.timeout = timeout
+        self.subject_prefix = subject_prefix
+
+    def message(self, alerts: List[Alert]) -> EmailMessage:
+        worst = min(alerts, key=lambda alert: ALERT_SEVERITIES.index(alert.severity))
+        message = EmailMessage()
+        subject = worst.title if len(alerts) == 1 else f"{len(alerts)} powiadomień, m.in. {worst.title}"
+        message['Subject'] = f"{self.subject_prefix} {SEVERITY_NAMES[worst.severity]}: {subject}"
+        message['From'] = self.sender
+        message['To'] = ', '.join(self.recipients)
+        lines = [alert.format_text() for alert in alerts]
+        lines.append("")
+        lines.append(json.dumps([alert.to_dict() for alert in alerts], ensure_ascii=False, indent=2))
+        message.set_content("\n".join(lines))
+        return message
+
+    def send(self, alerts: List[Alert]):
+        with smtplib.SMTP(self.host, self.port, timeout=self.timeout) as smtp:
+            if self.starttls:
+                smtp.starttls()
+            if self.username:
+                smtp.login(self.username, self.password or '')
+            smtp.send_message(self.message(alerts))
+
+
+class _RuleSink:
+    """Odbiorca zdarzeń analizatora (add_event_sink) sprawdzający reguły"""
+
+    def __init__(self, dispatcher: 'AlertDispatcher', rules: Sequence[AlertRule]):
+        self.dispatcher = dispatcher
+        self.rules = tuple(rules)
+        # Najnowsze sprawdzone rekordy bieżącego przebiegu (zatwierdzane po analizie)
+        self.checked = {}
+
+    def write(self, events: Iterable[Dict]):
+        self.dispatcher.check_events(events, self.rules, self.checked)
+
+
+def _window_seconds(analyzer) -> float:
+    """Długość okna analizy w sekundach (nieskończona dla zakresu bezwzględnego lub całych plików)"""
+    if analyzer.start_time is not None or analyzer.hours_back is None:
+        return float('inf')
+    return analyzer.hours_back * 3600.0
+
+
+class AlertDispatcher:
+    """
+    Kolejka powiadomień z deduplikacją, ograniczaniem częstości i wysyłką partiami
+
+    - deduplikacja: zdarzenia nie nowsze niż najnowszy rekord dziennika
+      sprawdzony w poprzednich przebiegach (znacznik według komputera
+      i dziennika) są pomijane, a zagrożenia i zdarzenia bez numeru rekordu -
+      po odcisku zapamiętanym przez dedup_window (attach wydłuża je do okna
+      analizy, więc ponowny odczyt tego samego okna nie powtarza powiadomień),
+    - agregacja: trafienia o tym samym kluczu czekające na wysyłkę są scalane
+      w jedno powiadomienie z łączną liczbą,
+    - ograniczanie częstości: klucz jest wysyłany najwyżej raz na throttle_window
+      sekund - trafienia w tym czasie czekają i trafiają do kolejnego powiadomienia,
+    - partie: flush wysyła gotowe powiadomienia partiami po batch_size do każdego
+      odbiorcy; nieudana partia jest ponawiana przy kolejnych wywołaniach flush
+      (najwyżej max_attempts razy).
+
+    Przykład:
+        dispatcher = AlertDispatcher([WebhookSink('http://127.0.0.1:9000/alerts')])
+        dispatcher.start()                # wysyłka co flush_interval sekund w tle
+        dispatcher.attach(analyzer)       # reguły, detektory zagrożeń
+        analyzer.analyze_events()
+        dispatcher.close()                # wysyła pozostałe powiadomienia
+    """
+
+    # Maksymalna liczba zapamiętanych odcisków trafień (najstarsze są usuwane)
+    MAX_FINGERPRINTS = 100000
+
+    def __init__(self, sinks: Iterable[AlertSink] = (), dedup_window: float = 3600.0,
+                 throttle_window: float = 900.0, batch_size: int = 50, flush_interval: float = 30.0,
+                 max_attempts: int = 3, clock: Callable[[], float] = time.time):
+        """
+        Args:
+            sinks: Odbiorcy powiadomień
+            dedup_window: Jak długo pamiętać odciski trafień (sekundy)
+            throttle_window: Minimalny odstęp powiadomień o tym samym kluczu (sekundy)
+            batch_size: Maksymalna liczba powiadomień w jednej wysyłce
+            flush_interval: Odstęp wysyłek w tle (start)
+            max_attempts: Liczba prób wysłania partii do odbiorcy
+            clock: Źródło czasu w sekundach (do testów)
+        """
+        self.sinks = list(sinks)
+        self.dedup_window = dedup_window
+        self.throttle_window = throttle_window
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_attempts = max_attempts
+        self.clock = clock
+        # Klucz -> powiadomienie czekające na wysyłkę (kolejność pierwszego trafienia)
+        self.pending = OrderedDict()
+        self._last_sent = {}
+        self._fingerprints = OrderedDict()
+        # (komputer, dziennik) -> (najnowszy sprawdzony numer rekordu, jego czas)
+        self._high_water = {}
+        # Odbiorca -> lista (partia, liczba prób) do ponowienia
+        self._retries = {}
+        self.stats = {'hits': 0, 'duplicates': 0, 'aggregated': 0, 'sent': 0, 'batches': 0,
+                      'failed_batches': 0, 'dropped': 0}
+        # Ostatnie błędy odbiorców: lista (nazwa odbiorcy, opis)
+        self.errors = []
+        self._lock = threading.RLock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def add_sink(self, sink: AlertSink):
+        self.sinks.append(sink)
+
+    def is_duplicate(self, fingerprint) -> bool:
+        """Sprawdza i zapamiętuje odcisk trafienia (True - trafienie już zgłoszone)"""
+        now = self.clock()
+        with self._lock:
+            seen = self._fingerprints.get(fingerprint)
+            if seen is not None and now - seen < self.dedup_window:
+                self.stats['duplicates'] += 1
+                return True
+            self._fingerprints[fingerprint] = now
+            self._fingerprints.move_to_end(fingerprint)
+            if len(self._fingerprints) > self.MAX_FINGERPRINTS:
+                self._fingerprints.popitem(last=False)
+            return False
+
+    def submit(self, alert: Alert, fingerprint=None) -> bool:
+        """
+        Dodaje trafienie do kolejki
+
+        Args:
+            alert: Powiadomienie (trafienia o tym samym kluczu są scalane)
+            fingerprint: Odcisk trafienia do deduplikacji (domyślnie klucz i czas)
+
+        Returns:
+            False, gdy trafienie było duplikatem
+        """
+        if self.is_duplicate(fingerprint if fingerprint is not None else (alert.key, alert.last_seen)):
+            return False
+        with self._lock:
+            self.stats['hits'] += alert.count
+            queued = self.pending.get(alert.key)
+            if queued is None:
+                self.pending[alert.key] = alert
+            else:
+                queued.absorb(alert)
+                self.stats['aggregated'] += 1
+        return True
+
+    def submit_all(self, alerts: Iterable[Alert]):
+        for alert in alerts:
+            self.submit(alert)
+
+    def check_events(self, events: Iterable[Dict], rules: Sequence[AlertRule] = DEFAULT_RULES,
+                     checked: Dict = None):
+        """
+        Sprawdza reguły dla partii zdarzeń
+
+        Trafienia jednej partii są najpierw agregowane według klucza, więc
+        burza zdarzeń to jedno powiadomienie w kolejce. Zdarzenie trafia do
+        pierwszej pasującej reguły. Zdarzenia nie nowsze niż znacznik dziennika
+        z poprzednich przebiegów (ponownie odczytane) nie są zgłaszane.
+
+        Args:
+            events: Zdarzenia (w dowolnej kolejności)
+            rules: Reguły w kolejności sprawdzania
+            checked: Znaczniki bieżącego przebiegu, zatwierdzane później przez
+                     commit_checked (None - zatwierdź po tej partii)
+        """
+        commit = checked is None
+        if commit:
+            checked = {}
+        high_water = self._high_water
+        batch = {}
+        duplicates = 0
+        for event in events:
+            for rule in rules:
+                if rule.matches(event):
+                    break
+            else:
+                continue
+            event_time = event['time']
+            record_number = event.get('record_number')
+            if record_number is not None:
+                log_key = (event.get('computer'), event['log_name'])
+                mark = high_water.get(log_key)
+                # Po wyczyszczeniu dziennika numery zaczynają się od nowa, ale czas jest nowszy
+                if mark is not None and record_number <= mark[0] and event_time <= mark[1]:
+                    duplicates += 1
+                    continue
+                current = checked.get(log_key)
+                if current is None:
+                    checked[log_key] = (record_number, event_time)
+                elif record_number > current[0] or event_time > current[1]:
+                    checked[log_key] = (max(record_number, current[0]), max(event_time, current[1]))
+            elif self.is_duplicate((rule.name, event['log_name'], event.get('source'), event_time)):
+                continue
+            key = rule.key(event)
+            alert = batch.get(key)
+            if alert is None:
+                batch[key] = Alert(key, rule.title, rule.severity, time=event_time,
+                                   details={'event_id': event['event_id'], 'log_name': event['log_name'],
+                                            'source': event['source'], 'message': event['message']})
+            else:
+                alert.count += 1
+                alert.first_seen = min(alert.first_seen, event_time)
+                if event_time >= alert.last_seen:
+                    alert.last_seen = event_time
+                    alert.details['message'] = event['message']
+        with self._lock:
+            self.stats['duplicates'] += duplicates
+            for key, alert in batch.items():
+                self.stats['hits'] += alert.count
+                queued = self.pending.get(key)
+                if queued is None:
+                    self.pending[key] = alert
+                else:
+                    queued.absorb(alert)
+                    self.stats['aggregated'] += 1
+        if commit:
+            self.commit_checked(checked)
+
+    def commit_checked(self, checked: Dict):
+        """Przesuwa znaczniki dzienników po zakończonym przebiegu (check_events z checked)"""
+        with self._lock:
+            for log_key, (record_number, event_time) in checked.items():
+                mark = self._high_water.get(log_key)
+                if mark is None:
+                    self._high_water[log_key] = (record_number, event_time)
+                else:
+                    self._high_water[log_key] = (max(record_number, mark[0]), max(event_time, mark[1]))
+
+    def attach(self, analyzer, rules: Sequence[AlertRule] = DEFAULT_RULES):
+        """
+        Podłącza powiadomienia do analizatora
+
+        Reguły sprawdzają odczytywane zdarzenia (odbiorca zdarzeń - bez zdarzeń
+        z pamięci podręcznej podsumowań), a po analizie do kolejki trafiają
+        zagrożenia wykryte przez detektory i wykonywana jest wysyłka. Okno
+        deduplikacji jest wydłużane do okna analizy - zagrożenia wykryte
+        ponownie przy kolejnym odczycie tego samego okna nie są zgłaszane.
+        """
+        with self._lock:
+            self.dedup_window = max(self.dedup_window, _window_seconds(analyzer))
+        sink = _RuleSink(self, rules) if rules else None
+        if sink is not None:
+            analyzer.add_event_sink(sink)
+
+        def on_progress(stage: str, info: Dict):
+            if stage == 'analysis_done':
+                if sink is not None:
+                    self.commit_checked(sink.checked)
+                    sink.checked = {}
+                self.submit_all(alerts_from_findings(analyzer.security_findings))
+                self.flush()
+
+        analyzer.add_progress_callback(on_progress)
+
+    def scan(self, analyzer, rules: Sequence[AlertRule] = DEFAULT_RULES):
+        """Sprawdza zdarzenia i zagrożenia już przeanalizowanego analizatora (np. z migawki)"""
+        with self._lock:
+            self.dedup_window = max(self.dedup_window, _window_seconds(analyzer))
+        self.check_events(analyzer.events, rules)
+        self.submit_all(alerts_from_findings(analyzer.security_findings))
+
+    def flush(self, force: bool = False) -> int:
+        """
+        Wysyła powiadomienia, których klucze nie są ograniczone (throttle_window)
+
+        Args:
+            force: Wyślij wszystkie czekające powiadomienia, także ograniczone
+
+        Returns:
+            Liczba wysłanych powiadomień (z ponowień i nowych)
+        """
+        now = self.clock()
+        with self._lock:
+            # Odciski starsze niż okno deduplikacji
+            while self._fingerprints:
+                fingerprint, seen = next(iter(self._fingerprints.items()))
+                if now - seen < self.dedup_window:
+                    break
+                self._fingerprints.popitem(last=False)
+
+            ready = []
+            for key, alert in list(self.pending.items()):
+                last = self._last_sent.get(key)
+                if force or last is None or now - last >= self.throttle_window:
+                    ready.append(self.pending.pop(key))
+                    self._last_sent[key] = now
+            retries = self._retries
+            self._retries = {}
+
+        batches = [ready[start:start + self.batch_size] for start in range(0, len(ready), self.batch_size)]
+        sent = 0
+        for sink in self.sinks:
+            queue = retries.get(sink, []) + [(batch, 0) for batch in batches]
+            for batch, attempts in queue:
+                if self._send(sink, batch):
+                    sent += len(batch)
+                elif attempts + 1 < self.max_attempts:
+                    with self._lock:
+                        self._retries.setdefault(sink, []).append((batch, attempts + 1))
+                else:
+                    with self._lock:
+                        self.stats['dropped'] += len(batch)
+        return sent
+
+    def _send(self, sink: AlertSink, batch: List[Alert]) -> bool:
+        try:
+            sink.send(batch)
+        except Exception as e:
+            with self._lock:
+                self.stats['failed_batches'] += 1
+                self.errors.append((sink.name, f"{type(e).__name__}: {e}"))
+                del self.errors[:-20]
+            return False
+        with self._lock:
+            self.stats['sent'] += len(batch)
+            self.stats['batches'] += 1
+        return True
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def start(self):
+        """Uruchamia wysyłkę w tle co flush_interval sekund"""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='alert-dispatch', daemon=True)
+        self._thread.start()
+
+    def close(self, force: bool = True) -> int:
+        """
+        Zatrzymuje wysyłkę w tle, wysyła pozostałe powiadomienia i zamyka odbiorców
+
+        Args:
+            force: Wyślij także powiadomienia wstrzymane przez ograniczanie częstości
+        """
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        sent = self.flush(force=force)
+        with self._lock:
+            # Partie, których nie udało się wysłać do końca pracy, są tracone
+            self.stats['dropped'] += sum(len(batch) for batches in self._retries.values()
+                                         for batch, attempts in batches)
+            self._retries = {}
+        for sink in self.sinks:
+            sink.close()
+        return sent
+
+
+def parse_address(value: str, default_port: int) -> Tuple[str, int]:
+    """Adres HOST[:PORT] z linii poleceń"""
+    host, _, port = value.rpartition(':')
+    if not host:
+        return value, default_port
+    return host, int(port)
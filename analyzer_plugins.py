@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Wtyczki analizatora zdarzeń
+Własne analizy (statystyki, audyty, kontrole) wykonywane w jednym przebiegu
+po strumieniu zdarzeń, z sekcjami w raportach TXT i HTML
+"""
+
+from collections import defaultdict
+from html import escape as html_escape
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+# Poziomy ważności (EventSeverity) używane przez wbudowane wtyczki
+CRITICAL_SEVERITY = 1
+ERROR_SEVERITY = 2
+
+
+def html_table(headers: Iterable[str], rows: Iterable[Iterable]) -> str:
+    """Tabela HTML w stylu raportu (wartości są escapowane)"""
+    lines = ['<table class="event-table">', '<thead><tr>']
+    lines.extend(f'<th>{html_escape(str(header))}</th>' for header in headers)
+    lines.append('</tr></thead>')
+    lines.append('<tbody>')
+    for row in rows:
+        lines.append('<tr>' + ''.join(f'<td>{html_escape(str(value))}</td>' for value in row) + '</tr>')
+    lines.append('</tbody>')
+    lines.append('</table>')
+    return "\n".join(lines)
+
+
+class AnalyzerPlugin:
+    """
+    Bazowa klasa wtyczki analizatora
+
+    Wtyczka deklaruje interesujące ją Event ID (event_ids) i dzienniki (logs)
+    - None oznacza wszystkie. Dyspozytor przekazuje do on_event tylko pasujące
+    zdarzenia, po odczycie wywołuje on_finish, a render_txt / render_html
+    tworzą treść sekcji raportu (sekcja jest pomijana, gdy obie są puste).
+
+    Zdarzenia napływają dziennikami, w obrębie dziennika od najnowszych.
+    W trybie przybliżonym (approximate) zdarzenia nie mają pól w magazynie
+    analizatora, a przy pamięci podręcznej podsumowań wtyczki widzą tylko
+    zdarzenia faktycznie odczytane.
+
+    Przykład:
+        class ServiceCrashes(AnalyzerPlugin):
+            name = 'service_crashes'
+            title = 'Awarie usług'
+            event_ids = (7031, 7034)
+            logs = ('System',)
+
+            def __init__(self):
+                self.count = 0
+
+            def on_event(self, event):
+                self.count += 1
+
+            def render_txt(self):
+                return [f"Nieoczekiwane zatrzymania usług: {self.count}"]
+
+        analyzer.add_plugin(ServiceCrashes())
+    """
+
+    # Identyfikator wtyczki i tytuł sekcji raportu
+    name = 'plugin'
+    title = 'Wtyczka'
+    # Event ID i dzienniki przekazywane do on_event (None - wszystkie)
+    event_ids: Optional[Iterable[int]] = None
+    logs: Optional[Iterable[str]] = None
+
+    def accepts(self, log_name: str, event_id: int) -> bool:
+        """Czy zdarzenia o tym dzienniku i Event ID trafiają do wtyczki"""
+        return ((self.logs is None or log_name in self.logs)
+                and (self.event_ids is None or event_id in self.event_ids))
+
+    def on_event(self, event: Dict):
+        """Przetwarza pojedyncze zdarzenie"""
+
+    def on_finish(self, analyzer):
+        """Kończy analizę (analyzer daje dostęp do pól, treści i wyników detektorów)"""
+
+    def render_txt(self) -> List[str]:
+        """Wiersze sekcji raportu tekstowego"""
+        return []
+
+    def render_html(self) -> str:
+        """Treść sekcji raportu HTML (domyślnie wiersze render_txt)"""
+        lines = self.render_txt()
+        if not lines:
+            return ''
+        return f'<pre>{html_escape(chr(10).join(lines))}</pre>'
+
+
+class PluginDispatcher:
+    """
+    Rozdziela zdarzenia do wtyczek w jednym przebiegu
+
+    Dla każdej pary (dziennik, Event ID) krotka metod on_event pasujących
+    wtyczek jest wyznaczana raz i zapamiętywana w tablicy tras - zdarzenie
+    wywołuje tylko wtyczki, które je zadeklarowały.
+    """
+
+    def __init__(self, plugins: Iterable[AnalyzerPlugin] = ()):
+        self.plugins = []
+        self._routes = {}
+        for plugin in plugins:
+            self.register(plugin)
+
+    def __len__(self) -> int:
+        return len(self.plugins)
+
+    def register(self, plugin: AnalyzerPlugin):
+        """Dodaje wtyczkę (tablica tras jest budowana od nowa)"""
+        self.plugins.append(plugin)
+        self._routes.clear()
+
+    def _route(self, key: Tuple[str, int]) -> Tuple:
+        log_name, event_id = key
+        handlers = tuple(plugin.on_event for plugin in self.plugins if plugin.accepts(log_name, event_id))
+        self._routes[key] = handlers
+        return handlers
+
+    def add_events(self, events: Iterable[Dict]):
+        """Przekazuje wtyczkom partię zdarzeń"""
+        routes = self._routes
+        for event in events:
+            key = (event['log_name'], event['event_id'])
+            handlers = routes.get(key)
+            if handlers is None:
+                handlers = self._route(key)
+            for handler in handlers:
+                handler(event)
+
+    def finish(self, analyzer):
+        for plugin in self.plugins:
+            plugin.on_finish(analyzer)
+
+    def sections(self) -> List[Tuple[AnalyzerPlugin, List[str], str]]:
+        """Niepuste sekcje raportu: (wtyczka, wiersze TXT, treść HTML)"""
+        sections = []
+        for plugin in self.plugins:
+            lines = plugin.render_txt()
+            html = plugin.render_html()
+            if lines or html:
+                sections.append((plugin, lines, html))
+        return sections
+
+    def render_txt(self) -> List[str]:
+        """Sekcje wtyczek w formacie raportu tekstowego"""
+        report_lines = []
+        for plugin, lines, html in self.sections():
+            if not lines:
+                continue
+            report_lines.append("-" * 80)
+            report_lines.append(plugin.title.upper())
+            report_lines.append("-" * 80)
+            report_lines.extend(f"  {line}" for line in lines)
+            report_lines.append("")
+        return report_lines
+
+    def render_html(self) -> str:
+        """Sekcje wtyczek w formacie raportu HTML"""
+        html = []
+        for plugin, lines, content in self.sections():
+            if not content:
+                continue
+            html.append(f"""
+            <div class="section">
+                <h2 class="section-title">🧩 {html_escape(plugin.title)}</h2>
+                {content}
+            </div>""")
+        return "".join(html)
+
+
+class LogStatisticsPlugin(AnalyzerPlugin):
+    """Liczba zdarzeń, błędów i zdarzeń krytycznych w każdym dzienniku"""
+
+    name = 'log_stats'
+    title = 'Statystyki dzienników'
+
+    def __init__(self):
+        self.counts = defaultdict(lambda: [0, 0, 0])
+
+    def on_event(self, event: Dict):
+        counts = self.counts[event['log_name']]
+        counts[0] += 1
+        if event['severity'] == ERROR_SEVERITY:
+            counts[1] += 1
+        elif event['severity'] == CRITICAL_SEVERITY:
+            counts[2] += 1
+
+    def render_txt(self) -> List[str]:
+        return [f"{log_name:15} : łącznie {total:8,}, błędy {errors:6,}, krytyczne {critical:6,}"
+                for log_name, (total, errors, critical) in self.counts.items()]
+
+    def render_html(self) -> str:
+        if not self.counts:
+            return ''
+        return html_table(('Dziennik', 'Łącznie', 'Błędy', 'Krytyczne'),
+                          ((log_name, f"{total:,}", f"{errors:,}", f"{critical:,}")
+                           for log_name, (total, errors, critical) in self.counts.items()))
+
+
+class TopErrorSourcesPlugin(AnalyzerPlugin):
+    """Źródła z największą liczbą błędów i zdarzeń krytycznych"""
+
+    name = 'top_sources'
+    title = 'Źródła z największą liczbą błędów'
+
+    def __init__(self, limit: int = 5):
+        self.limit = limit
+        self.counts = defaultdict(int)
+
+    def on_event(self, event: Dict):
+        if event['severity'] <= ERROR_SEVERITY:
+            self.counts[event['source']] += 1
+
+    def top(self) -> List[Tuple[str, int]]:
+        return sorted(self.counts.items(), key=lambda item: (-item[1], item[0]))[:self.limit]
+
+    def render_txt(self) -> List[str]:
+        return [f"{source:40} : {count:6} błędów" for source, count in self.top()]
+
+    def render_html(self) -> str:
+        top = self.top()
+        return html_table(('Źródło', 'Błędy'), top) if top else ''
+
+
+class HourlyBreakdownPlugin(AnalyzerPlugin):
+    """Rozkład błędów i zdarzeń krytycznych według godziny doby"""
+
+    name = 'hourly'
+    title = 'Rozkład błędów według godzin'
+
+    def __init__(self):
+        self.counts = [0] * 24
+
+    def on_event(self, event: Dict):
+        if event['severity'] <= ERROR_SEVERITY:
+            self.counts[event['time'].hour] += 1
+
+    def render_txt(self) -> List[str]:
+        return [f"{hour:02d}:00 | {'█' * (count // 5 or 1)} ({count})"
+                for hour, count in enumerate(self.counts) if count]
+
+    def render_html(self) -> str:
+        peak = max(self.counts)
+        if not peak:
+            return ''
+        rows = []
+        for hour, count in enumerate(self.counts):
+            width = count * 100 // peak
+            rows.append(f'<tr><td>{hour:02d}:00</td><td>{count}</td>'
+                        f'<td><div style="background: #667eea; height: 12px; width: {width}%;"></div></td></tr>')
+        return ('<table class="event-table">\n<thead><tr><th>Godzina</th><th>Błędy</th><th></th></tr></thead>\n'
+                '<tbody>\n' + "\n".join(rows) + '\n</tbody>\n</table>')
+
+
+class SecurityAuditPlugin(AnalyzerPlugin):
+    """Udane i nieudane logowania oraz konta i adresy z największą liczbą nieudanych prób"""
+
+    name = 'security_audit'
+    title = 'Audyt logowań'
+    event_ids = (4624, 4625)
+    logs = ('Security',)
+
+    # Liczba nieudanych logowań, powyżej której audyt wyświetla ostrzeżenie
+    FAILED_THRESHOLD = 10
+
+    def __init__(self, limit: int = 10):
+        self.limit = limit
+        self.successful = 0
+        self.failed = 0
+        self.failed_events = []
+        self.failed_by_account = []
+        self.findings = 0
+
+    def on_event(self, event: Dict):
+        if event['event_id'] == 4625:
+            self.failed_events.append(event)
+        else:
+            self.successful += 1
+
+    def on_finish(self, analyzer):
+        counts = defaultdict(int)
+        for event in self.failed_events:
+            user = analyzer.get_event_field(event, 'TargetUserName') or '-'
+            address = analyzer.get_event_field(event, 'IpAddress') or '-'
+            counts[(user, address)] += 1
+        self.failed_by_account = sorted(counts.items(), key=lambda item: (-item[1], item[0]))[:self.limit]
+        self.failed = len(self.failed_events)
+        self.findings = len(analyzer.security_findings)
+
+    def render_txt(self) -> List[str]:
+        lines = [f"Udane logowania: {self.successful}",
+                 f"Nieudane próby logowania: {self.failed}",
+                 f"Wykryte zagrożenia: {self.findings}"]
+        if self.failed_by_account:
+            lines.append("Nieudane logowania według konta i adresu IP:")
+            lines.extend(f"  {user:25} z {address:20} : {count} prób"
+                         for (user, address), count in self.failed_by_account)
+        if self.failed > self.FAILED_THRESHOLD:
+            lines.append(f"[!] {self.failed} nieudanych prób logowania może wskazywać na próby włamania")
+        return lines
+
+    def render_html(self) -> str:
+        html = [f"<p>Udane logowania: <strong>{self.successful}</strong>, "
+                f"nieudane próby: <strong>{self.failed}</strong>, "
+                f"wykryte zagrożenia: <strong>{self.findings}</strong></p>"]
+        if self.failed_by_account:
+            html.append(html_table(('Konto', 'Adres IP', 'Nieudane próby'),
+                                   ((user, address, count) for (user, address), count in self.failed_by_account)))
+        return "\n".join(html)
+
+
+class DiskHealthPlugin(AnalyzerPlugin):
+    """Błędy dysku (uszkodzone bloki, ponawiane i nieudane operacje wejścia/wyjścia)"""
+
+    name = 'disk_health'
+    title = 'Stan dysków'
+    logs = ('System',)
+
+    DISK_EVENTS = {
+        7: "Uszkodzony blok na urządzeniu",
+        51: "Błąd dysku podczas stronicowania",
+        153: "Ponowiona operacja wejścia/wyjścia",
+        154: "Operacja wejścia/wyjścia zakończona błędem sprzętowym",
+    }
+    event_ids = tuple(DISK_EVENTS)
+
+    def __init__(self, limit: int = 10):
+        self.limit = limit
+        self.counts = defaultdict(int)
+        # Najnowsze błędy (zdarzenia dziennika napływają od najnowszych)
+        self.latest = []
+
+    def on_event(self, event: Dict):
+        self.counts[event['event_id']] += 1
+        if len(self.latest) < self.limit:
+            self.latest.append((event['time'], event['event_id'], event['source']))
+
+    def render_txt(self) -> List[str]:
+        total = sum(self.counts.values())
+        if not total:
+            return ["[OK] Nie wykryto problemów z dyskiem"]
+        lines = [f"[!] Wykryto {total} błędów dysku - wykonaj kopię zapasową danych!"]
+        lines.extend(f"Event ID {event_id:5} ({count:3}x) : {self.DISK_EVENTS[event_id]}"
+                     for event_id, count in sorted(self.counts.items()))
+        lines.append("Najnowsze:")
+        lines.extend(f"  {time.strftime('%Y-%m-%d %H:%M:%S')}  Event ID {event_id:5}  {source}"
+                     for time, event_id, source in self.latest)
+        return lines
+
+    def render_html(self) -> str:
+        if not self.counts:
+            return '<p>✓ Nie wykryto problemów z dyskiem</p>'
+        return html_table(('Czas', 'Event ID', 'Źródło', 'Problem'),
+                          ((time.strftime('%Y-%m-%d %H:%M:%S'), event_id, source, self.DISK_EVENTS[event_id])
+                           for time, event_id, source in self.latest))
+
+
+# Wbudowane wtyczki według identyfikatora (opcja --plugin)
+BUILTIN_PLUGINS = {
+    plugin.name: plugin
+    for plugin in (LogStatisticsPlugin, TopErrorSourcesPlugin, HourlyBreakdownPlugin,
+                   SecurityAuditPlugin, DiskHealthPlugin)
+}
@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Eksport kolumnowy zdarzeń i podsumowań (Apache Parquet / Arrow IPC)
+Zapis strumieniowy w partiach w trakcie odczytu dzienników, z kodowaniem
+słownikowym tekstów, partycjonowaniem według hosta i daty oraz odczytem
+zwrotnym bez kopiowania (pliki Arrow IPC mapowane w pamięci)
+"""
+
+import os
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+
+# Obsługiwane formaty: rozszerzenie pliku
+EXPORT_FORMATS = {
+    'parquet': 'parquet',
+    'arrow': 'arrow',
+}
+
+# Kompresje buforów Arrow IPC (Parquet obsługuje też m.in. 'snappy' i 'gzip')
+IPC_COMPRESSIONS = ('lz4', 'zstd')
+
+# Kolumny partycjonowania: nazwa katalogu -> funkcja wyznaczająca wartość ze zdarzenia
+PARTITION_KEYS = {
+    'host': lambda event: event.get('computer') or 'unknown',
+    'date': lambda event: event['time'].strftime('%Y-%m-%d'),
+    'log': lambda event: event['log_name'],
+}
+
+# Nazwy poziomów ważności przy odczycie zwrotnym (jak EventSeverity.NAMES)
+SEVERITY_NAMES = {1: 'KRYTYCZNY', 2: 'BŁĄD', 3: 'OSTRZEŻENIE', 4: 'INFORMACJA'}
+
+
+def require_pyarrow():
+    """Zgłasza ImportError z instrukcją instalacji, gdy pyarrow nie jest dostępny"""
+    if pa is None:
+        raise ImportError("Eksport Parquet / Arrow wymaga pakietu: pip install pyarrow")
+
+
+def event_schema(include_messages: bool = False):
+    """
+    Schemat tabeli zdarzeń
+
+    Teksty o małej liczbie różnych wartości (dziennik, źródło, komputer, SID)
+    są kodowane słownikowo, czas jest liczbą sekund (timestamp[s]).
+    """
+    require_pyarrow()
+    dictionary = pa.dictionary(pa.int32(), pa.string())
+    fields = [
+        pa.field('log_name', dictionary),
+        pa.field('event_id', pa.uint16()),
+        pa.field('source', dictionary),
+        pa.field('time', pa.timestamp('s')),
+        pa.field('severity', pa.uint8()),
+        pa.field('category', pa.int32()),
+        pa.field('record_number', pa.int64()),
+        pa.field('computer', dictionary),
+        pa.field('user_sid', dictionary),
+        pa.field('message', pa.string()),
+    ]
+    if include_messages:
+        fields.append(pa.field('full_message', pa.string()))
+    return pa.schema(fields)
+
+
+# Kolumny kodowane słownikowo
+DICTIONARY_COLUMNS = ('log_name', 'source', 'computer', 'user_sid')
+
+
+class _Partition:
+    """
+    Bufor kolumn i otwarty plik jednej partycji
+
+    Słowniki kolumn tekstowych są wspólne dla wszystkich partii pliku
+    (kolejne partie jedynie je rozszerzają), więc plik Arrow IPC zawiera
+    tylko przyrosty słowników, a kody wartości są stałe w całym pliku.
+    """
+
+    def __init__(self, path: str, schema):
+        self.path = path
+        self.schema = schema
+        self.columns = {name: [] for name in schema.names}
+        self.codes = {name: {} for name in DICTIONARY_COLUMNS}
+        self.dictionaries = {name: [] for name in DICTIONARY_COLUMNS}
+        self.rows = 0
+        self.writer = None
+
+    def encode(self, name: str, value: Optional[str]) -> Optional[int]:
+        """Zwraca kod wartości w słowniku kolumny (None dla braku wartości)"""
+        if value is None:
+            return None
+        codes = self.codes[name]
+        code = codes.get(value)
+        if code is None:
+            code = len(codes)
+            codes[value] = code
+            self.dictionaries[name].append(value)
+        return code
+
+    def to_batch(self):
+        arrays = []
+        for field in self.schema:
+            values = self.columns[field.name]
+            if field.name in self.dictionaries:
+                arrays.append(pa.DictionaryArray.from_arrays(
+                    pa.array(values, pa.int32()), pa.array(self.dictionaries[field.name], pa.string())
+                ))
+            else:
+                arrays.append(pa.array(values, type=field.type))
+        self.columns = {name: [] for name in self.schema.names}
+        self.rows = 0
+        return pa.RecordBatch.from_arrays(arrays, schema=self.schema)
+
+
+class ArrowEventWriter:
+    """
+    Strumieniowy zapis zdarzeń do plików Parquet lub Arrow IPC
+
+    Zdarzenia są buforowane kolumnowo per partycja i zapisywane partiami
+    po row_group_size wierszy (jedna grupa wierszy Parquet / jeden rekord
+    Arrow na partię), więc pamięć nie zależy od liczby zdarzeń.
+
+    Przykład:
+        with ArrowEventWriter('eksport', partition_by=('host', 'date')) as writer:
+            analyzer.add_event_sink(writer)
+            analyzer.analyze_events()
+        # eksport/host=PC01/date=2025-01-05/part-0.parquet
+    """
+
+    def __init__(self, path: str, format: str = 'parquet', partition_by: Iterable[str] = (),
+                 row_group_size: int = 128 * 1024, compression: str = 'zstd',
+                 include_messages: bool = False,
+                 message_getter: Callable[[Dict], str] = None):
+        """
+        Args:
+            path: Katalog wyjściowy (z partycjami) lub plik (bez partycji)
+            format: 'parquet' lub 'arrow' (Arrow IPC - odczyt bez kopiowania przez mmap)
+            partition_by: Kolumny partycjonowania: 'host', 'date', 'log' (katalogi w stylu Hive)
+            row_group_size: Liczba wierszy w grupie wierszy / partii zapisu
+            compression: Kompresja: Parquet - np. 'zstd', 'snappy', 'lz4'; Arrow IPC -
+                         tylko 'zstd' lub 'lz4'; None - bez kompresji
+            include_messages: Zapisuj pełne treści wiadomości (kolumna full_message)
+            message_getter: Funkcja zwracająca pełną treść zdarzenia (np. analyzer.get_message)
+        """
+        require_pyarrow()
+        if format not in EXPORT_FORMATS:
+            raise ValueError(f"Nieobsługiwany format eksportu: {format}")
+        if format == 'arrow' and compression is not None and compression not in IPC_COMPRESSIONS:
+            raise ValueError(f"Arrow IPC nie obsługuje kompresji {compression} (tylko: {', '.join(IPC_COMPRESSIONS)})")
+        unknown = [key for key in partition_by if key not in PARTITION_KEYS]
+        if unknown:
+            raise ValueError(f"Nieznane kolumny partycjonowania: {', '.join(unknown)}")
+
+        self.path = path
+        self.format = format
+        self.partition_by = tuple(partition_by)
+        self.row_group_size = row_group_size
+        self.compression = compression
+        self.include_messages = include_messages
+        self.message_getter = message_getter
+        self.schema = event_schema(include_messages)
+        self.rows_written = 0
+        self.files = []
+        self._partitions = {}
+        self._closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _partition_path(self, values) -> str:
+        if not self.partition_by:
+            return self.path
+        directory = os.path.join(self.path, *(
+            f"{key}={value}" for key, value in zip(self.partition_by, values)
+        ))
+        return os.path.join(directory, f"part-0.{EXPORT_FORMATS[self.format]}")
+
+    def _partition_for(self, event: Dict) -> _Partition:
+        values = tuple(PARTITION_KEYS[key](event) for key in self.partition_by)
+        partition = self._partitions.get(values)
+        if partition is None:
+            partition = _Partition(self._partition_path(values), self.schema)
+            self._partitions[values] = partition
+        return partition
+
+    def write(self, events: Iterable[Dict]):
+        """Dopisuje partię zdarzeń"""
+        include_messages = self.include_messages
+        message_getter = self.message_getter
+        for event in events:
+            partition = self._partition_for(event)
+            columns = partition.columns
+            encode = partition.encode
+            columns['log_name'].append(encode('log_name', event['log_name']))
+            columns['event_id'].append(event['event_id'])
+            columns['source'].append(encode('source', event['source']))
+            columns['time'].append(event['time'])
+            columns['severity'].append(event['severity'])
+            columns['category'].append(event.get('category'))
+            columns['record_number'].append(event.get('record_number'))
+            columns['computer'].append(encode('computer', event.get('computer')))
+            columns['user_sid'].append(encode('user_sid', event.get('user_sid')))
+            columns['message'].append(event['message'])
+            if include_messages:
+                message = event.get('full_message')
+                if message is None and message_getter is not None:
+                    message = message_getter(event)
+                columns['full_message'].append(message)
+            partition.rows += 1
+            if partition.rows >= self.row_group_size:
+                self._flush(partition)
+
+    def _flush(self, partition: _Partition):
+        if not partition.rows:
+            return
+        batch = partition.to_batch()
+        if partition.writer is None:
+            directory = os.path.dirname(partition.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            if self.format == 'parquet':
+                partition.writer = pq.ParquetWriter(partition.path, self.schema, compression=self.compression)
+            else:
+                options = pa.ipc.IpcWriteOptions(compression=self.compression, emit_dictionary_deltas=True)
+                partition.writer = pa.ipc.new_file(partition.path, self.schema, options=options)
+            self.files.append(partition.path)
+        if self.format == 'parquet':
+            partition.writer.write_batch(batch, row_group_size=self.row_group_size)
+        else:
+            partition.writer.write_batch(batch)
+        self.rows_written += batch.num_rows
+
+    def close(self) -> List[str]:
+        """
+        Zapisuje pozostałe bufory i zamyka pliki
+
+        Returns:
+            Lista zapisanych plików
+        """
+        if not self._closed:
+            self._closed = True
+            for partition in self._partitions.values():
+                self._flush(partition)
+                if partition.writer is not None:
+                    partition.writer.close()
+        return self.files
+
+
+def export_summary_tables(summary, directory: str, format: str = 'parquet') -> List[str]:
+    """
+    Zapisuje tabele podsumowania (Event ID, źródła, szablony, grupy, dzienniki)
+
+    Args:
+        summary: Podsumowanie analizy (ReportSummary)
+        directory: Katalog wyjściowy
+        format: 'parquet' lub 'arrow'
+
+    Returns:
+        Lista zapisanych plików ({katalog}/summary_{tabela}.{rozszerzenie})
+    """
+    require_pyarrow()
+    groups = sorted(summary.groups.values(), key=lambda group: (group.event_id, group.severity))
+    tables = {
+        'event_ids': pa.table({
+            'event_id': pa.array(list(summary.event_id_counts), pa.uint16()),
+            'count': pa.array(list(summary.event_id_counts.values()), pa.int64()),
+        }),
+        'sources': pa.table({
+            'source': pa.array(list(summary.source_counts), pa.string()),
+            'count': pa.array(list(summary.source_counts.values()), pa.int64()),
+        }),
+        'templates': pa.table({
+            'source': pa.array([source for source, _ in summary.template_counts], pa.string()),
+            'event_id': pa.array([event_id for _, event_id in summary.template_counts], pa.uint16()),
+            'count': pa.array(list(summary.template_counts.values()), pa.int64()),
+        }),
+        'logs': pa.table({
+            'log_name': pa.array(list(summary.log_counts), pa.string()),
+            'count': pa.array(list(summary.log_counts.values()), pa.int64()),
+        }),
+        'groups': pa.table({
+            'event_id': pa.array([group.event_id for group in groups], pa.uint16()),
+            'severity': pa.array([group.severity for group in groups], pa.uint8()),
+            'count': pa.array([group.count for group in groups], pa.int64()),
+            'first_seen': pa.array([group.first_seen for group in groups], pa.timestamp('s')),
+            'last_seen': pa.array([group.last_seen for group in groups], pa.timestamp('s')),
+        }),
+    }
+
+    os.makedirs(directory, exist_ok=True)
+    files = []
+    for name, table in tables.items():
+        filename = os.path.join(directory, f"summary_{name}.{EXPORT_FORMATS[format]}")
+        if format == 'parquet':
+            pq.write_table(table, filename)
+        else:
+            with pa.ipc.new_file(filename, table.schema) as writer:
+                writer.write_table(table)
+        files.append(filename)
+    return files
+
+
+def read_events(path: str):
+    """
+    Wczytuje wyeksportowane zdarzenia jako tabelę Arrow
+
+    Pliki Arrow IPC są mapowane w pamięci (bez kopiowania i dekodowania),
+    katalogi z partycjami są czytane jako jeden zbiór danych.
+
+    Args:
+        path: Plik .parquet / .arrow lub katalog eksportu
+    """
+    require_pyarrow()
+    if path.endswith('.arrow'):
+        with pa.memory_map(path) as source:
+            return pa.ipc.open_file(source).read_all()
+    if os.path.isdir(path) and any(name.endswith('.arrow') for _, _, names in os.walk(path) for name in names):
+        import pyarrow.dataset as ds
+        return ds.dataset(path, format='arrow', partitioning='hive').to_table()
+    return pq.read_table(path)
+
+
+def iter_table_events(table, batch_size: int = 64 * 1024) -> Iterator[Dict]:
+    """
+    Odtwarza zdarzenia (słowniki jak z read_event_log) z tabeli Arrow
+
+    Pozwala przeliczyć podsumowanie z eksportu bez ponownego odczytu dzienników:
+        summary = ReportSummary()
+        summary.add_events(iter_table_events(read_events('eksport')))
+    """
+    for batch in table.to_batches(max_chunksize=batch_size):
+        for row in batch.to_pylist():
+            event = {
+                'log_name': row['log_name'],
+                'event_id': row['event_id'],
+                'source': row['source'],
+                'time': row['time'],
+                'severity': row['severity'],
+                'severity_name': SEVERITY_NAMES.get(row['severity'], str(row['severity'])),
+                'message': row['message'],
+                'message_ref': None,
+                'category': row.get('category'),
+                'record_number': row.get('record_number'),
+                'computer': row.get('computer', row.get('host')),
+                'user_sid': row.get('user_sid'),
+                'field_row': None,
+            }
+            if 'full_message' in row:
+                event['full_message'] = row['full_message']
+            yield event
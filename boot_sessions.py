@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Oś czasu sesji uruchomieniowych
+Podział uporządkowanego czasowo strumienia zdarzeń na sesje od uruchomienia
+do wyłączenia (6005/6006/6008/41/1001/1074) w jednym liniowym przebiegu
+"""
+
+from bisect import bisect_right
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional
+
+
+TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# Znaczniki sesji w dzienniku System
+EVENT_LOG_STARTED = 6005
+EVENT_LOG_STOPPED = 6006
+UNEXPECTED_SHUTDOWN = 6008
+KERNEL_POWER = 41
+BUGCHECK = 1001
+SHUTDOWN_INITIATED = 1074
+
+# 1001 w dzienniku System oznacza zrzut po BSOD tylko dla tych źródeł
+BUGCHECK_SOURCES = {'BugCheck', 'Microsoft-Windows-WER-SystemErrorReporting'}
+
+# Zdarzenia 41/6008/1001 są zapisywane przy starcie kolejnej sesji i dotyczą
+# poprzedniej - jeśli pojawią się do tylu minut po 6005
+BOOT_GRACE = timedelta(minutes=10)
+
+# Poziom ważności ERROR (jak EventSeverity.ERROR) - błędy liczone per sesja
+ERROR_SEVERITY = 2
+
+
+def _format_time(value: Optional[datetime]) -> Optional[str]:
+    return value.strftime(TIME_FORMAT) if value else None
+
+
+def _parse_time(value: Optional[str]) -> Optional[datetime]:
+    return datetime.strptime(value, TIME_FORMAT) if value else None
+
+
+class BootSession:
+    """Jedna sesja systemu - od uruchomienia (6005) do wyłączenia lub awarii"""
+
+    CLEAN = 'clean'
+    UNEXPECTED = 'unexpected'
+    BSOD = 'bsod'
+    ONGOING = 'ongoing'
+    UNKNOWN = 'unknown'
+
+    NAMES = {
+        CLEAN: "Poprawne wyłączenie",
+        UNEXPECTED: "Nieoczekiwane wyłączenie",
+        BSOD: "Błąd krytyczny (BSOD)",
+        ONGOING: "Trwa",
+        UNKNOWN: "Nieznane",
+    }
+
+    def __init__(self, index: int, boot_time: Optional[datetime]):
+        """
+        Args:
+            index: Numer sesji na osi czasu (od 1)
+            boot_time: Czas uruchomienia (None - sesja rozpoczęta przed okresem analizy)
+        """
+        self.index = index
+        self.boot_time = boot_time
+        # Komputer (lub pliki części analizy rozproszonej), z którego pochodzi sesja
+        self.origin = None
+        self.end_time = None
+        self.end_type = None
+        self.closed = False
+        self.first_event_time = None
+        self.last_event_time = None
+        self.shutdown_initiator = None
+        self.shutdown_type = None
+        self.shutdown_reason = None
+        self.bugcheck = None
+        self.total_events = 0
+        self.severity_counts = {}
+        self.error_counts = {}
+
+    @property
+    def status(self) -> str:
+        """Sposób zakończenia sesji (CLEAN, UNEXPECTED, BSOD, ONGOING, UNKNOWN)"""
+        if self.end_type is not None:
+            return self.end_type
+        return self.UNKNOWN if self.closed else self.ONGOING
+
+    @property
+    def status_name(self) -> str:
+        return self.NAMES[self.status]
+
+    @property
+    def start(self) -> Optional[datetime]:
+        """Początek sesji (czas uruchomienia lub pierwsze zdarzenie w okresie analizy)"""
+        return self.boot_time or self.first_event_time
+
+    @property
+    def end(self) -> Optional[datetime]:
+        """Koniec sesji (6006 lub ostatnie zdarzenie przed kolejnym uruchomieniem)"""
+        return self.end_time or self.last_event_time
+
+    @property
+    def duration(self) -> Optional[timedelta]:
+        if self.start is None or self.end is None:
+            return None
+        return self.end - self.start
+
+    @property
+    def duration_text(self) -> str:
+        """Czas trwania w postaci "2 d 03:15:00" (lub "-" gdy nieznany)"""
+        duration = self.duration
+        if duration is None:
+            return "-"
+        hours, remainder = divmod(int(duration.total_seconds()) % 86400, 3600)
+        text = f"{hours:02}:{remainder // 60:02}:{remainder % 60:02}"
+        return f"{duration.days} d {text}" if duration.days else text
+
+    @property
+    def error_total(self) -> int:
+        return sum(self.error_counts.values())
+
+    def top_errors(self, limit: int = 10) -> List:
+        """Najczęstsze błędy i zdarzenia krytyczne sesji jako lista (event_id, liczba)"""
+        return sorted(self.error_counts.items(), key=lambda x: (-x[1], x[0]))[:limit]
+
+    def add_event(self, event: Dict):
+        """Dolicza zdarzenie do agregatów sesji"""
+        time = event['time']
+        if self.first_event_time is None:
+            self.first_event_time = time
+        if self.origin is None:
+            self.origin = event.get('computer') or None
+        self.last_event_time = time
+        self.total_events += 1
+        severity = event['severity']
+        self.severity_counts[severity] = self.severity_counts.get(severity, 0) + 1
+        if severity <= ERROR_SEVERITY:
+            event_id = event['event_id']
+            self.error_counts[event_id] = self.error_counts.get(event_id, 0) + 1
+
+    def close(self):
+        """Zamyka sesję przy kolejnym uruchomieniu systemu"""
+        self.closed = True
+
+    def to_dict(self) -> Dict:
+        return {
+            'index': self.index,
+            'origin': self.origin,
+            'boot_time': _format_time(self.boot_time),
+            'end_time': _format_time(self.end_time),
+            'end_type': self.end_type,
+            'status': self.status,
+            'closed': self.closed,
+            'first_event_time': _format_time(self.first_event_time),
+            'last_event_time': _format_time(self.last_event_time),
+            'shutdown_initiator': self.shutdown_initiator,
+            'shutdown_type': self.shutdown_type,
+            'shutdown_reason': self.shutdown_reason,
+            'bugcheck': self.bugcheck,
+            'total_events': self.total_events,
+            'severity_counts': {str(k): v for k, v in sorted(self.severity_counts.items())},
+            'error_counts': {str(k): v for k, v in sorted(self.error_counts.items())},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'BootSession':
+        """Odtwarza sesję z postaci słownikowej (to_dict)"""
+        session = cls(data['index'], _parse_time(data['boot_time']))
+        session.origin = data.get('origin')
+        session.end_time = _parse_time(data['end_time'])
+        session.end_type = data['end_type']
+        session.closed = data['closed']
+        session.first_event_time = _parse_time(data['first_event_time'])
+        session.last_event_time = _parse_time(data['last_event_time'])
+        session.shutdown_initiator = data['shutdown_initiator']
+        session.shutdown_type = data['shutdown_type']
+        session.shutdown_reason = data['shutdown_reason']
+        session.bugcheck = data['bugcheck']
+        session.total_events = data['total_events']
+        session.severity_counts = {int(k): v for k, v in data['severity_counts'].items()}
+        session.error_counts = {int(k): v for k, v in data['error_counts'].items()}
+        return session
+
+
+class BootTimeline:
+    """
+    Dzieli zdarzenia (rosnąco według czasu) na sesje uruchomieniowe
+
+    Każde zdarzenie jest doliczane do sesji trwającej w chwili jego zapisu,
+    więc podział wymaga jednego przebiegu. Oś czasu można kontynuować od
+    sesji zapisanych wcześniej (np. w pamięci podręcznej) - zdarzenia nie
+    nowsze niż ostatnie zdarzenie tych sesji są wtedy pomijane.
+
+    Przykład:
+        timeline = BootTimeline(analyzer.get_event_field)
+        timeline.add_events(reversed(analyzer.events))
+        for session in timeline.sessions:
+            print(session.index, session.start, session.status_name, session.top_errors(3))
+    """
+
+    def __init__(self, field_getter: Callable[[Dict, str], Optional[str]] = None,
+                 sessions: Iterable[BootSession] = ()):
+        """
+        Args:
+            field_getter: Funkcja (zdarzenie, nazwa pola) -> wartość, np. analyzer.get_event_field
+            sessions: Sesje, od których oś czasu jest kontynuowana
+        """
+        self.field_getter = field_getter
+        self.sessions = list(sessions)
+        # Czasy uruchomienia do wyszukiwania binarnego (sesja sprzed okresu analizy - datetime.min)
+        self._boot_times = [session.boot_time or datetime.min for session in self.sessions]
+        # Zdarzenia do tej chwili zostały już doliczone do kontynuowanych sesji
+        last = self.sessions[-1] if self.sessions else None
+        self.resume_after = last.last_event_time if last else None
+
+    def _field(self, event: Dict, name: str) -> Optional[str]:
+        if self.field_getter is None:
+            return None
+        value = self.field_getter(event, name)
+        return value if value not in (None, '', '-') else None
+
+    def _start_session(self, boot_time: Optional[datetime]) -> BootSession:
+        if self.sessions:
+            self.sessions[-1].close()
+        session = BootSession(len(self.sessions) + 1, boot_time)
+        self.sessions.append(session)
+        self._boot_times.append(boot_time or datetime.min)
+        return session
+
+    def _crashed_session(self, time: datetime) -> Optional[BootSession]:
+        """Sesja, której dotyczy znacznik awarii zapisany w chwili time"""
+        current = self.sessions[-1]
+        if current.boot_time is not None and time - current.boot_time <= BOOT_GRACE:
+            # Znacznik zapisany tuż po starcie - dotyczy poprzedniej sesji
+            return self.sessions[-2] if len(self.sessions) > 1 else None
+        return current
+
+    def add_event(self, event: Dict):
+        """Przetwarza kolejne zdarzenie (zdarzenia muszą być uporządkowane rosnąco)"""
+        time = event['time']
+        if self.resume_after is not None and time <= self.resume_after:
+            return
+
+        is_system = event['log_name'] == 'System'
+        event_id = event['event_id']
+        if is_system and event_id == EVENT_LOG_STARTED:
+            session = self._start_session(time)
+        elif not self.sessions:
+            # Zdarzenia sprzed pierwszego uruchomienia w okresie analizy
+            session = self._start_session(None)
+        else:
+            session = self.sessions[-1]
+        session.add_event(event)
+
+        if not is_system:
+            return
+        if event_id == EVENT_LOG_STOPPED:
+            session.end_time = time
+            if session.end_type is None:
+                session.end_type = BootSession.CLEAN
+        elif event_id == SHUTDOWN_INITIATED:
+            session.shutdown_initiator = self._field(event, 'param1') or event['source']
+            session.shutdown_reason = self._field(event, 'param3')
+            session.shutdown_type = self._field(event, 'param5')
+        elif event_id in (UNEXPECTED_SHUTDOWN, KERNEL_POWER) or (
+                event_id == BUGCHECK and event['source'] in BUGCHECK_SOURCES):
+            crashed = self._crashed_session(time)
+            if crashed is None:
+                return
+            bugcheck_code = self._field(event, 'BugcheckCode') if event_id == KERNEL_POWER else None
+            if event_id == BUGCHECK or (bugcheck_code and bugcheck_code != '0'):
+                crashed.end_type = BootSession.BSOD
+                if bugcheck_code:
+                    crashed.bugcheck = self._format_bugcheck(bugcheck_code)
+                elif crashed.bugcheck is None:
+                    crashed.bugcheck = event['message']
+            elif crashed.end_type != BootSession.BSOD:
+                crashed.end_type = BootSession.UNEXPECTED
+
+    @staticmethod
+    def _format_bugcheck(code: str) -> str:
+        """Kod błędu krytycznego w zapisie szesnastkowym (jak na niebieskim ekranie)"""
+        return f"0x{int(code):08X}" if code.isdigit() else code
+
+    def add_events(self, events: Iterable[Dict]):
+        """Przetwarza wszystkie zdarzenia ze strumienia (rosnąco według czasu)"""
+        for event in events:
+            self.add_event(event)
+
+    def session_at(self, time: datetime) -> Optional[BootSession]:
+        """Sesja trwająca w podanej chwili (wyszukiwanie binarne po czasach uruchomienia)"""
+        index = bisect_right(self._boot_times, time) - 1
+        return self.sessions[index] if index >= 0 else None
@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Korelacja czasowa zdarzeń między dziennikami
+Współwystępowanie par Event ID w przesuwnym oknie czasowym i ranking
+prawdopodobnych łańcuchów przyczyna -> skutek (np. błąd dysku -> awaria aplikacji)
+"""
+
+import math
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# Poziom ważności WARNING (jak EventSeverity.WARNING) - domyślnie korelowane są
+# zdarzenia krytyczne, błędy i ostrzeżenia
+WARNING_SEVERITY = 3
+
+# Klucz zdarzenia w korelacji: (dziennik, Event ID)
+EventKey = Tuple[str, int]
+
+
+def _parse_time(value: Optional[str]) -> Optional[datetime]:
+    return datetime.strptime(value, TIME_FORMAT) if value else None
+
+
+def format_key(key: EventKey) -> str:
+    """Opis klucza zdarzenia, np. "System 7" """
+    return f"{key[0]} {key[1]}"
+
+
+class CorrelationPair:
+    """Para zdarzeń przyczyna -> skutek ze statystykami współwystępowania"""
+
+    def __init__(self, cause: EventKey, effect: EventKey, support: int, reverse_support: int,
+                 cause_count: int, effect_count: int, mean_delay: float, lift: float):
+        self.cause = cause
+        self.effect = effect
+        self.support = support
+        self.reverse_support = reverse_support
+        self.cause_count = cause_count
+        self.effect_count = effect_count
+        self.mean_delay = mean_delay
+        self.lift = lift
+
+    @property
+    def confidence(self) -> float:
+        """Udział wystąpień skutku poprzedzonych przyczyną w oknie"""
+        return self.support / self.effect_count if self.effect_count else 0.0
+
+    @property
+    def score(self) -> float:
+        """Waga pary do rankingu - liczba wystąpień ważona siłą związku"""
+        return self.support * math.log2(self.lift) if self.lift > 1 else 0.0
+
+    def describe(self) -> str:
+        return (f"{format_key(self.cause)} -> {format_key(self.effect)} : {self.support}x, "
+                f"{self.confidence * 100:.0f}% wystąpień {self.effect[1]}, "
+                f"lift {self.lift:.1f}, średnio po {self.mean_delay:.1f} s")
+
+    def to_dict(self) -> Dict:
+        return {
+            'cause': list(self.cause),
+            'effect': list(self.effect),
+            'support': self.support,
+            'reverse_support': self.reverse_support,
+            'cause_count': self.cause_count,
+            'effect_count': self.effect_count,
+            'confidence': round(self.confidence, 4),
+            'mean_delay_seconds': round(self.mean_delay, 3),
+            'lift': round(self.lift, 3),
+        }
+
+
+class EventCorrelator:
+    """
+    Współwystępowanie par zdarzeń w przesuwnym oknie czasowym
+
+    Zdarzenia muszą napływać rosnąco według czasu. Okno przechowuje liczność
+    i czas ostatniego wystąpienia każdego klucza (dziennik, Event ID), więc
+    koszt zdarzenia zależy od liczby różnych kluczy w oknie, a nie od liczby
+    zdarzeń w nim - całość jest liniowa względem liczby zdarzeń.
+
+    Liczności par są sumowalne, więc korelator można scalać (merge)
+    i kontynuować od stanu zapisanego w pamięci podręcznej.
+
+    Przykład:
+        correlator = EventCorrelator(window=timedelta(seconds=60))
+        correlator.add_events(reversed(analyzer.events))
+        for pair in correlator.pairs(limit=10):
+            print(pair.describe())
+    """
+
+    def __init__(self, window: timedelta = timedelta(seconds=60), max_severity: int = WARNING_SEVERITY,
+                 cross_log_only: bool = False):
+        """
+        Args:
+            window: Maksymalny odstęp między przyczyną a skutkiem
+            max_severity: Największy poziom ważności korelowanych zdarzeń
+            cross_log_only: Koreluj tylko zdarzenia z różnych dzienników
+        """
+        self.window = window
+        self.max_severity = max_severity
+        self.cross_log_only = cross_log_only
+        self.key_counts = {}
+        # Liczności par: skutek -> {przyczyna: [liczba, suma opóźnień w sekundach]}
+        self.causes = {}
+        self.first_time = None
+        self.last_time = None
+        # Zdarzenia do tej chwili zostały już policzone (kontynuacja stanu)
+        self.resume_after = None
+
+        self._window_events = deque()
+        self._window_counts = {}
+        self._window_last = {}
+
+    def add_event(self, event: Dict):
+        """Przetwarza kolejne zdarzenie (zdarzenia muszą być uporządkowane rosnąco)"""
+        if event['severity'] > self.max_severity:
+            return
+        time = event['time']
+        if self.resume_after is not None and time <= self.resume_after:
+            return
+
+        # Czas jako liczba sekund - w pętli po oknie tańszy niż datetime
+        seconds = time.timestamp()
+
+        # Usuń z okna zdarzenia starsze niż time - window
+        window_events = self._window_events
+        window_counts = self._window_counts
+        window_last = self._window_last
+        threshold = seconds - self.window.total_seconds()
+        while window_events and window_events[0][0] < threshold:
+            _, old_key = window_events.popleft()
+            window_counts[old_key] -= 1
+            if not window_counts[old_key]:
+                del window_counts[old_key]
+                del window_last[old_key]
+
+        key = (event['log_name'], event['event_id'])
+        causes = self.causes.get(key)
+        if causes is None:
+            causes = self.causes[key] = {}
+        for cause, cause_seconds in window_last.items():
+            if cause == key or (self.cross_log_only and cause[0] == key[0]):
+                continue
+            entry = causes.get(cause)
+            if entry is None:
+                causes[cause] = [1, seconds - cause_seconds]
+            else:
+                entry[0] += 1
+                entry[1] += seconds - cause_seconds
+
+        window_events.append((seconds, key))
+        window_counts[key] = window_counts.get(key, 0) + 1
+        window_last[key] = seconds
+        self.key_counts[key] = self.key_counts.get(key, 0) + 1
+        if self.first_time is None:
+            self.first_time = time
+        self.last_time = time
+
+    def add_events(self, events: Iterable[Dict]):
+        """Przetwarza wszystkie zdarzenia ze strumienia (rosnąco według czasu)"""
+        for event in events:
+            self.add_event(event)
+
+    def resume(self):
+        """Przygotowuje stan odtworzony z from_dict do dalszego przetwarzania"""
+        self.resume_after = self.last_time
+
+    def _lift(self, cause: EventKey, confidence: float) -> float:
+        """
+        Stosunek pewności do prawdopodobieństwa przypadkowego wystąpienia przyczyny w oknie
+
+        Przyczyna jest modelowana jako proces Poissona o stałej częstości
+        w całym okresie: P(co najmniej jedno wystąpienie w oknie) = 1 - e^(-λw).
+        """
+        span = max((self.last_time - self.first_time).total_seconds(), self.window.total_seconds())
+        rate = self.key_counts[cause] / span
+        chance = 1 - math.exp(-rate * self.window.total_seconds())
+        return confidence / chance if chance > 0 else 0.0
+
+    def pairs(self, min_support: int = 3, min_lift: float = 2.0, limit: int = None) -> List[CorrelationPair]:
+        """
+        Prawdopodobne pary przyczyna -> skutek od najsilniejszych
+
+        Para jest uwzględniana, gdy wystąpiła co najmniej min_support razy,
+        przyczyna poprzedza skutek częściej niż odwrotnie, a współwystępowanie
+        jest co najmniej min_lift razy częstsze niż przypadkowe.
+        """
+        result = []
+        for effect, causes in self.causes.items():
+            effect_count = self.key_counts[effect]
+            for cause, (support, delay_sum) in causes.items():
+                if support < min_support:
+                    continue
+                reverse = self.causes.get(cause, {}).get(effect)
+                reverse_support = reverse[0] if reverse else 0
+                if support <= reverse_support:
+                    continue
+                lift = self._lift(cause, support / effect_count)
+                if lift < min_lift:
+                    continue
+                result.append(CorrelationPair(
+                    cause, effect, support, reverse_support, self.key_counts[cause], effect_count,
+                    delay_sum / support, lift
+                ))
+        result.sort(key=lambda pair: (-pair.score, pair.cause, pair.effect))
+        return result[:limit] if limit else result
+
+    def chains(self, max_length: int = 3, limit: int = 10, candidates: int = 100,
+               **pair_options) -> List[List[CorrelationPair]]:
+        """
+        Łańcuchy przyczyna -> skutek złożone z par (np. 7 -> 51 -> 1000)
+
+        Każdy łańcuch zaczyna się od jednej z par i jest przedłużany najsilniejszą
+        parą, której przyczyną jest bieżący skutek. Łańcuchy zawarte w dłuższych
+        są pomijane.
+
+        Args:
+            max_length: Maksymalna liczba par w łańcuchu
+            limit: Maksymalna liczba łańcuchów
+            candidates: Liczba najsilniejszych par, z których budowane są łańcuchy
+            pair_options: Progi przekazywane do pairs()
+        """
+        pairs = self.pairs(limit=candidates, **pair_options)
+        best_next = {}
+        for pair in pairs:
+            # Pary są posortowane od najsilniejszych - zostaje pierwsza dla każdej przyczyny
+            best_next.setdefault(pair.cause, pair)
+
+        chains = []
+        for pair in pairs:
+            chain = [pair]
+            visited = {pair.cause, pair.effect}
+            while len(chain) < max_length:
+                following = best_next.get(chain[-1].effect)
+                if following is None or following.effect in visited:
+                    break
+                chain.append(following)
+                visited.add(following.effect)
+            if len(chain) > 1:
+                chains.append(chain)
+
+        # Pomiń łańcuchy będące końcówką dłuższego
+        keys = [tuple(p.cause for p in chain) + (chain[-1].effect,) for chain in chains]
+        result = []
+        for chain, key in zip(chains, keys):
+            if any(len(other) > len(key) and other[-len(key):] == key for other in keys):
+                continue
+            result.append(chain)
+        result.sort(key=lambda chain: -min(pair.score for pair in chain))
+        return result[:limit]
+
+    def merge(self, other: 'EventCorrelator'):
+        """Scala liczności innego korelatora (np. z innego okresu lub hosta)"""
+        for key, count in other.key_counts.items():
+            self.key_counts[key] = self.key_counts.get(key, 0) + count
+        for effect, other_causes in other.causes.items():
+            causes = self.causes.setdefault(effect, {})
+            for cause, (count, delay_sum) in other_causes.items():
+                entry = causes.setdefault(cause, [0, 0.0])
+                entry[0] += count
+                entry[1] += delay_sum
+        if other.first_time is not None and (self.first_time is None or other.first_time < self.first_time):
+            self.first_time = other.first_time
+        if other.last_time is not None and (self.last_time is None or other.last_time > self.last_time):
+            self.last_time = other.last_time
+
+    def to_dict(self) -> Dict:
+        """Zwraca liczności jako słownik gotowy do serializacji JSON (bez stanu okna)"""
+        return {
+            'window_seconds': self.window.total_seconds(),
+            'max_severity': self.max_severity,
+            'cross_log_only': self.cross_log_only,
+            'first_time': self.first_time.strftime(TIME_FORMAT) if self.first_time else None,
+            'last_time': self.last_time.strftime(TIME_FORMAT) if self.last_time else None,
+            'key_counts': [[log_name, event_id, count]
+                           for (log_name, event_id), count in sorted(self.key_counts.items())],
+            'pair_counts': [[list(cause), list(effect), count, round(delay_sum, 3)]
+                            for effect, causes in sorted(self.causes.items())
+                            for cause, (count, delay_sum) in sorted(causes.items())],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'EventCorrelator':
+        """Odtwarza korelator z postaci słownikowej (to_dict)"""
+        correlator = cls(timedelta(seconds=data['window_seconds']), data['max_severity'],
+                         data['cross_log_only'])
+        correlator.first_time = _parse_time(data['first_time'])
+        correlator.last_time = _parse_time(data['last_time'])
+        correlator.key_counts = {(log_name, event_id): count for log_name, event_id, count in data['key_counts']}
+        for cause, effect, count, delay_sum in data['pair_counts']:
+            correlator.causes.setdefault(tuple(effect), {})[tuple(cause)] = [count, delay_sum]
+        return correlator
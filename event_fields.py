@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Strukturalne pola zdarzeń Windows
+Wyodrębnianie nazwanych pól z wstawek tekstowych (StringInserts) zdarzeń
+z kodowaniem słownikowym wartości
+"""
+
+import sys
+from array import array
+from collections import Counter
+from typing import Dict, List, Tuple, Optional, Iterable
+
+
+SECURITY_AUDITING = 'Microsoft-Windows-Security-Auditing'
+
+# Nazwy pól wstawek dla znanych par (źródło, Event ID) - kolejność zgodna
+# z szablonami zdarzeń opublikowanymi przez Microsoft
+FIELD_SCHEMAS = {
+    (SECURITY_AUDITING, 4624): (
+        'SubjectUserSid', 'SubjectUserName', 'SubjectDomainName', 'SubjectLogonId',
+        'TargetUserSid', 'TargetUserName', 'TargetDomainName', 'TargetLogonId',
+        'LogonType', 'LogonProcessName', 'AuthenticationPackageName', 'WorkstationName',
+        'LogonGuid', 'TransmittedServices', 'LmPackageName', 'KeyLength',
+        'ProcessId', 'ProcessName', 'IpAddress', 'IpPort',
+        'ImpersonationLevel', 'RestrictedAdminMode', 'TargetOutboundUserName',
+        'TargetOutboundDomainName', 'VirtualAccount', 'TargetLinkedLogonId', 'ElevatedToken'
+    ),
+    (SECURITY_AUDITING, 4625): (
+        'SubjectUserSid', 'SubjectUserName', 'SubjectDomainName', 'SubjectLogonId',
+        'TargetUserSid', 'TargetUserName', 'TargetDomainName', 'Status',
+        'FailureReason', 'SubStatus', 'LogonType', 'LogonProcessName',
+        'AuthenticationPackageName', 'WorkstationName', 'TransmittedServices',
+        'LmPackageName', 'KeyLength', 'ProcessId', 'ProcessName', 'IpAddress', 'IpPort'
+    ),
+    (SECURITY_AUDITING, 4634): (
+        'TargetUserSid', 'TargetUserName', 'TargetDomainName', 'TargetLogonId', 'LogonType'
+    ),
+    (SECURITY_AUDITING, 4648): (
+        'SubjectUserSid', 'SubjectUserName', 'SubjectDomainName', 'SubjectLogonId',
+        'LogonGuid', 'TargetUserName', 'TargetDomainName', 'TargetLogonGuid',
+        'TargetServerName', 'TargetInfo', 'ProcessId', 'ProcessName', 'IpAddress', 'IpPort'
+    ),
+    (SECURITY_AUDITING, 4672): (
+        'SubjectUserSid', 'SubjectUserName', 'SubjectDomainName', 'SubjectLogonId',
+        'PrivilegeList'
+    ),
+    (SECURITY_AUDITING, 4720): (
+        'TargetUserName', 'TargetDomainName', 'TargetSid', 'SubjectUserSid',
+        'SubjectUserName', 'SubjectDomainName', 'SubjectLogonId', 'PrivilegeList',
+        'SamAccountName', 'DisplayName', 'UserPrincipalName', 'HomeDirectory',
+        'HomePath', 'ScriptPath', 'ProfilePath', 'UserWorkstations', 'PasswordLastSet',
+        'AccountExpires', 'PrimaryGroupId', 'AllowedToDelegateTo', 'OldUacValue',
+        'NewUacValue', 'UserAccountControl', 'UserParameters', 'SidHistory', 'LogonHours'
+    ),
+    (SECURITY_AUDITING, 4740): (
+        'TargetUserName', 'TargetDomainName', 'TargetSid', 'SubjectUserSid',
+        'SubjectUserName', 'SubjectDomainName', 'SubjectLogonId'
+    ),
+    ('Service Control Manager', 7036): ('param1', 'param2'),
+    ('Service Control Manager', 7045): (
+        'ServiceName', 'ImagePath', 'ServiceType', 'StartType', 'AccountName'
+    ),
+    ('Microsoft-Windows-Kernel-Power', 41): (
+        'BugcheckCode', 'BugcheckParameter1', 'BugcheckParameter2', 'BugcheckParameter3',
+        'BugcheckParameter4', 'SleepInProgress', 'PowerButtonTimestamp'
+    ),
+    ('User32', 1074): ('param1', 'param2', 'param3', 'param4', 'param5', 'param6', 'param7'),
+    ('Application Error', 1000): (
+        'AppName', 'AppVersion', 'AppTimeStamp', 'ModuleName', 'ModuleVersion',
+        'ModuleTimeStamp', 'ExceptionCode', 'FaultingOffset', 'ProcessId',
+        'ProcessCreationTime', 'AppPath', 'ModulePath', 'IntegratorReportId',
+        'PackageFullName', 'PackageRelativeAppId'
+    ),
+}
+
+
+class StringTable:
+    """Słownik internowanych wartości tekstowych (wartość <-> kod całkowity)"""
+
+    def __init__(self):
+        self._codes = {'': 0}
+        self.values = ['']
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def intern(self, value: str) -> int:
+        """Zwraca kod wartości, dodając ją do słownika jeśli jest nowa"""
+        code = self._codes.get(value)
+        if code is None:
+            code = len(self.values)
+            value = sys.intern(value)
+            self._codes[value] = code
+            self.values.append(value)
+        return code
+
+    def code_of(self, value: str) -> Optional[int]:
+        """Zwraca kod wartości bez dodawania jej do słownika"""
+        return self._codes.get(value)
+
+    def lookup(self, code: int) -> str:
+        """Zwraca wartość dla kodu"""
+        return self.values[code]
+
+
+class FieldTable:
+    """Kolumnowa tabela pól dla jednej pary (źródło, Event ID)"""
+
+    def __init__(self, provider: str, event_id: int, field_names: Tuple[str, ...]):
+        self.provider = provider
+        self.event_id = event_id
+        self.field_names = list(field_names)
+        self.columns = {name: array('I') for name in self.field_names}
+        self.row_count = 0
+
+    def _add_column(self, name: str):
+        """Dodaje kolumnę wypełnioną pustymi wartościami dla istniejących wierszy"""
+        self.field_names.append(name)
+        self.columns[name] = array('I', bytes(4 * self.row_count))
+
+    def append(self, codes: List[int]) -> int:
+        """
+        Dodaje wiersz zakodowanych wartości
+
+        Returns:
+            Numer dodanego wiersza
+        """
+        # Zdarzenie może mieć więcej wstawek niż znany szablon
+        while len(codes) > len(self.field_names):
+            self._add_column(f"param{len(self.field_names) + 1}")
+
+        for index, name in enumerate(self.field_names):
+            self.columns[name].append(codes[index] if index < len(codes) else 0)
+
+        row = self.row_count
+        self.row_count += 1
+        return row
+
+    def column(self, name: str) -> Optional[array]:
+        """Zwraca kolumnę kodów dla pola (lub None jeśli pole nie istnieje)"""
+        return self.columns.get(name)
+
+
+class EventFieldStore:
+    """Magazyn nazwanych pól zdarzeń z kodowaniem słownikowym wartości"""
+
+    def __init__(self):
+        self.strings = StringTable()
+        self.tables = {}
+
+    @staticmethod
+    def schema_for(provider: str, event_id: int) -> Tuple[str, ...]:
+        """Zwraca nazwy pól dla pary (źródło, Event ID)"""
+        return FIELD_SCHEMAS.get((provider, event_id), ())
+
+    def add(self, provider: str, event_id: int, inserts: Optional[Iterable]) -> Optional[int]:
+        """
+        Zapisuje wstawki zdarzenia jako nazwane pola
+
+        Args:
+            provider: Nazwa źródła zdarzenia
+            event_id: Event ID
+            inserts: Wstawki tekstowe zdarzenia (StringInserts)
+
+        Returns:
+            Numer wiersza w tabeli pól lub None jeśli zdarzenie nie ma wstawek
+        """
+        if not inserts:
+            return None
+
+        key = (provider, event_id)
+        table = self.tables.get(key)
+        if table is None:
+            table = FieldTable(provider, event_id, self.schema_for(provider, event_id))
+            self.tables[key] = table
+
+        intern = self.strings.intern
+        codes = [intern(str(value)) if value is not None else 0 for value in inserts]
+        return table.append(codes)
+
+    def get_fields(self, provider: str, event_id: int, row: Optional[int]) -> Dict[str, str]:
+        """Zwraca pola zdarzenia jako słownik nazwa -> wartość"""
+        table = self.tables.get((provider, event_id))
+        if table is None or row is None:
+            return {}
+        lookup = self.strings.lookup
+        return {name: lookup(table.columns[name][row]) for name in table.field_names}
+
+    def get_value(self, provider: str, event_id: int, row: Optional[int], name: str) -> Optional[str]:
+        """Zwraca wartość pojedynczego pola zdarzenia"""
+        table = self.tables.get((provider, event_id))
+        if table is None or row is None:
+            return None
+        column = table.column(name)
+        if column is None:
+            return None
+        return self.strings.lookup(column[row])
+
+    def tables_for(self, event_id: int, provider: str = None) -> List[FieldTable]:
+        """Zwraca tabele pól dla Event ID (opcjonalnie tylko dla jednego źródła)"""
+        return [
+            table for (table_provider, table_event_id), table in self.tables.items()
+            if table_event_id == event_id and (provider is None or table_provider == provider)
+        ]
+
+    def group_by(self, event_id: int, field_names: Iterable[str], provider: str = None,
+                 where: Dict[str, str] = None) -> Dict[Tuple[str, ...], int]:
+        """
+        Grupuje zdarzenia według wartości pól (np. 4625 wg TargetUserName i IpAddress)
+
+        Grupowanie odbywa się na kodach całkowitych - wartości tekstowe są
+        dekodowane dopiero dla gotowych grup.
+
+        Args:
+            event_id: Event ID
+            field_names: Nazwy pól grupujących
+            provider: Opcjonalna nazwa źródła
+            where: Opcjonalne filtry równościowe pole -> wartość
+
+        Returns:
+            Słownik krotka wartości -> liczba zdarzeń
+        """
+        field_names = tuple(field_names)
+        code_counts = Counter()
+
+        for table in self.tables_for(event_id, provider):
+            columns = [table.column(name) for name in field_names]
+            if any(column is None for column in columns):
+                continue
+
+            if where:
+                filters = []
+                for name, value in where.items():
+                    column = table.column(name)
+                    code = self.strings.code_of(value)
+                    if column is None or code is None:
+                        filters = None
+                        break
+                    filters.append((column, code))
+                if filters is None:
+                    continue
+                rows = [
+                    row for row in range(table.row_count)
+                    if all(column[row] == code for column, code in filters)
+                ]
+                code_counts.update(tuple(column[row] for column in columns) for row in rows)
+            else:
+                code_counts.update(zip(*columns))
+
+        lookup = self.strings.lookup
+        return {
+            tuple(lookup(code) for code in codes): count
+            for codes, count in code_counts.most_common()
+        }
@@ -0,0 +1,718 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Odczyt eksportów dzienników zdarzeń z plików
+wevtutil qe /f:xml (oraz "Zapisz jako XML" w Podglądzie zdarzeń) i CSV
+z Podglądu zdarzeń lub Export-Csv - podział dużych plików na fragmenty
+na granicach rekordów i równoległe, przyrostowe parsowanie w puli procesów
+"""
+
+import csv
+import gc
+import io
+import os
+import sys
+import xml.etree.ElementTree as ET
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+# Poziomy ważności (jak EventSeverity)
+CRITICAL = 1
+ERROR = 2
+WARNING = 3
+INFORMATION = 4
+
+SEVERITY_NAMES = {1: 'KRYTYCZNY', 2: 'BŁĄD', 3: 'OSTRZEŻENIE', 4: 'INFORMACJA'}
+
+# Poziom zdarzenia (System/Level) -> poziom ważności. Klasyczny interfejs
+# ReadEventLog zgłasza zdarzenia krytyczne jako błędy, a niepowodzenia
+# inspekcji jako zdarzenia krytyczne - odwzorowanie jest takie samo,
+# aby zdarzenia z plików i z dzienników dawały te same raporty
+LEVEL_SEVERITY = {1: ERROR, 2: ERROR, 3: WARNING}
+
+# Bit słowa kluczowego "Audit Failure" (Keywords 0x8010000000000000)
+AUDIT_FAILURE_KEYWORD = 0x10000000000000
+
+# Nazwy poziomów i słów kluczowych w eksportach CSV (małe litery, en/pl)
+LEVEL_NAMES = {
+    'critical': ERROR, 'krytyczny': ERROR, 'krytyczne': ERROR,
+    'error': ERROR, 'błąd': ERROR,
+    'warning': WARNING, 'ostrzeżenie': WARNING,
+    'audit failure': CRITICAL, 'failureaudit': CRITICAL, 'niepowodzenie inspekcji': CRITICAL,
+    'inspekcja zakończona niepowodzeniem': CRITICAL,
+}
+
+# Kolumny eksportów CSV: pole zdarzenia -> możliwe nagłówki (Podgląd zdarzeń en/pl,
+# Get-WinEvent | Export-Csv, Get-EventLog | Export-Csv)
+CSV_COLUMNS = {
+    'level': ('Level', 'Poziom', 'LevelDisplayName', 'EntryType'),
+    'keywords': ('Keywords', 'Słowa kluczowe', 'KeywordsDisplayNames'),
+    'time': ('Date and Time', 'Data i godzina', 'TimeCreated', 'TimeGenerated'),
+    'source': ('Source', 'Źródło', 'ProviderName'),
+    'event_id': ('Event ID', 'Identyfikator zdarzenia', 'Id', 'EventID'),
+    'category': ('Task', 'CategoryNumber', 'Task Category', 'Kategoria zadania'),
+    'message': ('Message', 'Description', 'Opis'),
+    'log_name': ('LogName', 'Log Name', 'Dziennik'),
+    'computer': ('MachineName', 'Computer', 'Komputer'),
+    'record_number': ('RecordId', 'Index'),
+    'user_sid': ('UserId',),
+}
+
+# Formaty daty w eksportach CSV (czas lokalny, zależny od ustawień regionalnych)
+CSV_TIME_FORMATS = (
+    '%Y-%m-%d %H:%M:%S', '%Y-%m-%dT%H:%M:%S', '%d.%m.%Y %H:%M:%S',
+    '%m/%d/%Y %I:%M:%S %p', '%m/%d/%Y %H:%M:%S', '%d/%m/%Y %H:%M:%S',
+)
+
+# Rozmiar odczytu przy szukaniu granic i zliczaniu cudzysłowów
+CHUNK_SIZE = 4 * 1024 * 1024
+
+# Okno szukania znacznika <Event za punktem podziału
+BOUNDARY_WINDOW = 64 * 1024
+
+# Rozmiar tekstu XML parsowanego jednorazowo (drzewo istnieje tylko dla tej partii)
+XML_BATCH_SIZE = 1024 * 1024
+
+UTF16 = ('utf-16-le', 'utf-16-be')
+
+EPOCH = datetime(1970, 1, 1)
+
+
+def detect_encoding(path: str) -> Tuple[str, int]:
+    """
+    Rozpoznaje kodowanie pliku eksportu
+
+    Returns:
+        Krotka (kodowanie, długość BOM w bajtach)
+    """
+    with open(path, 'rb') as f:
+        head = f.read(4)
+    if head.startswith(b'\xef\xbb\xbf'):
+        return 'utf-8', 3
+    if head.startswith(b'\xff\xfe'):
+        return 'utf-16-le', 2
+    if head.startswith(b'\xfe\xff'):
+        return 'utf-16-be', 2
+    # Przekierowanie w PowerShell bez BOM - co drugi bajt tekstu ASCII jest zerem
+    if len(head) >= 2 and head[1] == 0 and head[0] != 0:
+        return 'utf-16-le', 0
+    return 'utf-8', 0
+
+
+def detect_format(path: str) -> str:
+    """Rozpoznaje format pliku ('xml' lub 'csv') po rozszerzeniu lub treści"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.evtx':
+        raise ValueError(f"Pliki .evtx nie są obsługiwane - wyeksportuj je poleceniem: "
+                         f"wevtutil qe \"{path}\" /lf:true /f:xml > plik.xml")
+    if extension in ('.xml', '.csv'):
+        return extension[1:]
+    encoding, bom = detect_encoding(path)
+    with open(path, 'rb') as f:
+        f.seek(bom)
+        head = f.read(256).decode(encoding, errors='ignore').lstrip()
+    return 'xml' if head.startswith('<') else 'csv'
+
+
+def _unit_size(encoding: str) -> int:
+    """Rozmiar jednostki kodowej w bajtach (granice muszą być do niej wyrównane)"""
+    return 2 if encoding in UTF16 else 1
+
+
+def _code_units(data: bytes, encoding: str):
+    """Jednostki kodowe tekstu - bajty (UTF-8, ANSI) lub 16-bitowe jednostki UTF-16"""
+    if encoding not in UTF16:
+        return data
+    units = array('H')
+    units.frombytes(data[:len(data) - len(data) % 2])
+    if (encoding == 'utf-16-be') != (sys.byteorder == 'big'):
+        units.byteswap()
+    return units
+
+
+class _RangeReader(io.RawIOBase):
+    """Plik ograniczony do zakresu bajtów [start, end)"""
+
+    def __init__(self, path: str, start: int, end: int):
+        super().__init__()
+        self._file = open(path, 'rb')
+        self._file.seek(start)
+        self._remaining = end - start
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        size = min(len(buffer), self._remaining)
+        if size <= 0:
+            return 0
+        count = self._file.readinto(memoryview(buffer)[:size])
+        self._remaining -= count
+        return count
+
+    def close(self):
+        self._file.close()
+        super().close()
+
+
+def _open_range(path: str, encoding: str, start: int, end: int) -> io.TextIOWrapper:
+    return io.TextIOWrapper(io.BufferedReader(_RangeReader(path, start, end), CHUNK_SIZE),
+                            encoding=encoding, errors='replace', newline='')
+
+
+@contextmanager
+def _gc_paused():
+    """
+    Wstrzymuje cykliczny odśmiecacz pamięci na czas budowania dużej liczby zdarzeń
+
+    Zdarzenia nie tworzą cykli, a każde kolejne pokolenie odśmiecacza
+    przegląda wszystkie zgromadzone już słowniki - bez wstrzymania
+    parsowanie jest około 1,5 raza wolniejsze.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+class FileShard:
+    """Fragment pliku eksportu zawierający całe rekordy"""
+
+    def __init__(self, path: str, format: str, encoding: str, start: int, end: int,
+                 log_name: str = None, columns: Dict[str, int] = None):
+        """
+        Args:
+            path: Ścieżka pliku
+            format: 'xml' lub 'csv'
+            encoding: Kodowanie tekstu
+            start: Początek fragmentu (bajt, granica rekordu)
+            end: Koniec fragmentu (bajt, granica rekordu)
+            log_name: Nazwa dziennika dla rekordów bez niej (CSV z Podglądu zdarzeń)
+            columns: Pozycje kolumn CSV (pole zdarzenia -> numer kolumny)
+        """
+        self.path = path
+        self.format = format
+        self.encoding = encoding
+        self.start = start
+        self.end = end
+        self.log_name = log_name
+        self.columns = columns
+
+    @property
+    def size(self) -> int:
+        return self.end - self.start
+
+
+def _local_time(text: str) -> datetime:
+    """Czas UTC z atrybutu SystemTime jako czas lokalny (z dokładnością do sekundy, jak TimeGenerated)"""
+    utc = datetime(int(text[0:4]), int(text[5:7]), int(text[8:10]),
+                   int(text[11:13]), int(text[14:16]), int(text[17:19]))
+    return datetime.fromtimestamp((utc - EPOCH).total_seconds())
+
+
+# Nazwy elementów bez przestrzeni nazw (pamięć podręczna - znaczniki się powtarzają)
+_TAG_NAMES = {}
+
+
+def _local_name(tag: str) -> str:
+    name = _TAG_NAMES.get(tag)
+    if name is None:
+        name = _TAG_NAMES[tag] = tag.rpartition('}')[2]
+    return name
+
+
+def _new_event(log_name: str, event_id: int, source: str, event_time: datetime, severity: int,
+               message: str, category: Optional[int], record_number: Optional[int],
+               computer: Optional[str], user_sid: Optional[str], inserts: Optional[List[str]],
+               preview_length: int) -> Dict:
+    """Zdarzenie w postaci zwracanej przez iter_event_log(store=False)"""
+    return {
+        'log_name': log_name,
+        'event_id': event_id,
+        'source': source,
+        'time': event_time,
+        'severity': severity,
+        'severity_name': SEVERITY_NAMES[severity],
+        'message': message[:preview_length],
+        'message_ref': None,
+        'category': category,
+        'record_number': record_number,
+        'computer': computer,
+        'user_sid': user_sid,
+        'field_row': None,
+        'full_message': message,
+        'inserts': inserts,
+    }
+
+
+def _xml_event(element, default_log: Optional[str], preview_length: int) -> Dict:
+    """Konwertuje element <Event> na zdarzenie"""
+    source = log_name = computer = user_sid = time_created = None
+    event_id = level = category = record_number = 0
+    keywords = 0
+    inserts = None
+    message = None
+    names = []
+
+    for part in element:
+        part_name = _local_name(part.tag)
+        if part_name == 'System':
+            for child in part:
+                name = _local_name(child.tag)
+                if name == 'Provider':
+                    source = child.get('EventSourceName') or child.get('Name')
+                elif name == 'EventID':
+                    event_id = int(child.text or 0) & 0xFFFF
+                elif name == 'Level':
+                    level = int(child.text or 0)
+                elif name == 'Task':
+                    category = int(child.text or 0)
+                elif name == 'Keywords':
+                    keywords = int(child.text or '0', 16)
+                elif name == 'TimeCreated':
+                    time_created = child.get('SystemTime')
+                elif name == 'EventRecordID':
+                    record_number = int(child.text or 0)
+                elif name == 'Channel':
+                    log_name = child.text
+                elif name == 'Computer':
+                    computer = child.text
+                elif name == 'Security':
+                    user_sid = child.get('UserID')
+        elif part_name == 'EventData':
+            inserts = []
+            for data in part:
+                if _local_name(data.tag) == 'Data':
+                    inserts.append(data.text or '')
+                    names.append(data.get('Name'))
+        elif part_name == 'UserData':
+            # Pola zdarzenia są liśćmi pierwszego (jedynego) elementu UserData
+            inserts = []
+            for data in part.iter():
+                if len(data) == 0 and data is not part:
+                    inserts.append(data.text or '')
+                    names.append(_local_name(data.tag))
+        elif part_name == 'RenderingInfo':
+            message = part.findtext(f"{part.tag[:-len('RenderingInfo')]}Message")
+
+    if not message:
+        # Bez treści sformatowanej (wevtutil /f:xml) - wstawki jako opis zdarzenia
+        if inserts:
+            message = "\n".join(f"{name}: {value}" if name else value
+                                for name, value in zip(names, inserts))
+        else:
+            message = "Brak opisu zdarzenia"
+
+    if keywords & AUDIT_FAILURE_KEYWORD:
+        severity = CRITICAL
+    else:
+        severity = LEVEL_SEVERITY.get(level, INFORMATION)
+
+    return _new_event(
+        sys.intern(log_name or default_log or 'Unknown'), event_id, sys.intern(source or 'Unknown'),
+        _local_time(time_created) if time_created else datetime.now(), severity, message,
+        category, record_number, sys.intern(computer) if computer else None,
+        sys.intern(user_sid) if user_sid else None, inserts or None, preview_length
+    )
+
+
+def _parse_xml_shard(shard: FileShard, preview_length: int) -> Iterator[Dict]:
+    """
+    Parsuje fragment XML przyrostowo
+
+    Fragment jest ciągiem elementów <Event>. Tekst jest czytany partiami po
+    XML_BATCH_SIZE znaków i parsowany do ostatniego pełnego elementu </Event>
+    partii, więc w pamięci jest tylko drzewo jednej partii, a nie całego pliku.
+    """
+    rest = ''
+    with _open_range(shard.path, shard.encoding, shard.start, shard.end) as text:
+        while True:
+            chunk = text.read(XML_BATCH_SIZE)
+            if not chunk:
+                break
+            rest += chunk
+            cut = rest.rfind('</Event>')
+            if cut < 0:
+                continue
+            cut += len('</Event>')
+            batch = ET.fromstring(f"<Events>{rest[:cut]}</Events>")
+            rest = rest[cut:]
+            for element in batch:
+                yield _xml_event(element, shard.log_name, preview_length)
+    if rest.strip():
+        raise ET.ParseError(f"Niepełny element <Event> na końcu fragmentu: {rest[:80]}")
+
+
+def _csv_severity(level: str, keywords: str) -> int:
+    """Poziom ważności z kolumn poziomu i słów kluczowych eksportu CSV"""
+    keywords = keywords.strip()
+    if keywords:
+        if keywords.lstrip('-').isdigit():
+            if int(keywords) & AUDIT_FAILURE_KEYWORD:
+                return CRITICAL
+        elif LEVEL_NAMES.get(keywords.strip('{}').lower()) == CRITICAL:
+            return CRITICAL
+    level = level.strip()
+    if level.isdigit():
+        return LEVEL_SEVERITY.get(int(level), INFORMATION)
+    return LEVEL_NAMES.get(level.lower(), INFORMATION)
+
+
+class _CsvTimeParser:
+    """Parsowanie dat CSV - zapamiętuje ostatni pasujący format"""
+
+    def __init__(self):
+        self.format = CSV_TIME_FORMATS[0]
+
+    def __call__(self, text: str) -> datetime:
+        text = text.strip()
+        # Ułamki sekund i strefa czasowa (ISO 8601) nie są potrzebne
+        if 'T' in text[:11]:
+            text = text[:19]
+        try:
+            return datetime.strptime(text, self.format)
+        except ValueError:
+            pass
+        for time_format in CSV_TIME_FORMATS:
+            try:
+                value = datetime.strptime(text, time_format)
+            except ValueError:
+                continue
+            self.format = time_format
+            return value
+        raise ValueError(f"Nierozpoznany format daty: {text}")
+
+
+def _parse_csv_shard(shard: FileShard, preview_length: int) -> Iterator[Dict]:
+    """Parsuje fragment CSV strumieniowo (moduł csv)"""
+    columns = shard.columns
+    parse_time = _CsvTimeParser()
+
+    def value(row: List[str], field: str) -> str:
+        index = columns.get(field)
+        return row[index] if index is not None and index < len(row) else ''
+
+    def number(row: List[str], field: str) -> Optional[int]:
+        text = value(row, field).strip()
+        return int(text) if text.isdigit() else None
+
+    with _open_range(shard.path, shard.encoding, shard.start, shard.end) as text:
+        for row in csv.reader(text):
+            if not row:
+                continue
+            source = value(row, 'source')
+            log_name = value(row, 'log_name') or shard.log_name or 'Unknown'
+            computer = value(row, 'computer')
+            user_sid = value(row, 'user_sid')
+            message = value(row, 'message') or "Brak opisu zdarzenia"
+            yield _new_event(
+                sys.intern(log_name), (number(row, 'event_id') or 0) & 0xFFFF,
+                sys.intern(source) if source else 'Unknown', parse_time(value(row, 'time')),
+                _csv_severity(value(row, 'level'), value(row, 'keywords')), message,
+                number(row, 'category'), number(row, 'record_number'),
+                sys.intern(computer) if computer else None,
+                sys.intern(user_sid) if user_sid else None, None, preview_length
+            )
+
+
+def parse_shard(shard: FileShard, preview_length: int = 120, start_time: datetime = None,
+                end_time: datetime = None) -> List[Dict]:
+    """
+    Parsuje fragment pliku (funkcja wykonywana w procesach puli)
+
+    Args:
+        shard: Fragment pliku
+        preview_length: Długość skrótu wiadomości (jak MESSAGE_PREVIEW_LENGTH)
+        start_time: Pomijaj zdarzenia starsze
+        end_time: Pomijaj zdarzenia nowsze
+
+    Returns:
+        Zdarzenia w kolejności z pliku
+    """
+    parse = _parse_xml_shard if shard.format == 'xml' else _parse_csv_shard
+    with _gc_paused():
+        return [
+            event for event in parse(shard, preview_length)
+            if (start_time is None or event['time'] >= start_time)
+            and (end_time is None or event['time'] <= end_time)
+        ]
+
+
+def scan_csv_range(path: str, encoding: str, start: int, end: int) -> Tuple[int, Optional[int], Optional[int]]:
+    """
+    Zlicza cudzysłowy w zakresie pliku CSV (funkcja wykonywana w procesach puli)
+
+    Znak nowej linii jest granicą rekordu, gdy liczba cudzysłowów od początku
+    danych do niego jest parzysta. Parzystość na początku zakresu znana jest
+    dopiero po zsumowaniu zakresów poprzednich, więc dla obu możliwości
+    zapamiętywana jest pierwsza nowa linia o danej parzystości lokalnej.
+
+    Returns:
+        Krotka (liczba cudzysłowów, pozycja za pierwszą nową linią przy parzystej
+        liczbie cudzysłowów od start, to samo przy nieparzystej) - pozycje w bajtach
+        lub None, jeśli w zakresie nie ma takiej nowej linii
+    """
+    unit = _unit_size(encoding)
+    quote, newline = ord('"'), ord('\n')
+    quotes = 0
+    after_newline = [None, None]
+    position = start
+    with open(path, 'rb') as f:
+        f.seek(start)
+        while position < end:
+            data = f.read(min(CHUNK_SIZE, end - position))
+            if not data:
+                break
+            units = _code_units(data, encoding)
+            index = 0
+            # Pojedyncze jednostki tylko do znalezienia obu granic - dalej zliczanie hurtowe
+            while None in after_newline and index < len(units):
+                value = units[index]
+                index += 1
+                if value == quote:
+                    quotes += 1
+                elif value == newline and after_newline[quotes % 2] is None:
+                    after_newline[quotes % 2] = position + index * unit
+            if index < len(units):
+                quotes += units[index:].count(quote)
+            position += len(data)
+    return quotes, after_newline[0], after_newline[1]
+
+
+class EventFileReader:
+    """
+    Równoległy odczyt plików eksportu dzienników (XML, CSV)
+
+    Pliki są dzielone na fragmenty na granicach rekordów: w XML przed znacznikiem
+    <Event, w CSV na nowej linii poza polem w cudzysłowie (parzystość cudzysłowów
+    wyznaczana równolegle dla zakresów pliku). Fragmenty są parsowane w puli
+    procesów, więc czas odczytu skaluje się z liczbą rdzeni.
+
+    Przykład:
+        reader = EventFileReader(workers=8)
+        logs = reader.read(['System.xml', 'Application.csv'])
+        for log_name, events in logs.items():
+            print(log_name, len(events))
+    """
+
+    # Minimalny rozmiar fragmentu - mniejsze pliki są parsowane w całości
+    MIN_SHARD_SIZE = 4 * 1024 * 1024
+
+    # Liczba fragmentów na proces (wyrównanie obciążenia przy nierównych rekordach)
+    SHARDS_PER_WORKER = 4
+
+    def __init__(self, workers: int = None, preview_length: int = 120,
+                 start_time: datetime = None, end_time: datetime = None):
+        """
+        Args:
+            workers: Liczba procesów (domyślnie liczba rdzeni, 1 - bez puli procesów)
+            preview_length: Długość skrótu wiadomości
+            start_time: Pomijaj zdarzenia starsze
+            end_time: Pomijaj zdarzenia nowsze
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.preview_length = preview_length
+        self.start_time = start_time
+        self.end_time = end_time
+        # Pliki, których nie udało się odczytać: lista (ścieżka, wyjątek)
+        self.errors = []
+        self.shard_count = 0
+
+    def _shard_count(self, size: int) -> int:
+        return max(1, min(self.workers * self.SHARDS_PER_WORKER, size // self.MIN_SHARD_SIZE))
+
+    def _targets(self, start: int, end: int, count: int, unit: int) -> List[int]:
+        """Punkty podziału zakresu na count części (wyrównane do jednostki kodowej)"""
+        step = (end - start) // count
+        return [start + (step * i) // unit * unit for i in range(1, count)]
+
+    @staticmethod
+    def _find_event_start(f, position: int, end: int, encoding: str) -> Optional[int]:
+        """Pozycja pierwszego znacznika <Event (nie <EventData, <Events) od position"""
+        unit = _unit_size(encoding)
+        marker = '<Event'.encode(encoding)
+        terminators = {char.encode(encoding) for char in ' \t\r\n>'}
+        while position < end:
+            f.seek(position)
+            data = f.read(BOUNDARY_WINDOW + len(marker) + unit)
+            index = data.find(marker)
+            while index >= 0:
+                following = data[index + len(marker):index + len(marker) + unit]
+                if index % unit == 0 and following in terminators:
+                    return position + index
+                index = data.find(marker, index + 1)
+            position += BOUNDARY_WINDOW
+        return None
+
+    @staticmethod
+    def _find_events_end(f, start: int, end: int, encoding: str) -> int:
+        """Pozycja za ostatnim znacznikiem </Event> (przed zamknięciem elementu głównego)"""
+        unit = _unit_size(encoding)
+        marker = '</Event>'.encode(encoding)
+        position = end
+        while position > start:
+            window_start = max(start, position - BOUNDARY_WINDOW)
+            window_start -= (window_start - start) % unit
+            f.seek(window_start)
+            data = f.read(position - window_start + len(marker))
+            index = data.rfind(marker)
+            while index >= 0:
+                if (window_start + index - start) % unit == 0:
+                    return min(window_start + index + len(marker), end)
+                index = data.rfind(marker, 0, index)
+            position = window_start
+        return start
+
+    def _xml_shards(self, path: str, encoding: str, bom: int, log_name: Optional[str]) -> List[FileShard]:
+        size = os.path.getsize(path)
+        with open(path, 'rb') as f:
+            first = self._find_event_start(f, bom, size, encoding)
+            if first is None:
+                return []
+            last = self._find_events_end(f, first, size, encoding)
+            boundaries = [first]
+            for target in self._targets(first, last, self._shard_count(last - first), _unit_size(encoding)):
+                boundary = self._find_event_start(f, max(target, boundaries[-1] + 1), last, encoding)
+                if boundary is not None and boundary > boundaries[-1]:
+                    boundaries.append(boundary)
+        boundaries.append(last)
+        return [FileShard(path, 'xml', encoding, start, end, log_name)
+                for start, end in zip(boundaries, boundaries[1:])]
+
+    @staticmethod
+    def _csv_columns(header: List[str]) -> Dict[str, int]:
+        """Pozycje kolumn CSV na podstawie nagłówka"""
+        positions = {name.strip().lstrip('\ufeff'): index for index, name in enumerate(header)}
+        columns = {}
+        for field, names in CSV_COLUMNS.items():
+            for name in names:
+                if name in positions:
+                    columns[field] = positions[name]
+                    break
+        if 'message' not in columns:
+            # Podgląd zdarzeń zapisuje opis w kolumnie bez nagłówka za ostatnią nazwaną
+            columns['message'] = len(header)
+        return columns
+
+    def _csv_shards(self, path: str, encoding: str, bom: int, log_name: Optional[str],
+                    executor) -> List[FileShard]:
+        size = os.path.getsize(path)
+        unit = _unit_size(encoding)
+        with open(path, 'rb') as f:
+            f.seek(bom)
+            text = f.read(BOUNDARY_WINDOW).decode(encoding, errors='ignore')
+
+        # Nagłówek jest pierwszą linią (Export-Csv w PowerShell 5 poprzedza go linią #TYPE)
+        header = None
+        first = bom
+        position = 0
+        while header is None:
+            end = text.find('\n', position)
+            if end < 0:
+                return []
+            line = text[position:end + 1]
+            first += len(line.encode(encoding))
+            position = end + 1
+            if line.strip() and not line.startswith('#TYPE'):
+                header = next(csv.reader([line]))
+        columns = self._csv_columns(header)
+        if first >= size:
+            return []
+
+        boundaries = [first]
+        targets = self._targets(first, size, self._shard_count(size - first), unit)
+        if targets:
+            ranges = list(zip([first] + targets, targets + [size]))
+            scans = list(self._map(executor, scan_csv_range, *zip(*((path, encoding, start, end)
+                                                                    for start, end in ranges))))
+            quotes = scans[0][0]
+            for count, after_even, after_odd in scans[1:]:
+                # Granica zakresu jest w polu w cudzysłowie, gdy suma dotąd jest nieparzysta
+                boundary = after_odd if quotes % 2 else after_even
+                if boundary is not None and boundary > boundaries[-1]:
+                    boundaries.append(boundary)
+                quotes += count
+        boundaries.append(size)
+        return [FileShard(path, 'csv', encoding, start, end, log_name, columns)
+                for start, end in zip(boundaries, boundaries[1:]) if end > start]
+
+    @staticmethod
+    def _map(executor, function, *iterables) -> Iterable:
+        if executor is None:
+            return map(function, *iterables)
+        return executor.map(function, *iterables)
+
+    def shards(self, paths: Iterable[str], executor=None) -> List[FileShard]:
+        """
+        Dzieli pliki na fragmenty zawierające całe rekordy
+
+        Nazwą dziennika rekordów bez niej (CSV z Podglądu zdarzeń) jest nazwa
+        pliku bez rozszerzenia, np. System.csv -> System.
+        """
+        result = []
+        for path in paths:
+            try:
+                file_format = detect_format(path)
+                encoding, bom = detect_encoding(path)
+                log_name = os.path.splitext(os.path.basename(path))[0]
+                if file_format == 'xml':
+                    result.extend(self._xml_shards(path, encoding, bom, log_name))
+                else:
+                    result.extend(self._csv_shards(path, encoding, bom, log_name, executor))
+            except (OSError, ValueError) as e:
+                self.errors.append((path, e))
+        return result
+
+    def _parse(self, shards: List[FileShard], executor) -> Iterator[Tuple[FileShard, List[Dict]]]:
+        """Parsuje fragmenty (w kolejności), błędny fragment nie przerywa odczytu pozostałych"""
+        options = (self.preview_length, self.start_time, self.end_time)
+        if executor is None:
+            pending = [(shard, None) for shard in shards]
+        else:
+            pending = [(shard, executor.submit(parse_shard, shard, *options)) for shard in shards]
+        for shard, future in pending:
+            try:
+                events = future.result() if future is not None else parse_shard(shard, *options)
+            except (ET.ParseError, ValueError, OSError, csv.Error) as e:
+                self.errors.append((shard.path, e))
+                continue
+            yield shard, events
+
+    def read(self, paths: Iterable[str]) -> Dict[str, List[Dict]]:
+        """
+        Odczytuje pliki eksportu
+
+        Returns:
+            Słownik nazwa dziennika -> zdarzenia od najnowszych (jak iter_event_log
+            z store=False - pełna treść w 'full_message', wstawki w 'inserts')
+        """
+        paths = list(paths)
+        total_size = sum(os.path.getsize(path) for path in paths if os.path.isfile(path))
+        use_pool = self.workers > 1 and total_size >= 2 * self.MIN_SHARD_SIZE
+        executor = ProcessPoolExecutor(max_workers=self.workers) if use_pool else None
+        try:
+            shards = self.shards(paths, executor)
+            self.shard_count = len(shards)
+            logs = {}
+            with _gc_paused():
+                for shard, events in self._parse(shards, executor):
+                    for event in events:
+                        log_events = logs.get(event['log_name'])
+                        if log_events is None:
+                            log_events = logs[event['log_name']] = []
+                        log_events.append(event)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        for events in logs.values():
+            # Od najnowszych, przy równym czasie od najwyższego numeru rekordu (jak odczyt wstecz)
+            events.sort(key=lambda event: (event['time'], event['record_number'] or 0), reverse=True)
+        return logs
@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Potok asyncio odczytu zdarzeń
+Odczyt dzienników, konwersja rekordów oraz agregacja i odbiorcy zdarzeń jako
+osobne etapy połączone ograniczonymi kolejkami - wolny etap wstrzymuje
+poprzednie (backpressure), a pętla zdarzeń nie jest blokowana
+"""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from report_summary import ReportSummary
+
+
+# Konsument partii zdarzeń: await consumer(dziennik, zdarzenia)
+BatchConsumer = Callable[[str, List[Dict]], Awaitable[None]]
+
+# Konsument blokujący wykonywany w osobnym wątku: consumer(dziennik, zdarzenia)
+BatchFunction = Callable[[str, List[Dict]], None]
+
+
+async def _uninterrupted(future: asyncio.Future):
+    """
+    Czeka na zakończenie future także po (wielokrotnym) anulowaniu
+
+    Anulowanie jest zgłaszane dopiero po zakończeniu - np. zamknięcie uchwytu
+    dziennika nie zostaje porzucone, gdy pętla anuluje zadania przy zamykaniu.
+    """
+    cancelled = False
+    while not future.done():
+        try:
+            await asyncio.shield(future)
+        except asyncio.CancelledError:
+            cancelled = True
+    if cancelled:
+        raise asyncio.CancelledError()
+    return future.result()
+
+
+class EventPipeline:
+    """
+    Potok odczytu dzienników analizatora z ograniczonymi kolejkami
+
+    Etapy:
+        odczyt (producent na dziennik, własny wątek) -> kolejka rekordów ->
+        konwersja (jeden wątek - magazyny treści i pól nie są współbieżne) ->
+        kolejka zdarzeń -> konsumenci: agregacja (lista i ReportSummary dziennika),
+        odbiorcy analizatora (add_event_sink) i konsumenci dodani przez add_consumer
+        lub add_thread_consumer
+
+    Każdy konsument ma własną kolejkę o rozmiarze queue_size partii. Gdy
+    konsument nie nadąża, jego kolejka zapełnia się i kolejno wstrzymywane są
+    rozdział, konwersja i odczyt - pamięć potoku jest ograniczona niezależnie
+    od liczby zdarzeń. Zdarzenia każdego dziennika napływają od najnowszych,
+    dzienniki są czytane równolegle.
+
+    Przykład:
+        pipeline = EventPipeline(analyzer, collect=False)
+        pipeline.add_consumer(send_to_service)
+        await pipeline.run()
+    """
+
+    def __init__(self, analyzer, logs: List[str] = None, store: bool = True, collect: bool = True,
+                 queue_size: int = 4):
+        """
+        Args:
+            analyzer: WindowsEventAnalyzer, którego dzienniki są czytane
+            logs: Dzienniki do odczytu (domyślnie analyzer.logs_to_check)
+            store: Zapisuj pełne treści i pola w magazynach analizatora (jak iter_event_log)
+            collect: Zachowaj zdarzenia i podsumowania dzienników (events, summaries)
+            queue_size: Pojemność każdej kolejki w partiach
+        """
+        self.analyzer = analyzer
+        self.logs = list(analyzer.logs_to_check if logs is None else logs)
+        self.store = store
+        self.collect = collect
+        self.queue_size = queue_size
+        self.consumers = []
+        self.thread_consumers = []
+        # Zdarzenia (od najnowszych) i podsumowania dzienników - przy collect=True
+        self.events = {log_name: [] for log_name in self.logs}
+        self.summaries = {log_name: analyzer._new_summary([log_name]) for log_name in self.logs}
+        # Czas odczytu dziennika od otwarcia do ostatniej partii
+        self.seconds = {}
+
+    def add_consumer(self, consumer: BatchConsumer):
+        """Dodaje konsumenta wywoływanego dla każdej partii zdarzeń (funkcja async)"""
+        self.consumers.append(consumer)
+
+    def add_thread_consumer(self, consumer: BatchFunction):
+        """Dodaje konsumenta blokującego (np. wtyczki analizatora) wykonywanego we własnym wątku"""
+        self.thread_consumers.append(consumer)
+
+    async def _produce(self, log_name: str, records: asyncio.Queue, started: Dict[str, float]):
+        """Czyta partie rekordów dziennika w osobnym wątku"""
+        analyzer = self.analyzer
+        loop = asyncio.get_running_loop()
+        state = analyzer._read_state(log_name)
+        # Jeden wątek na dziennik - zamknięcie uchwytu czeka na trwający odczyt
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"read-{log_name}")
+        analyzer._notify('log_start', log_name=log_name)
+        started[log_name] = time.perf_counter()
+        try:
+            hand = await loop.run_in_executor(executor, analyzer._open_event_log, log_name)
+            if hand is not None:
+                try:
+                    while not state.done:
+                        event_records = await loop.run_in_executor(executor, analyzer._read_record_batch, hand)
+                        if not event_records:
+                            break
+                        await records.put((state, event_records))
+                except asyncio.CancelledError:
+                    # W Pythonie 3.7 CancelledError dziedziczy po Exception
+                    raise
+                except Exception as e:
+                    analyzer._report_error(log_name, e)
+                finally:
+                    # Uchwyt jest zamykany także po anulowaniu
+                    await _uninterrupted(loop.run_in_executor(executor, analyzer._close_event_log, hand))
+        finally:
+            executor.shutdown(wait=False)
+        # Koniec dziennika (po anulowaniu nie jest wysyłany - nikt go nie odbierze)
+        await records.put((state, None))
+
+    async def _convert(self, records: asyncio.Queue, events: asyncio.Queue, started: Dict[str, float]):
+        """Konwertuje partie rekordów na zdarzenia w jednym wątku"""
+        analyzer = self.analyzer
+        loop = asyncio.get_running_loop()
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="convert")
+        counts = {log_name: 0 for log_name in self.logs}
+        remaining = len(self.logs)
+        try:
+            while remaining:
+                state, event_records = await records.get()
+                log_name = state.log_name
+                if event_records is None:
+                    remaining -= 1
+                    self.seconds[log_name] = time.perf_counter() - started[log_name]
+                    continue
+                if state.done:
+                    # Partia odczytana, zanim konwersja osiągnęła początek zakresu
+                    continue
+                try:
+                    batch = await loop.run_in_executor(executor, analyzer._convert_records,
+                                                       state, event_records, self.store)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    state.done = True
+                    analyzer._report_error(log_name, e)
+                    continue
+                if not batch:
+                    continue
+                previous = counts[log_name]
+                counts[log_name] += len(batch)
+                if counts[log_name] // analyzer.PROGRESS_INTERVAL > previous // analyzer.PROGRESS_INTERVAL:
+                    analyzer._notify('log_progress', log_name=log_name, events=counts[log_name])
+                await events.put((log_name, batch))
+        finally:
+            executor.shutdown(wait=False)
+        await events.put(None)
+
+    async def _dispatch(self, events: asyncio.Queue, queues: List[asyncio.Queue]):
+        """
+        Przekazuje partie wszystkim konsumentom (czeka na najwolniejszego)
+
+        Znaczniki końca są wysyłane tylko po odebraniu wszystkich partii - po
+        anulowaniu CancelledError przerywa oczekiwanie na pełną kolejkę.
+        """
+        while True:
+            item = await events.get()
+            if item is None:
+                break
+            for queue in queues:
+                await queue.put(item)
+        for queue in queues:
+            await queue.put(None)
+
+    @staticmethod
+    async def _consume(queue: asyncio.Queue, consumer: BatchConsumer):
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            await consumer(*item)
+
+    @staticmethod
+    def _threaded(function: BatchFunction, name: str) -> BatchConsumer:
+        """Konsument wykonujący function w osobnym wątku (executor zamyka run)"""
+        loop = asyncio.get_running_loop()
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=name)
+
+        async def consumer(log_name: str, batch: List[Dict]):
+            await loop.run_in_executor(executor, function, log_name, batch)
+
+        consumer.executor = executor
+        return consumer
+
+    def _aggregator(self) -> BatchConsumer:
+        """Konsument zapamiętujący zdarzenia i podsumowanie dziennika (w osobnym wątku)"""
+        stats = self.analyzer.stats
+
+        def aggregate(log_name: str, batch: List[Dict]):
+            with stats.stage('aggregate'):
+                self.events[log_name].extend(batch)
+                self.summaries[log_name].add_events(batch)
+
+        return self._threaded(aggregate, "aggregate")
+
+    def _sink_writer(self) -> Tuple[BatchConsumer, Callable[[], Awaitable[None]]]:
+        """Konsument zapisujący zdarzenia do odbiorców analizatora partiami SINK_BATCH_SIZE"""
+        analyzer = self.analyzer
+        loop = asyncio.get_running_loop()
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sinks")
+        pending = []
+
+        async def consumer(log_name: str, batch: List[Dict]):
+            pending.extend(batch)
+            while len(pending) >= analyzer.SINK_BATCH_SIZE:
+                chunk = pending[:analyzer.SINK_BATCH_SIZE]
+                del pending[:analyzer.SINK_BATCH_SIZE]
+                await loop.run_in_executor(executor, analyzer._write_sinks, chunk)
+
+        async def flush():
+            try:
+                if pending:
+                    await loop.run_in_executor(executor, analyzer._write_sinks, list(pending))
+                    pending.clear()
+            finally:
+                executor.shutdown(wait=False)
+
+        return consumer, flush
+
+    async def run(self) -> Dict[str, List[Dict]]:
+        """
+        Wykonuje potok do końca odczytu wszystkich dzienników
+
+        Returns:
+            Słownik nazwa dziennika -> zdarzenia od najnowszych (puste listy przy collect=False)
+        """
+        consumers = list(self.consumers)
+        threaded = [self._threaded(function, "consumer") for function in self.thread_consumers]
+        flush_sinks = None
+        if self.collect:
+            threaded.append(self._aggregator())
+        consumers.extend(threaded)
+        if self.analyzer.event_sinks:
+            sink_consumer, flush_sinks = self._sink_writer()
+            consumers.append(sink_consumer)
+
+        records = asyncio.Queue(self.queue_size)
+        events = asyncio.Queue(self.queue_size)
+        queues = [asyncio.Queue(self.queue_size) for _ in consumers]
+        started = {}
+        tasks = [asyncio.ensure_future(self._produce(log_name, records, started)) for log_name in self.logs]
+        tasks.append(asyncio.ensure_future(self._convert(records, events, started)))
+        tasks.append(asyncio.ensure_future(self._dispatch(events, queues)))
+        tasks.extend(asyncio.ensure_future(self._consume(queue, consumer))
+                     for queue, consumer in zip(queues, consumers))
+        try:
+            await asyncio.gather(*tasks)
+            if flush_sinks is not None:
+                await flush_sinks()
+        except BaseException:
+            # Błąd konsumenta lub anulowanie - pozostałe etapy czekałyby na kolejki
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        finally:
+            for consumer in threaded:
+                consumer.executor.shutdown(wait=False)
+        return self.events
+
+    async def batches(self) -> AsyncIterator[Tuple[str, List[Dict]]]:
+        """
+        Zwraca partie zdarzeń w miarę odczytu (async for log_name, events in ...)
+
+        Wolne pobieranie partii wstrzymuje odczyt dzienników. Przerwanie
+        iteracji anuluje potok.
+        """
+        output = asyncio.Queue(self.queue_size)
+
+        async def forward(log_name: str, batch: List[Dict]):
+            await output.put((log_name, batch))
+
+        async def run_and_close():
+            cancelled = False
+            try:
+                await self.run()
+            except asyncio.CancelledError:
+                cancelled = True
+                raise
+            finally:
+                # Po anulowaniu (iteracja przerwana) nikt nie odbiera kolejki -
+                # oczekiwanie na miejsce w pełnej kolejce zablokowałoby zamknięcie
+                if not cancelled:
+                    await output.put(None)
+
+        self.add_consumer(forward)
+        runner = asyncio.ensure_future(run_and_close())
+        try:
+            while True:
+                item = await output.get()
+                if item is None:
+                    break
+                yield item
+            await runner
+        finally:
+            if not runner.done():
+                # Anulowanie run anuluje i czeka na wszystkie etapy (odczyt, rozdział, konsumentów)
+                runner.cancel()
+                await asyncio.gather(runner, return_exceptions=True)
+
+    def summary(self) -> Optional[ReportSummary]:
+        """Podsumowanie wszystkich dzienników scalone w kolejności logs (przy collect=True)"""
+        if not self.collect:
+            return None
+        summary = self.analyzer._new_summary(self.logs)
+        for log_name in self.logs:
+            summary.merge(self.summaries[log_name])
+        return summary
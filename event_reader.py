@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Odczyt rekordów dziennika zdarzeń z wyprzedzeniem
+Kolejna partia rekordów jest pobierana w wątku tła, gdy bieżąca jest
+konwertowana (podwójne buforowanie), z metrykami partii i czasu oczekiwania
+"""
+
+import queue
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import pywintypes
+    import win32evtlog
+except ImportError:
+    pywintypes = win32evtlog = None
+
+
+# Domyślny rozmiar bufora ReadEventLog w bajtach (API przyjmuje najwyżej 0x7FFFF)
+READ_BUFFER_SIZE = 64 * 1024
+MAX_READ_BUFFER_SIZE = 0x7FFFF
+
+# Błędy dostępu do dziennika - pywintypes.error nie dziedziczy po OSError
+LOG_ERRORS = (OSError, pywintypes.error) if pywintypes is not None else (OSError,)
+
+
+class Win32RecordSource:
+    """Rekordy dziennika Windows (win32evtlog) czytane wstecz partiami"""
+
+    def __init__(self, buffer_size: int = READ_BUFFER_SIZE):
+        """
+        Args:
+            buffer_size: Rozmiar bufora jednego wywołania ReadEventLog w bajtach
+        """
+        if win32evtlog is None:
+            raise ImportError("Odczyt dzienników Windows wymaga pakietu: pip install pywin32")
+        self.buffer_size = min(buffer_size, MAX_READ_BUFFER_SIZE)
+        # Starsze wersje pywin32 nie przyjmują rozmiaru bufora
+        self._sized_reads = True
+
+    def open(self, log_name: str):
+        return win32evtlog.OpenEventLog(None, log_name)
+
+    def read(self, hand) -> List:
+        """Kolejna partia rekordów (pusta lista na końcu dziennika)"""
+        flags = win32evtlog.EVENTLOG_BACKWARDS_READ | win32evtlog.EVENTLOG_SEQUENTIAL_READ
+        if self._sized_reads:
+            try:
+                return win32evtlog.ReadEventLog(hand, flags, 0, self.buffer_size)
+            except TypeError:
+                self._sized_reads = False
+        return win32evtlog.ReadEventLog(hand, flags, 0)
+
+    def record_range(self, hand) -> Tuple[int, int]:
+        """Numer najstarszego rekordu i liczba rekordów dziennika"""
+        return win32evtlog.GetOldestEventLogRecord(hand), win32evtlog.GetNumberOfEventLogRecords(hand)
+
+    def close(self, hand):
+        win32evtlog.CloseEventLog(hand)
+
+
+class FakeEventRecord:
+    """Rekord o atrybutach PyEventLogRecord - do testów odczytu bez Windows"""
+
+    __slots__ = ('RecordNumber', 'TimeGenerated', 'TimeWritten', 'EventID', 'EventType', 'EventCategory',
+                 'SourceName', 'ComputerName', 'Sid', 'StringInserts', 'Data')
+
+    def __init__(self, record_number: int, time_generated: datetime, event_id: int, event_type: int,
+                 source_name: str, computer_name: str, string_inserts: Optional[tuple] = None):
+        self.RecordNumber = record_number
+        self.TimeGenerated = time_generated
+        self.TimeWritten = time_generated
+        self.EventID = event_id
+        self.EventType = event_type
+        self.EventCategory = 0
+        self.SourceName = source_name
+        self.ComputerName = computer_name
+        self.Sid = None
+        self.StringInserts = string_inserts
+        self.Data = None
+
+
+class FakeRecordSource:
+    """
+    Syntetyczne rekordy dziennika o interfejsie Win32RecordSource
+
+    Pozwala mierzyć przepustowość i sprawdzać kolejność odczytu (np.
+    ReadAheadReader) na systemach bez dzienników Windows. Rekordy są
+    zwracane od najnowszych, partiami mieszczącymi się w buforze, a opóźnienie
+    wywołania symuluje czas pracy API.
+
+    Przykład:
+        source = FakeRecordSource(records=100000, latency=0.002)
+        hand = source.open('System')
+        with ReadAheadReader(lambda: source.read(hand)) as reader:
+            numbers = [record.RecordNumber for batch in reader for record in batch]
+    """
+
+    EVENTS = ((7036, 4, 'Service Control Manager'), (1000, 1, 'Application Error'),
+              (10016, 1, 'DistributedCOM'), (51, 2, 'Disk'), (6005, 4, 'EventLog'))
+
+    def __init__(self, records: int = 10000, record_size: int = 512, buffer_size: int = READ_BUFFER_SIZE,
+                 latency: float = 0.0, interval: timedelta = timedelta(seconds=1),
+                 newest_time: datetime = None, seed: int = 0):
+        """
+        Args:
+            records: Liczba rekordów każdego dziennika
+            record_size: Średni rozmiar rekordu w bajtach (liczba rekordów w partii)
+            buffer_size: Rozmiar bufora odczytu w bajtach
+            latency: Czas jednego wywołania read w sekundach
+            interval: Odstęp czasu między kolejnymi rekordami
+            newest_time: Czas najnowszego rekordu (domyślnie teraz)
+            seed: Ziarno losowania rodzajów zdarzeń
+        """
+        self.records = records
+        self.batch_records = max(1, min(buffer_size, MAX_READ_BUFFER_SIZE) // record_size)
+        self.latency = latency
+        self.interval = interval
+        self.newest_time = (newest_time or datetime.now()).replace(microsecond=0)
+        self.seed = seed
+
+    def open(self, log_name: str) -> Dict:
+        return {'log_name': log_name, 'next': self.records,
+                'random': random.Random(f"{self.seed}:{log_name}")}
+
+    def read(self, hand: Dict) -> List[FakeEventRecord]:
+        if self.latency:
+            time.sleep(self.latency)
+        newest = hand['next']
+        oldest = max(0, newest - self.batch_records)
+        hand['next'] = oldest
+        choose = hand['random'].choice
+        batch = []
+        for number in range(newest, oldest, -1):
+            event_id, event_type, source = choose(self.EVENTS)
+            event_time = self.newest_time - (self.records - number) * self.interval
+            batch.append(FakeEventRecord(number, event_time, event_id, event_type, source, 'FAKE-HOST',
+                                         (source, str(number))))
+        return batch
+
+    def record_range(self, hand: Dict) -> Tuple[int, int]:
+        # Rekordy są numerowane od 1 do records
+        return (1, self.records) if self.records else (0, 0)
+
+    def close(self, hand: Dict):
+        hand['next'] = 0
+
+
+class ReadMetrics:
+    """Metryki odczytu z wyprzedzeniem: rozmiary partii i czasy oczekiwania"""
+
+    def __init__(self):
+        self.batches = 0
+        self.records = 0
+        self.min_batch = None
+        self.max_batch = 0
+        # Łączny czas wywołań odczytu (w wątku tła)
+        self.read_seconds = 0.0
+        # Konwersja czekała na partię - odczyt nie nadążał
+        self.stall_seconds = 0.0
+        self.stalls = 0
+        # Odczyt czekał na wolny bufor - konwersja nie nadążała
+        self.wait_seconds = 0.0
+
+    def add_batch(self, size: int):
+        self.batches += 1
+        self.records += size
+        self.min_batch = size if self.min_batch is None else min(self.min_batch, size)
+        self.max_batch = max(self.max_batch, size)
+
+    @property
+    def mean_batch(self) -> float:
+        return self.records / self.batches if self.batches else 0.0
+
+    def to_dict(self) -> Dict:
+        return {
+            'batches': self.batches,
+            'records': self.records,
+            'min_batch': self.min_batch or 0,
+            'max_batch': self.max_batch,
+            'mean_batch': round(self.mean_batch, 1),
+            'read_seconds': round(self.read_seconds, 6),
+            'stall_seconds': round(self.stall_seconds, 6),
+            'stalls': self.stalls,
+            'wait_seconds': round(self.wait_seconds, 6),
+        }
+
+
+class _ReadFailure:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+class ReadAheadReader:
+    """
+    Partie rekordów pobierane z wyprzedzeniem w wątku tła
+
+    Wątek tła wywołuje read() i odkłada partie do kolejki o pojemności
+    read_ahead, więc kolejna partia jest czytana, gdy bieżąca jest
+    konwertowana (read_ahead=1 - podwójne buforowanie). Kolejność partii
+    jest zachowana. Przy read_ahead=0 odczyt odbywa się w wątku wywołującym.
+    Czytnik trzeba zamknąć (close lub with), jeśli iteracja kończy się przed
+    końcem dziennika - close czeka na trwające wywołanie read, więc uchwyt
+    dziennika można potem bezpiecznie zamknąć.
+    """
+
+    # Co ile sekund wątek tła sprawdza, czy czytnik nie został zamknięty
+    POLL_INTERVAL = 0.1
+
+    def __init__(self, read: Callable[[], List], read_ahead: int = 1,
+                 on_stall: Callable[[float], None] = None):
+        """
+        Args:
+            read: Funkcja zwracająca kolejną partię rekordów (pustą na końcu)
+            read_ahead: Liczba partii buforowanych ponad konwertowaną
+            on_stall: Wywoływane z czasem każdego oczekiwania na partię (np. statystyki)
+        """
+        self.read = read
+        self.read_ahead = read_ahead
+        self.on_stall = on_stall
+        self.metrics = ReadMetrics()
+        self._queue = queue.Queue(maxsize=read_ahead) if read_ahead > 0 else None
+        self._closed = threading.Event()
+        self._thread = None
+
+    def __enter__(self) -> 'ReadAheadReader':
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
+
+    def _timed_read(self) -> List:
+        start = time.perf_counter()
+        batch = self.read()
+        self.metrics.read_seconds += time.perf_counter() - start
+        return batch
+
+    def _put(self, item) -> bool:
+        """Odkłada partię, czekając na wolne miejsce (False - czytnik zamknięty)"""
+        start = time.perf_counter()
+        try:
+            while not self._closed.is_set():
+                try:
+                    self._queue.put(item, timeout=self.POLL_INTERVAL)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+        finally:
+            self.metrics.wait_seconds += time.perf_counter() - start
+
+    def _run(self):
+        try:
+            while not self._closed.is_set():
+                batch = self._timed_read()
+                if not self._put(batch) or not batch:
+                    return
+        except BaseException as e:
+            self._put(_ReadFailure(e))
+
+    def __iter__(self) -> Iterator[List]:
+        if self._queue is None:
+            while not self._closed.is_set():
+                batch = self._timed_read()
+                if not batch:
+                    return
+                self.metrics.add_batch(len(batch))
+                yield batch
+            return
+
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="event-log-read-ahead", daemon=True)
+            self._thread.start()
+        while True:
+            start = time.perf_counter()
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                item = self._queue.get()
+                stall = time.perf_counter() - start
+                self.metrics.stall_seconds += stall
+                self.metrics.stalls += 1
+                if self.on_stall is not None:
+                    self.on_stall(stall)
+            if isinstance(item, _ReadFailure):
+                raise item.error
+            if not item:
+                return
+            self.metrics.add_batch(len(item))
+            yield item
+
+    def close(self):
+        """Zatrzymuje wątek tła i czeka na zakończenie trwającego odczytu"""
+        self._closed.set()
+        if self._thread is None:
+            return
+        # Zwolnij miejsce w kolejce, jeśli wątek czeka na odłożenie partii
+        while self._thread.is_alive():
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                pass
+            self._thread.join(self.POLL_INTERVAL)
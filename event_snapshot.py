@@ -0,0 +1,476 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Migawki przeanalizowanych zdarzeń
+Zwarty format binarny do zapisu i szybkiego ponownego wczytania zestawu zdarzeń:
+bloki kolumnowe kompresowane zstd (lub zlib), wspólny słownik tekstów
+oraz nagłówek JSON z zakresem analizy, dziennikami i gotowym podsumowaniem
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+import zlib
+from array import array
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from event_fields import EventFieldStore, FieldTable, StringTable
+from message_store import MessageStore
+from report_summary import ReportSummary
+from time_index import EventTimeIndex
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+MAGIC = b'WEASNAP1'
+FORMAT_VERSION = 1
+
+# Sygnatura i długość nagłówka JSON na początku pliku
+PREAMBLE = struct.Struct('<8sQ')
+
+# Bloki danych zaczynają się od przesunięć podzielnych przez 8, aby kolumny
+# z pliku odwzorowanego w pamięci można było czytać bez kopiowania
+ALIGNMENT = 8
+
+CODECS = ('zstd', 'zlib', 'none')
+
+TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# Czas zdarzenia zapisywany jest jako liczba mikrosekund od tej chwili
+EPOCH = datetime(1970, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+
+# Kolumny zdarzeń: (klucz zdarzenia, typ tablicy array) w kolejności kluczy słownika zdarzenia.
+# Teksty są kodami we wspólnym słowniku migawki (0 - None), brak liczby zapisywany jest jako -1
+COLUMNS = (
+    ('time', 'q'),
+    ('log_name', 'I'),
+    ('event_id', 'I'),
+    ('source', 'I'),
+    ('severity', 'B'),
+    ('message', 'I'),
+    ('message_ref', 'i'),
+    ('category', 'i'),
+    ('record_number', 'q'),
+    ('computer', 'I'),
+    ('user_sid', 'I'),
+    ('field_row', 'i'),
+)
+TEXT_COLUMNS = ('log_name', 'source', 'message', 'computer', 'user_sid')
+OPTIONAL_COLUMNS = ('message_ref', 'category', 'record_number', 'field_row')
+
+
+def _format_time(value: Optional[datetime]) -> Optional[str]:
+    return value.strftime(TIME_FORMAT) if value else None
+
+
+def _parse_time(value: Optional[str]) -> Optional[datetime]:
+    return datetime.strptime(value, TIME_FORMAT) if value else None
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def _compressor(codec: str, level: int):
+    if codec == 'zstd':
+        return zstandard.ZstdCompressor(level=level).compress
+    if codec == 'zlib':
+        return lambda data: zlib.compress(data, level)
+    return None
+
+
+def _decompress(codec: str, data) -> bytes:
+    if codec == 'zstd':
+        return zstandard.ZstdDecompressor().decompress(data)
+    return zlib.decompress(data)
+
+
+def _encode_strings(values: List[str]) -> Dict[str, bytes]:
+    """
+    Słownik tekstów jako jeden blok UTF-8 rozdzielany znakiem NUL
+
+    Długości tekstów (w znakach) pozwalają odtworzyć słownik także wtedy,
+    gdy któryś tekst zawiera znak NUL.
+    """
+    return {
+        'text': '\0'.join(values).encode('utf-8', errors='surrogatepass'),
+        'lengths': array('I', map(len, values)).tobytes(),
+    }
+
+
+def _decode_strings(text, lengths, count: int) -> List[str]:
+    if not count:
+        return []
+    values = bytes(text).decode('utf-8', errors='surrogatepass').split('\0')
+    if len(values) == count:
+        return values
+    # Teksty zawierające NUL - podział według zapisanych długości
+    joined = '\0'.join(values)
+    values = []
+    position = 0
+    for length in _typed(lengths, 'I'):
+        values.append(joined[position:position + length])
+        position += length + 1
+    return values
+
+
+def _typed(data, typecode: str, byteorder: str = sys.byteorder):
+    """Widok bloku jako tablica liczb (bez kopiowania, gdy kolejność bajtów się zgadza)"""
+    if byteorder == sys.byteorder:
+        return memoryview(data).cast('B').cast(typecode)
+    values = array(typecode)
+    values.frombytes(data)
+    values.byteswap()
+    return values
+
+
+class _BlockWriter:
+    """Bloki danych migawki wraz z opisami zapisywanymi w nagłówku"""
+
+    def __init__(self, codec: str, level: int):
+        self.codec = codec
+        self.level = level
+        self._blocks = []
+
+    def add(self, data, compress: bool = True) -> int:
+        """Dodaje blok i zwraca jego numer (odwołanie w nagłówku)"""
+        self._blocks.append((data, compress and self.codec != 'none'))
+        return len(self._blocks) - 1
+
+    def compress(self, workers: int = None) -> List:
+        """Kompresuje bloki równolegle (zstd i zlib zwalniają GIL) i zwraca ich opisy"""
+        compress = _compressor(self.codec, self.level)
+        with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+            data = list(executor.map(lambda block: compress(block[0]) if block[1] else block[0],
+                                     self._blocks))
+        # Długości w bajtach (także dla tablic array zapisywanych bez kompresji)
+        data = [memoryview(block).cast('B') for block in data]
+        self._data = data
+        descriptors = []
+        offset = 0
+        for block, (_, compressed) in zip(data, self._blocks):
+            descriptors.append([offset, len(block), compressed])
+            offset = _aligned(offset + len(block))
+        return descriptors
+
+    def write(self, file):
+        """Zapisuje skompresowane bloki z wyrównaniem (po compress)"""
+        for block in self._data:
+            file.write(block)
+            file.write(bytes(_aligned(len(block)) - len(block)))
+
+
+class EventColumns(Sequence):
+    """
+    Zdarzenia migawki odtwarzane z kolumn na żądanie
+
+    Lista zachowuje się jak self.events analizatora (indeksowanie, wycinki,
+    iteracja, reversed), ale słowniki zdarzeń powstają dopiero przy dostępie,
+    więc wczytanie milionów zdarzeń nie tworzy milionów obiektów. Każdy
+    dostęp zwraca nowy słownik - zmiany w nim nie są zapamiętywane.
+    """
+
+    def __init__(self, columns: Dict[str, Sequence], strings: List[Optional[str]],
+                 severity_names: Dict[int, str]):
+        self.columns = columns
+        self.strings = strings
+        self.severity_names = severity_names
+        # Czasy powtarzają się (wiele zdarzeń w tej samej sekundzie) - datetime tworzony raz
+        self._times = {}
+        self._length = len(columns['time'])
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self._events(*index.indices(self._length)))
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("indeks zdarzenia poza zakresem")
+        return next(self._events(index, index + 1, 1))
+
+    def __iter__(self) -> Iterator[Dict]:
+        return self._events(0, self._length, 1)
+
+    def __reversed__(self) -> Iterator[Dict]:
+        return self._events(self._length - 1, -1, -1)
+
+    def time_index(self) -> EventTimeIndex:
+        """Indeks czasowy na kolumnie czasu - bez odtwarzania zdarzeń spoza wybranych zakresów"""
+        return EventTimeIndex(self, times=self.columns['time'],
+                              time_key=lambda value: (value - EPOCH) // MICROSECOND)
+
+    def _events(self, start: int, stop: int, step: int) -> Iterator[Dict]:
+        if stop < 0:
+            stop = None
+        columns = [self.columns[name][start:stop:step] for name, _ in COLUMNS]
+        strings = self.strings
+        severity_names = self.severity_names
+        times = self._times
+        for (time_value, log_name, event_id, source, severity, message, message_ref, category,
+             record_number, computer, user_sid, field_row) in zip(*columns):
+            event_time = times.get(time_value)
+            if event_time is None:
+                event_time = times[time_value] = EPOCH + timedelta(microseconds=time_value)
+            yield {
+                'log_name': strings[log_name],
+                'event_id': event_id,
+                'source': strings[source],
+                'time': event_time,
+                'severity': severity,
+                'severity_name': severity_names[severity],
+                'message': strings[message],
+                'message_ref': message_ref if message_ref >= 0 else None,
+                'category': category if category >= 0 else None,
+                'record_number': record_number if record_number >= 0 else None,
+                'computer': strings[computer],
+                'user_sid': strings[user_sid],
+                'field_row': field_row if field_row >= 0 else None,
+            }
+
+
+class Snapshot:
+    """Zawartość wczytanej migawki"""
+
+    def __init__(self, header: Dict, events: EventColumns, messages: MessageStore,
+                 fields: EventFieldStore, summary: ReportSummary):
+        self.header = header
+        self.events = events
+        self.messages = messages
+        self.fields = fields
+        self.summary = summary
+
+    @property
+    def hours_back(self) -> Optional[int]:
+        return self.header['hours_back']
+
+    @property
+    def start_time(self) -> Optional[datetime]:
+        return _parse_time(self.header['start_time'])
+
+    @property
+    def end_time(self) -> Optional[datetime]:
+        return _parse_time(self.header['end_time'])
+
+    @property
+    def logs(self) -> List[str]:
+        return list(self.header['logs'])
+
+    @property
+    def newest_records(self) -> Dict[str, int]:
+        return dict(self.header['newest_records'])
+
+
+def write_snapshot(filename: str, events: Sequence, messages: MessageStore, fields: EventFieldStore,
+                   summary: ReportSummary, hours_back: Optional[int] = None,
+                   start_time: datetime = None, end_time: datetime = None, logs: Iterable[str] = (),
+                   newest_records: Dict[str, int] = None, codec: str = None, level: int = 3) -> int:
+    """
+    Zapisuje zdarzenia, magazyny treści i pól oraz podsumowanie do pliku migawki
+
+    Plik powstaje pod nazwą tymczasową i jest podmieniany po zapisaniu całości,
+    więc przerwany zapis nie niszczy poprzedniej migawki.
+
+    Args:
+        filename: Nazwa pliku migawki
+        events: Zdarzenia (jak self.events analizatora, od najnowszych)
+        messages: Magazyn pełnych treści wiadomości
+        fields: Magazyn nazwanych pól zdarzeń
+        summary: Podsumowanie analizy (odtwarzane przy wczytaniu bez przeliczania)
+        hours_back, start_time, end_time, logs, newest_records: Parametry analizy
+        codec: Kompresja bloków: 'zstd', 'zlib' lub 'none' (None - zstd, jeśli dostępny)
+        level: Poziom kompresji
+
+    Returns:
+        Rozmiar pliku w bajtach
+    """
+    if codec is None:
+        codec = 'zstd' if zstandard is not None else 'zlib'
+    if codec not in CODECS:
+        raise ValueError(f"Nieznana kompresja migawki: {codec} (dostępne: {', '.join(CODECS)})")
+    if codec == 'zstd' and zstandard is None:
+        raise ImportError("Kompresja zstd wymaga pakietu: pip install zstandard")
+
+    blocks = _BlockWriter(codec, level)
+
+    # Kolumny zdarzeń - teksty kodowane we wspólnym słowniku (kolejność wstawienia = kod)
+    codes = {None: 0}
+    column_blocks = {}
+    for name, typecode in COLUMNS:
+        if name == 'time':
+            values = array(typecode, [(event['time'] - EPOCH) // MICROSECOND for event in events])
+        elif name in TEXT_COLUMNS:
+            intern = codes.setdefault
+            values = array(typecode, [intern(event[name], len(codes)) for event in events])
+        elif name in OPTIONAL_COLUMNS:
+            values = array(typecode, [-1 if value is None else value
+                                      for value in (event.get(name) for event in events)])
+        else:
+            values = array(typecode, [event[name] for event in events])
+        column_blocks[name] = blocks.add(values)
+    strings = list(codes)[1:]
+    severity_names = {event['severity']: event['severity_name'] for event in events}
+
+    # Magazyn wiadomości - bloki są już skompresowane, zapisywane bez zmian
+    messages.flush()
+    entries = list(zip(*messages.entries)) or ((), (), ())
+    message_header = {
+        'codec': messages.codec,
+        'dictionary': blocks.add(messages.dictionary, compress=False) if messages.dictionary else None,
+        'blocks': [blocks.add(block, compress=False) for block in messages.blocks],
+        'entries': [blocks.add(array('I', column)) for column in entries],
+        'raw_bytes': messages.raw_bytes,
+        'deduplicated': messages.deduplicated,
+    }
+
+    # Magazyn pól - słownik wartości i kolumny kodów każdej tabeli
+    field_strings = fields.strings.values
+    field_header = {
+        'strings': {key: blocks.add(data) for key, data in _encode_strings(field_strings).items()},
+        'string_count': len(field_strings),
+        'tables': [
+            {
+                'provider': table.provider,
+                'event_id': table.event_id,
+                'field_names': table.field_names,
+                'row_count': table.row_count,
+                'columns': blocks.add(b''.join(table.columns[name].tobytes() for name in table.field_names)),
+            }
+            for table in fields.tables.values()
+        ],
+    }
+
+    header = {
+        'format': FORMAT_VERSION,
+        'created': datetime.now().strftime(TIME_FORMAT),
+        'byteorder': sys.byteorder,
+        'codec': codec,
+        'hours_back': hours_back,
+        'start_time': _format_time(start_time),
+        'end_time': _format_time(end_time),
+        'logs': list(logs),
+        'newest_records': newest_records or {},
+        'event_count': len(events),
+        'columns': [[name, typecode, column_blocks[name]] for name, typecode in COLUMNS],
+        'strings': {key: blocks.add(data) for key, data in _encode_strings(strings).items()},
+        'string_count': len(strings),
+        'severity_names': {str(k): v for k, v in sorted(severity_names.items())},
+        'messages': message_header,
+        'fields': field_header,
+        'summary': summary.to_dict(),
+    }
+    header['blocks'] = blocks.compress()
+    header_data = json.dumps(header, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+    temp_path = f"{filename}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, 'xb') as file:
+            file.write(PREAMBLE.pack(MAGIC, len(header_data)))
+            file.write(header_data)
+            file.write(bytes(_aligned(PREAMBLE.size + len(header_data)) - PREAMBLE.size - len(header_data)))
+            blocks.write(file)
+            size = file.tell()
+        os.replace(temp_path, filename)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return size
+
+
+def read_snapshot(filename: str, memory_map: bool = False, workers: int = None) -> Snapshot:
+    """
+    Wczytuje migawkę zapisaną przez write_snapshot
+
+    Bloki są dekompresowane równolegle, kolumny zdarzeń są widokami
+    zdekompresowanych danych (bez konwersji na słowniki), a podsumowanie
+    pochodzi z nagłówka - raporty nie wymagają przeglądania zdarzeń.
+
+    Args:
+        filename: Nazwa pliku migawki
+        memory_map: Odwzoruj plik w pamięci zamiast go czytać - bloki bez kompresji
+                    (codec='none') są wtedy używane bez kopiowania, a bloki wiadomości
+                    czytane z dysku dopiero przy dostępie. Plik pozostaje otwarty,
+                    dopóki istnieją zdarzenia migawki.
+        workers: Liczba wątków dekompresji (None - liczba rdzeni)
+
+    Returns:
+        Zawartość migawki
+    """
+    with open(filename, 'rb') as file:
+        magic, header_length = PREAMBLE.unpack(file.read(PREAMBLE.size))
+        if magic != MAGIC:
+            raise ValueError(f"Plik {filename} nie jest migawką analizatora zdarzeń")
+        header = json.loads(file.read(header_length).decode('utf-8'))
+        if header['format'] > FORMAT_VERSION:
+            raise ValueError(f"Migawka {filename} ma nowszy format ({header['format']}) - "
+                             f"zaktualizuj analizator")
+        data_start = _aligned(PREAMBLE.size + header_length)
+
+        if memory_map:
+            view = memoryview(mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ))
+            raw = [view[data_start + offset:data_start + offset + length]
+                   for offset, length, _ in header['blocks']]
+        else:
+            raw = []
+            for offset, length, _ in header['blocks']:
+                file.seek(data_start + offset)
+                raw.append(file.read(length))
+
+    codec = header['codec']
+    if codec == 'zstd' and zstandard is None:
+        raise ImportError("Migawka jest skompresowana zstd - wymaga pakietu: pip install zstandard")
+    compressed = [index for index, (_, _, is_compressed) in enumerate(header['blocks']) if is_compressed]
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+        for index, data in zip(compressed, executor.map(lambda i: _decompress(codec, raw[i]), compressed)):
+            raw[index] = data
+
+    byteorder = header['byteorder']
+    strings = [None] + _decode_strings(raw[header['strings']['text']], raw[header['strings']['lengths']],
+                                       header['string_count'])
+    columns = {name: _typed(raw[block], typecode, byteorder) for name, typecode, block in header['columns']}
+    severity_names = {int(k): v for k, v in header['severity_names'].items()}
+    events = EventColumns(columns, strings, severity_names)
+
+    # Magazyn wiadomości z gotowymi blokami (nowe treści nie są deduplikowane względem wczytanych)
+    message_header = header['messages']
+    messages = MessageStore(use_zstd=message_header['codec'] == 'zstd', train_dictionary=False)
+    if message_header['dictionary'] is not None:
+        messages.dictionary = bytes(raw[message_header['dictionary']])
+    messages.blocks = [raw[block] if memory_map else bytes(raw[block]) for block in message_header['blocks']]
+    messages.entries = list(zip(*(_typed(raw[block], 'I', byteorder) for block in message_header['entries'])))
+    messages.raw_bytes = message_header['raw_bytes']
+    messages.deduplicated = message_header['deduplicated']
+
+    field_header = header['fields']
+    fields = EventFieldStore()
+    field_strings = StringTable()
+    field_strings.values = _decode_strings(raw[field_header['strings']['text']],
+                                           raw[field_header['strings']['lengths']],
+                                           field_header['string_count'])
+    field_strings._codes = {value: code for code, value in enumerate(field_strings.values)}
+    fields.strings = field_strings
+    for table_data in field_header['tables']:
+        table = FieldTable(table_data['provider'], table_data['event_id'], table_data['field_names'])
+        table.row_count = table_data['row_count']
+        values = _typed(raw[table_data['columns']], 'I', byteorder)
+        for index, name in enumerate(table.field_names):
+            # Tabele pól są rozszerzane przy dodawaniu zdarzeń - kolumny jako tablice array
+            table.columns[name] = array('I', values[index * table.row_count:(index + 1) * table.row_count])
+        fields.tables[(table.provider, table.event_id)] = table
+
+    summary = ReportSummary.from_dict(header.pop('summary'))
+    for name in ('blocks', 'columns', 'strings', 'messages', 'fields'):
+        header.pop(name)
+    return Snapshot(header, events, messages, fields, summary)
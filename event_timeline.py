@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Oś czasu zdarzeń
+Liczby zdarzeń w przedziałach czasu (według ważności i Event ID) oraz
+wykresy raportu HTML zredukowane algorytmem LTTB do ograniczonej liczby punktów
+"""
+
+import json
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+
+# Początek numeracji przedziałów (czasy zdarzeń są lokalne, bez strefy)
+EPOCH = datetime(1970, 1, 1)
+
+# Domyślna szerokość przedziału w sekundach
+BUCKET_SECONDS = 300
+
+# Przedziały wykresu na jeden punkt po redukcji LTTB - dłuższe okresy są
+# rysowane z szerszych przedziałów (koszt wykresu nie rośnie z długością okresu)
+CHART_BUCKETS_PER_POINT = 4
+
+
+def _flatten(counts: Dict[int, int]) -> List[int]:
+    return [value for bucket in sorted(counts) for value in (bucket, counts[bucket])]
+
+
+def _unflatten(values: Sequence[int]) -> Dict[int, int]:
+    return dict(zip(values[0::2], values[1::2]))
+
+
+class EventTimeline:
+    """
+    Liczby zdarzeń w przedziałach czasu o stałej szerokości
+
+    Przedziały są numerowane od EPOCH, więc osie czasu różnych dzienników
+    i okresów można scalać (merge). Serie są rzadkie - przechowywane są tylko
+    przedziały z co najmniej jednym zdarzeniem. Zapis (to_dict) może pominąć
+    serie rzadkich Event ID - są wtedy oznaczone jako niepełne i nie są
+    odtwarzane przy scalaniu.
+    """
+
+    def __init__(self, bucket_seconds: int = BUCKET_SECONDS, per_event_id: bool = True):
+        """
+        Args:
+            bucket_seconds: Szerokość przedziału w sekundach
+            per_event_id: Zliczaj też serie każdego Event ID (poza ważnościami)
+        """
+        self.bucket_seconds = bucket_seconds
+        self.per_event_id = per_event_id
+        # ważność / Event ID -> {numer przedziału: liczba zdarzeń}
+        self.severity_counts = {}
+        self.event_id_counts = {}
+        # Event ID, których serie pominięto przy zapisie - ich liczby są niepełne
+        self.dropped_event_ids = set()
+        # Granice ostatniego przedziału - zdarzenia napływają uporządkowane w czasie
+        self._bucket = None
+        self._start = None
+        self._end = None
+
+    def __bool__(self) -> bool:
+        return bool(self.severity_counts)
+
+    def bucket_of(self, time: datetime) -> int:
+        """Numer przedziału zawierającego podany czas"""
+        return int((time - EPOCH).total_seconds() // self.bucket_seconds)
+
+    def bucket_time(self, bucket: int) -> datetime:
+        """Początek przedziału o podanym numerze"""
+        return EPOCH + timedelta(seconds=bucket * self.bucket_seconds)
+
+    def add(self, time: datetime, severity: int, event_id: int):
+        """Dolicza zdarzenie do przedziału jego czasu"""
+        if self._start is None or not self._start <= time < self._end:
+            self._bucket = self.bucket_of(time)
+            self._start = self.bucket_time(self._bucket)
+            self._end = self._start + timedelta(seconds=self.bucket_seconds)
+        bucket = self._bucket
+
+        counts = self.severity_counts.get(severity)
+        if counts is None:
+            counts = self.severity_counts[severity] = {}
+        counts[bucket] = counts.get(bucket, 0) + 1
+
+        if self.per_event_id and event_id not in self.dropped_event_ids:
+            counts = self.event_id_counts.get(event_id)
+            if counts is None:
+                counts = self.event_id_counts[event_id] = {}
+            counts[bucket] = counts.get(bucket, 0) + 1
+
+    def has_event_id_series(self, event_id: int) -> bool:
+        """Czy seria Event ID jest pełna (zliczana i nie pominięta przy zapisie)"""
+        return self.per_event_id and event_id not in self.dropped_event_ids
+
+    def merge(self, other: 'EventTimeline'):
+        """Scala inną oś czasu z bieżącą (przedziały innej szerokości są przeliczane)"""
+        sources = [(self.severity_counts, other.severity_counts)]
+        if self.per_event_id:
+            # Seria pominięta w jednej z osi byłaby po scaleniu niepełna
+            self.dropped_event_ids |= other.dropped_event_ids
+            for event_id in self.dropped_event_ids:
+                self.event_id_counts.pop(event_id, None)
+            sources.append((self.event_id_counts, other.event_id_counts))
+        for target, source in sources:
+            for key, other_counts in source.items():
+                if target is self.event_id_counts and key in self.dropped_event_ids:
+                    continue
+                counts = target.get(key)
+                if counts is None:
+                    counts = target[key] = {}
+                for bucket, count in other_counts.items():
+                    if other.bucket_seconds != self.bucket_seconds:
+                        bucket = bucket * other.bucket_seconds // self.bucket_seconds
+                    counts[bucket] = counts.get(bucket, 0) + count
+
+    def bounds(self) -> Optional[Tuple[int, int]]:
+        """Numery pierwszego i ostatniego przedziału ze zdarzeniami (None dla pustej osi)"""
+        buckets = [bucket for counts in self.severity_counts.values() for bucket in (min(counts), max(counts))]
+        if not buckets:
+            return None
+        return min(buckets), max(buckets)
+
+    @staticmethod
+    def dense(counts: Dict[int, int], first: int, last: int, factor: int = 1) -> List[int]:
+        """
+        Seria jako lista liczb kolejnych przedziałów first..last (z zerami)
+
+        Przy factor > 1 każda pozycja sumuje factor kolejnych przedziałów -
+        koszt zależy od liczby niepustych przedziałów i długości wyniku.
+        """
+        values = [0] * ((last - first) // factor + 1)
+        for bucket, count in counts.items():
+            if first <= bucket <= last:
+                values[(bucket - first) // factor] += count
+        return values
+
+    def to_dict(self, event_ids: Iterable[int] = None) -> Dict:
+        """
+        Zwraca oś czasu jako słownik gotowy do serializacji JSON
+
+        Args:
+            event_ids: Event ID, których serie są zapisywane (None - wszystkie);
+                       pozostałe są zapisane jako pominięte (dropped_event_ids)
+        """
+        series = self.event_id_counts
+        dropped = self.dropped_event_ids
+        if event_ids is not None:
+            kept = set(event_ids)
+            series = {key: counts for key, counts in series.items() if key in kept}
+            dropped = dropped | (self.event_id_counts.keys() - kept)
+        return {
+            'bucket_seconds': self.bucket_seconds,
+            'per_event_id': self.per_event_id,
+            # Serie jako płaskie listy [przedział, liczba, przedział, liczba, ...]
+            'severity': {str(k): _flatten(v) for k, v in sorted(self.severity_counts.items())},
+            'event_ids': {str(k): _flatten(v) for k, v in sorted(series.items())},
+            'dropped_event_ids': sorted(dropped),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'EventTimeline':
+        """Odtwarza oś czasu z postaci słownikowej (to_dict)"""
+        timeline = cls(data['bucket_seconds'], data.get('per_event_id', True))
+        timeline.severity_counts = {int(k): _unflatten(v) for k, v in data['severity'].items()}
+        timeline.event_id_counts = {int(k): _unflatten(v) for k, v in data['event_ids'].items()}
+        timeline.dropped_event_ids = set(data.get('dropped_event_ids', ()))
+        return timeline
+
+
+def lttb(points: Sequence[Tuple[float, float]], threshold: int) -> List[Tuple[float, float]]:
+    """
+    Redukuje serię do threshold punktów algorytmem Largest-Triangle-Three-Buckets
+
+    Pierwszy i ostatni punkt są zachowane, a z każdego z pozostałych
+    przedziałów wybierany jest punkt tworzący największy trójkąt z punktem
+    poprzednio wybranym i średnią następnego przedziału - piki są zachowane
+    mimo redukcji.
+    """
+    count = len(points)
+    if threshold >= count or threshold < 3:
+        return list(points)
+
+    sampled = [points[0]]
+    every = (count - 2) / (threshold - 2)
+    selected = 0
+    for index in range(threshold - 2):
+        # Średnia następnego przedziału
+        average_start = int((index + 1) * every) + 1
+        average_end = min(int((index + 2) * every) + 1, count)
+        average_count = average_end - average_start
+        average_x = sum(point[0] for point in points[average_start:average_end]) / average_count
+        average_y = sum(point[1] for point in points[average_start:average_end]) / average_count
+
+        # Punkt bieżącego przedziału o największym trójkącie
+        selected_x, selected_y = points[selected]
+        largest = -1.0
+        candidate = selected
+        for position in range(int(index * every) + 1, int((index + 1) * every) + 1):
+            x, y = points[position]
+            area = abs((selected_x - average_x) * (y - selected_y) - (selected_x - x) * (average_y - selected_y))
+            if area > largest:
+                largest = area
+                candidate = position
+        sampled.append(points[candidate])
+        selected = candidate
+
+    sampled.append(points[-1])
+    return sampled
+
+
+def chart_data(timeline: EventTimeline, charts: List[Tuple[str, List[Tuple[str, str, Dict[int, int]]]]],
+               max_points: int) -> Optional[Dict]:
+    """
+    Dane wykresów osi czasu dla renderera raportu HTML
+
+    Args:
+        timeline: Oś czasu (wyznacza zakres i szerokość przedziałów)
+        charts: Wykresy jako (tytuł, [(nazwa serii, kolor, liczby przedziałów), ...])
+        max_points: Maksymalna liczba punktów każdej serii (redukcja LTTB)
+
+    Szerokość przedziału wykresu (step) to wielokrotność szerokości przedziału
+    osi dobrana tak, by seria miała najwyżej max_points * CHART_BUCKETS_PER_POINT
+    przedziałów przed redukcją LTTB.
+
+    Returns:
+        Słownik z przesunięciami przedziałów (x) i liczbami (y) serii lub None dla pustej osi
+    """
+    bounds = timeline.bounds()
+    if bounds is None:
+        return None
+    first, last = bounds
+    span = last - first + 1
+    factor = max(1, -(-span // (max_points * CHART_BUCKETS_PER_POINT)))
+    data = {
+        'start': first * timeline.bucket_seconds,
+        'step': timeline.bucket_seconds * factor,
+        'length': -(-span // factor),
+        'charts': [],
+    }
+    for title, series in charts:
+        chart = {'title': title, 'series': []}
+        for name, color, counts in series:
+            points = lttb(list(enumerate(timeline.dense(counts, first, last, factor))), max_points)
+            chart['series'].append({
+                'name': name,
+                'color': color,
+                'x': [x for x, _ in points],
+                'y': [y for _, y in points],
+            })
+        if chart['series']:
+            data['charts'].append(chart)
+    return data
+
+
+# Renderer wykresów osadzany w raporcie (bez zewnętrznych bibliotek, działa offline).
+# Wykresy to elementy .timeline-chart z atrybutem data-chart (indeks w data.charts).
+CHART_RENDERER = """
+(function () {
+    var data = JSON.parse(document.getElementById('timeline-data').textContent);
+    var W = 1000, H = 260, L = 55, R = 15, T = 10, B = 30;
+    var NS = 'http://www.w3.org/2000/svg';
+    var span = Math.max(data.length - 1, 1);
+
+    function node(name, attrs, parent) {
+        var element = document.createElementNS(NS, name);
+        for (var key in attrs) element.setAttribute(key, attrs[key]);
+        parent.appendChild(element);
+        return element;
+    }
+    function pad(n) { return (n < 10 ? '0' : '') + n; }
+    function label(offset) {
+        var d = new Date((data.start + offset * data.step) * 1000);
+        return d.getUTCFullYear() + '-' + pad(d.getUTCMonth() + 1) + '-' + pad(d.getUTCDate()) + ' ' +
+               pad(d.getUTCHours()) + ':' + pad(d.getUTCMinutes());
+    }
+    function nearest(xs, x) {
+        var low = 0, high = xs.length - 1;
+        while (low < high) {
+            var middle = (low + high) >> 1;
+            if (xs[middle] < x) low = middle + 1; else high = middle;
+        }
+        return (low > 0 && x - xs[low - 1] < xs[low] - x) ? low - 1 : low;
+    }
+    function px(x) { return L + x * (W - L - R) / span; }
+
+    function draw(container, chart) {
+        var visible = chart.series.filter(function (s) { return !s.hidden; });
+        var maxY = 1;
+        visible.forEach(function (s) { maxY = Math.max.apply(null, [maxY].concat(s.y)); });
+        function py(y) { return H - B - y * (H - T - B) / maxY; }
+
+        container.innerHTML = '';
+        var title = document.createElement('h3');
+        title.textContent = chart.title;
+        container.appendChild(title);
+        var svg = node('svg', {viewBox: '0 0 ' + W + ' ' + H, 'class': 'chart-svg'}, container);
+        for (var i = 0; i <= 4; i++) {
+            var y = py(maxY * i / 4);
+            node('line', {x1: L, x2: W - R, y1: y, y2: y, stroke: '#e9ecef'}, svg);
+            node('text', {x: L - 6, y: y + 4, 'text-anchor': 'end', 'class': 'chart-axis'}, svg)
+                .textContent = Math.round(maxY * i / 4);
+            var offset = Math.round(span * i / 4);
+            node('text', {x: px(offset), y: H - 8, 'class': 'chart-axis',
+                          'text-anchor': i === 0 ? 'start' : (i === 4 ? 'end' : 'middle')}, svg)
+                .textContent = label(offset);
+        }
+        visible.forEach(function (s) {
+            var points = s.x.map(function (x, k) { return px(x).toFixed(1) + ',' + py(s.y[k]).toFixed(1); });
+            node('polyline', {points: points.join(' '), fill: 'none', stroke: s.color, 'stroke-width': 1.5}, svg);
+        });
+
+        var cursor = node('line', {y1: T, y2: H - B, stroke: '#6c757d', visibility: 'hidden'}, svg);
+        var tip = document.createElement('div');
+        tip.className = 'chart-tip';
+        container.appendChild(tip);
+        svg.addEventListener('mousemove', function (event) {
+            var box = svg.getBoundingClientRect();
+            var x = Math.round(((event.clientX - box.left) * W / box.width - L) * span / (W - L - R));
+            x = Math.max(0, Math.min(span, x));
+            cursor.setAttribute('x1', px(x));
+            cursor.setAttribute('x2', px(x));
+            cursor.setAttribute('visibility', 'visible');
+            tip.textContent = [label(x)].concat(visible.map(function (s) {
+                return s.name + ': ' + s.y[nearest(s.x, x)];
+            })).join('   |   ');
+        });
+        svg.addEventListener('mouseleave', function () {
+            cursor.setAttribute('visibility', 'hidden');
+            tip.textContent = '';
+        });
+
+        var legend = document.createElement('div');
+        legend.className = 'chart-legend';
+        chart.series.forEach(function (s) {
+            var item = document.createElement('span');
+            item.innerHTML = '<i style="background:' + s.color + '"></i>';
+            item.appendChild(document.createTextNode(s.name));
+            if (s.hidden) item.className = 'hidden';
+            item.addEventListener('click', function () {
+                s.hidden = !s.hidden;
+                draw(container, chart);
+            });
+            legend.appendChild(item);
+        });
+        container.appendChild(legend);
+    }
+
+    var containers = document.querySelectorAll('.timeline-chart');
+    for (var i = 0; i < containers.length; i++) {
+        draw(containers[i], data.charts[+containers[i].getAttribute('data-chart')]);
+    }
+})();
+"""
+
+
+def chart_scripts(data: Dict) -> str:
+    """Dane wykresów (zwarty JSON) i renderer jako elementy <script> raportu HTML"""
+    encoded = json.dumps(data, ensure_ascii=False, separators=(',', ':')).replace('</', '<\\/')
+    return (f'<script type="application/json" id="timeline-data">{encoded}</script>\n'
+            f'<script>{CHART_RENDERER}</script>')
@@ -10,6 +10,14 @@ from windows_event_analyzer import (
     EventSeverity,
     SolutionDatabase
 )
+from analyzer_plugins import (
+    AnalyzerPlugin,
+    LogStatisticsPlugin,
+    TopErrorSourcesPlugin,
+    HourlyBreakdownPlugin,
+    SecurityAuditPlugin,
+    DiskHealthPlugin
+)
 from datetime import datetime
 
 
@@ -107,38 +115,23 @@ def example_statistics():
     print("PRZYKŁAD 5: Zaawansowane statystyki")
     print("=" * 80)
 
+    # Obie analizy wykonywane są w jednym przebiegu po zdarzeniach
     analyzer = WindowsEventAnalyzer(hours_back=24)
+    log_stats = LogStatisticsPlugin()
+    top_sources = TopErrorSourcesPlugin(limit=5)
+    analyzer.add_plugin(log_stats)
+    analyzer.add_plugin(top_sources)
     analyzer.analyze_events()
 
-    # Statystyki według dzienników
-    from collections import defaultdict
-
-    log_stats = defaultdict(lambda: {'total': 0, 'errors': 0, 'critical': 0})
-
-    for event in analyzer.events:
-        log_name = event['log_name']
-        log_stats[log_name]['total'] += 1
-
-        if event['severity'] == EventSeverity.ERROR:
-            log_stats[log_name]['errors'] += 1
-        elif event['severity'] == EventSeverity.CRITICAL:
-            log_stats[log_name]['critical'] += 1
-
     print("\nStatystyki według dzienników:")
-    for log_name, stats in log_stats.items():
+    for log_name, (total, errors, critical) in log_stats.counts.items():
         print(f"\n{log_name}:")
-        print(f"  Łącznie: {stats['total']}")
-        print(f"  Błędy: {stats['errors']}")
-        print(f"  Krytyczne: {stats['critical']}")
-
-    # Top 5 najbardziej problematycznych źródeł
-    source_errors = defaultdict(int)
-    for event in analyzer.events:
-        if event['severity'] <= EventSeverity.ERROR:
-            source_errors[event['source']] += 1
+        print(f"  Łącznie: {total}")
+        print(f"  Błędy: {errors}")
+        print(f"  Krytyczne: {critical}")
 
     print("\n\nTop 5 źródeł z największą liczbą błędów:")
-    for source, count in sorted(source_errors.items(), key=lambda x: x[1], reverse=True)[:5]:
+    for source, count in top_sources.top():
         print(f"  {source}: {count} błędów")
 
 
@@ -149,21 +142,13 @@ def example_hourly_breakdown():
     print("=" * 80)
 
     analyzer = WindowsEventAnalyzer(hours_back=24)
+    hourly = HourlyBreakdownPlugin()
+    analyzer.add_plugin(hourly)
     analyzer.analyze_events()
 
-    # Grupuj według godzin
-    from collections import defaultdict
-    hourly_counts = defaultdict(int)
-
-    for event in analyzer.events:
-        if event['severity'] <= EventSeverity.ERROR:  # Tylko błędy i krytyczne
-            hour = event['time'].hour
-            hourly_counts[hour] += 1
-
     print("\nRozkład błędów i zdarzeń krytycznych według godzin (ostatnie 24h):")
-    for hour in sorted(hourly_counts.keys()):
-        bar = "█" * (hourly_counts[hour] // 5 or 1)  # Prosty wykres
-        print(f"{hour:02d}:00 | {bar} ({hourly_counts[hour]})")
+    for line in hourly.render_txt():
+        print(line)
 
 
 def example_security_audit():
@@ -172,24 +157,24 @@ def example_security_audit():
     print("PRZYKŁAD 7: Audit bezpieczeństwa")
     print("=" * 80)
 
+    # Wtyczka otrzymuje tylko zdarzenia 4624 i 4625 z dziennika Security
     analyzer = WindowsEventAnalyzer(hours_back=24)
+    audit = SecurityAuditPlugin()
+    analyzer.add_plugin(audit)
     analyzer.analyze_events()
 
-    # Szukaj zdarzeń związanych z bezpieczeństwem
-    security_events = [e for e in analyzer.events if e['log_name'] == 'Security']
-
-    # Nieudane logowania
-    failed_logins = [e for e in security_events if e['event_id'] == 4625]
-    successful_logins = [e for e in security_events if e['event_id'] == 4624]
-
     print(f"\nZdarzenia bezpieczeństwa (ostatnie 24h):")
-    print(f"Łącznie zdarzeń Security: {len(security_events)}")
-    print(f"Udane logowania: {len(successful_logins)}")
-    print(f"Nieudane próby logowania: {len(failed_logins)}")
+    for line in audit.render_txt():
+        print(line)
 
-    if len(failed_logins) > 10:
-        print(f"\n[!] UWAGA: Wykryto {len(failed_logins)} nieudanych prób logowania!")
-        print("To może wskazywać na próby włamania. Zalecane działania:")
+    # Zagrożenia wykryte w oknach przesuwnych (brute force, spraying, nowi administratorzy)
+    if analyzer.security_findings:
+        print(f"\nWykryte zagrożenia ({len(analyzer.security_findings)}):")
+        for finding in analyzer.security_findings[:10]:
+            print(f"  [{finding.time}] {finding.name}: {finding.description}")
+
+    if audit.failed > audit.FAILED_THRESHOLD:
+        print("\nZalecane działania:")
         solution = SolutionDatabase.get_solution(4625)
         for sol in solution['solutions']:
             print(f"  - {sol}")
@@ -202,28 +187,13 @@ def example_disk_health_check():
     print("=" * 80)
 
     analyzer = WindowsEventAnalyzer(hours_back=168)  # 7 dni
+    disk_health = DiskHealthPlugin()
+    analyzer.add_plugin(disk_health)
     analyzer.analyze_events()
 
-    # Szukaj problemów dyskowych
-    disk_errors = [
-        e for e in analyzer.events
-        if e['event_id'] in [7, 51, 153, 154]  # Znane Event ID błędów dysku
-    ]
-
     print(f"\nSprawdzanie błędów dyskowych (ostatnie 7 dni):")
-    print(f"Znaleziono: {len(disk_errors)} potencjalnych problemów")
-
-    if disk_errors:
-        print("\n[!] UWAGA: Wykryto problemy z dyskiem!")
-        print("NATYCHMIAST wykonaj backup danych!")
-        print("\nSzczegóły:")
-        for event in disk_errors[:10]:  # Pierwszych 10
-            print(f"\n  Event ID {event['event_id']}: {event['time']}")
-            print(f"  Źródło: {event['source']}")
-            solution = SolutionDatabase.get_solution(event['event_id'])
-            print(f"  Problem: {solution['description']}")
-    else:
-        print("[OK] Nie wykryto problemów z dyskiem")
+    for line in disk_health.render_txt():
+        print(line)
 
 
 def example_custom_report():
@@ -299,12 +269,9 @@ def example_both_formats():
     analyzer = WindowsEventAnalyzer(hours_back=24)
     analyzer.analyze_events()
 
-    # Generuj oba formaty
-    print("\n1. Generowanie raportu TXT...")
-    txt_file = analyzer.save_report(format='txt')
-
-    print("\n2. Generowanie raportu HTML...")
-    html_file = analyzer.save_report(format='html')
+    # Generuj oba formaty równolegle z jednego podsumowania
+    print("\nGenerowanie raportów TXT i HTML...")
+    txt_file, html_file = analyzer.save_report(format=['txt', 'html'])
 
     print("\n✓ Oba raporty zostały wygenerowane!")
     print(f"\n  TXT:  {txt_file}")
@@ -313,6 +280,41 @@ def example_both_formats():
     print("HTML - do prezentacji i analizy wizualnej")
 
 
+class ServiceCrashPlugin(AnalyzerPlugin):
+    """Własna wtyczka: nieoczekiwane zatrzymania usług"""
+
+    name = 'service_crashes'
+    title = 'Awarie usług'
+    event_ids = (7031, 7034)
+    logs = ('System',)
+
+    def __init__(self):
+        self.count = 0
+
+    def on_event(self, event):
+        self.count += 1
+
+    def render_txt(self):
+        return [f"Nieoczekiwane zatrzymania usług: {self.count}"]
+
+
+def example_plugins():
+    """Przykład 12: Wtyczki - wiele analiz w jednym przebiegu z sekcjami w raporcie"""
+    print("\n" + "=" * 80)
+    print("PRZYKŁAD 12: Wtyczki analizatora")
+    print("=" * 80)
+
+    analyzer = WindowsEventAnalyzer(hours_back=24)
+    for plugin in (LogStatisticsPlugin(), HourlyBreakdownPlugin(), SecurityAuditPlugin(),
+                   DiskHealthPlugin(), ServiceCrashPlugin()):
+        analyzer.add_plugin(plugin)
+    analyzer.analyze_events()
+
+    # Sekcje wtyczek trafiają do raportów TXT i HTML przed rekomendacjami
+    txt_file, html_file = analyzer.save_report(format=['txt', 'html'])
+    print(f"\nRaporty z sekcjami wtyczek: {txt_file}, {html_file}")
+
+
 def main():
     """Uruchom wszystkie przykłady"""
     print("\n")
@@ -335,6 +337,7 @@ def main():
         # example_custom_report()
         # example_html_report()         # NOWOŚĆ: Raport HTML
         # example_both_formats()         # NOWOŚĆ: Oba formaty
+        # example_plugins()              # NOWOŚĆ: Wtyczki w jednym przebiegu
 
         print("\n" + "=" * 80)
         print("Wszystkie przykłady zostały wykonane pomyślnie!")
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Magazyn pełnych treści wiadomości zdarzeń
+Treści są deduplikowane po skrócie, łączone w bloki i kompresowane (zstd lub zlib),
+a zdarzenia przechowują jedynie odwołanie do wpisu w magazynie
+"""
+
+import hashlib
+import zlib
+from collections import OrderedDict
+from typing import List, Optional
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+class MessageStore:
+    """Skompresowany, deduplikowany magazyn treści wiadomości"""
+
+    # Minimalna liczba próbek potrzebna do wytrenowania słownika
+    MIN_DICTIONARY_SAMPLES = 100
+
+    def __init__(self, block_size: int = 64 * 1024, use_zstd: bool = None,
+                 train_dictionary: bool = True, dictionary_size: int = 16 * 1024,
+                 cache_blocks: int = 8, level: int = 3):
+        """
+        Args:
+            block_size: Rozmiar nieskompresowanego bloku w bajtach
+            use_zstd: Użyj zstd (None - automatycznie, jeśli pakiet zstandard jest dostępny)
+            train_dictionary: Wytrenuj słownik kompresji na wiadomościach pierwszego bloku
+            dictionary_size: Maksymalny rozmiar słownika w bajtach
+            cache_blocks: Liczba zdekompresowanych bloków trzymanych w pamięci podręcznej
+            level: Poziom kompresji
+        """
+        if use_zstd is None:
+            use_zstd = zstandard is not None
+        if use_zstd and zstandard is None:
+            raise ImportError("Kompresja zstd wymaga pakietu: pip install zstandard")
+
+        self.codec = 'zstd' if use_zstd else 'zlib'
+        self.block_size = block_size
+        self.train_dictionary = train_dictionary
+        self.dictionary_size = dictionary_size
+        self.cache_blocks = cache_blocks
+        self.level = level
+        self.dictionary = None
+        self._dictionary_ready = not train_dictionary
+
+        self.blocks = []
+        self.entries = []
+        self._by_hash = {}
+        self._buffer = bytearray()
+        self._buffer_samples = []
+        self._cache = OrderedDict()
+
+        self.raw_bytes = 0
+        self.deduplicated = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    @property
+    def compressed_bytes(self) -> int:
+        """Rozmiar skompresowanych bloków (bez bieżącego bufora)"""
+        return sum(len(block) for block in self.blocks)
+
+    def add(self, message: str) -> int:
+        """
+        Dodaje treść wiadomości do magazynu
+
+        Returns:
+            Odwołanie do wpisu (przekazywane później do get)
+        """
+        data = message.encode('utf-8', errors='replace')
+        digest = hashlib.blake2b(data, digest_size=16).digest()
+        ref = self._by_hash.get(digest)
+        if ref is not None:
+            self.deduplicated += 1
+            return ref
+
+        ref = len(self.entries)
+        self.entries.append((len(self.blocks), len(self._buffer), len(data)))
+        self._by_hash[digest] = ref
+        self._buffer += data
+        self.raw_bytes += len(data)
+        if not self._dictionary_ready:
+            self._buffer_samples.append(data)
+
+        if len(self._buffer) >= self.block_size:
+            self.flush()
+        return ref
+
+    def get(self, ref: Optional[int]) -> Optional[str]:
+        """Zwraca pełną treść wiadomości (dekompresując jej blok w razie potrzeby)"""
+        if ref is None:
+            return None
+        block_index, offset, length = self.entries[ref]
+        if block_index == len(self.blocks):
+            data = self._buffer
+        else:
+            data = self._block(block_index)
+        return bytes(data[offset:offset + length]).decode('utf-8', errors='replace')
+
+    def flush(self):
+        """Kompresuje bieżący bufor do nowego bloku"""
+        if not self._buffer:
+            return
+        # Słownik jest ustalany raz, przy pierwszym bloku - wszystkie bloki
+        # muszą być kompresowane z tym samym słownikiem
+        if not self._dictionary_ready:
+            self._train(self._buffer_samples)
+            self._buffer_samples = []
+            self._dictionary_ready = True
+        self.blocks.append(self._compress(bytes(self._buffer)))
+        self._buffer = bytearray()
+
+    def _train(self, samples: List[bytes]):
+        """Trenuje słownik kompresji na próbkach wiadomości"""
+        if len(samples) < self.MIN_DICTIONARY_SAMPLES:
+            return
+        if self.codec == 'zstd':
+            try:
+                self.dictionary = zstandard.train_dictionary(self.dictionary_size, samples).as_bytes()
+            except zstandard.ZstdError:
+                self.dictionary = None
+        else:
+            # zlib nie ma trenowania - słownikiem są ostatnie bajty próbek,
+            # bo deflate najtaniej odwołuje się do najbliższych dopasowań
+            self.dictionary = b''.join(samples)[-min(self.dictionary_size, 32 * 1024):]
+
+    def _compress(self, data: bytes) -> bytes:
+        if self.codec == 'zstd':
+            dict_data = zstandard.ZstdCompressionDict(self.dictionary) if self.dictionary else None
+            return zstandard.ZstdCompressor(level=self.level, dict_data=dict_data).compress(data)
+        if self.dictionary:
+            compressor = zlib.compressobj(self.level, zdict=self.dictionary)
+        else:
+            compressor = zlib.compressobj(self.level)
+        return compressor.compress(data) + compressor.flush()
+
+    def _decompress(self, data: bytes) -> bytes:
+        if self.codec == 'zstd':
+            dict_data = zstandard.ZstdCompressionDict(self.dictionary) if self.dictionary else None
+            return zstandard.ZstdDecompressor(dict_data=dict_data).decompress(data)
+        if self.dictionary:
+            decompressor = zlib.decompressobj(zdict=self.dictionary)
+        else:
+            decompressor = zlib.decompressobj()
+        return decompressor.decompress(data) + decompressor.flush()
+
+    def _block(self, block_index: int) -> bytes:
+        """Zwraca zdekompresowany blok z pamięci podręcznej LRU"""
+        data = self._cache.get(block_index)
+        if data is not None:
+            self._cache.move_to_end(block_index)
+            return data
+        data = self._decompress(self.blocks[block_index])
+        self._cache[block_index] = data
+        if len(self._cache) > self.cache_blocks:
+            self._cache.popitem(last=False)
+        return data
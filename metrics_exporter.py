@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Eksport metryk analizatora w formacie tekstowym Prometheus
+Lekki lokalny serwer HTTP (/metrics) dla analizy uruchamianej w trybie ciągłym
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from functools import partial
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Tuple
+
+from run_stats import RunStats
+
+
+METRIC_PREFIX = 'windows_event_analyzer'
+
+# Typ zawartości formatu tekstowego Prometheus
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _escape_label(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_value(value) -> str:
+    if isinstance(value, float):
+        return repr(value) if value == value else 'NaN'
+    return str(value)
+
+
+class MetricsRegistry:
+    """
+    Rejestr metryk z wcześniej zagregowanymi zestawami etykiet
+
+    Wartości są aktualizowane po zakończeniu etapów analizy, więc renderowanie
+    (przy każdym odpytaniu) kosztuje O(liczba metryk) i nie dotyka zdarzeń.
+    """
+
+    def __init__(self, prefix: str = METRIC_PREFIX):
+        self.prefix = prefix
+        self._families = OrderedDict()
+        self._lock = threading.Lock()
+
+    def describe(self, name: str, metric_type: str, help_text: str):
+        """Rejestruje rodzinę metryk (typ 'counter' lub 'gauge')"""
+        with self._lock:
+            if name not in self._families:
+                self._families[name] = [metric_type, help_text, {}]
+
+    @staticmethod
+    def _labels_key(labels: Dict) -> Tuple:
+        return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+    def set(self, name: str, value, **labels):
+        """Ustawia wartość metryki o podanych etykietach"""
+        with self._lock:
+            self._families[name][2][self._labels_key(labels)] = value
+
+    def inc(self, name: str, value=1, **labels):
+        """Zwiększa licznik o podanych etykietach"""
+        key = self._labels_key(labels)
+        with self._lock:
+            samples = self._families[name][2]
+            samples[key] = samples.get(key, 0) + value
+
+    def replace(self, name: str, samples: List[Tuple[Dict, float]]):
+        """Podmienia wszystkie wartości rodziny (np. liczności w bieżącym oknie)"""
+        new_samples = {self._labels_key(labels): value for labels, value in samples}
+        with self._lock:
+            self._families[name][2] = new_samples
+
+    def render(self) -> str:
+        """Zwraca metryki w formacie tekstowym Prometheus"""
+        lines = []
+        with self._lock:
+            for name, (metric_type, help_text, samples) in self._families.items():
+                full_name = f"{self.prefix}_{name}"
+                lines.append(f"# HELP {full_name} {help_text}")
+                lines.append(f"# TYPE {full_name} {metric_type}")
+                for labels, value in samples.items():
+                    if labels:
+                        label_text = ','.join(f'{k}="{_escape_label(v)}"' for k, v in labels)
+                        lines.append(f"{full_name}{{{label_text}}} {_format_value(value)}")
+                    else:
+                        lines.append(f"{full_name} {_format_value(value)}")
+        lines.append('')
+        return "\n".join(lines)
+
+
+class AnalyzerMetrics:
+    """
+    Metryki analizatora aktualizowane przez wywołania zwrotne postępu
+
+    Liczniki (zdarzenia, czasy etapów) rosną monotonicznie między kolejnymi
+    przebiegami, a liczności w oknie analizy (ważność, Event ID, zagrożenia)
+    i opóźnienie względem najnowszego rekordu są wskaźnikami podmienianymi po
+    każdym przebiegu - odpytanie /metrics nie odczytuje dzienników.
+    """
+
+    def __init__(self, registry: MetricsRegistry = None, max_event_ids: int = 50):
+        """
+        Args:
+            registry: Rejestr metryk (domyślnie nowy)
+            max_event_ids: Limit Event ID publikowanych jako osobne etykiety
+                           (ogranicza liczbę serii)
+        """
+        self.registry = registry or MetricsRegistry()
+        self.max_event_ids = max_event_ids
+        self._analyzers = []
+        self._stage_totals = {}
+        self._lock = threading.Lock()
+
+        describe = self.registry.describe
+        describe('events_ingested_total', 'counter', 'Liczba odczytanych zdarzeń według dziennika')
+        describe('log_read_seconds_total', 'counter', 'Łączny czas odczytu dziennika')
+        describe('log_ingest_rate', 'gauge', 'Zdarzenia na sekundę w ostatnim odczycie dziennika')
+        describe('log_lag_records', 'gauge', 'Liczba rekordów dziennika nowszych niż przetworzone '
+                                             '(na koniec ostatniego przebiegu)')
+        describe('window_events', 'gauge', 'Zdarzenia w oknie analizy według ważności')
+        describe('window_event_id_events', 'gauge', 'Zdarzenia w oknie analizy według Event ID (najczęstsze)')
+        describe('rule_hits', 'gauge', 'Zagrożenia wykryte w oknie analizy według reguły')
+        describe('stage_seconds_total', 'counter', 'Łączny czas etapów analizy')
+        describe('stage_calls_total', 'counter', 'Liczba wywołań etapów analizy')
+        describe('errors_total', 'counter', 'Błędy pominięte w trakcie analizy')
+        describe('runs_total', 'counter', 'Liczba zakończonych przebiegów analizy')
+        describe('last_run_timestamp_seconds', 'gauge', 'Czas zakończenia ostatniego przebiegu (epoch)')
+        describe('last_run_duration_seconds', 'gauge', 'Czas trwania ostatniego przebiegu')
+
+    def attach(self, analyzer):
+        """Podłącza metryki do analizatora (jako wywołanie zwrotne postępu)"""
+        with self._lock:
+            # W trybie ciągłym każdy przebieg to nowy analizator - poprzedni
+            # dla tych samych dzienników przestaje być śledzony
+            self._analyzers = [a for a in self._analyzers if a.logs_to_check != analyzer.logs_to_check]
+            self._analyzers.append(analyzer)
+            tracked = {id(a.stats) for a in self._analyzers}
+            self._stage_totals = {k: v for k, v in self._stage_totals.items() if k in tracked}
+        analyzer.add_progress_callback(partial(self.on_progress, analyzer))
+
+    def on_progress(self, analyzer, stage: str, info: Dict):
+        """Aktualizuje metryki po zakończeniu etapu analizy"""
+        registry = self.registry
+        if stage == 'log_done':
+            log_name = info['log_name']
+            registry.inc('events_ingested_total', info['events'], log=log_name)
+            registry.inc('log_read_seconds_total', info['seconds'], log=log_name)
+            if info['seconds'] > 0 and info.get('source') != 'cache':
+                registry.set('log_ingest_rate', info['events'] / info['seconds'], log=log_name)
+        elif stage == 'error':
+            registry.inc('errors_total', log=info['log_name'])
+        elif stage == 'analysis_done':
+            self._update_window(analyzer.build_summary())
+            self._update_lag(analyzer)
+            self._absorb_stats(analyzer.stats)
+            registry.inc('runs_total')
+            registry.set('last_run_timestamp_seconds', time.time())
+            registry.set('last_run_duration_seconds', round(analyzer.stats.elapsed, 6))
+        elif stage == 'report_saved':
+            self._absorb_stats(analyzer.stats)
+
+    def _absorb_stats(self, stats: RunStats):
+        """Dolicza przyrost czasów etapów od poprzedniej aktualizacji"""
+        stages = stats.to_dict()['stages']
+        with self._lock:
+            previous = self._stage_totals.setdefault(id(stats), {})
+            for name, stage in stages.items():
+                calls, seconds = previous.get(name, (0, 0.0))
+                self.registry.inc('stage_calls_total', stage['calls'] - calls, stage=name)
+                self.registry.inc('stage_seconds_total', stage['total_seconds'] - seconds, stage=name)
+                previous[name] = (stage['calls'], stage['total_seconds'])
+
+    def _update_window(self, summary):
+        """Podmienia liczności okna analizy na podstawie podsumowania"""
+        # Import lokalny - moduł analizatora wymaga pywin32 i importuje ten moduł pośrednio
+        from windows_event_analyzer import EventSeverity
+
+        self.registry.replace('window_events', [
+            ({'severity': EventSeverity.NAMES.get(severity, severity)}, count)
+            for severity, count in sorted(summary.severity_counts.items())
+        ])
+        self.registry.replace('window_event_id_events', [
+            ({'event_id': event_id}, count)
+            for event_id, count in summary.top_event_ids(self.max_event_ids)
+        ])
+        hits = {}
+        for finding in summary.security_findings:
+            hits[finding.type] = hits.get(finding.type, 0) + 1
+        self.registry.replace('rule_hits', [({'rule': rule}, count) for rule, count in sorted(hits.items())])
+
+    def _update_lag(self, analyzer):
+        """Opóźnienie względem najnowszego rekordu na koniec przebiegu (jeden odczyt odcisku dziennika)"""
+        if analyzer.event_files:
+            # Numery rekordów plików eksportu nie dotyczą dzienników tego systemu
+            return
+        for log_name, processed in list(analyzer.newest_records.items()):
+            fingerprint = analyzer.get_log_fingerprint(log_name)
+            if fingerprint is not None:
+                self.registry.set('log_lag_records', max(0, fingerprint['newest'] - processed), log=log_name)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    """Obsługa żądań /metrics"""
+
+    registry = None
+
+    def do_GET(self):
+        if self.path.split('?', 1)[0] not in ('/metrics', '/'):
+            self.send_error(404)
+            return
+        body = self.registry.render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Bez wpisów w konsoli przy każdym odpytaniu
+        pass
+
+
+class MetricsExporter:
+    """
+    Lokalny serwer HTTP publikujący metryki analizatora
+
+    Przykład:
+        exporter = MetricsExporter(port=9464)
+        exporter.start()
+        analyzer = WindowsEventAnalyzer(hours_back=24)
+        exporter.attach(analyzer)
+        analyzer.analyze_events()
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 9464, max_event_ids: int = 50):
+        """
+        Args:
+            host: Adres nasłuchu (domyślnie tylko lokalnie)
+            port: Port HTTP (0 - dowolny wolny port)
+            max_event_ids: Limit Event ID publikowanych jako osobne etykiety
+        """
+        self.host = host
+        self.port = port
+        self.metrics = AnalyzerMetrics(max_event_ids=max_event_ids)
+        self._server = None
+        self._thread = None
+
+    @property
+    def registry(self) -> MetricsRegistry:
+        return self.metrics.registry
+
+    def attach(self, analyzer):
+        """Publikuje metryki podanego analizatora"""
+        self.metrics.attach(analyzer)
+
+    def start(self):
+        """Uruchamia serwer HTTP w wątku w tle"""
+        if self._server is not None:
+            return
+        handler = type('MetricsHandler', (_MetricsHandler,), {'registry': self.registry})
+        self._server = ThreadingHTTPServer((self.host, self.port), handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Zatrzymuje serwer HTTP"""
+        if self._server is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}/metrics"
@@ -0,0 +1,634 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Lokalny serwer zapytań HTTP/JSON
+Podsumowanie, rankingi, histogramy, wyszukiwanie zdarzeń i raporty dla narzędzi
+zewnętrznych (np. SOC) - bez czytania plików HTML
+"""
+
+import asyncio
+import json
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+from event_timeline import EPOCH
+
+
+# Typy zawartości formatów raportu
+REPORT_CONTENT_TYPES = {
+    'txt': 'text/plain; charset=utf-8',
+    'html': 'text/html; charset=utf-8',
+    'json': 'application/json; charset=utf-8',
+    'csv': 'text/csv; charset=utf-8',
+}
+
+JSON_CONTENT_TYPE = 'application/json; charset=utf-8'
+
+STATUS_TEXT = {200: 'OK', 202: 'Accepted', 400: 'Bad Request', 404: 'Not Found',
+               405: 'Method Not Allowed', 409: 'Conflict', 500: 'Internal Server Error',
+               503: 'Service Unavailable'}
+
+# Odpowiedź: (status HTTP, typ zawartości, treść)
+Response = Tuple[int, str, bytes]
+
+
+class QueryError(Exception):
+    """Błędne zapytanie - zwracane klientowi jako {"error": ...} z podanym statusem"""
+
+    def __init__(self, message: str, status: int = 400):
+        super().__init__(message)
+        self.status = status
+
+
+def _json_response(data, status: int = 200) -> Response:
+    return status, JSON_CONTENT_TYPE, json.dumps(data, ensure_ascii=False,
+                                                 separators=(',', ':')).encode('utf-8')
+
+
+def _format_time(value: Optional[datetime]) -> Optional[str]:
+    return value.strftime('%Y-%m-%d %H:%M:%S') if value else None
+
+
+def _int_param(params: Dict[str, str], name: str, default: int = None,
+               minimum: int = None, maximum: int = None) -> Optional[int]:
+    value = params.get(name)
+    if value is None or value == '':
+        return default
+    try:
+        number = int(value)
+    except ValueError:
+        raise QueryError(f"Parametr {name} musi być liczbą całkowitą")
+    if minimum is not None and number < minimum:
+        raise QueryError(f"Parametr {name} musi być nie mniejszy niż {minimum}")
+    if maximum is not None and number > maximum:
+        raise QueryError(f"Parametr {name} musi być nie większy niż {maximum}")
+    return number
+
+
+def _time_param(params: Dict[str, str], name: str) -> Optional[datetime]:
+    value = params.get(name)
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace('T', ' '))
+    except ValueError:
+        raise QueryError(f"Parametr {name} musi być datą, np. 2025-01-05 02:00")
+
+
+class ResponseCache:
+    """
+    Pamięć podręczna odpowiedzi LRU ograniczona liczbą wpisów i łącznym rozmiarem
+
+    Wpisy są opróżniane po każdej publikacji nowych danych (QueryServer.publish),
+    a klucz zawiera numer publikacji, więc odpowiedź policzona na starych danych
+    nigdy nie zostanie zwrócona dla nowych.
+    """
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key) -> Optional[Response]:
+        response = self._entries.get(key)
+        if response is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return response
+
+    def put(self, key, response: Response):
+        size = len(response[2])
+        if self.max_entries <= 0 or size > self.max_bytes:
+            return
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self.bytes -= len(previous[2])
+        self._entries[key] = response
+        self.bytes += size
+        while len(self._entries) > self.max_entries or self.bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.bytes -= len(evicted[2])
+
+    def clear(self):
+        self._entries.clear()
+        self.bytes = 0
+
+    def to_dict(self) -> Dict:
+        return {'entries': len(self._entries), 'bytes': self.bytes, 'hits': self.hits, 'misses': self.misses}
+
+
+class QueryState:
+    """
+    Opublikowany, niezmienny stan analizy, na którym wykonywane są zapytania
+
+    Każde wczytanie danych tworzy nowy analizator i nowy stan - zapytania
+    w toku kończą się na poprzednim stanie, więc nigdy nie czekają na odczyt.
+    Magazyny wiadomości i pól nie są bezpieczne wątkowo, dlatego odwołania
+    do analizatora (pełne treści, pola, raporty) są chronione blokadą.
+    """
+
+    def __init__(self, analyzer, generation: int):
+        self.analyzer = analyzer
+        self.generation = generation
+        self.published_at = datetime.now()
+        self.lock = threading.Lock()
+        self.summary = analyzer.build_summary()
+        # Zakresy czasu wyszukiwaniem binarnym (migawka - na kolumnie czasu, bez odtwarzania zdarzeń)
+        self.index = analyzer.time_index()
+
+
+class QueryServer:
+    """
+    Lokalny serwer zapytań HTTP/JSON (asyncio) nad danymi analizatora
+
+    Punkty końcowe (GET, parametry w adresie):
+        /summary    - podsumowanie analizy
+        /top        - ranking: by=event_id|source|log|severity|template, n, severity
+        /histogram  - liczba zdarzeń w przedziałach: interval (s), start, end,
+                      log, source, event_id, severity
+        /events     - wyszukiwanie: start, end, log, source, event_id, severity,
+                      q (fragment treści), limit, offset, fields=1, full=1
+        /report     - raport: format=txt|html|json|csv, start, end
+        /status     - stan serwera i pamięci podręcznej
+    POST /ingest uruchamia ponowny odczyt dzienników w tle.
+
+    Zapytania są wykonywane w puli wątków na ostatnim opublikowanym stanie
+    (QueryState), a wyniki trafiają do pamięci podręcznej LRU opróżnianej
+    po każdym odczycie. Jednoczesne identyczne zapytania są liczone raz.
+
+    Przykład:
+        server = QueryServer(factory=lambda: WindowsEventAnalyzer(hours_back=24, progress=None),
+                             refresh_interval=300)
+        asyncio.run(server.serve_forever())
+        # curl "http://127.0.0.1:8765/top?by=source&n=5"
+    """
+
+    # Maksymalna liczba przedziałów histogramu i zdarzeń w jednej odpowiedzi
+    MAX_BUCKETS = 10000
+    MAX_EVENTS = 1000
+
+    # Maksymalny czas odczytu nagłówków żądania w sekundach
+    REQUEST_TIMEOUT = 10.0
+
+    def __init__(self, analyzer=None, factory: Callable[[], object] = None,
+                 host: str = '127.0.0.1', port: int = 8765, cache_entries: int = 256,
+                 cache_bytes: int = 64 * 1024 * 1024, refresh_interval: float = None, workers: int = 4):
+        """
+        Args:
+            analyzer: Analizator z gotową analizą do opublikowania od razu
+            factory: Tworzy nowy, nieprzeanalizowany analizator dla każdego odczytu
+                     (wymagane dla /ingest i refresh_interval). Analizator z pamięcią
+                     podręczną podsumowań odświeża się szybko, ale /events i /histogram
+                     z filtrami obejmują wtedy tylko nowo odczytane zdarzenia
+            host: Adres nasłuchu (domyślnie tylko lokalnie)
+            port: Port HTTP (0 - dowolny wolny port)
+            cache_entries: Maksymalna liczba odpowiedzi w pamięci podręcznej
+            cache_bytes: Maksymalny łączny rozmiar odpowiedzi w pamięci podręcznej
+            refresh_interval: Co ile sekund ponawiać odczyt (None - tylko na żądanie)
+            workers: Liczba wątków wykonujących zapytania
+        """
+        self.factory = factory
+        self.host = host
+        self.port = port
+        self.refresh_interval = refresh_interval
+        self.cache = ResponseCache(cache_entries, cache_bytes)
+        self.state = None
+        self.ingesting = False
+        self.last_error = None
+        self.last_ingestion_seconds = None
+        self._initial = analyzer
+        self._generation = 0
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='query')
+        self._pending = {}
+        self._server = None
+        self._tasks = []
+        self._ingest_lock = None
+        self.routes = {
+            '/summary': self._summary,
+            '/top': self._top,
+            '/histogram': self._histogram,
+            '/events': self._events,
+            '/report': self._report,
+        }
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}/"
+
+    async def publish(self, analyzer) -> int:
+        """
+        Publikuje przeanalizowany analizator jako nowy stan zapytań
+
+        Returns:
+            Numer publikacji
+        """
+        loop = asyncio.get_running_loop()
+        # Podsumowanie i indeks czasowy są budowane w wątku - pętla obsługuje zapytania
+        state = await loop.run_in_executor(self._executor, QueryState, analyzer, self._generation + 1)
+        self._generation = state.generation
+        self.state = state
+        self.cache.clear()
+        return state.generation
+
+    async def ingest(self) -> int:
+        """
+        Analizuje dzienniki nowym analizatorem (factory) i publikuje wynik
+
+        Zapytania w tym czasie są obsługiwane na poprzednim stanie.
+
+        Returns:
+            Numer publikacji
+        """
+        if self.factory is None:
+            raise RuntimeError("Serwer bez fabryki analizatora nie może ponowić odczytu")
+        async with self._ingest_lock:
+            self.ingesting = True
+            start = time.perf_counter()
+            try:
+                analyzer = self.factory()
+                await analyzer.analyze_events_async()
+                generation = await self.publish(analyzer)
+                self.last_error = None
+                return generation
+            except Exception as e:
+                self.last_error = f"{type(e).__name__}: {e}"
+                raise
+            finally:
+                self.ingesting = False
+                self.last_ingestion_seconds = time.perf_counter() - start
+
+    async def _ingest_in_background(self):
+        try:
+            await self.ingest()
+        except Exception:
+            # Błąd jest widoczny w /status, serwer działa dalej na poprzednim stanie
+            pass
+
+    async def _refresh_loop(self):
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            await self._ingest_in_background()
+
+    async def start(self):
+        """Uruchamia serwer (pierwszy odczyt factory trwa w tle)"""
+        if self._server is not None:
+            return
+        self._ingest_lock = asyncio.Lock()
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        if self._initial is not None:
+            await self.publish(self._initial)
+            self._initial = None
+        elif self.factory is not None:
+            self._tasks.append(asyncio.ensure_future(self._ingest_in_background()))
+        if self.refresh_interval and self.factory is not None:
+            self._tasks.append(asyncio.ensure_future(self._refresh_loop()))
+
+    async def stop(self):
+        """Zatrzymuje serwer i zadania w tle"""
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        self._executor.shutdown(wait=False)
+
+    async def serve_forever(self):
+        """Uruchamia serwer i obsługuje zapytania do przerwania"""
+        await self.start()
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.stop()
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Jedno żądanie HTTP/1.1 na połączenie (Connection: close)"""
+        method = 'GET'
+        try:
+            try:
+                method, target, length = await asyncio.wait_for(self._read_request(reader),
+                                                                self.REQUEST_TIMEOUT)
+                if length:
+                    await asyncio.wait_for(reader.readexactly(length), self.REQUEST_TIMEOUT)
+            except (ValueError, asyncio.IncompleteReadError, asyncio.TimeoutError):
+                status, content_type, body = _json_response({'error': "Nieprawidłowe żądanie HTTP"}, 400)
+            else:
+                status, content_type, body = await self.handle(method, target)
+            head = (f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\n"
+                    f"Content-Type: {content_type}\r\n"
+                    f"Content-Length: {len(body)}\r\n"
+                    f"Connection: close\r\n\r\n").encode('latin-1')
+            writer.write(head if method == 'HEAD' else head + body)
+            await writer.drain()
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _read_request(reader: asyncio.StreamReader) -> Tuple[str, str, int]:
+        """Wiersz żądania i nagłówki - zwraca (metoda, adres, długość treści)"""
+        request_line = (await reader.readline()).decode('latin-1').strip()
+        method, target, _ = request_line.split(' ', 2)
+        length = 0
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            if name.strip().lower() == 'content-length':
+                length = int(value.strip())
+        return method.upper(), target, length
+
+    async def handle(self, method: str, target: str) -> Response:
+        """
+        Obsługuje żądanie (niezależnie od transportu HTTP)
+
+        Args:
+            method: Metoda HTTP
+            target: Ścieżka z parametrami, np. /top?by=source&n=5
+        """
+        url = urlsplit(target)
+        path = url.path.rstrip('/') or '/'
+        params = dict(parse_qsl(url.query))
+
+        if path == '/ingest':
+            if method != 'POST':
+                return _json_response({'error': "Użyj metody POST"}, 405)
+            if self.factory is None:
+                return _json_response({'error': "Serwer nie ma fabryki analizatora"}, 409)
+            if not self.ingesting:
+                self._tasks.append(asyncio.ensure_future(self._ingest_in_background()))
+            return _json_response({'generation': self._generation, 'ingesting': True}, 202)
+        if method not in ('GET', 'HEAD'):
+            return _json_response({'error': "Użyj metody GET"}, 405)
+        if path == '/status':
+            return _json_response(self.status())
+
+        query = self.routes.get(path)
+        if query is None:
+            return _json_response({'error': f"Nieznany punkt końcowy: {path}",
+                                   'endpoints': sorted(list(self.routes) + ['/status', '/ingest'])}, 404)
+        state = self.state
+        if state is None:
+            return _json_response({'error': "Brak danych - trwa pierwszy odczyt dzienników"}, 503)
+
+        key = (state.generation, path, tuple(sorted(params.items())))
+        response = self.cache.get(key)
+        if response is not None:
+            return response
+        pending = self._pending.get(key)
+        if pending is not None:
+            # To samo zapytanie jest już liczone - bez powtarzania pracy
+            return await asyncio.shield(pending)
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending[key] = future
+        try:
+            response = await loop.run_in_executor(self._executor, self._execute, query, state, params)
+        except BaseException:
+            future.cancel()
+            raise
+        finally:
+            del self._pending[key]
+        if response[0] == 200:
+            self.cache.put(key, response)
+        future.set_result(response)
+        return response
+
+    @staticmethod
+    def _execute(query: Callable, state: QueryState, params: Dict[str, str]) -> Response:
+        try:
+            result = query(state, params)
+        except QueryError as e:
+            return _json_response({'error': str(e)}, e.status)
+        except Exception as e:
+            print(f"Błąd zapytania: {type(e).__name__}: {e}", file=sys.stderr)
+            return _json_response({'error': f"{type(e).__name__}: {e}"}, 500)
+        if isinstance(result, tuple):
+            return result
+        return _json_response(result)
+
+    def status(self) -> Dict:
+        """Stan serwera (/status)"""
+        state = self.state
+        return {
+            'generation': self._generation,
+            'published_at': _format_time(state.published_at) if state else None,
+            'ingesting': self.ingesting,
+            'last_ingestion_seconds': self.last_ingestion_seconds,
+            'last_error': self.last_error,
+            'cache': self.cache.to_dict(),
+        }
+
+    # Zapytania - wykonywane w puli wątków na niezmiennym stanie
+
+    @staticmethod
+    def _severity_names() -> Dict[int, str]:
+        # Import wewnątrz - moduł analizatora importuje serwer
+        from windows_event_analyzer import EventSeverity
+        return EventSeverity.NAMES
+
+    def _severity_param(self, params: Dict[str, str]) -> Optional[int]:
+        value = params.get('severity')
+        if not value:
+            return None
+        if value.isdigit():
+            return int(value)
+        for severity, name in self._severity_names().items():
+            if name.lower() == value.lower():
+                return severity
+        raise QueryError(f"Nieznany poziom ważności: {value}")
+
+    def _summary(self, state: QueryState, params: Dict[str, str]) -> Dict:
+        summary = state.summary
+        names = self._severity_names()
+        return {
+            'generation': state.generation,
+            'published_at': _format_time(state.published_at),
+            'generated_at': _format_time(summary.generated_at),
+            'period': summary.period_description(),
+            'first_event': _format_time(state.index.first_time),
+            'last_event': _format_time(state.index.last_time),
+            'total_events': summary.total_events,
+            'logs': dict(summary.log_counts),
+            'severity': {names.get(severity, str(severity)): count
+                         for severity, count in sorted(summary.severity_counts.items())},
+            'distinct_event_ids': len(summary.event_id_counts),
+            'distinct_sources': len(summary.source_counts),
+            'security_findings': len(summary.security_findings),
+            'boot_sessions': len(summary.boot_sessions),
+            'approximate': summary.approximate,
+            'error_bounds': summary.error_bounds,
+        }
+
+    def _top(self, state: QueryState, params: Dict[str, str]) -> Dict:
+        from windows_event_analyzer import SolutionDatabase
+
+        summary = state.summary
+        by = params.get('by', 'event_id')
+        limit = _int_param(params, 'n', 10, minimum=1, maximum=self.MAX_EVENTS)
+        severity = self._severity_param(params)
+        if severity is not None and by != 'event_id':
+            raise QueryError("Parametr severity dotyczy tylko by=event_id")
+        if by == 'event_id':
+            counts = summary.counts_for_severity(severity) if severity is not None else summary.event_id_counts
+        elif by == 'source':
+            counts = summary.source_counts
+        elif by == 'log':
+            counts = summary.log_counts
+        elif by == 'severity':
+            counts = summary.severity_counts
+        elif by == 'template':
+            counts = summary.template_counts
+        else:
+            raise QueryError("Parametr by: event_id, source, log, severity lub template")
+
+        items = sorted(counts.items(), key=lambda item: (-item[1], str(item[0])))[:limit]
+        names = self._severity_names()
+        result = []
+        for key, count in items:
+            entry = {'count': count}
+            if by == 'event_id':
+                entry['event_id'] = key
+                entry['description'] = SolutionDatabase.get_solution(key)['description']
+            elif by == 'severity':
+                entry['severity'] = names.get(key, str(key))
+            elif by == 'template':
+                entry['source'], entry['event_id'] = key
+            else:
+                entry[by] = key
+            result.append(entry)
+        return {'generation': state.generation, 'by': by, 'total_events': summary.total_events, 'top': result}
+
+    def _filter(self, state: QueryState, params: Dict[str, str]) -> Tuple[List[Dict], Optional[Callable]]:
+        """Zdarzenia z zakresu czasu i predykat pozostałych filtrów (None - bez filtrów)"""
+        start, end = _time_param(params, 'start'), _time_param(params, 'end')
+        log_name = params.get('log')
+        source = params.get('source')
+        event_id = _int_param(params, 'event_id')
+        severity = self._severity_param(params)
+        text = params.get('q', '').lower()
+        events = state.index.range(start, end)
+
+        checks = []
+        if log_name:
+            checks.append(lambda event: event['log_name'] == log_name)
+        if source:
+            checks.append(lambda event: event['source'] == source)
+        if event_id is not None:
+            checks.append(lambda event: event['event_id'] == event_id)
+        if severity is not None:
+            checks.append(lambda event: event['severity'] == severity)
+        if text:
+            checks.append(lambda event: text in (event['message'] or '').lower())
+        if not checks:
+            return events, None
+        return events, lambda event: all(check(event) for check in checks)
+
+    def _histogram(self, state: QueryState, params: Dict[str, str]) -> Dict:
+        interval = _int_param(params, 'interval', 3600, minimum=1)
+        start, end = _time_param(params, 'start'), _time_param(params, 'end')
+        timeline = state.summary.timeline
+        event_id = _int_param(params, 'event_id')
+        severity = self._severity_param(params)
+
+        # Oś czasu podsumowania wystarcza, gdy przedział jest wielokrotnością jej
+        # przedziału i filtr dotyczy najwyżej jednej jej serii (bez przeglądania zdarzeń)
+        use_timeline = (not params.get('log') and not params.get('source')
+                        and interval % timeline.bucket_seconds == 0
+                        and (event_id is None or severity is None)
+                        and (event_id is None or timeline.has_event_id_series(event_id)))
+        counts = {}
+        if use_timeline:
+            if event_id is not None:
+                series = [timeline.event_id_counts.get(event_id, {})]
+            elif severity is not None:
+                series = [timeline.severity_counts.get(severity, {})]
+            else:
+                series = timeline.severity_counts.values()
+            ratio = interval // timeline.bucket_seconds
+            low = timeline.bucket_of(start) if start else None
+            high = timeline.bucket_of(end) if end else None
+            for values in series:
+                for bucket, count in values.items():
+                    if (low is None or bucket >= low) and (high is None or bucket <= high):
+                        counts[bucket // ratio] = counts.get(bucket // ratio, 0) + count
+        else:
+            events, matches = self._filter(state, params)
+            for event in events:
+                if matches is None or matches(event):
+                    bucket = int((event['time'] - EPOCH).total_seconds()) // interval
+                    counts[bucket] = counts.get(bucket, 0) + 1
+
+        buckets = []
+        if counts:
+            first, last = min(counts), max(counts)
+            if last - first + 1 > self.MAX_BUCKETS:
+                raise QueryError(f"Ponad {self.MAX_BUCKETS} przedziałów - zwiększ interval lub zawęź zakres")
+            buckets = [[_format_time(EPOCH + timedelta(seconds=bucket * interval)), counts.get(bucket, 0)]
+                       for bucket in range(first, last + 1)]
+        return {'generation': state.generation, 'interval': interval,
+                'source': 'timeline' if use_timeline else 'events',
+                'total': sum(counts.values()), 'buckets': buckets}
+
+    def _events(self, state: QueryState, params: Dict[str, str]) -> Dict:
+        limit = _int_param(params, 'limit', 100, minimum=1, maximum=self.MAX_EVENTS)
+        offset = _int_param(params, 'offset', 0, minimum=0)
+        events, matches = self._filter(state, params)
+        if matches is not None:
+            events = [event for event in events if matches(event)]
+        page = events[offset:offset + limit]
+
+        result = []
+        analyzer = state.analyzer
+        with state.lock:
+            for event in page:
+                entry = {
+                    'time': _format_time(event['time']),
+                    'log_name': event['log_name'],
+                    'event_id': event['event_id'],
+                    'source': event['source'],
+                    'severity': event['severity_name'],
+                    'computer': event.get('computer'),
+                    'record_number': event.get('record_number'),
+                    'message': event['message'],
+                }
+                if params.get('full') == '1':
+                    entry['message'] = analyzer.get_message(event)
+                if params.get('fields') == '1':
+                    entry['fields'] = analyzer.get_event_fields(event)
+                result.append(entry)
+        return {'generation': state.generation, 'total': len(events), 'offset': offset,
+                'limit': limit, 'events': result}
+
+    def _report(self, state: QueryState, params: Dict[str, str]) -> Response:
+        report_format = params.get('format', 'json')
+        if report_format not in REPORT_CONTENT_TYPES:
+            raise QueryError(f"Format raportu: {', '.join(REPORT_CONTENT_TYPES)}")
+        start, end = _time_param(params, 'start'), _time_param(params, 'end')
+        analyzer = state.analyzer
+        method_name, _ = analyzer.REPORT_FORMATS[report_format]
+        with state.lock:
+            summary = state.summary
+            if start is not None or end is not None:
+                summary = analyzer.summary_for_range(start, end)
+            report = getattr(analyzer, method_name)(summary)
+        return 200, REPORT_CONTENT_TYPES[report_format], report.encode('utf-8')
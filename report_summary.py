@@ -0,0 +1,785 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Podsumowanie analizy zdarzeń
+Zagregowane statystyki, z których renderowane są wszystkie formaty raportów
+"""
+
+import copy
+import math
+import zlib
+from collections import defaultdict
+from datetime import datetime
+from operator import itemgetter
+from typing import Dict, List, Optional, Iterable, Tuple
+
+from event_fields import FIELD_SCHEMAS
+from security_detectors import SecurityFinding
+from boot_sessions import BootSession
+from event_correlation import EventCorrelator
+from event_timeline import EventTimeline
+from sketches import CountMinSketch, SpaceSaving, HyperLogLog
+
+
+TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# Serie osi czasu najczęstszych Event ID zapisywane w to_dict (pamięć podręczna,
+# migawki) - wykres raportu pokazuje ich kilka, zapas na zmiany rankingu po scaleniu
+TIMELINE_EVENT_IDS = 20
+
+# Pola zdarzenia zachowywane w próbce grupy
+SAMPLE_FIELDS = ('log_name', 'event_id', 'source', 'time', 'severity', 'severity_name',
+                 'message', 'message_ref', 'full_message')
+
+# Pozycja wstawki z nazwą konta dla zdarzeń o znanym schemacie
+# (konto docelowe ma pierwszeństwo przed kontem wywołującym)
+ACCOUNT_FIELD_INDEX = {
+    key: names.index(field)
+    for key, names in FIELD_SCHEMAS.items()
+    for field in ('SubjectUserName', 'TargetUserName')
+    if field in names
+}
+
+
+_MASK64 = (1 << 64) - 1
+
+
+def _parse_time(value: Optional[str]) -> Optional[datetime]:
+    return datetime.strptime(value, TIME_FORMAT) if value else None
+
+
+def _sample_to_dict(sample: Optional[Dict]) -> Optional[Dict]:
+    if not sample:
+        return None
+    sample = dict(sample)
+    sample['time'] = sample['time'].strftime(TIME_FORMAT)
+    sample.pop('message_ref', None)
+    return sample
+
+
+def _sample_from_dict(sample: Optional[Dict]) -> Optional[Dict]:
+    if not sample:
+        return None
+    sample = dict(sample)
+    sample['time'] = _parse_time(sample['time'])
+    sample.setdefault('message_ref', None)
+    return sample
+
+
+def _seed_state(seed: int, event_id: int, severity: int, origin: int = 0) -> int:
+    """
+    Stan początkowy generatora próbki grupy (splitmix64)
+
+    origin (pierwsze zdarzenie grupy w danym podsumowaniu) rozróżnia strumienie
+    tej samej grupy w podsumowaniach częściowych - bez niego wszystkie części
+    losowałyby te same priorytety i scalona próbka nie byłaby równomierna.
+    """
+    x = (seed * 0x9E3779B97F4A7C15 + event_id * 0xBF58476D1CE4E5B9 + severity + 1
+         + origin * 0x94D049BB133111EB) & _MASK64
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return (x ^ (x >> 31)) or 1
+
+
+def _event_origin(event: Dict) -> int:
+    """Identyfikator zdarzenia rozpoczynającego strumień priorytetów grupy"""
+    return zlib.crc32(f"{event.get('log_name')}\0{event.get('record_number')}\0{event['time']}\0"
+                      f"{event.get('source')}\0{event.get('computer')}".encode('utf-8'))
+
+
+def lowest_priority_samples(reservoir: Iterable[Tuple[float, Dict]], size: int,
+                            stratify: bool = False) -> List[Tuple[float, Dict]]:
+    """
+    Próbka rezerwuarowa z sumy rezerwuarów - size par (priorytet, próbka) o najniższym priorytecie
+
+    Priorytety są niezależnymi liczbami losowymi (każde podsumowanie częściowe
+    losuje z własnego strumienia), więc wynik jest równomierną próbką sumy
+    zdarzeń (scalanie jest dokładne i łączne). Przy stratify
+    każde źródło (szablon komunikatu) jest reprezentowane najwyżej raz.
+    """
+    result = []
+    sources = set()
+    for priority, sample in sorted(reservoir, key=itemgetter(0)):
+        if len(result) == size:
+            break
+        if stratify:
+            if sample['source'] in sources:
+                continue
+            sources.add(sample['source'])
+        result.append((priority, sample))
+    return result
+
+
+class EventGroup:
+    """
+    Zagregowane wystąpienia jednego Event ID o jednym poziomie ważności
+
+    Poza najnowszym zdarzeniem (sample) grupa przechowuje próbkę rezerwuarową
+    SAMPLE_SIZE zdarzeń (samples) - pamięć O(k) niezależnie od liczby wystąpień.
+    Każde zdarzenie dostaje losowy priorytet z generatora grupy (ziarno
+    SAMPLE_SEED i pierwsze zdarzenie grupy w tym podsumowaniu), a próbkę
+    tworzą zdarzenia o najniższych priorytetach. Zdarzenia, które nie trafią
+    do próbki, są pomijane bez losowania (skoki o rozkładzie geometrycznym,
+    jak w algorytmie L), a próbki z innych podsumowań scalają się dokładnie.
+    Przy stratify próbki pochodzą z różnych źródeł (w obrębie Event ID -
+    różnych szablonów komunikatów).
+    """
+
+    # Liczba przykładowych zdarzeń w próbce grupy
+    SAMPLE_SIZE = 3
+
+    # Ziarno generatora - ta sama sekwencja zdarzeń daje te same próbki
+    SAMPLE_SEED = 0
+
+    # Domyślny wybór próbek z różnych źródeł (każde źródło najwyżej raz) zamiast równomiernych
+    STRATIFY_SAMPLES = False
+
+    def __init__(self, event_id: int, severity: int, stratify: bool = None):
+        """
+        Args:
+            event_id: Event ID grupy
+            severity: Poziom ważności grupy
+            stratify: Próbki z różnych źródeł (domyślnie STRATIFY_SAMPLES)
+        """
+        self.event_id = event_id
+        self.severity = severity
+        self.stratify = self.STRATIFY_SAMPLES if stratify is None else stratify
+        self.count = 0
+        self.first_seen = None
+        self.last_seen = None
+        self.sample = None
+        # Próbka rezerwuarowa: pary (priorytet, próbka) rosnąco według priorytetu
+        self.samples = []
+        self._random_state = None
+        # Numer kolejnego zdarzenia, które trafi do próbki
+        self._next_sample = 1
+
+    def add_event(self, event: Dict):
+        """Dolicza zdarzenie do grupy (sample - najnowsze zdarzenie, samples - próbka rezerwuarowa)"""
+        self.count += 1
+        time = event['time']
+        if self.first_seen is None or time < self.first_seen:
+            self.first_seen = time
+        if self.last_seen is None or time >= self.last_seen:
+            self.last_seen = time
+            self.sample = {name: event.get(name) for name in SAMPLE_FIELDS}
+        if self._random_state is None:
+            self._random_state = _seed_state(self.SAMPLE_SEED, self.event_id, self.severity,
+                                             _event_origin(event))
+        if self.stratify:
+            self._sample_stratified(event)
+        elif self.count >= self._next_sample:
+            self._sample_event(event)
+
+    def _random(self) -> float:
+        """Liczba losowa z przedziału (0, 1) z generatora grupy (xorshift64*)"""
+        state = self._random_state
+        if state is None:
+            state = _seed_state(self.SAMPLE_SEED, self.event_id, self.severity)
+        state ^= state >> 12
+        state ^= (state << 25) & _MASK64
+        state ^= state >> 27
+        self._random_state = state
+        return ((((state * 0x2545F4914F6CDD1D) & _MASK64) >> 11) + 0.5) / 9007199254740992.0
+
+    def _sample_event(self, event: Dict):
+        """Dodaje zdarzenie do próbki i losuje, ile kolejnych zdarzeń pominąć"""
+        sample = {name: event.get(name) for name in SAMPLE_FIELDS}
+        samples = self.samples
+        if len(samples) < self.SAMPLE_SIZE:
+            samples.append((self._random(), sample))
+        else:
+            # Priorytet przyjętego zdarzenia jest równomierny poniżej progu próbki
+            samples[-1] = (samples[-1][0] * self._random(), sample)
+        samples.sort(key=itemgetter(0))
+        self._schedule_next_sample()
+
+    def _schedule_next_sample(self):
+        if len(self.samples) < self.SAMPLE_SIZE:
+            self._next_sample = self.count + 1
+            return
+        # Każde zdarzenie ma priorytet poniżej progu z prawdopodobieństwem równym progowi,
+        # więc liczba pominiętych zdarzeń ma rozkład geometryczny
+        threshold = self.samples[-1][0]
+        self._next_sample = self.count + 1 + int(math.log(self._random()) / math.log1p(-threshold))
+
+    def _sample_stratified(self, event: Dict):
+        """Próbka warstwowa - najniższy priorytet każdego źródła, SAMPLE_SIZE źródeł"""
+        priority = self._random()
+        source = event['source']
+        samples = self.samples
+        for index, (current, sample) in enumerate(samples):
+            if sample['source'] == source:
+                if priority < current:
+                    samples[index] = (priority, {name: event.get(name) for name in SAMPLE_FIELDS})
+                    samples.sort(key=itemgetter(0))
+                return
+        if len(samples) < self.SAMPLE_SIZE:
+            samples.append((priority, {name: event.get(name) for name in SAMPLE_FIELDS}))
+        elif priority < samples[-1][0]:
+            samples[-1] = (priority, {name: event.get(name) for name in SAMPLE_FIELDS})
+        else:
+            return
+        samples.sort(key=itemgetter(0))
+
+    def merge(self, other: 'EventGroup'):
+        """Scala inną grupę o tym samym kluczu"""
+        self.count += other.count
+        if other.first_seen is not None and (self.first_seen is None or other.first_seen < self.first_seen):
+            self.first_seen = other.first_seen
+        if other.last_seen is not None and (self.last_seen is None or other.last_seen >= self.last_seen):
+            self.last_seen = other.last_seen
+            self.sample = dict(other.sample) if other.sample else None
+        if other.samples:
+            self.samples = lowest_priority_samples(
+                self.samples + [(priority, dict(sample)) for priority, sample in other.samples],
+                self.SAMPLE_SIZE, self.stratify)
+        if self._random_state is None and other._random_state is not None:
+            # Nowy strumień wyprowadzony ze scalanego - kolejne zdarzenia tej grupy
+            # nie mogą powtarzać priorytetów, które wylosowałaby scalana grupa
+            self._random_state = _seed_state(self.SAMPLE_SEED, self.event_id, self.severity,
+                                             other._random_state)
+        self._schedule_next_sample()
+
+    def to_dict(self) -> Dict:
+        return {
+            'event_id': self.event_id,
+            'severity': self.severity,
+            'count': self.count,
+            'first_seen': self.first_seen.strftime(TIME_FORMAT) if self.first_seen else None,
+            'last_seen': self.last_seen.strftime(TIME_FORMAT) if self.last_seen else None,
+            'sample': _sample_to_dict(self.sample),
+            'samples': [[priority, _sample_to_dict(sample)] for priority, sample in self.samples],
+            'sample_state': [self._random_state, self._next_sample],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict, stratify: bool = None) -> 'EventGroup':
+        """Odtwarza grupę z postaci słownikowej (to_dict)"""
+        group = cls(data['event_id'], data['severity'], stratify)
+        group.count = data['count']
+        group.first_seen = _parse_time(data['first_seen'])
+        group.last_seen = _parse_time(data['last_seen'])
+        group.sample = _sample_from_dict(data.get('sample'))
+        group.samples = [(priority, _sample_from_dict(sample)) for priority, sample in data.get('samples', ())]
+        if 'sample_state' in data:
+            group._random_state, group._next_sample = data['sample_state']
+        else:
+            group._schedule_next_sample()
+        return group
+
+
+class ReportSummary:
+    """
+    Podsumowanie zdarzeń wspólne dla wszystkich formatów raportu
+
+    Podsumowanie jest budowane w jednym przebiegu po zdarzeniach i może być
+    scalane z innymi podsumowaniami (np. z innych dzienników).
+    """
+
+    def __init__(self, hours_back: int = None, logs: Iterable[str] = (),
+                 start_time: datetime = None, end_time: datetime = None, stratify_samples: bool = None):
+        self.hours_back = hours_back
+        self.logs = list(logs)
+        # Bezwzględny zakres analizy (jeśli podany, zastępuje hours_back)
+        self.start_time = start_time
+        self.end_time = end_time
+        # Próbki grup z różnych źródeł (domyślnie EventGroup.STRATIFY_SAMPLES)
+        self.stratify_samples = EventGroup.STRATIFY_SAMPLES if stratify_samples is None else stratify_samples
+        self.generated_at = datetime.now()
+        self.total_events = 0
+        self.severity_counts = defaultdict(int)
+        self.event_id_counts = defaultdict(int)
+        self.source_counts = defaultdict(int)
+        self.log_counts = defaultdict(int)
+        # Liczności szablonów komunikatów - para (źródło, Event ID)
+        self.template_counts = defaultdict(int)
+        self.groups = {}
+        self.security_findings = []
+        self.boot_sessions = []
+        # Liczności współwystępowania zdarzeń (EventCorrelator) lub None
+        self.correlations = None
+        # Liczby zdarzeń w przedziałach czasu (wykresy raportu HTML)
+        self.timeline = EventTimeline()
+        # Wypełniane tylko przez ApproximateSummary.to_report_summary()
+        self.approximate = False
+        self.distinct_counts = {}
+        self.error_bounds = {}
+
+    def add_event(self, event: Dict):
+        """Dolicza pojedyncze zdarzenie"""
+        severity = event['severity']
+        event_id = event['event_id']
+        self.total_events += 1
+        self.severity_counts[severity] += 1
+        self.event_id_counts[event_id] += 1
+        self.source_counts[event['source']] += 1
+        self.log_counts[event['log_name']] += 1
+        self.template_counts[(event['source'], event_id)] += 1
+        self.timeline.add(event['time'], severity, event_id)
+
+        group = self.groups.get((event_id, severity))
+        if group is None:
+            group = EventGroup(event_id, severity, self.stratify_samples)
+            self.groups[(event_id, severity)] = group
+        group.add_event(event)
+
+    def add_events(self, events: Iterable[Dict]):
+        """Dolicza wszystkie zdarzenia ze strumienia"""
+        for event in events:
+            self.add_event(event)
+
+    def merge(self, other: 'ReportSummary'):
+        """
+        Scala inne podsumowanie z bieżącym
+
+        Scalanie jest łączne, więc częściowe podsumowania (np. z innych
+        procesów lub komputerów) można scalać w dowolnych grupach.
+        """
+        if not self.total_events and not self.logs and self.start_time is None and self.hours_back is None:
+            # Puste podsumowanie zbiorcze przejmuje okres i sposób próbkowania pierwszego scalanego
+            self.hours_back = other.hours_back
+            self.start_time = other.start_time
+            self.end_time = other.end_time
+            self.stratify_samples = other.stratify_samples
+        elif self.start_time is not None and other.start_time is not None:
+            self.start_time = min(self.start_time, other.start_time)
+            if self.end_time is None or other.end_time is None:
+                self.end_time = None
+            else:
+                self.end_time = max(self.end_time, other.end_time)
+        self.generated_at = max(self.generated_at, other.generated_at)
+        self.total_events += other.total_events
+        for target, source in ((self.severity_counts, other.severity_counts),
+                               (self.event_id_counts, other.event_id_counts),
+                               (self.source_counts, other.source_counts),
+                               (self.log_counts, other.log_counts),
+                               (self.template_counts, other.template_counts)):
+            for key, count in source.items():
+                target[key] += count
+        for key, other_group in other.groups.items():
+            group = self.groups.get(key)
+            if group is None:
+                group = EventGroup(*key, stratify=self.stratify_samples)
+                self.groups[key] = group
+            group.merge(other_group)
+        self.timeline.merge(other.timeline)
+        for log_name in other.logs:
+            if log_name not in self.logs:
+                self.logs.append(log_name)
+        self.security_findings.extend(other.security_findings)
+        if other.boot_sessions:
+            # Kopie sesji numerowane od nowa w kolejności czasu - numery są
+            # kotwicami raportu HTML, a sesje części (lub komputerów) numerowano
+            # niezależnie; sesje scalanych podsumowań pozostają bez zmian
+            sessions = [copy.copy(session) for session in self.boot_sessions + other.boot_sessions]
+            sessions.sort(key=lambda session: (session.start or datetime.min, session.origin or ''))
+            for index, session in enumerate(sessions, 1):
+                session.index = index
+            self.boot_sessions = sessions
+        if other.correlations is not None:
+            if self.correlations is None:
+                self.correlations = EventCorrelator(other.correlations.window, other.correlations.max_severity,
+                                                    other.correlations.cross_log_only)
+            self.correlations.merge(other.correlations)
+        if other.approximate:
+            self.approximate = True
+            for name, bound in other.error_bounds.items():
+                self.error_bounds[name] = self.error_bounds.get(name, 0) + bound
+            # Liczności różnych wartości nie sumują się - zostaje dolne ograniczenie
+            for name, count in other.distinct_counts.items():
+                self.distinct_counts[name] = max(self.distinct_counts.get(name, 0), count)
+
+    def period_description(self) -> str:
+        """Opis okresu analizy do nagłówków raportów"""
+        if self.start_time is None:
+            if self.hours_back is None:
+                return "Wszystkie zdarzenia"
+            return f"Ostatnie {self.hours_back} godzin"
+        end = self.end_time.strftime(TIME_FORMAT) if self.end_time else "teraz"
+        return f"{self.start_time.strftime(TIME_FORMAT)} - {end}"
+
+    @property
+    def period_hours(self) -> float:
+        """Długość okresu analizy w godzinach (do porównywania częstości)"""
+        if self.start_time is None:
+            return float(self.hours_back or 0)
+        end = self.end_time or self.generated_at
+        return max((end - self.start_time).total_seconds() / 3600, 0.0)
+
+    def session_origins(self) -> List[str]:
+        """Różne pochodzenia sesji uruchomieniowych (więcej niż jedno - raport pokazuje komputer sesji)"""
+        return sorted({session.origin for session in self.boot_sessions if session.origin})
+
+    def oldest_event_time(self) -> Optional[datetime]:
+        """Czas najstarszego zliczonego zdarzenia (None dla pustego podsumowania)"""
+        times = [group.first_seen for group in self.groups.values() if group.first_seen is not None]
+        return min(times) if times else None
+
+    def samples(self) -> Iterable[Dict]:
+        """Zwraca próbki wszystkich grup"""
+        return (group.sample for group in self.groups.values() if group.sample)
+
+    def top_event_ids(self, limit: int = 10) -> List:
+        """Najczęstsze Event ID jako lista (event_id, liczba)"""
+        return sorted(self.event_id_counts.items(), key=lambda x: (-x[1], x[0]))[:limit]
+
+    def problem_groups(self, max_severity: int) -> List[Dict]:
+        """
+        Grupy zdarzeń o ważności nie mniejszej niż podana, scalone według Event ID
+
+        Args:
+            max_severity: Największa wartość poziomu ważności do uwzględnienia
+                          (np. EventSeverity.ERROR dla krytycznych i błędów)
+
+        Returns:
+            Lista słowników z kluczami event_id, count, last_seen, sample, samples
+            (próbka rezerwuarowa od najnowszych), posortowana malejąco według liczby wystąpień
+        """
+        merged = {}
+        reservoirs = defaultdict(list)
+        for (event_id, severity), group in self.groups.items():
+            if severity > max_severity:
+                continue
+            reservoirs[event_id].extend(group.samples)
+            entry = merged.get(event_id)
+            if entry is None:
+                entry = {'event_id': event_id, 'count': 0, 'first_seen': group.first_seen,
+                         'last_seen': group.last_seen, 'sample': group.sample, 'severity': severity}
+                merged[event_id] = entry
+            else:
+                entry['first_seen'] = min(entry['first_seen'], group.first_seen)
+                entry['last_seen'] = max(entry['last_seen'], group.last_seen)
+                # Jako próbkę pokaż zdarzenie o niższej ważności (jak w dotychczasowym sortowaniu)
+                if severity > entry['severity']:
+                    entry['sample'] = group.sample
+                    entry['severity'] = severity
+            entry['count'] += group.count
+        for event_id, entry in merged.items():
+            samples = lowest_priority_samples(reservoirs[event_id], EventGroup.SAMPLE_SIZE,
+                                              self.stratify_samples)
+            entry['samples'] = sorted((sample for _, sample in samples), key=itemgetter('time'), reverse=True)
+        return sorted(merged.values(), key=lambda x: (-x['count'], x['event_id']))
+
+    def counts_for_severity(self, severity: int) -> Dict[int, int]:
+        """Liczba wystąpień Event ID dla jednego poziomu ważności"""
+        return {
+            event_id: group.count
+            for (event_id, group_severity), group in self.groups.items()
+            if group_severity == severity
+        }
+
+    def to_dict(self) -> Dict:
+        """Zwraca podsumowanie jako słownik gotowy do serializacji JSON"""
+        return {
+            'generated_at': self.generated_at.strftime(TIME_FORMAT),
+            'hours_back': self.hours_back,
+            'start_time': self.start_time.strftime(TIME_FORMAT) if self.start_time else None,
+            'end_time': self.end_time.strftime(TIME_FORMAT) if self.end_time else None,
+            'logs': self.logs,
+            'stratify_samples': self.stratify_samples,
+            'total_events': self.total_events,
+            'severity_counts': {str(k): v for k, v in sorted(self.severity_counts.items())},
+            'event_id_counts': {str(k): v for k, v in sorted(self.event_id_counts.items())},
+            'source_counts': dict(sorted(self.source_counts.items())),
+            'log_counts': dict(sorted(self.log_counts.items())),
+            'template_counts': [[source, event_id, count]
+                                for (source, event_id), count in sorted(self.template_counts.items())],
+            'groups': [group.to_dict() for _, group in sorted(self.groups.items())],
+            'security_findings': [finding.to_dict() for finding in self.security_findings],
+            'boot_sessions': [session.to_dict() for session in self.boot_sessions],
+            'correlation_counts': self.correlations.to_dict() if self.correlations else None,
+            'timeline': self.timeline.to_dict(
+                event_ids=[event_id for event_id, _ in self.top_event_ids(TIMELINE_EVENT_IDS)]),
+            'approximate': self.approximate,
+            'distinct_counts': self.distinct_counts,
+            'error_bounds': self.error_bounds,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'ReportSummary':
+        """Odtwarza podsumowanie z postaci słownikowej (to_dict)"""
+        summary = cls(hours_back=data.get('hours_back'), logs=data.get('logs', ()),
+                      start_time=_parse_time(data.get('start_time')),
+                      end_time=_parse_time(data.get('end_time')),
+                      stratify_samples=data.get('stratify_samples'))
+        summary.generated_at = _parse_time(data['generated_at'])
+        summary.total_events = data['total_events']
+        summary.severity_counts.update({int(k): v for k, v in data['severity_counts'].items()})
+        summary.event_id_counts.update({int(k): v for k, v in data['event_id_counts'].items()})
+        summary.source_counts.update(data['source_counts'])
+        summary.log_counts.update(data['log_counts'])
+        summary.template_counts.update({
+            (source, event_id): count for source, event_id, count in data.get('template_counts', ())
+        })
+        for group_data in data['groups']:
+            group = EventGroup.from_dict(group_data, summary.stratify_samples)
+            summary.groups[(group.event_id, group.severity)] = group
+        summary.security_findings = [
+            SecurityFinding.from_dict(finding) for finding in data.get('security_findings', ())
+        ]
+        summary.boot_sessions = [
+            BootSession.from_dict(session) for session in data.get('boot_sessions', ())
+        ]
+        if data.get('correlation_counts'):
+            summary.correlations = EventCorrelator.from_dict(data['correlation_counts'])
+        if data.get('timeline'):
+            summary.timeline = EventTimeline.from_dict(data['timeline'])
+        summary.approximate = data.get('approximate', False)
+        summary.distinct_counts = dict(data.get('distinct_counts', {}))
+        summary.error_bounds = dict(data.get('error_bounds', {}))
+        return summary
+
+
+def event_account(event: Dict) -> Optional[str]:
+    """Zwraca nazwę konta zdarzenia (z wstawek znanych schematów lub SID użytkownika)"""
+    inserts = event.get('inserts')
+    index = ACCOUNT_FIELD_INDEX.get((event['source'], event['event_id']))
+    if inserts and index is not None and index < len(inserts):
+        account = inserts[index]
+        if account and account != '-':
+            return account.lower()
+    return event.get('user_sid')
+
+
+class ApproximateSummary:
+    """
+    Podsumowanie o stałym rozmiarze pamięci dla bardzo dużych zakresów czasowych
+
+    Liczby zdarzeń według ważności i dziennika są dokładne. Najczęstsze Event ID,
+    źródła i grupy (Event ID, ważność) śledzi SpaceSaving, a ich liczności są
+    zawężane przez Count-Min Sketch. Liczba różnych źródeł, kont i komputerów
+    jest szacowana przez HyperLogLog. Podsumowania z różnych dzienników i hostów
+    można scalać, o ile mają te same parametry szkiców.
+    """
+
+    def __init__(self, hours_back: int = None, logs: Iterable[str] = (), top_k: int = 200,
+                 epsilon: float = 0.001, delta: float = 0.01, hll_precision: int = 14,
+                 tracked_event_ids: Iterable[int] = (), start_time: datetime = None,
+                 end_time: datetime = None, stratify_samples: bool = None):
+        """
+        Args:
+            hours_back: Ile godzin wstecz obejmuje analiza
+            logs: Analizowane dzienniki
+            top_k: Liczba monitorowanych Event ID / źródeł / grup
+            epsilon: Względny błąd Count-Min Sketch
+            delta: Prawdopodobieństwo przekroczenia błędu Count-Min Sketch
+            hll_precision: Precyzja HyperLogLog (błąd ok. 1.04 / sqrt(2^p))
+            tracked_event_ids: Event ID liczone dokładnie (np. te, od których zależą rekomendacje)
+            start_time: Początek bezwzględnego zakresu analizy
+            end_time: Koniec bezwzględnego zakresu analizy
+            stratify_samples: Próbki grup z różnych źródeł (domyślnie EventGroup.STRATIFY_SAMPLES)
+        """
+        self.hours_back = hours_back
+        self.logs = list(logs)
+        self.start_time = start_time
+        self.end_time = end_time
+        self.stratify_samples = EventGroup.STRATIFY_SAMPLES if stratify_samples is None else stratify_samples
+        self.generated_at = datetime.now()
+        self.top_k = top_k
+        self.total_events = 0
+        self.severity_counts = defaultdict(int)
+        self.log_counts = defaultdict(int)
+        self.tracked_counts = {event_id: 0 for event_id in tracked_event_ids}
+        self.event_ids = SpaceSaving(top_k)
+        self.event_id_sketch = CountMinSketch(epsilon, delta)
+        self.sources = SpaceSaving(top_k)
+        self.source_sketch = CountMinSketch(epsilon, delta)
+        self.group_counts = SpaceSaving(top_k)
+        self.groups = {}
+        self.distinct_sources = HyperLogLog(hll_precision)
+        self.distinct_accounts = HyperLogLog(hll_precision)
+        self.distinct_computers = HyperLogLog(hll_precision)
+        # Oś czasu tylko według ważności - liczba serii nie zależy od liczby Event ID
+        self.timeline = EventTimeline(per_event_id=False)
+        self.security_findings = []
+
+    def add_event(self, event: Dict):
+        """Dolicza pojedyncze zdarzenie"""
+        severity = event['severity']
+        event_id = event['event_id']
+        source = event['source']
+        self.total_events += 1
+        self.severity_counts[severity] += 1
+        self.log_counts[event['log_name']] += 1
+        if event_id in self.tracked_counts:
+            self.tracked_counts[event_id] += 1
+        self.timeline.add(event['time'], severity, event_id)
+
+        self.event_ids.add(event_id)
+        self.event_id_sketch.add(event_id)
+        self.sources.add(source)
+        self.source_sketch.add(source)
+
+        self.distinct_sources.add(source)
+        account = event_account(event)
+        if account:
+            self.distinct_accounts.add(account)
+        if event.get('computer'):
+            self.distinct_computers.add(event['computer'])
+
+        # Próbki i czasy trzymane są tylko dla monitorowanych grup
+        key = (event_id, severity)
+        evicted = self.group_counts.add(key)
+        if evicted is not None:
+            self.groups.pop(evicted, None)
+        group = self.groups.get(key)
+        if group is None:
+            group = EventGroup(event_id, severity, self.stratify_samples)
+            self.groups[key] = group
+        group.add_event(event)
+
+    def add_events(self, events: Iterable[Dict]):
+        """Dolicza wszystkie zdarzenia ze strumienia"""
+        for event in events:
+            self.add_event(event)
+
+    def merge(self, other: 'ApproximateSummary'):
+        """Scala inne podsumowanie przybliżone (np. z innego hosta)"""
+        self.total_events += other.total_events
+        for target, source in ((self.severity_counts, other.severity_counts),
+                               (self.log_counts, other.log_counts)):
+            for key, count in source.items():
+                target[key] += count
+        for event_id, count in other.tracked_counts.items():
+            self.tracked_counts[event_id] = self.tracked_counts.get(event_id, 0) + count
+
+        self.event_ids.merge(other.event_ids)
+        self.event_id_sketch.merge(other.event_id_sketch)
+        self.sources.merge(other.sources)
+        self.source_sketch.merge(other.source_sketch)
+        self.group_counts.merge(other.group_counts)
+        self.distinct_sources.merge(other.distinct_sources)
+        self.distinct_accounts.merge(other.distinct_accounts)
+        self.distinct_computers.merge(other.distinct_computers)
+        self.timeline.merge(other.timeline)
+
+        groups = {}
+        for key in self.group_counts.counters:
+            group = EventGroup(*key, stratify=self.stratify_samples)
+            for source_groups in (self.groups, other.groups):
+                if key in source_groups:
+                    group.merge(source_groups[key])
+            groups[key] = group
+        self.groups = groups
+
+        for log_name in other.logs:
+            if log_name not in self.logs:
+                self.logs.append(log_name)
+        self.security_findings.extend(other.security_findings)
+
+    def error_bounds(self) -> Dict[str, int]:
+        """Maksymalne zawyżenie liczności w raporcie (Count-Min z prawdopodobieństwem 1 - delta)"""
+        ss_bound = self.total_events / self.top_k
+        return {
+            'event_id_count': int(math.ceil(min(ss_bound, self.event_id_sketch.error_bound))),
+            'source_count': int(math.ceil(min(ss_bound, self.source_sketch.error_bound))),
+            'group_count': int(math.ceil(ss_bound)),
+            'distinct_relative_error_pct': round(self.distinct_sources.relative_error * 100, 2),
+        }
+
+    def distinct_counts(self) -> Dict[str, int]:
+        """Szacowana liczba różnych źródeł, kont i komputerów"""
+        return {
+            'sources': self.distinct_sources.count(),
+            'accounts': self.distinct_accounts.count(),
+            'computers': self.distinct_computers.count(),
+        }
+
+    @property
+    def memory_bytes(self) -> int:
+        """Przybliżony rozmiar szkiców (niezależny od liczby zdarzeń)"""
+        return (self.event_id_sketch.memory_bytes + self.source_sketch.memory_bytes
+                + self.distinct_sources.memory_bytes + self.distinct_accounts.memory_bytes
+                + self.distinct_computers.memory_bytes)
+
+    def to_report_summary(self) -> ReportSummary:
+        """Zwraca podsumowanie do renderowania raportów (oznaczone jako przybliżone)"""
+        summary = ReportSummary(hours_back=self.hours_back, logs=self.logs,
+                                start_time=self.start_time, end_time=self.end_time,
+                                stratify_samples=self.stratify_samples)
+        summary.generated_at = self.generated_at
+        summary.total_events = self.total_events
+        summary.severity_counts.update(self.severity_counts)
+        summary.log_counts.update(self.log_counts)
+
+        # Oba szkice zawyżają liczności, więc mniejsze z oszacowań jest dokładniejsze
+        for event_id, count, _ in self.event_ids.top():
+            summary.event_id_counts[event_id] = min(count, self.event_id_sketch.estimate(event_id))
+        summary.event_id_counts.update({k: v for k, v in self.tracked_counts.items() if v})
+        for source, count, _ in self.sources.top():
+            summary.source_counts[source] = min(count, self.source_sketch.estimate(source))
+
+        for key, count, _ in self.group_counts.top():
+            group = self.groups.get(key)
+            if group is None:
+                continue
+            report_group = EventGroup(*key, stratify=self.stratify_samples)
+            report_group.merge(group)
+            report_group.count = count
+            summary.groups[key] = report_group
+
+        summary.timeline = EventTimeline(self.timeline.bucket_seconds, per_event_id=False)
+        summary.timeline.merge(self.timeline)
+        summary.security_findings = list(self.security_findings)
+        summary.approximate = True
+        summary.distinct_counts = self.distinct_counts()
+        summary.error_bounds = self.error_bounds()
+        return summary
+
+    def to_dict(self) -> Dict:
+        """Zwraca stan szkiców jako słownik gotowy do serializacji JSON"""
+        return {
+            'generated_at': self.generated_at.strftime(TIME_FORMAT),
+            'hours_back': self.hours_back,
+            'start_time': self.start_time.strftime(TIME_FORMAT) if self.start_time else None,
+            'end_time': self.end_time.strftime(TIME_FORMAT) if self.end_time else None,
+            'logs': self.logs,
+            'stratify_samples': self.stratify_samples,
+            'top_k': self.top_k,
+            'total_events': self.total_events,
+            'severity_counts': {str(k): v for k, v in sorted(self.severity_counts.items())},
+            'log_counts': dict(sorted(self.log_counts.items())),
+            'tracked_counts': {str(k): v for k, v in sorted(self.tracked_counts.items())},
+            'event_ids': self.event_ids.to_dict(),
+            'event_id_sketch': self.event_id_sketch.to_dict(),
+            'sources': self.sources.to_dict(),
+            'source_sketch': self.source_sketch.to_dict(),
+            'group_counts': self.group_counts.to_dict(),
+            'groups': [group.to_dict() for _, group in sorted(self.groups.items())],
+            'distinct_sources': self.distinct_sources.to_dict(),
+            'distinct_accounts': self.distinct_accounts.to_dict(),
+            'distinct_computers': self.distinct_computers.to_dict(),
+            'timeline': self.timeline.to_dict(),
+            'security_findings': [finding.to_dict() for finding in self.security_findings],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'ApproximateSummary':
+        """Odtwarza podsumowanie z postaci słownikowej (to_dict)"""
+        summary = cls(hours_back=data.get('hours_back'), logs=data.get('logs', ()), top_k=data['top_k'],
+                      start_time=_parse_time(data.get('start_time')),
+                      end_time=_parse_time(data.get('end_time')),
+                      stratify_samples=data.get('stratify_samples'))
+        summary.generated_at = _parse_time(data['generated_at'])
+        summary.total_events = data['total_events']
+        summary.severity_counts.update({int(k): v for k, v in data['severity_counts'].items()})
+        summary.log_counts.update(data['log_counts'])
+        summary.tracked_counts = {int(k): v for k, v in data['tracked_counts'].items()}
+        summary.event_ids = SpaceSaving.from_dict(data['event_ids'])
+        summary.event_id_sketch = CountMinSketch.from_dict(data['event_id_sketch'])
+        summary.sources = SpaceSaving.from_dict(data['sources'])
+        summary.source_sketch = CountMinSketch.from_dict(data['source_sketch'])
+        summary.group_counts = SpaceSaving.from_dict(data['group_counts'])
+        for group_data in data['groups']:
+            group = EventGroup.from_dict(group_data, summary.stratify_samples)
+            summary.groups[(group.event_id, group.severity)] = group
+        summary.distinct_sources = HyperLogLog.from_dict(data['distinct_sources'])
+        summary.distinct_accounts = HyperLogLog.from_dict(data['distinct_accounts'])
+        summary.distinct_computers = HyperLogLog.from_dict(data['distinct_computers'])
+        if data.get('timeline'):
+            summary.timeline = EventTimeline.from_dict(data['timeline'])
+        summary.security_findings = [
+            SecurityFinding.from_dict(finding) for finding in data.get('security_findings', ())
+        ]
+        return summary
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Profilowanie przebiegu analizy
+cProfile, migawki tracemalloc i próbkowanie stosów (format collapsed dla flamegraph)
+"""
+
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from typing import List, Optional
+
+
+class StackSampler:
+    """
+    Próbkuje stos jednego wątku w stałych odstępach czasu
+
+    Wynik to liczności stosów w formacie collapsed ("a;b;c liczba"),
+    zgodnym z flamegraph.pl, speedscope i inferno.
+    """
+
+    def __init__(self, thread_id: int, interval: float = 0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._active = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def resume(self):
+        self._active.set()
+
+    def pause(self):
+        self._active.clear()
+
+    def stop(self):
+        if self._stopped.is_set():
+            return
+        self._stopped.set()
+        self._active.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._active.wait()
+            if self._stopped.is_set():
+                break
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.stacks[self._collapse(frame)] += 1
+            del frame
+            time.sleep(self.interval)
+
+    @staticmethod
+    def _collapse(frame) -> str:
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            names.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+            frame = frame.f_back
+        names.reverse()
+        return ';'.join(names)
+
+    def collapsed(self) -> str:
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common()) + "\n"
+
+
+class PhaseResult:
+    """Wynik jednej fazy profilowania (czas, przyrost i szczyt pamięci, największe alokacje)"""
+
+    def __init__(self, name: str, seconds: float, memory_diff: int, peak: Optional[int], top_allocations):
+        self.name = name
+        self.seconds = seconds
+        self.memory_diff = memory_diff
+        self.peak = peak
+        self.top_allocations = top_allocations
+
+
+class RunProfiler:
+    """
+    Profiler przebiegu analizy podzielonego na fazy (odczyt, analiza, renderowanie)
+
+    Przykład:
+        profiler = RunProfiler()
+        profiler.attach(analyzer)
+        with profiler.phase('ingestion'):
+            analyzer.analyze_events()      # po odczycie faza zmienia się na 'analysis'
+        with profiler.phase('rendering'):
+            analyzer.save_report(format='html')
+        profiler.write('event_log_profile')
+    """
+
+    def __init__(self, sample_interval: float = 0.005, top_allocations: int = 25,
+                 traceback_frames: int = 1):
+        """
+        Args:
+            sample_interval: Odstęp próbkowania stosu w sekundach
+            top_allocations: Liczba największych alokacji w zestawieniu każdej fazy
+            traceback_frames: Liczba ramek zapamiętywanych przez tracemalloc
+        """
+        self.top_allocations = top_allocations
+        self.traceback_frames = traceback_frames
+        self.profile = cProfile.Profile()
+        self.sampler = StackSampler(threading.get_ident(), sample_interval)
+        self.phases = []
+        self._current = None
+        self._started_tracing = False
+
+    def attach(self, analyzer):
+        """
+        Dzieli analizę na fazy odczytu i analizy (przez wywołania zwrotne postępu)
+
+        cProfile mierzy tylko bieżący wątek, więc odczyt dzienników (bez
+        wątku odczytu z wyprzedzeniem) i renderowanie formatów odbywają się
+        sekwencyjnie w wątku wywołującym.
+        """
+        analyzer.parallel_render = False
+        analyzer.read_ahead = 0
+        analyzer.add_progress_callback(self._on_progress)
+
+    def _on_progress(self, stage: str, info):
+        if stage == 'ingestion_done' and self._current is not None:
+            self.mark('analysis')
+
+    @contextmanager
+    def phase(self, name: str):
+        """Profiluje blok kodu jako fazę o podanej nazwie"""
+        self._begin(name)
+        try:
+            yield self
+        finally:
+            self._end()
+
+    def mark(self, name: str):
+        """Kończy bieżącą fazę i rozpoczyna kolejną"""
+        self._end()
+        self._begin(name)
+
+    def _begin(self, name: str):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.traceback_frames)
+            self._started_tracing = True
+        if hasattr(tracemalloc, 'reset_peak'):
+            tracemalloc.reset_peak()
+        self._current = (name, tracemalloc.take_snapshot(), time.perf_counter())
+        self.profile.enable()
+        self.sampler.resume()
+
+    def _end(self):
+        if self._current is None:
+            return
+        self.sampler.pause()
+        self.profile.disable()
+        name, before, start = self._current
+        seconds = time.perf_counter() - start
+        self._current = None
+
+        peak = tracemalloc.get_traced_memory()[1] if hasattr(tracemalloc, 'reset_peak') else None
+        after = tracemalloc.take_snapshot()
+        filters = [tracemalloc.Filter(False, tracemalloc.__file__)]
+        stats = after.filter_traces(filters).compare_to(before.filter_traces(filters), 'lineno')
+        self.phases.append(PhaseResult(
+            name, seconds,
+            sum(stat.size_diff for stat in stats),
+            peak,
+            sorted(stats, key=lambda stat: -stat.size_diff)[:self.top_allocations]
+        ))
+
+    def stop(self):
+        """Kończy profilowanie (bieżącą fazę, próbkowanie i śledzenie alokacji)"""
+        self._end()
+        self.sampler.stop()
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def format_allocations(self) -> str:
+        """Zwraca zestawienie czasów faz i największych alokacji"""
+        lines = ["PROFIL PRZEBIEGU ANALIZY", "=" * 80]
+        for phase in self.phases:
+            peak = f", szczyt {phase.peak / 1024 / 1024:.1f} MB" if phase.peak is not None else ""
+            lines.append(f"Faza {phase.name}: {phase.seconds:.3f} s, "
+                         f"przyrost pamięci {phase.memory_diff / 1024 / 1024:+.1f} MB{peak}")
+        lines.append("")
+
+        for phase in self.phases:
+            lines.append("-" * 80)
+            lines.append(f"NAJWIĘKSZE ALOKACJE - {phase.name}")
+            lines.append("-" * 80)
+            for stat in phase.top_allocations:
+                frame = stat.traceback[0]
+                lines.append(f"  {stat.size_diff / 1024:+10.1f} KiB {stat.count_diff:+8} bloków  "
+                             f"{frame.filename}:{frame.lineno}")
+            lines.append("")
+
+        lines.append("-" * 80)
+        lines.append("NAJDROŻSZE FUNKCJE (czas łączny)")
+        lines.append("-" * 80)
+        output = io.StringIO()
+        pstats.Stats(self.profile, stream=output).sort_stats('cumulative').print_stats(30)
+        lines.append(output.getvalue())
+        return "\n".join(lines)
+
+    def write(self, prefix: str) -> List[str]:
+        """
+        Zapisuje wyniki profilowania
+
+        Args:
+            prefix: Początek nazw plików (np. nazwa raportu bez rozszerzenia)
+
+        Returns:
+            Lista zapisanych plików: {prefix}.prof (pstats / snakeviz),
+            {prefix}.alloc.txt i {prefix}.collapsed.txt (flamegraph)
+        """
+        self.stop()
+        profile_file = f"{prefix}.prof"
+        allocations_file = f"{prefix}.alloc.txt"
+        collapsed_file = f"{prefix}.collapsed.txt"
+
+        self.profile.dump_stats(profile_file)
+        with open(allocations_file, 'w', encoding='utf-8') as f:
+            f.write(self.format_allocations())
+        with open(collapsed_file, 'w', encoding='utf-8') as f:
+            f.write(self.sampler.collapsed())
+        return [profile_file, allocations_file, collapsed_file]
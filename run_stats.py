@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Statystyki przebiegu analizy
+Czasy poszczególnych etapów, liczniki i wywołania zwrotne postępu
+"""
+
+import json
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, Dict
+
+
+# Etapy mierzone w trakcie analizy i zapisu raportów
+STAGES = ('open', 'read_batch', 'read_wait', 'read_files', 'snapshot', 'format_message', 'build_record',
+          'merge', 'detect', 'correlate', 'plugins', 'aggregate', 'export', 'render', 'write')
+
+# Typ wywołania zwrotnego postępu: callback(etap, informacje)
+ProgressCallback = Callable[[str, Dict], None]
+
+
+class ProgressCallbackError(Exception):
+    """Wyjątek zgłoszony przez wywołanie zwrotne postępu - przerywa analizę"""
+
+
+class RunStats:
+    """
+    Statystyki jednego przebiegu analizy
+
+    Dla każdego etapu zapamiętywana jest liczba wywołań, łączny i maksymalny
+    czas. Liczniki (zdarzenia, bajty, pominięte wyjątki, ...) są dowolnymi
+    nazwanymi liczbami całkowitymi. Metody są bezpieczne dla wątków, bo
+    raporty są renderowane równolegle.
+    """
+
+    def __init__(self):
+        self.started_at = datetime.now()
+        self._start = time.perf_counter()
+        self._end = None
+        self.stages = {}
+        self.counters = defaultdict(int)
+        self.logs = {}
+        self._lock = threading.Lock()
+
+    def add_time(self, stage: str, seconds: float):
+        """Dolicza czas jednego wywołania etapu"""
+        with self._lock:
+            entry = self.stages.get(stage)
+            if entry is None:
+                self.stages[stage] = [1, seconds, seconds]
+            else:
+                entry[0] += 1
+                entry[1] += seconds
+                if seconds > entry[2]:
+                    entry[2] = seconds
+
+    @contextmanager
+    def stage(self, stage: str):
+        """Mierzy czas bloku kodu jako wywołanie etapu"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(stage, time.perf_counter() - start)
+
+    def count(self, name: str, value: int = 1):
+        """Zwiększa licznik"""
+        with self._lock:
+            self.counters[name] += value
+
+    def record_log(self, log_name: str, events: int, seconds: float, source: str = 'read'):
+        """Zapisuje wynik odczytu jednego dziennika"""
+        with self._lock:
+            self.logs[log_name] = {'events': events, 'seconds': round(seconds, 6), 'source': source}
+
+    def finish(self):
+        """Zamyka pomiar czasu całego przebiegu"""
+        self._end = time.perf_counter()
+
+    @property
+    def elapsed(self) -> float:
+        return (self._end or time.perf_counter()) - self._start
+
+    @property
+    def events_per_second(self) -> float:
+        """Liczba odczytanych zdarzeń na sekundę czasu odczytu dzienników"""
+        read_seconds = sum(log['seconds'] for log in self.logs.values() if log['source'] != 'cache')
+        if read_seconds <= 0:
+            return 0.0
+        return self.counters['events'] / read_seconds
+
+    def to_dict(self) -> Dict:
+        """Zwraca statystyki jako słownik gotowy do serializacji JSON"""
+        with self._lock:
+            stages = {
+                name: {
+                    'calls': calls,
+                    'total_seconds': round(total, 6),
+                    'max_seconds': round(maximum, 6),
+                }
+                for name, (calls, total, maximum) in sorted(
+                    self.stages.items(),
+                    key=lambda x: STAGES.index(x[0]) if x[0] in STAGES else len(STAGES)
+                )
+            }
+            counters = dict(sorted(self.counters.items()))
+            logs = {name: dict(log) for name, log in self.logs.items()}
+        return {
+            'started_at': self.started_at.strftime('%Y-%m-%d %H:%M:%S'),
+            'elapsed_seconds': round(self.elapsed, 6),
+            'events_per_second': round(self.events_per_second, 1),
+            'stages': stages,
+            'counters': counters,
+            'logs': logs,
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), ensure_ascii=False, indent=2)
+
+    def format_text(self) -> str:
+        """Zwraca krótkie zestawienie czasów etapów i liczników"""
+        data = self.to_dict()
+        lines = [f"Czas analizy: {data['elapsed_seconds']:.2f} s "
+                 f"({data['events_per_second']:.0f} zdarzeń/s)"]
+        for name, stage in data['stages'].items():
+            lines.append(f"  {name:15} : {stage['total_seconds']:8.3f} s ({stage['calls']} wywołań)")
+        for name, value in data['counters'].items():
+            lines.append(f"  {name:32} : {value}")
+        return "\n".join(lines)
+
+
+def console_progress(stage: str, info: Dict):
+    """Domyślne wywołanie zwrotne postępu - komunikaty w konsoli"""
+    if stage == 'analysis_start':
+        if info.get('start_time') is not None:
+            end = info['end_time'].strftime('%Y-%m-%d %H:%M:%S') if info.get('end_time') else "teraz"
+            print(f"Analizuję dzienniki zdarzeń z okresu "
+                  f"{info['start_time'].strftime('%Y-%m-%d %H:%M:%S')} - {end}...\n")
+        elif info.get('hours_back') is None:
+            print("Analizuję wszystkie zdarzenia dzienników...\n")
+        else:
+            print(f"Analizuję dzienniki zdarzeń z ostatnich {info['hours_back']} godzin...\n")
+    elif stage == 'log_start':
+        print(f"Czytam dziennik: {info['log_name']}...")
+    elif stage == 'log_cached':
+        print(f"  Dziennik bez zmian - z pamięci podręcznej: {info['cached_events']} zdarzeń")
+    elif stage == 'log_delta':
+        print(f"  Z pamięci podręcznej: {info['cached_events']} zdarzeń, czytam tylko nowe rekordy")
+    elif stage == 'log_done':
+        print(f"  Znaleziono {info['events']} zdarzeń\n")
+    elif stage == 'snapshot_loaded':
+        print(f"Wczytano migawkę {info['filename']}: {info['events']} zdarzeń\n")
+    elif stage == 'snapshot_saved':
+        print(f"Migawka zapisana do pliku: {info['filename']} ({info['events']} zdarzeń)\n")
+    elif stage == 'error':
+        print(f"Błąd podczas odczytu dziennika {info['log_name']}: {info['error']}")
@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Detektory zagrożeń dla dziennika Security
+Wykrywanie ataków brute force, password spraying i nowych logowań administratorów
+w przesuwnych oknach czasowych, w jednym przebiegu po strumieniu zdarzeń
+"""
+
+from collections import deque, OrderedDict, Counter
+from datetime import datetime, timedelta
+from typing import List, Dict, Callable, Optional, Iterable
+
+
+# Konta systemowe, dla których 4672 jest normalnym elementem pracy systemu
+SYSTEM_ACCOUNT_SIDS = {'S-1-5-18', 'S-1-5-19', 'S-1-5-20'}
+SYSTEM_ACCOUNT_NAMES = {'SYSTEM', 'LOCAL SERVICE', 'NETWORK SERVICE', 'LOKALNA USŁUGA', 'USŁUGA SIECIOWA'}
+
+# Wartości oznaczające brak danych w polach zdarzeń Security
+EMPTY_VALUES = {'', '-', '::1', '127.0.0.1'}
+
+
+class SlidingWindows:
+    """
+    Przesuwne okna czasowe per klucz z ograniczoną pamięcią
+
+    Dla każdego klucza przechowywana jest kolejka znaczników czasu z okna
+    (maksymalnie max_per_key), a liczba kluczy jest ograniczona przez
+    usuwanie najdawniej używanych (LRU).
+    """
+
+    def __init__(self, window: timedelta, max_keys: int = 10000, max_per_key: int = 1000):
+        self.window = window
+        self.max_keys = max_keys
+        self.max_per_key = max_per_key
+        self._windows = OrderedDict()
+        self.evicted = 0
+
+    def __len__(self) -> int:
+        return len(self._windows)
+
+    def add(self, key, time: datetime) -> int:
+        """
+        Dodaje wystąpienie dla klucza
+
+        Returns:
+            Liczba wystąpień klucza w oknie kończącym się w chwili time
+        """
+        times = self._windows.get(key)
+        if times is None:
+            times = deque(maxlen=self.max_per_key)
+            self._windows[key] = times
+            if len(self._windows) > self.max_keys:
+                self._windows.popitem(last=False)
+                self.evicted += 1
+        else:
+            self._windows.move_to_end(key)
+
+        times.append(time)
+        self._expire(times, time)
+        return len(times)
+
+    def count(self, key, time: datetime) -> int:
+        """Zwraca liczbę wystąpień klucza w oknie kończącym się w chwili time"""
+        times = self._windows.get(key)
+        if not times:
+            return 0
+        self._expire(times, time)
+        return len(times)
+
+    def _expire(self, times: deque, time: datetime):
+        threshold = time - self.window
+        while times and times[0] < threshold:
+            times.popleft()
+
+
+class DistinctWindows:
+    """
+    Przesuwne okna liczące różne wartości per klucz (np. różne konta per adres IP)
+
+    Pamięć per klucz jest ograniczona do max_per_key wpisów, liczba kluczy - LRU.
+    """
+
+    def __init__(self, window: timedelta, max_keys: int = 10000, max_per_key: int = 1000):
+        self.window = window
+        self.max_keys = max_keys
+        self.max_per_key = max_per_key
+        self._windows = OrderedDict()
+        self.evicted = 0
+
+    def __len__(self) -> int:
+        return len(self._windows)
+
+    def add(self, key, value, time: datetime) -> int:
+        """
+        Dodaje wartość dla klucza
+
+        Returns:
+            Liczba różnych wartości klucza w oknie kończącym się w chwili time
+        """
+        state = self._windows.get(key)
+        if state is None:
+            state = (deque(), Counter())
+            self._windows[key] = state
+            if len(self._windows) > self.max_keys:
+                self._windows.popitem(last=False)
+                self.evicted += 1
+        else:
+            self._windows.move_to_end(key)
+
+        entries, values = state
+        entries.append((time, value))
+        values[value] += 1
+
+        threshold = time - self.window
+        while entries and (entries[0][0] < threshold or len(entries) > self.max_per_key):
+            _, old_value = entries.popleft()
+            values[old_value] -= 1
+            if not values[old_value]:
+                del values[old_value]
+
+        return len(values)
+
+    def values(self, key) -> List:
+        """Zwraca różne wartości klucza w bieżącym oknie"""
+        state = self._windows.get(key)
+        return list(state[1]) if state else []
+
+
+class SecurityFinding:
+    """Pojedyncze wykryte zagrożenie bezpieczeństwa"""
+
+    BRUTE_FORCE = 'brute_force'
+    BRUTE_FORCE_SUCCESS = 'brute_force_success'
+    PASSWORD_SPRAY = 'password_spray'
+    NEW_ADMIN_LOGON = 'new_admin_logon'
+
+    NAMES = {
+        BRUTE_FORCE: "Atak brute force",
+        BRUTE_FORCE_SUCCESS: "Udane logowanie po serii nieudanych prób",
+        PASSWORD_SPRAY: "Password spraying",
+        NEW_ADMIN_LOGON: "Nowe logowanie z uprawnieniami administratora",
+    }
+
+    def __init__(self, finding_type: str, key: str, time: datetime, count: int, description: str):
+        self.type = finding_type
+        self.key = key
+        self.time = time
+        self.count = count
+        self.description = description
+
+    @property
+    def name(self) -> str:
+        return self.NAMES.get(self.type, self.type)
+
+    def to_dict(self) -> Dict:
+        return {
+            'type': self.type,
+            'name': self.name,
+            'key': self.key,
+            'time': self.time.strftime('%Y-%m-%d %H:%M:%S'),
+            'count': self.count,
+            'description': self.description,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'SecurityFinding':
+        """Odtwarza zagrożenie z postaci słownikowej (to_dict)"""
+        return cls(data['type'], data['key'], datetime.strptime(data['time'], '%Y-%m-%d %H:%M:%S'),
+                   data['count'], data['description'])
+
+
+class SecurityMonitor:
+    """
+    Strumieniowy monitor zdarzeń Security
+
+    Zdarzenia muszą być podawane w kolejności rosnącego czasu. Zdarzenia
+    4625 zasilają okna per konto, per adres IP i per stację roboczą, 4624
+    sprawdza czy udane logowanie nastąpiło po serii niepowodzeń, a 4672
+    wykrywa konta, które pierwszy raz otrzymały uprawnienia administratora.
+    """
+
+    def __init__(self,
+                 field_getter: Callable[[Dict, str], Optional[str]],
+                 window: timedelta = timedelta(minutes=10),
+                 brute_force_threshold: int = 10,
+                 spray_threshold: int = 5,
+                 max_keys: int = 10000,
+                 known_admins: Iterable[str] = (),
+                 learning_period: timedelta = timedelta(hours=1)):
+        """
+        Args:
+            field_getter: Funkcja (zdarzenie, nazwa pola) -> wartość pola
+            window: Szerokość okna przesuwnego
+            brute_force_threshold: Liczba nieudanych logowań w oknie uznawana za brute force
+            spray_threshold: Liczba różnych kont z jednego źródła w oknie uznawana za spraying
+            max_keys: Maksymalna liczba śledzonych kluczy w każdym oknie (LRU)
+            known_admins: Konta administratorów znane przed analizą
+            learning_period: Okres od początku strumienia, w którym konta z 4672
+                             tworzą bazę znanych administratorów
+        """
+        self.get_field = field_getter
+        self.window = window
+        self.brute_force_threshold = brute_force_threshold
+        self.spray_threshold = spray_threshold
+
+        self.failures_by_account = SlidingWindows(window, max_keys)
+        self.failures_by_ip = SlidingWindows(window, max_keys)
+        self.failures_by_workstation = SlidingWindows(window, max_keys)
+        self.accounts_by_ip = DistinctWindows(window, max_keys)
+        self.accounts_by_workstation = DistinctWindows(window, max_keys)
+
+        self.known_admins = OrderedDict((name.upper(), True) for name in known_admins)
+        self.max_admins = max_keys
+        self.learning_period = learning_period
+        self._stream_start = None
+        self._reported = OrderedDict()
+        self.max_reported = max_keys
+        self.findings = []
+        self.processed = 0
+
+        self._handlers = {
+            4625: self._on_failed_logon,
+            4624: self._on_successful_logon,
+            4672: self._on_special_logon,
+        }
+
+    def process(self, event: Dict):
+        """Przetwarza pojedyncze zdarzenie (pozostałe Event ID są pomijane)"""
+        handler = self._handlers.get(event['event_id'])
+        if handler is not None:
+            if self._stream_start is None:
+                self._stream_start = event['time']
+            self.processed += 1
+            handler(event)
+
+    def process_all(self, events: Iterable[Dict]) -> List[SecurityFinding]:
+        """Przetwarza strumień zdarzeń uporządkowany rosnąco według czasu"""
+        for event in events:
+            self.process(event)
+        return self.findings
+
+    def _value(self, event: Dict, name: str) -> Optional[str]:
+        value = self.get_field(event, name)
+        if value is None or value in EMPTY_VALUES:
+            return None
+        return value
+
+    def _report(self, finding_type: str, key: str, time: datetime, count: int, description: str):
+        """Zgłasza zagrożenie - ten sam klucz co najwyżej raz na okno"""
+        report_key = (finding_type, key)
+        last = self._reported.get(report_key)
+        if last is not None and time - last < self.window:
+            return
+        self._reported[report_key] = time
+        self._reported.move_to_end(report_key)
+        if len(self._reported) > self.max_reported:
+            self._reported.popitem(last=False)
+        self.findings.append(SecurityFinding(finding_type, key, time, count, description))
+
+    def _on_failed_logon(self, event: Dict):
+        time = event['time']
+        account = self._value(event, 'TargetUserName')
+        ip = self._value(event, 'IpAddress')
+        workstation = self._value(event, 'WorkstationName')
+        minutes = int(self.window.total_seconds() // 60)
+
+        if account:
+            count = self.failures_by_account.add(account.upper(), time)
+            if count >= self.brute_force_threshold:
+                self._report(SecurityFinding.BRUTE_FORCE, f"konto {account}", time, count,
+                             f"{count} nieudanych logowań na konto {account} w ciągu {minutes} min")
+
+        for key_name, key, failures, accounts in (
+                ('adresu IP', ip, self.failures_by_ip, self.accounts_by_ip),
+                ('stacji', workstation, self.failures_by_workstation, self.accounts_by_workstation)):
+            if not key:
+                continue
+            count = failures.add(key, time)
+            if count >= self.brute_force_threshold:
+                self._report(SecurityFinding.BRUTE_FORCE, f"{key_name} {key}", time, count,
+                             f"{count} nieudanych logowań z {key_name} {key} w ciągu {minutes} min")
+            if account:
+                distinct = accounts.add(key, account.upper(), time)
+                if distinct >= self.spray_threshold:
+                    self._report(SecurityFinding.PASSWORD_SPRAY, f"{key_name} {key}", time, distinct,
+                                 f"Próby logowania na {distinct} różnych kont z {key_name} {key} "
+                                 f"w ciągu {minutes} min")
+
+    def _on_successful_logon(self, event: Dict):
+        time = event['time']
+        account = self._value(event, 'TargetUserName')
+        ip = self._value(event, 'IpAddress')
+
+        if account:
+            failures = self.failures_by_account.count(account.upper(), time)
+            if failures >= self.brute_force_threshold:
+                self._report(SecurityFinding.BRUTE_FORCE_SUCCESS, f"konto {account}", time, failures,
+                             f"Udane logowanie na konto {account} po {failures} nieudanych próbach")
+        if ip:
+            failures = self.failures_by_ip.count(ip, time)
+            if failures >= self.brute_force_threshold:
+                self._report(SecurityFinding.BRUTE_FORCE_SUCCESS, f"adres IP {ip}", time, failures,
+                             f"Udane logowanie z adresu IP {ip} (konto {account or '?'}) "
+                             f"po {failures} nieudanych próbach")
+
+    def _on_special_logon(self, event: Dict):
+        account = self._value(event, 'SubjectUserName')
+        sid = self._value(event, 'SubjectUserSid')
+        if not account or account.endswith('$') or sid in SYSTEM_ACCOUNT_SIDS:
+            return
+        if account.upper() in SYSTEM_ACCOUNT_NAMES:
+            return
+
+        key = account.upper()
+        if key in self.known_admins:
+            self.known_admins.move_to_end(key)
+            return
+
+        self.known_admins[key] = True
+        if len(self.known_admins) > self.max_admins:
+            self.known_admins.popitem(last=False)
+        if event['time'] - self._stream_start < self.learning_period:
+            return
+        self._report(SecurityFinding.NEW_ADMIN_LOGON, f"konto {account}", event['time'], 1,
+                     f"Konto {account} zalogowało się z uprawnieniami specjalnymi "
+                     f"po raz pierwszy w analizowanym okresie")
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Szkice probabilistyczne o stałym rozmiarze pamięci
+Count-Min Sketch (częstości), SpaceSaving (top-k) i HyperLogLog (liczba różnych wartości).
+Wszystkie struktury można scalać (np. między dziennikami lub hostami) i serializować.
+"""
+
+import base64
+import hashlib
+import heapq
+import math
+from array import array
+from typing import Dict, List, Tuple
+
+
+def stable_hash64(value) -> int:
+    """
+    64-bitowy skrót wartości niezależny od procesu
+
+    Wbudowane hash() jest losowane per proces, więc szkice liczone na różnych
+    hostach nie dałyby się scalić.
+    """
+    data = value if isinstance(value, bytes) else str(value).encode('utf-8')
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), 'little')
+
+
+class CountMinSketch:
+    """
+    Count-Min Sketch - przybliżone częstości z gwarantowanym ograniczeniem błędu
+
+    Oszacowanie nigdy nie jest mniejsze od prawdziwej wartości, a z
+    prawdopodobieństwem 1 - delta zawyża ją o co najwyżej epsilon * N.
+    """
+
+    def __init__(self, epsilon: float = 0.001, delta: float = 0.01):
+        """
+        Args:
+            epsilon: Względny błąd oszacowania (względem liczby wszystkich zdarzeń)
+            delta: Prawdopodobieństwo przekroczenia błędu
+        """
+        self.epsilon = epsilon
+        self.delta = delta
+        self.width = int(math.ceil(math.e / epsilon))
+        self.depth = int(math.ceil(math.log(1 / delta)))
+        self.rows = [array('Q', bytes(8 * self.width)) for _ in range(self.depth)]
+        self.total = 0
+
+    def _positions(self, key) -> List[int]:
+        # Podwójne haszowanie (Kirsch-Mitzenmacher) - jeden skrót na wszystkie wiersze
+        h = stable_hash64(key)
+        h1, h2 = h & 0xFFFFFFFF, (h >> 32) | 1
+        return [(h1 + i * h2) % self.width for i in range(self.depth)]
+
+    def add(self, key, count: int = 1):
+        """Dolicza wystąpienia klucza"""
+        self.total += count
+        for row, position in zip(self.rows, self._positions(key)):
+            row[position] += count
+
+    def estimate(self, key) -> int:
+        """Zwraca oszacowanie liczby wystąpień klucza"""
+        return min(row[position] for row, position in zip(self.rows, self._positions(key)))
+
+    @property
+    def error_bound(self) -> float:
+        """Maksymalne zawyżenie oszacowania (z prawdopodobieństwem 1 - delta)"""
+        return self.epsilon * self.total
+
+    def merge(self, other: 'CountMinSketch'):
+        """Scala szkic o tych samych wymiarach"""
+        if (self.width, self.depth) != (other.width, other.depth):
+            raise ValueError("Nie można scalić szkiców Count-Min o różnych wymiarach")
+        for row, other_row in zip(self.rows, other.rows):
+            for i, value in enumerate(other_row):
+                if value:
+                    row[i] += value
+        self.total += other.total
+
+    @property
+    def memory_bytes(self) -> int:
+        return self.width * self.depth * 8
+
+    def to_dict(self) -> Dict:
+        return {
+            'epsilon': self.epsilon,
+            'delta': self.delta,
+            'total': self.total,
+            'rows': [base64.b64encode(row.tobytes()).decode('ascii') for row in self.rows],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'CountMinSketch':
+        sketch = cls(data['epsilon'], data['delta'])
+        sketch.total = data['total']
+        for row, encoded in zip(sketch.rows, data['rows']):
+            row[:] = array('Q', base64.b64decode(encoded))
+        return sketch
+
+
+class SpaceSaving:
+    """
+    SpaceSaving - najczęstsze elementy strumienia przy k monitorowanych licznikach
+
+    Każdy element o częstości większej niż N / k jest na liście, a licznik
+    zawyża prawdziwą wartość co najwyżej o zapisany błąd.
+    """
+
+    def __init__(self, k: int = 100):
+        self.k = k
+        self.counters = {}
+        self._heap = []
+        self.total = 0
+
+    def add(self, key, count: int = 1):
+        """
+        Dolicza wystąpienia klucza
+
+        Returns:
+            Klucz usunięty z monitorowanych (lub None)
+        """
+        self.total += count
+        entry = self.counters.get(key)
+        if entry is not None:
+            entry[0] += count
+            return None
+
+        if len(self.counters) < self.k:
+            self.counters[key] = [count, 0]
+            heapq.heappush(self._heap, (count, key))
+            return None
+
+        evicted, min_count = self._pop_min()
+        self.counters[key] = [min_count + count, min_count]
+        heapq.heappush(self._heap, (min_count + count, key))
+        return evicted
+
+    def _pop_min(self) -> Tuple:
+        """Usuwa klucz o najmniejszym liczniku (kopiec aktualizowany leniwie)"""
+        while True:
+            count, key = heapq.heappop(self._heap)
+            entry = self.counters.get(key)
+            if entry is None:
+                continue
+            if entry[0] != count:
+                heapq.heappush(self._heap, (entry[0], key))
+                continue
+            del self.counters[key]
+            return key, count
+
+    def top(self, n: int = None) -> List[Tuple]:
+        """Zwraca listę (klucz, oszacowanie, maksymalny błąd) malejąco"""
+        items = sorted(self.counters.items(), key=lambda x: (-x[1][0], str(x[0])))
+        if n is not None:
+            items = items[:n]
+        return [(key, count, error) for key, (count, error) in items]
+
+    def __contains__(self, key) -> bool:
+        return key in self.counters
+
+    def merge(self, other: 'SpaceSaving'):
+        """Scala inny szkic (algorytm scalania podsumowań SpaceSaving)"""
+        self_min = min((c for c, _ in self.counters.values()), default=0) if len(self.counters) >= self.k else 0
+        other_min = min((c for c, _ in other.counters.values()), default=0) if len(other.counters) >= other.k else 0
+
+        merged = {}
+        for key in set(self.counters) | set(other.counters):
+            count_a, error_a = self.counters.get(key, (self_min, self_min))
+            count_b, error_b = other.counters.get(key, (other_min, other_min))
+            merged[key] = [count_a + count_b, error_a + error_b]
+
+        kept = sorted(merged.items(), key=lambda x: -x[1][0])[:self.k]
+        self.counters = dict(kept)
+        self._heap = [(entry[0], key) for key, entry in kept]
+        heapq.heapify(self._heap)
+        self.total += other.total
+
+    def to_dict(self) -> Dict:
+        return {
+            'k': self.k,
+            'total': self.total,
+            'counters': [[key, count, error] for key, (count, error) in self.counters.items()],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'SpaceSaving':
+        sketch = cls(data['k'])
+        sketch.total = data['total']
+        for key, count, error in data['counters']:
+            # Klucze złożone (krotki) wracają z JSON jako listy
+            if isinstance(key, list):
+                key = tuple(key)
+            sketch.counters[key] = [count, error]
+        sketch._heap = [(entry[0], key) for key, entry in sketch.counters.items()]
+        heapq.heapify(sketch._heap)
+        return sketch
+
+
+class HyperLogLog:
+    """HyperLogLog - przybliżona liczba różnych wartości (błąd ok. 1.04 / sqrt(2^p))"""
+
+    def __init__(self, precision: int = 14):
+        if not 4 <= precision <= 18:
+            raise ValueError("Precyzja HyperLogLog musi być z zakresu 4-18")
+        self.precision = precision
+        self.m = 1 << precision
+        self.registers = bytearray(self.m)
+
+    def add(self, value):
+        """Dodaje wartość"""
+        h = stable_hash64(value)
+        index = h >> (64 - self.precision)
+        rest = (h << self.precision) & 0xFFFFFFFFFFFFFFFF
+        rank = (64 - self.precision + 1) if rest == 0 else (64 - rest.bit_length() + 1)
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def count(self) -> int:
+        """Zwraca oszacowanie liczby różnych wartości"""
+        m = self.m
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        # Korekta dla małych liczności (zliczanie liniowe)
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+    @property
+    def relative_error(self) -> float:
+        return 1.04 / math.sqrt(self.m)
+
+    def merge(self, other: 'HyperLogLog'):
+        """Scala szkic o tej samej precyzji"""
+        if self.precision != other.precision:
+            raise ValueError("Nie można scalić szkiców HyperLogLog o różnej precyzji")
+        self.registers = bytearray(max(a, b) for a, b in zip(self.registers, other.registers))
+
+    @property
+    def memory_bytes(self) -> int:
+        return self.m
+
+    def to_dict(self) -> Dict:
+        return {
+            'precision': self.precision,
+            'registers': base64.b64encode(bytes(self.registers)).decode('ascii'),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'HyperLogLog':
+        sketch = cls(data['precision'])
+        sketch.registers = bytearray(base64.b64decode(data['registers']))
+        return sketch
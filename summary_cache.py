@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Trwała pamięć podręczna podsumowań analizy
+Podsumowania są zapisywane per dziennik i identyfikowane odciskiem źródła
+(numery najstarszego i najnowszego rekordu), zakresem czasowym i filtrem
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Optional
+
+from report_summary import ReportSummary, TIME_FORMAT
+
+
+# Wersja zawartości wpisów - zmiana unieważnia wpisy zapisane przez starsze wersje
+# (2: oś czasu zdarzeń w podsumowaniu, 3: próbki rezerwuarowe grup)
+ENTRY_FORMAT = 3
+
+
+class CacheEntry:
+    """Wpis pamięci podręcznej - podsumowanie wraz z odciskiem źródła"""
+
+    def __init__(self, summary: ReportSummary, fingerprint: Dict, window_end: datetime):
+        self.summary = summary
+        self.fingerprint = fingerprint
+        self.window_end = window_end
+
+
+class SummaryCache:
+    """
+    Pamięć podręczna podsumowań z usuwaniem najdawniej używanych wpisów (LRU)
+
+    Każdy wpis to osobny plik JSON, a indeks (klucz, rozmiar, czas użycia)
+    jest trzymany w pliku index.json. Liczba wpisów i ich łączny rozmiar
+    są ograniczone.
+    """
+
+    INDEX_FILE = 'index.json'
+
+    def __init__(self, directory: str = None, max_entries: int = 64,
+                 max_bytes: int = 50 * 1024 * 1024, max_age_minutes: int = 15):
+        """
+        Args:
+            directory: Katalog pamięci podręcznej (domyślnie ~/.windows_event_analyzer/cache)
+            max_entries: Maksymalna liczba wpisów
+            max_bytes: Maksymalny łączny rozmiar wpisów w bajtach
+            max_age_minutes: Jak długo podsumowanie okna względnego ("ostatnie N godzin")
+                             może być używane ponownie - początek okna przesuwa się
+                             z upływem czasu, więc starsze wpisy są liczone od nowa
+        """
+        if directory is None:
+            directory = os.path.join(os.path.expanduser('~'), '.windows_event_analyzer', 'cache')
+        self.directory = directory
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_age_minutes = max_age_minutes
+        self._lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+        self._index = self._load_index()
+
+    @staticmethod
+    def make_key(**parts) -> str:
+        """Tworzy klucz wpisu z części (dziennik, zakres czasowy, filtr, ...)"""
+        encoded = json.dumps(dict(parts, format=ENTRY_FORMAT), sort_keys=True, default=str)
+        return hashlib.sha1(encoded.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """Zwraca wpis dla klucza lub None (także gdy wpis jest przeterminowany)"""
+        with self._lock:
+            meta = self._index.get(key)
+            if meta is None:
+                return None
+
+            window_end = datetime.strptime(meta['window_end'], TIME_FORMAT)
+            age_minutes = (datetime.now() - window_end).total_seconds() / 60
+            if age_minutes > self.max_age_minutes:
+                self._remove(key)
+                self._save_index()
+                return None
+
+            try:
+                with open(self._path(key), 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                self._remove(key)
+                self._save_index()
+                return None
+
+            meta['last_used'] = time.time()
+            self._save_index()
+
+        return CacheEntry(ReportSummary.from_dict(data['summary']), data['fingerprint'], window_end)
+
+    def put(self, key: str, summary: ReportSummary, fingerprint: Dict, window_end: datetime):
+        """Zapisuje podsumowanie pod kluczem (zastępując poprzedni wpis)"""
+        content = json.dumps({
+            'fingerprint': fingerprint,
+            'summary': summary.to_dict(),
+        }, ensure_ascii=False)
+
+        with self._lock:
+            path = self._path(key)
+            temp_path = f"{path}.{os.getpid()}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                f.write(content)
+            os.replace(temp_path, path)
+
+            self._index[key] = {
+                'size': len(content.encode('utf-8')),
+                'last_used': time.time(),
+                'window_end': window_end.strftime(TIME_FORMAT),
+            }
+            self._evict()
+            self._save_index()
+
+    def clear(self):
+        """Usuwa wszystkie wpisy"""
+        with self._lock:
+            for key in list(self._index):
+                self._remove(key)
+            self._save_index()
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(meta['size'] for meta in self._index.values())
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _load_index(self) -> Dict:
+        try:
+            with open(os.path.join(self.directory, self.INDEX_FILE), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_index(self):
+        path = os.path.join(self.directory, self.INDEX_FILE)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._index, f)
+        os.replace(temp_path, path)
+
+    def _remove(self, key: str):
+        self._index.pop(key, None)
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def _evict(self):
+        """Usuwa najdawniej używane wpisy aż do spełnienia limitów"""
+        by_age = sorted(self._index, key=lambda k: self._index[k]['last_used'])
+        while by_age and (len(self._index) > self.max_entries or self.total_bytes > self.max_bytes):
+            self._remove(by_age.pop(0))
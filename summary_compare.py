@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Porównanie okresu bazowego z bieżącym
+Nowe Event ID, źródła i szablony komunikatów oraz istotne zmiany częstości,
+wyznaczane na zagregowanych licznościach podsumowań (bez przeglądania zdarzeń)
+"""
+
+import json
+import math
+from typing import Dict, List
+
+from report_summary import ReportSummary
+
+
+class RateChange:
+    """Zmiana częstości jednego Event ID między okresami"""
+
+    def __init__(self, event_id: int, baseline_count: int, current_count: int,
+                 baseline_rate: float, current_rate: float, z_score: float):
+        self.event_id = event_id
+        self.baseline_count = baseline_count
+        self.current_count = current_count
+        self.baseline_rate = baseline_rate
+        self.current_rate = current_rate
+        self.z_score = z_score
+
+    @property
+    def ratio(self) -> float:
+        """Stosunek częstości bieżącej do bazowej"""
+        return self.current_rate / self.baseline_rate
+
+    def to_dict(self) -> Dict:
+        return {
+            'event_id': self.event_id,
+            'baseline_count': self.baseline_count,
+            'current_count': self.current_count,
+            'baseline_per_hour': round(self.baseline_rate, 3),
+            'current_per_hour': round(self.current_rate, 3),
+            'ratio': round(self.ratio, 3),
+            'z_score': round(self.z_score, 2),
+        }
+
+
+class SummaryComparison:
+    """
+    Porównanie dwóch podsumowań (dwóch okresów, hostów lub zapisanych raportów)
+
+    Koszt porównania zależy od liczby różnych kluczy (Event ID, źródeł,
+    szablonów), a nie od liczby zdarzeń. Częstości są normalizowane długością
+    okresów, a zmiana jest istotna, gdy stosunek częstości przekracza
+    min_ratio i jednocześnie liczność bieżąca odbiega od oczekiwanej
+    (test dwumianowy przy ustalonej sumie wystąpień, przybliżenie normalne)
+    o co najmniej z_threshold odchyleń standardowych.
+    """
+
+    def __init__(self, baseline: ReportSummary, current: ReportSummary, min_count: int = 5,
+                 min_ratio: float = 2.0, z_threshold: float = 3.0):
+        """
+        Args:
+            baseline: Podsumowanie okresu bazowego (np. poprzedniego tygodnia)
+            current: Podsumowanie okresu bieżącego
+            min_count: Minimalna łączna liczba wystąpień Event ID w obu okresach
+            min_ratio: Minimalny stosunek częstości (wzrost lub spadek)
+            z_threshold: Minimalna istotność zmiany w odchyleniach standardowych
+        """
+        self.baseline = baseline
+        self.current = current
+        self.min_count = min_count
+        self.min_ratio = min_ratio
+        self.z_threshold = z_threshold
+
+        # Okresy o nieznanej długości (0 godzin) są traktowane jako równe
+        self.baseline_hours = baseline.period_hours or 1.0
+        self.current_hours = current.period_hours or 1.0
+
+        self.new_event_ids = self._new_keys(baseline.event_id_counts, current.event_id_counts)
+        self.gone_event_ids = self._new_keys(current.event_id_counts, baseline.event_id_counts)
+        self.new_sources = self._new_keys(baseline.source_counts, current.source_counts)
+        self.new_templates = self._new_keys(baseline.template_counts, current.template_counts)
+        self.rate_changes = self._rate_changes()
+
+    @staticmethod
+    def _new_keys(old: Dict, new: Dict) -> List:
+        """Klucze obecne tylko w new, jako lista (klucz, liczba) od najczęstszych"""
+        return sorted(((key, count) for key, count in new.items() if count and not old.get(key)),
+                      key=lambda x: (-x[1], str(x[0])))
+
+    def _rate_changes(self) -> List[RateChange]:
+        """Istotne zmiany częstości Event ID obecnych w obu okresach"""
+        # Udział bieżącego okresu w łącznym czasie - oczekiwany udział wystąpień
+        share = self.current_hours / (self.baseline_hours + self.current_hours)
+        changes = []
+        baseline_counts = self.baseline.event_id_counts
+        for event_id, current_count in self.current.event_id_counts.items():
+            baseline_count = baseline_counts.get(event_id, 0)
+            total = baseline_count + current_count
+            if not baseline_count or not current_count or total < self.min_count:
+                continue
+
+            baseline_rate = baseline_count / self.baseline_hours
+            current_rate = current_count / self.current_hours
+            ratio = current_rate / baseline_rate
+            if 1 / self.min_ratio < ratio < self.min_ratio:
+                continue
+
+            z_score = (current_count - total * share) / math.sqrt(total * share * (1 - share))
+            if abs(z_score) >= self.z_threshold:
+                changes.append(RateChange(event_id, baseline_count, current_count,
+                                          baseline_rate, current_rate, z_score))
+        return sorted(changes, key=lambda change: (-abs(change.z_score), change.event_id))
+
+    @property
+    def increases(self) -> List[RateChange]:
+        return [change for change in self.rate_changes if change.ratio > 1]
+
+    @property
+    def decreases(self) -> List[RateChange]:
+        return [change for change in self.rate_changes if change.ratio < 1]
+
+    def to_dict(self) -> Dict:
+        """Zwraca porównanie jako słownik gotowy do serializacji JSON"""
+        return {
+            'baseline_period': self.baseline.period_description(),
+            'current_period': self.current.period_description(),
+            'baseline_events': self.baseline.total_events,
+            'current_events': self.current.total_events,
+            'new_event_ids': [{'event_id': k, 'count': v} for k, v in self.new_event_ids],
+            'gone_event_ids': [{'event_id': k, 'count': v} for k, v in self.gone_event_ids],
+            'new_sources': [{'source': k, 'count': v} for k, v in self.new_sources],
+            'new_templates': [{'source': source, 'event_id': event_id, 'count': count}
+                              for (source, event_id), count in self.new_templates],
+            'rate_changes': [change.to_dict() for change in self.rate_changes],
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), ensure_ascii=False, indent=2)
+
+    def format_text(self, limit: int = 20) -> str:
+        """
+        Zwraca raport tekstowy porównania
+
+        Args:
+            limit: Maksymalna liczba pozycji w każdej sekcji
+        """
+        lines = []
+        lines.append("=" * 80)
+        lines.append("PORÓWNANIE Z OKRESEM BAZOWYM")
+        lines.append("=" * 80)
+        lines.append(f"Okres bazowy:  {self.baseline.period_description()} "
+                     f"({self.baseline.total_events} zdarzeń)")
+        lines.append(f"Okres bieżący: {self.current.period_description()} "
+                     f"({self.current.total_events} zdarzeń)")
+        lines.append("")
+
+        sections = (
+            ("NOWE EVENT ID", [f"  Event ID {k:6} : {v:6} wystąpień" for k, v in self.new_event_ids]),
+            ("NOWE ŹRÓDŁA", [f"  {k:40} : {v:6} wystąpień" for k, v in self.new_sources]),
+            ("NOWE SZABLONY KOMUNIKATÓW (źródło, Event ID)",
+             [f"  {source:40} {event_id:6} : {count:6} wystąpień"
+              for (source, event_id), count in self.new_templates]),
+            ("ISTOTNE WZROSTY CZĘSTOŚCI", [self._format_change(change) for change in self.increases]),
+            ("ISTOTNE SPADKI CZĘSTOŚCI", [self._format_change(change) for change in self.decreases]),
+            ("EVENT ID NIEOBECNE W OKRESIE BIEŻĄCYM",
+             [f"  Event ID {k:6} : {v:6} wystąpień w okresie bazowym" for k, v in self.gone_event_ids]),
+        )
+        for title, entries in sections:
+            lines.append("-" * 80)
+            lines.append(f"{title} ({len(entries)})")
+            lines.append("-" * 80)
+            if entries:
+                lines.extend(entries[:limit])
+                if len(entries) > limit:
+                    lines.append(f"  ... i {len(entries) - limit} więcej")
+            else:
+                lines.append("  Brak")
+            lines.append("")
+        return "\n".join(lines)
+
+    @staticmethod
+    def _format_change(change: RateChange) -> str:
+        return (f"  Event ID {change.event_id:6} : {change.baseline_rate:9.2f}/h -> "
+                f"{change.current_rate:9.2f}/h (x{change.ratio:.2f}, "
+                f"{change.baseline_count} -> {change.current_count})")
+
+
+def load_summary(filename: str) -> ReportSummary:
+    """
+    Wczytuje podsumowanie z raportu JSON lub wpisu pamięci podręcznej
+
+    Pozwala porównać bieżącą analizę z raportem zapisanym wcześniej
+    albo na innym komputerze.
+    """
+    with open(filename, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if 'total_events' not in data and 'summary' in data:
+        data = data['summary']
+    return ReportSummary.from_dict(data)
@@ -0,0 +1,468 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Analiza rozproszona (map-reduce)
+Pliki eksportu dzienników są dzielone na części analizowane w osobnych
+procesach lub na innych komputerach, a częściowe podsumowania są scalane
+w jedno podsumowanie, z którego powstaje raport
+"""
+
+import json
+import os
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+from report_summary import ReportSummary, ApproximateSummary, TIME_FORMAT
+from summary_compare import load_summary
+
+
+# Znacznik i wersja pliku częściowego podsumowania
+PARTIAL_FORMAT = 'wea-partial-summary'
+PARTIAL_VERSION = 1
+
+
+def _format_time(value: Optional[datetime]) -> Optional[str]:
+    return value.strftime(TIME_FORMAT) if value else None
+
+
+def _parse_time(value: Optional[str]) -> Optional[datetime]:
+    return datetime.strptime(value, TIME_FORMAT) if value else None
+
+
+def _write_json_atomic(filename: str, data: Dict):
+    """Zapis przez plik tymczasowy - czytelnik nigdy nie widzi niepełnego pliku"""
+    temporary = f"{filename}.{os.getpid()}.tmp"
+    with open(temporary, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(temporary, filename)
+
+
+def partial_to_dict(summary: Union[ReportSummary, ApproximateSummary], files: Iterable[str] = ()) -> Dict:
+    """Częściowe podsumowanie jako słownik gotowy do serializacji JSON"""
+    return {
+        'format': PARTIAL_FORMAT,
+        'version': PARTIAL_VERSION,
+        'host': socket.gethostname(),
+        'files': list(files),
+        # Szkice trybu przybliżonego są scalane przed zamianą na ReportSummary
+        'approximate': isinstance(summary, ApproximateSummary),
+        'summary': summary.to_dict(),
+    }
+
+
+def partial_from_dict(data: Dict) -> Union[ReportSummary, ApproximateSummary]:
+    """Odtwarza częściowe podsumowanie (partial_to_dict)"""
+    if data.get('format') != PARTIAL_FORMAT:
+        raise ValueError("To nie jest plik częściowego podsumowania")
+    if data['version'] > PARTIAL_VERSION:
+        raise ValueError(f"Nieobsługiwana wersja częściowego podsumowania: {data['version']}")
+    if data['approximate']:
+        return ApproximateSummary.from_dict(data['summary'])
+    summary = ReportSummary.from_dict(data['summary'])
+    # Sesje ze zdarzeń bez nazwy komputera - pochodzenie to pliki części
+    origin = ', '.join(os.path.basename(path) for path in data.get('files', ())) or data.get('host')
+    for session in summary.boot_sessions:
+        if session.origin is None:
+            session.origin = origin
+    return summary
+
+
+def save_partial_summary(filename: str, summary: Union[ReportSummary, ApproximateSummary],
+                         files: Iterable[str] = ()):
+    """Zapisuje częściowe podsumowanie do scalenia na innym komputerze"""
+    _write_json_atomic(filename, partial_to_dict(summary, files))
+
+
+def load_partial_summary(filename: str) -> Union[ReportSummary, ApproximateSummary]:
+    """
+    Wczytuje częściowe podsumowanie
+
+    Poza plikami save_partial_summary przyjmuje raporty JSON i wpisy
+    pamięci podręcznej (jak summary_compare.load_summary).
+    """
+    with open(filename, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if data.get('format') == PARTIAL_FORMAT:
+        return partial_from_dict(data)
+    return load_summary(filename)
+
+
+def merge_summaries(summaries: Iterable[Union[ReportSummary, ApproximateSummary]]) -> ReportSummary:
+    """
+    Scala częściowe podsumowania w jedno (reduce)
+
+    Scalanie jest łączne, więc wynik nie zależy od podziału plików na części.
+    Podsumowania przybliżone są najpierw scalane ze sobą (szkice), a potem
+    z dokładnymi - wynik jest wtedy oznaczony jako przybliżony. Podane
+    podsumowania mogą zostać zmienione.
+    """
+    merged = ReportSummary()
+    approximate = None
+    for summary in summaries:
+        if isinstance(summary, ApproximateSummary):
+            if approximate is None:
+                approximate = summary
+            else:
+                approximate.merge(summary)
+        else:
+            merged.merge(summary)
+    if approximate is not None:
+        merged.merge(approximate.to_report_summary())
+    return merged
+
+
+def shard_files(paths: Iterable[str], shards: int) -> List[List[str]]:
+    """
+    Dzieli pliki na części o zbliżonym łącznym rozmiarze
+
+    Pliki od największego trafiają do najmniej obciążonej części, a puste
+    części są pomijane. Kolejność plików w części jest zachowana.
+    """
+    paths = list(paths)
+    order = {path: index for index, path in enumerate(paths)}
+    sizes = {path: os.path.getsize(path) if os.path.isfile(path) else 0 for path in paths}
+    bins = [[0, []] for _ in range(max(1, min(shards, len(paths))))]
+    for path in sorted(paths, key=lambda path: -sizes[path]):
+        target = min(bins, key=lambda item: item[0])
+        target[0] += sizes[path]
+        target[1].append(path)
+    return [sorted(files, key=order.get) for _, files in bins if files]
+
+
+def analyze_shard(task: Dict) -> Dict:
+    """
+    Analizuje pliki jednej części i zwraca częściowe podsumowanie (partial_to_dict)
+
+    Wykonywane w procesie roboczym lub na węźle - zadanie i wynik są
+    słownikami JSON, więc mogą przejść przez granicę procesu lub plik.
+    """
+    # Import wewnątrz - moduł analizatora importuje koordynator
+    from windows_event_analyzer import WindowsEventAnalyzer
+
+    started = time.perf_counter()
+    analyzer = WindowsEventAnalyzer(hours_back=task.get('hours_back'),
+                                    start_time=_parse_time(task.get('start_time')),
+                                    end_time=_parse_time(task.get('end_time')),
+                                    approximate=task.get('approximate', False),
+                                    sketch_options=task.get('sketch_options'),
+                                    progress=None)
+    analyzer.stratify_samples = task.get('stratify_samples', False)
+    analyzer.event_files = list(task['files'])
+    analyzer.file_workers = task.get('file_workers')
+    analyzer.analyze_events()
+    summary = analyzer.approximate_summary if analyzer.approximate else analyzer.build_summary()
+    result = partial_to_dict(summary, task['files'])
+    # Czas analizy tej części (SummaryCoordinator.shard_seconds)
+    result['seconds'] = time.perf_counter() - started
+    return result
+
+
+class FileDropQueue:
+    """
+    Kolejka zadań w katalogu współdzielonym przez koordynator i węzły
+
+    Protokół:
+        tasks/<id>.json    - zadanie zapisane przez koordynator
+        claimed/<id>.json  - zadanie przejęte przez węzeł (atomowa zmiana nazwy,
+                             więc każde zadanie przejmuje dokładnie jeden węzeł)
+        results/<id>.json  - częściowe podsumowanie lub {"error": ...}
+
+    Pliki są zapisywane przez plik tymczasowy i os.replace, więc żadna ze
+    stron nie czyta niepełnych plików. Węzeł co heartbeat_interval odświeża
+    czas modyfikacji pliku przejętego zadania (heartbeat), a zadanie bez
+    odświeżenia dłużej niż claim_timeout (węzeł przestał działać) wraca do
+    tasks/. Wynik zadania już zebranego przez koordynator jest pomijany.
+    """
+
+    def __init__(self, directory: str, claim_timeout: float = 300.0):
+        self.directory = directory
+        self.claim_timeout = claim_timeout
+        # Kilka odświeżeń na claim_timeout - pojedyncze opóźnienie nie zwalnia zadania
+        self.heartbeat_interval = claim_timeout / 10
+        self.tasks_dir = os.path.join(directory, 'tasks')
+        self.claimed_dir = os.path.join(directory, 'claimed')
+        self.results_dir = os.path.join(directory, 'results')
+        for path in (self.tasks_dir, self.claimed_dir, self.results_dir):
+            os.makedirs(path, exist_ok=True)
+
+    def submit(self, task: Dict) -> str:
+        """Dodaje zadanie (słownik z kluczem files) i zwraca jego identyfikator"""
+        task_id = task.setdefault('id', uuid.uuid4().hex)
+        _write_json_atomic(os.path.join(self.tasks_dir, f"{task_id}.json"), task)
+        return task_id
+
+    def claim(self) -> Optional[Dict]:
+        """Przejmuje najstarsze wolne zadanie (None, gdy brak zadań)"""
+        for name in sorted(os.listdir(self.tasks_dir)):
+            if not name.endswith('.json'):
+                continue
+            claimed = os.path.join(self.claimed_dir, name)
+            try:
+                os.replace(os.path.join(self.tasks_dir, name), claimed)
+            except FileNotFoundError:
+                # Zadanie przejął inny węzeł
+                continue
+            # Czas przejęcia (wykrywanie węzłów, które przestały działać)
+            os.utime(claimed)
+            with open(claimed, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        return None
+
+    def heartbeat(self, task_id: str) -> bool:
+        """Odświeża przejęcie zadania (False, gdy zadanie wróciło do kolejki lub zostało zebrane)"""
+        try:
+            os.utime(os.path.join(self.claimed_dir, f"{task_id}.json"))
+            return True
+        except FileNotFoundError:
+            return False
+
+    def _discard(self, task_id: str):
+        """Usuwa zadanie z tasks/ i claimed/ (ponownie kolejkowana kopia nie jest wykonywana)"""
+        for directory in (self.tasks_dir, self.claimed_dir):
+            try:
+                os.remove(os.path.join(directory, f"{task_id}.json"))
+            except FileNotFoundError:
+                pass
+
+    def complete(self, task_id: str, result: Dict) -> bool:
+        """
+        Zapisuje wynik zadania i zwalnia je
+
+        Returns:
+            False, gdy wynik jest spóźniony - zadanie wróciło do kolejki, wykonał
+            je inny węzeł i koordynator zebrał już wynik (wynik jest pomijany)
+        """
+        if not any(os.path.exists(os.path.join(directory, f"{task_id}.json"))
+                   for directory in (self.tasks_dir, self.claimed_dir)):
+            return False
+        _write_json_atomic(os.path.join(self.results_dir, f"{task_id}.json"), result)
+        self._discard(task_id)
+        return True
+
+    def requeue_stale(self) -> int:
+        """Przywraca zadania przejęte dawniej niż claim_timeout (zwraca ich liczbę)"""
+        requeued = 0
+        now = time.time()
+        for name in os.listdir(self.claimed_dir):
+            claimed = os.path.join(self.claimed_dir, name)
+            try:
+                if now - os.path.getmtime(claimed) > self.claim_timeout:
+                    os.replace(claimed, os.path.join(self.tasks_dir, name))
+                    requeued += 1
+            except FileNotFoundError:
+                continue
+        return requeued
+
+    def collect(self, task_ids: List[str], timeout: float = None, poll_interval: float = 1.0,
+                on_result: Callable[[str, Dict], None] = None) -> Dict[str, Dict]:
+        """
+        Czeka na wyniki zadań i usuwa ich pliki
+
+        Raises:
+            TimeoutError: Nie wszystkie wyniki nadeszły w czasie timeout
+        """
+        pending = set(task_ids)
+        results = {}
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while pending:
+            for task_id in sorted(pending):
+                path = os.path.join(self.results_dir, f"{task_id}.json")
+                if not os.path.exists(path):
+                    continue
+                with open(path, 'r', encoding='utf-8') as f:
+                    results[task_id] = json.load(f)
+                os.remove(path)
+                # Zadanie mogło wrócić do kolejki - kolejne wykonanie jest zbędne
+                self._discard(task_id)
+                pending.discard(task_id)
+                if on_result is not None:
+                    on_result(task_id, results[task_id])
+            if not pending:
+                break
+            if deadline is not None and time.monotonic() > deadline:
+                raise TimeoutError(f"Brak wyników {len(pending)} z {len(task_ids)} zadań")
+            self.requeue_stale()
+            time.sleep(poll_interval)
+        return results
+
+
+def _heartbeat(queue: FileDropQueue, task_id: str, done: threading.Event):
+    while not done.wait(queue.heartbeat_interval):
+        if not queue.heartbeat(task_id):
+            return
+
+
+def run_worker(directory: str, idle_timeout: float = None, poll_interval: float = 1.0,
+               on_task: Callable[[Dict, Dict], None] = None) -> int:
+    """
+    Wykonuje zadania z katalogu FileDropQueue (węzeł analizy rozproszonej)
+
+    Ścieżki plików w zadaniach muszą być dostępne na węźle (np. udział sieciowy).
+
+    Args:
+        directory: Katalog kolejki współdzielony z koordynatorem
+        idle_timeout: Zakończ po tylu sekundach bez zadań (None - działaj bez końca)
+        poll_interval: Co ile sekund sprawdzać nowe zadania
+        on_task: Wywoływane po każdym zadaniu z (zadanie, wynik)
+
+    Returns:
+        Liczba wykonanych zadań
+    """
+    queue = FileDropQueue(directory)
+    processed = 0
+    idle_since = time.monotonic()
+    while True:
+        task = queue.claim()
+        if task is None:
+            if idle_timeout is not None and time.monotonic() - idle_since > idle_timeout:
+                return processed
+            time.sleep(poll_interval)
+            continue
+        # Odświeżanie przejęcia w tle - długa analiza nie wraca do kolejki
+        done = threading.Event()
+        heartbeat = threading.Thread(target=_heartbeat, args=(queue, task['id'], done), daemon=True)
+        heartbeat.start()
+        try:
+            result = analyze_shard(task)
+        except Exception as e:
+            result = {'error': f"{type(e).__name__}: {e}", 'host': socket.gethostname(), 'files': task['files']}
+        finally:
+            done.set()
+            heartbeat.join()
+        queue.complete(task['id'], result)
+        processed += 1
+        if on_task is not None:
+            on_task(task, result)
+        idle_since = time.monotonic()
+
+
+class SummaryCoordinator:
+    """
+    Koordynator analizy rozproszonej plików eksportu
+
+    Pliki są dzielone na części (shard_files), każda część jest analizowana
+    osobno (map: analyze_shard - odczyt, detektory, podsumowanie), a częściowe
+    podsumowania scalane w jedno (reduce: merge_summaries). Detektory
+    zagrożeń, sesji i korelacji działają w obrębie części - zdarzenia jednego
+    dziennika warto trzymać w jednym pliku.
+
+    Przykład:
+        coordinator = SummaryCoordinator(workers=4)
+        summary = coordinator.run_local(glob.glob('eksporty/*.xml'))
+        WindowsEventAnalyzer(progress=None).save_report('raport.html', format='html', summary=summary)
+    """
+
+    def __init__(self, hours_back: int = None, start_time: datetime = None, end_time: datetime = None,
+                 approximate: bool = False, sketch_options: Dict = None, workers: int = None,
+                 stratify_samples: bool = False):
+        """
+        Args:
+            hours_back: Ile godzin wstecz analizować (None - wszystkie zdarzenia z plików)
+            start_time: Bezwzględny początek zakresu analizy
+            end_time: Bezwzględny koniec zakresu analizy
+            approximate: Analizuj części w trybie przybliżonym (szkice)
+            sketch_options: Parametry ApproximateSummary
+            workers: Liczba procesów run_local (domyślnie liczba rdzeni)
+            stratify_samples: Próbki grup z różnych źródeł (WindowsEventAnalyzer.stratify_samples)
+        """
+        self.hours_back = hours_back
+        self.start_time = start_time
+        self.end_time = end_time
+        self.approximate = approximate
+        self.sketch_options = sketch_options
+        self.workers = workers or os.cpu_count() or 1
+        self.stratify_samples = stratify_samples
+        # Części, których nie udało się przeanalizować: lista (pliki, opis błędu)
+        self.errors = []
+        # Czas analizy każdej części w sekundach (w kolejności części)
+        self.shard_seconds = []
+
+    def time_window(self) -> Tuple[Optional[datetime], Optional[datetime]]:
+        """
+        Bezwzględny zakres analizy wspólny dla wszystkich części
+
+        Okno względne (hours_back) jest ustalane raz, w chwili rozsyłania zadań -
+        części wykonywane później (kolejka, inne komputery) analizują ten sam okres.
+        """
+        if self.start_time is not None or self.hours_back is None:
+            return self.start_time, self.end_time
+        now = datetime.now().replace(microsecond=0)
+        return now - timedelta(hours=self.hours_back), now
+
+    def tasks(self, paths: Iterable[str], shards: int, file_workers: int = None) -> List[Dict]:
+        """Zadania analizy części jako słowniki JSON"""
+        start_time, end_time = self.time_window()
+        return [{
+            'files': files,
+            'hours_back': self.hours_back,
+            'start_time': _format_time(start_time),
+            'end_time': _format_time(end_time),
+            'approximate': self.approximate,
+            'sketch_options': self.sketch_options,
+            'stratify_samples': self.stratify_samples,
+            'file_workers': file_workers,
+        } for files in shard_files(paths, shards)]
+
+    def _reduce(self, results: Iterable[Dict]) -> ReportSummary:
+        partials = []
+        for result in results:
+            if 'seconds' in result:
+                self.shard_seconds.append(result['seconds'])
+            if 'error' in result:
+                self.errors.append((result.get('files', []), result['error']))
+            else:
+                partials.append(partial_from_dict(result))
+        return merge_summaries(partials)
+
+    def run_local(self, paths: Iterable[str], shards: int = None) -> ReportSummary:
+        """
+        Analizuje części w puli procesów tego komputera
+
+        Args:
+            paths: Pliki eksportu
+            shards: Liczba części (domyślnie liczba procesów)
+
+        Returns:
+            Scalone podsumowanie wszystkich części
+        """
+        tasks = self.tasks(paths, shards or self.workers, file_workers=1)
+        results = []
+        with ProcessPoolExecutor(max_workers=min(self.workers, len(tasks) or 1)) as executor:
+            futures = [executor.submit(analyze_shard, task) for task in tasks]
+            # Wyniki w kolejności części - scalone podsumowanie jest powtarzalne
+            for task, future in zip(tasks, futures):
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    results.append({'error': f"{type(e).__name__}: {e}", 'files': task['files']})
+        return self._reduce(results)
+
+    def run_distributed(self, paths: Iterable[str], directory: str, shards: int,
+                        timeout: float = None, on_result: Callable[[str, Dict], None] = None) -> ReportSummary:
+        """
+        Rozsyła części do węzłów przez katalog FileDropQueue i scala ich wyniki
+
+        Węzły uruchamiają run_worker (python windows_event_analyzer.py --worker KATALOG)
+        na tym samym katalogu, a ścieżki plików muszą być na nich dostępne.
+
+        Args:
+            paths: Pliki eksportu
+            directory: Katalog kolejki współdzielony z węzłami
+            shards: Liczba części
+            timeout: Maksymalny czas oczekiwania na wyniki w sekundach
+            on_result: Wywoływane po nadejściu każdego wyniku z (id zadania, wynik)
+        """
+        queue = FileDropQueue(directory)
+        task_ids = [queue.submit(task) for task in self.tasks(paths, shards)]
+        results = queue.collect(task_ids, timeout=timeout, on_result=on_result)
+        return self._reduce(results[task_id] for task_id in task_ids)
+
+
+def describe_errors(errors: List[Tuple[List[str], str]]) -> List[str]:
+    """Opisy nieudanych części do wyświetlenia"""
+    return [f"{', '.join(files) or '?'}: {error}" for files, error in errors]
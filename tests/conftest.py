@@ -0,0 +1,7 @@
+# -*- coding: utf-8 -*-
+"""Wspólna konfiguracja testów - moduły analizatora leżą w katalogu głównym repozytorium"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
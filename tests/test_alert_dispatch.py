@@ -0,0 +1,260 @@
+# -*- coding: utf-8 -*-
+"""Testy powiadomień (alert_dispatch) - odbiorcy na lokalnych serwerach, deduplikacja i ograniczanie częstości"""
+
+import http.server
+import json
+import socket
+import socketserver
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+from alert_dispatch import (Alert, AlertDispatcher, AlertSink, FileSink, SmtpSink, SyslogSink, WebhookSink,
+                            parse_address)
+
+
+NOW = datetime(2025, 1, 5, 12, 0, 0)
+
+
+def make_event(number: int, event_id: int = 4625, log_name: str = 'Security', severity: int = 1,
+               seconds: int = None) -> dict:
+    return {
+        'log_name': log_name, 'event_id': event_id, 'source': 'Microsoft-Windows-Security-Auditing',
+        'time': NOW - timedelta(seconds=number if seconds is None else seconds), 'severity': severity,
+        'message': f"Nieudane logowanie {number}", 'record_number': 100000 - number, 'computer': 'HOST1',
+    }
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class ListSink(AlertSink):
+    name = 'list'
+
+    def __init__(self):
+        self.batches = []
+
+    def send(self, alerts):
+        self.batches.append([alert.to_dict() for alert in alerts])
+
+    @property
+    def alerts(self):
+        return [alert for batch in self.batches for alert in batch]
+
+
+class FakeAnalyzer:
+    """Analizator z interfejsem używanym przez AlertDispatcher.attach - ponowny odczyt tego samego okna"""
+
+    def __init__(self, events, hours_back: int = 24):
+        self.events = events
+        self.hours_back = hours_back
+        self.start_time = None
+        self.security_findings = []
+        self.event_sinks = []
+        self.progress_callbacks = []
+
+    def add_event_sink(self, sink):
+        self.event_sinks.append(sink)
+
+    def add_progress_callback(self, callback):
+        self.progress_callbacks.append(callback)
+
+    def analyze_events(self):
+        for start in range(0, len(self.events), 16):
+            for sink in self.event_sinks:
+                sink.write(self.events[start:start + 16])
+        for callback in self.progress_callbacks:
+            callback('analysis_done', {})
+
+
+@pytest.fixture
+def webhook_server():
+    received = []
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers['Content-Length']))
+            received.append((self.path, self.headers['Content-Type'], json.loads(body)))
+            self.send_response(204)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/alerts", received
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def smtp_server():
+    """Minimalny serwer SMTP zapisujący treść wiadomości (DATA)"""
+    messages = []
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            self.wfile.write(b'220 localhost\r\n')
+            data = None
+            envelope = {'rcpt': []}
+            for line in self.rfile:
+                if data is not None:
+                    if line in (b'.\r\n', b'.\n'):
+                        messages.append(dict(envelope, data=b''.join(data).decode('utf-8')))
+                        data = None
+                        self.wfile.write(b'250 OK\r\n')
+                    else:
+                        data.append(line)
+                    continue
+                command = line.strip().upper()
+                if command.startswith(b'EHLO'):
+                    self.wfile.write(b'250-localhost\r\n250 8BITMIME\r\n')
+                elif command.startswith(b'RCPT TO:'):
+                    envelope['rcpt'].append(line.strip()[8:].decode('ascii'))
+                    self.wfile.write(b'250 OK\r\n')
+                elif command.startswith(b'DATA'):
+                    data = []
+                    self.wfile.write(b'354 End data with <CR><LF>.<CR><LF>\r\n')
+                elif command.startswith(b'QUIT'):
+                    self.wfile.write(b'221 Bye\r\n')
+                    return
+                else:
+                    self.wfile.write(b'250 OK\r\n')
+
+    server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server.server_address[1], messages
+    server.shutdown()
+    server.server_close()
+
+
+def test_failed_logon_storm_is_one_alert(webhook_server):
+    url, received = webhook_server
+    dispatcher = AlertDispatcher([WebhookSink(url)])
+    # Niepowodzenia inspekcji mają ważność krytyczną - tylko reguła failed_logon
+    dispatcher.check_events(make_event(number) for number in range(5000))
+    dispatcher.close()
+
+    assert len(received) == 1
+    path, content_type, body = received[0]
+    assert path == '/alerts' and content_type == 'application/json'
+    assert body['count'] == 1
+    alert = body['alerts'][0]
+    assert alert['key'] == 'rule:failed_logon'
+    assert alert['count'] == 5000
+    assert alert['last_seen'] == '2025-01-05 12:00:00'
+    assert dispatcher.stats['sent'] == 1
+
+
+def test_smtp_sink_sends_one_message_per_batch(smtp_server):
+    port, messages = smtp_server
+    dispatcher = AlertDispatcher([SmtpSink('127.0.0.1', ['soc@example.com'], port=port)])
+    dispatcher.check_events([make_event(number) for number in range(10)]
+                            + [make_event(number, event_id=41, log_name='System') for number in range(3)])
+    dispatcher.close()
+
+    assert len(messages) == 1
+    assert messages[0]['rcpt'] == ['<soc@example.com>']
+    data = messages[0]['data']
+    assert 'Subject:' in data and 'To: soc@example.com' in data
+    assert 'rule:failed_logon' in data and 'rule:unexpected_shutdown:41' in data
+    assert dispatcher.errors == []
+
+
+def test_syslog_udp_sink_formats_rfc5424():
+    receiver = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    receiver.bind(('127.0.0.1', 0))
+    receiver.settimeout(5)
+    try:
+        sink = SyslogSink('127.0.0.1', receiver.getsockname()[1])
+        sink.send([Alert('rule:disk_error:7', "Błędy dysku", 'error', time=NOW, count=4)])
+        message = receiver.recv(65536)
+    finally:
+        receiver.close()
+    # local0 (16) * 8 + błąd (3)
+    assert message.startswith(b'<131>1 ')
+    assert 'Błędy dysku (4x' in message.decode('utf-8')
+
+
+def test_file_sink_writes_json_lines(tmp_path):
+    path = tmp_path / 'alerty.jsonl'
+    dispatcher = AlertDispatcher([FileSink(str(path))])
+    dispatcher.submit(Alert('anomaly:rate:7', "Wzrost częstości", 'warning', time=NOW))
+    dispatcher.close()
+    lines = path.read_text(encoding='utf-8').splitlines()
+    assert [json.loads(line)['key'] for line in lines] == ['anomaly:rate:7']
+
+
+def test_refreshing_the_same_window_does_not_repeat_alerts():
+    # Serwer zapytań co 5 minut czyta od nowa całe okno 24 godzin - bez nowych zdarzeń
+    clock = FakeClock()
+    sink = ListSink()
+    dispatcher = AlertDispatcher([sink], clock=clock)
+    events = [make_event(number) for number in range(25)] + \
+        [make_event(number, event_id=7, log_name='System', severity=2) for number in range(25)]
+    for refresh in range(48):
+        analyzer = FakeAnalyzer(events)
+        dispatcher.attach(analyzer)
+        analyzer.analyze_events()
+        clock.now += 300
+    dispatcher.close()
+    assert sorted(alert['key'] for alert in sink.alerts) == ['rule:disk_error:7', 'rule:failed_logon']
+    assert sum(alert['count'] for alert in sink.alerts) == 50
+
+    # Nowe zdarzenia po odświeżeniu są zgłaszane
+    dispatcher = AlertDispatcher([sink], clock=clock)
+    dispatcher.check_events(events)
+    dispatcher.check_events(events + [make_event(-1, event_id=7, log_name='System', severity=2)])
+    assert dispatcher.pending['rule:disk_error:7'].count == 26
+
+
+def test_throttle_window_holds_repeated_key():
+    clock = FakeClock()
+    sink = ListSink()
+    dispatcher = AlertDispatcher([sink], throttle_window=900, clock=clock)
+    dispatcher.check_events([make_event(number) for number in range(100)])
+    assert dispatcher.flush() == 1
+
+    dispatcher.check_events([make_event(number, seconds=-60 - number) for number in range(100, 150)])
+    clock.now += 600
+    assert dispatcher.flush() == 0
+    assert dispatcher.pending['rule:failed_logon'].count == 50
+
+    clock.now += 300
+    assert dispatcher.flush() == 1
+    assert [alert['count'] for alert in sink.alerts] == [100, 50]
+
+
+def test_batches_and_retries_failed_sink():
+    class FlakySink(ListSink):
+        name = 'flaky'
+        failures = 1
+
+        def send(self, alerts):
+            if self.failures:
+                self.failures -= 1
+                raise OSError("odbiorca niedostępny")
+            super().send(alerts)
+
+    sink = FlakySink()
+    dispatcher = AlertDispatcher([sink], batch_size=2, max_attempts=2)
+    for index in range(5):
+        dispatcher.submit(Alert(f"test:{index}", "Test", time=NOW))
+    assert dispatcher.flush() == 3
+    assert dispatcher.errors == [('flaky', "OSError: odbiorca niedostępny")]
+    assert dispatcher.flush() == 2
+    assert [len(batch) for batch in sink.batches] == [2, 1, 2]
+    assert dispatcher.stats['dropped'] == 0
+
+
+def test_parse_address():
+    assert parse_address('siem.local', 514) == ('siem.local', 514)
+    assert parse_address('siem.local:6514', 514) == ('siem.local', 6514)
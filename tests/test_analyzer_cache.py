@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""Testy pamięci podręcznej podsumowań analizatora przy oknie względnym"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip('win32evtlog')
+
+from event_reader import FakeRecordSource
+from summary_cache import SummaryCache
+from windows_event_analyzer import WindowsEventAnalyzer
+
+
+def run(cache: SummaryCache, source: FakeRecordSource, window_start: datetime = None):
+    analyzer = WindowsEventAnalyzer(hours_back=1, cache=cache, progress=None)
+    analyzer.logs_to_check = ['System']
+    analyzer.record_source = source
+    if window_start is not None:
+        # Okno względne przesunięte tak, jak przy późniejszym uruchomieniu
+        analyzer.time_window = lambda: (window_start, None)
+    analyzer.analyze_events()
+    return analyzer
+
+
+def test_cached_summary_drops_events_older_than_the_window(tmp_path):
+    cache = SummaryCache(str(tmp_path))
+    source = FakeRecordSource(records=2 * 3600, interval=timedelta(seconds=1))
+    first = run(cache, source)
+    assert 3500 < first.build_summary().total_events <= 3601
+
+    window_start = first.time_window()[0] + timedelta(minutes=10)
+    later = run(cache, source, window_start)
+    summary = later.build_summary()
+    expected = sum(1 for event in first.events if event['time'] >= window_start)
+    assert summary.total_events == expected
+    assert summary.oldest_event_time() >= window_start
+
+
+def test_unchanged_log_inside_the_window_is_served_from_cache(tmp_path):
+    cache = SummaryCache(str(tmp_path))
+    source = FakeRecordSource(records=600, interval=timedelta(seconds=1))
+    first = run(cache, source)
+    later = run(cache, source)
+    assert later.events == []
+    assert later.build_summary().total_events == first.build_summary().total_events == 600
+
+
+class FailingSource(FakeRecordSource):
+    def __init__(self, error: Exception):
+        super().__init__(records=10)
+        self.error = error
+
+    def record_range(self, hand):
+        raise self.error
+
+
+def test_fingerprint_failures_are_counted_and_programming_errors_surface():
+    analyzer = WindowsEventAnalyzer(hours_back=1, progress=None)
+    analyzer.record_source = FakeRecordSource(records=50)
+    assert analyzer.get_log_fingerprint('System') == {'oldest': 1, 'newest': 50}
+
+    analyzer.record_source = FailingSource(OSError("dziennik niedostępny"))
+    assert analyzer.get_log_fingerprint('System') is None
+    assert analyzer.stats.counters['fingerprint_failures'] == 1
+
+    analyzer.record_source = FailingSource(AttributeError("GetOldestEventRecord"))
+    with pytest.raises(AttributeError):
+        analyzer.get_log_fingerprint('System')
+
+
+def test_rerun_detectors_keep_counts_of_cached_logs(tmp_path):
+    cache = SummaryCache(str(tmp_path))
+    source = FakeRecordSource(records=600, interval=timedelta(seconds=1))
+    run(cache, source)
+    later = run(cache, source)
+    summary = later.build_summary()
+    cached_sessions = list(summary.boot_sessions)
+
+    later.detect_security_threats()
+    sessions = later.detect_boot_sessions(cached_sessions)
+    correlator = later.correlate_events()
+    assert later.build_summary() is summary
+    assert summary.total_events == 600
+    assert summary.boot_sessions == sessions
+    assert summary.correlations is correlator
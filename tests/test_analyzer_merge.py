@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+"""Testy scalania strumieni dzienników analizatora (analyze_events, iter_events)"""
+
+from datetime import timedelta
+
+import pytest
+
+pytest.importorskip('win32evtlog')
+
+from event_reader import FakeRecordSource
+from windows_event_analyzer import WindowsEventAnalyzer
+
+
+class UnorderedSource(FakeRecordSource):
+    """Dziennik Application z przestawionymi czasami sąsiednich rekordów (np. zmiana zegara)"""
+
+    def read(self, hand):
+        batch = super().read(hand)
+        if hand['log_name'] == 'Application':
+            for newer, older in zip(batch[::2], batch[1::2]):
+                newer.TimeGenerated, older.TimeGenerated = older.TimeGenerated, newer.TimeGenerated
+        return batch
+
+
+def analyzer_for(source: FakeRecordSource) -> WindowsEventAnalyzer:
+    analyzer = WindowsEventAnalyzer(hours_back=None, progress=None)
+    analyzer.logs_to_check = ['System', 'Application']
+    analyzer.record_source = source
+    return analyzer
+
+
+def test_iter_events_orders_logs_with_unordered_records():
+    source = UnorderedSource(records=300, interval=timedelta(seconds=1))
+    events = list(analyzer_for(source).iter_events())
+
+    assert len(events) == 600
+    times = [event['time'] for event in events]
+    assert times == sorted(times, reverse=True)
+
+    analyzer = analyzer_for(source)
+    analyzer.analyze_events()
+    assert [event['time'] for event in analyzer.events] == times
@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+"""Testy rozdzielania zdarzeń do wtyczek (analyzer_plugins.PluginDispatcher)"""
+
+from analyzer_plugins import AnalyzerPlugin, PluginDispatcher
+
+
+class Recorder(AnalyzerPlugin):
+    def __init__(self, event_ids=None, logs=None):
+        self.event_ids = event_ids
+        self.logs = logs
+        self.seen = []
+
+    def on_event(self, event):
+        self.seen.append((event['log_name'], event['event_id']))
+
+
+def test_events_reach_only_declaring_plugins():
+    services = Recorder(event_ids=(7031, 7034), logs=('System',))
+    everything = Recorder()
+    dispatcher = PluginDispatcher([services])
+    events = [{'log_name': log_name, 'event_id': event_id}
+              for log_name, event_id in [('System', 7031), ('Application', 7031), ('System', 1000),
+                                         ('System', 7034), ('System', 7031)]]
+    dispatcher.add_events(events[:2])
+    # Nowa wtyczka unieważnia zapamiętane trasy
+    dispatcher.register(everything)
+    dispatcher.add_events(events[2:])
+    assert services.seen == [('System', 7031), ('System', 7034), ('System', 7031)]
+    assert everything.seen == [('System', 1000), ('System', 7034), ('System', 7031)]
+    assert len(dispatcher) == 2
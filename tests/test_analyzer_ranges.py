@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+"""Testy zakresów czasu analizatora (events_between) po zmianie listy zdarzeń"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip('win32evtlog')
+
+from windows_event_analyzer import WindowsEventAnalyzer
+
+
+def events_at(newest: datetime, count: int) -> list:
+    return [{'log_name': 'System', 'event_id': 7, 'time': newest - timedelta(minutes=number),
+             'record_number': count - number} for number in range(count)]
+
+
+def test_reassigned_events_rebuild_the_index():
+    analyzer = WindowsEventAnalyzer(hours_back=None, progress=None)
+    first = datetime(2025, 1, 5, 12, 0)
+    analyzer.events = events_at(first, 10)
+    assert len(analyzer.events_between(first - timedelta(minutes=4), first)) == 5
+
+    # Nowa lista tej samej długości z innego okresu
+    later = first + timedelta(days=1)
+    analyzer.events = events_at(later, 10)
+    assert analyzer.events_between(first - timedelta(minutes=4), first) == []
+    assert len(analyzer.events_between(later - timedelta(minutes=4), later)) == 5
+
+    # Dopisanie zdarzeń do tej samej listy
+    analyzer.events.extend(events_at(later - timedelta(minutes=10), 3))
+    assert len(analyzer.events_between(None, later - timedelta(minutes=10))) == 3
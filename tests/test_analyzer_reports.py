@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+"""Testy zapisu raportów analizatora (save_report)"""
+
+import pytest
+
+pytest.importorskip('win32evtlog')
+
+from event_reader import FakeRecordSource
+from windows_event_analyzer import WindowsEventAnalyzer
+
+
+def analyzed() -> WindowsEventAnalyzer:
+    analyzer = WindowsEventAnalyzer(hours_back=None, progress=None)
+    analyzer.logs_to_check = ['System']
+    analyzer.record_source = FakeRecordSource(records=200)
+    analyzer.analyze_events()
+    return analyzer
+
+
+def test_unknown_report_format_is_rejected_before_writing(tmp_path):
+    analyzer = analyzed()
+    with pytest.raises(ValueError) as error:
+        analyzer.save_report(str(tmp_path / 'raport'), format=['txt', 'pdf'])
+    assert 'pdf' in str(error.value)
+    assert 'txt, html, json, csv' in str(error.value)
+    assert list(tmp_path.iterdir()) == []
+
+    saved = analyzer.save_report(str(tmp_path / 'raport'), format=['txt', 'json'])
+    assert sorted(path.name for path in tmp_path.iterdir()) == ['raport.json', 'raport.txt']
+    assert saved == [str(tmp_path / 'raport.txt'), str(tmp_path / 'raport.json')]
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""Testy osi czasu sesji uruchomieniowych (boot_sessions)"""
+
+from datetime import datetime, timedelta
+
+from boot_sessions import BootSession, BootTimeline
+
+
+BOOT = datetime(2025, 2, 10, 8, 0, 0)
+
+
+def event(minutes: float, event_id: int, severity: int = 4, source: str = 'EventLog',
+          log_name: str = 'System', **fields) -> dict:
+    return {'log_name': log_name, 'event_id': event_id, 'source': source, 'severity': severity,
+            'time': BOOT + timedelta(minutes=minutes), 'message': f"zdarzenie {event_id}",
+            'computer': 'PC-01', 'fields': fields}
+
+
+def field_getter(event: dict, name: str):
+    return event['fields'].get(name)
+
+
+def stream() -> list:
+    return [
+        # Zdarzenia sprzed pierwszego uruchomienia w okresie analizy
+        event(-30, 7036, source='Service Control Manager'),
+        event(0, 6005),
+        event(5, 1000, severity=2, log_name='Application', source='Application Error'),
+        event(6, 1000, severity=2, log_name='Application', source='Application Error'),
+        event(60, 1074, source='User32', param1='C:\\Windows\\explorer.exe', param3='Brak tytułu',
+              param5='uruchom ponownie'),
+        event(61, 6006),
+        # Trzecia sesja kończy się awarią: 41 z kodem BSOD zapisanym po kolejnym starcie
+        event(65, 6005),
+        event(90, 51, severity=2, source='Disk'),
+        event(200, 6005),
+        event(201, 41, severity=1, source='Microsoft-Windows-Kernel-Power', BugcheckCode='209'),
+        event(202, 6008, severity=2),
+        # Czwarta sesja: nieoczekiwane wyłączenie bez kodu, piąta trwa
+        event(300, 6005),
+        event(300.5, 6008, severity=2),
+        event(400, 7036, source='Service Control Manager'),
+    ]
+
+
+def build(events=None) -> BootTimeline:
+    timeline = BootTimeline(field_getter)
+    timeline.add_events(events if events is not None else stream())
+    return timeline
+
+
+def test_sessions_and_how_they_ended():
+    sessions = build().sessions
+    assert [session.index for session in sessions] == [1, 2, 3, 4, 5]
+    assert [session.status for session in sessions] == [
+        BootSession.UNKNOWN, BootSession.CLEAN, BootSession.BSOD, BootSession.UNEXPECTED, BootSession.ONGOING]
+
+    before, clean, bsod, unexpected, ongoing = sessions
+    assert before.boot_time is None and before.start == BOOT - timedelta(minutes=30)
+    assert clean.shutdown_initiator == 'C:\\Windows\\explorer.exe'
+    assert clean.shutdown_type == 'uruchom ponownie'
+    assert clean.end == BOOT + timedelta(minutes=61) and clean.duration_text == '01:01:00'
+    assert clean.top_errors() == [(1000, 2)] and clean.error_total == 2
+    assert bsod.bugcheck == '0x000000D1'
+    assert bsod.error_counts == {51: 1}
+    # Znaczniki awarii poprzedniej sesji są liczone w sesji, w której je zapisano
+    assert unexpected.total_events == 3 and unexpected.error_counts == {41: 1, 6008: 1}
+    assert ongoing.end == BOOT + timedelta(minutes=400) and not ongoing.closed
+    assert all(session.origin == 'PC-01' for session in sessions)
+
+
+def test_session_at_finds_the_running_session():
+    timeline = build()
+    assert timeline.session_at(BOOT - timedelta(minutes=1)).index == 1
+    assert timeline.session_at(BOOT + timedelta(minutes=100)).index == 3
+    assert timeline.session_at(BOOT + timedelta(minutes=500)).index == 5
+
+
+def test_continuing_from_saved_sessions_matches_single_pass():
+    events = stream()
+    whole = build(events)
+
+    first = build(events[:9])
+    saved = [BootSession.from_dict(session.to_dict()) for session in first.sessions]
+    continued = BootTimeline(field_getter, saved)
+    # Zdarzenia już doliczone (do końca zapisanych sesji) są pomijane
+    continued.add_events(events[5:])
+    assert [session.to_dict() for session in continued.sessions] == \
+        [session.to_dict() for session in whole.sessions]
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""Testy korelacji czasowej zdarzeń (event_correlation)"""
+
+import json
+import random
+from datetime import datetime, timedelta
+
+from event_correlation import EventCorrelator
+
+
+START = datetime(2025, 4, 1, 0, 0, 0)
+
+
+def event(seconds: float, log_name: str, event_id: int, severity: int = 2) -> dict:
+    return {'log_name': log_name, 'event_id': event_id, 'severity': severity,
+            'time': START + timedelta(seconds=seconds)}
+
+
+def stream(seed: int = 3) -> list:
+    """Błąd dysku (System 51) po 5-20 s powoduje awarię aplikacji (Application 1000) i dalej 1001"""
+    rnd = random.Random(seed)
+    events = []
+    for incident in range(40):
+        base = incident * 3600 + rnd.randint(0, 600)
+        events.append(event(base, 'System', 51))
+        events.append(event(base + rnd.randint(5, 20), 'Application', 1000))
+        events.append(event(base + 40, 'Application', 1001, severity=3))
+    # Niezwiązany szum i zdarzenia informacyjne (pomijane)
+    for _ in range(200):
+        events.append(event(rnd.uniform(0, 40 * 3600), 'System', 7036, severity=4))
+    for _ in range(30):
+        events.append(event(rnd.uniform(0, 40 * 3600), 'System', 10016, severity=3))
+    events.sort(key=lambda e: e['time'])
+    return events
+
+
+def correlate(events) -> EventCorrelator:
+    correlator = EventCorrelator(window=timedelta(seconds=60))
+    correlator.add_events(events)
+    return correlator
+
+
+def pair_keys(correlator: EventCorrelator) -> list:
+    return [(pair.cause, pair.effect) for pair in correlator.pairs()]
+
+
+def test_cause_precedes_effect():
+    correlator = correlate(stream())
+    assert ('System', 7036) not in correlator.key_counts
+    pairs = correlator.pairs()
+    strongest = {(pair.cause, pair.effect): pair for pair in pairs}
+    pair = strongest[(('System', 51), ('Application', 1000))]
+    assert pair.support == 40 and pair.reverse_support == 0
+    assert pair.confidence == 1.0 and pair.lift > 2
+    assert 5 <= pair.mean_delay <= 20
+    # Odwrotny kierunek nie jest zgłaszany
+    assert (('Application', 1000), ('System', 51)) not in strongest
+    assert all(('System', 10016) not in key for key in strongest)
+
+    chains = correlator.chains()
+    assert [[pair.cause[1] for pair in chain] + [chain[-1].effect[1]] for chain in chains] == [[51, 1000, 1001]]
+
+
+def test_cross_log_only_skips_pairs_within_one_log():
+    correlator = EventCorrelator(window=timedelta(seconds=60), cross_log_only=True)
+    correlator.add_events(stream())
+    assert all(pair.cause[0] != pair.effect[0] for pair in correlator.pairs())
+    assert (('System', 51), ('Application', 1000)) in pair_keys(correlator)
+
+
+def test_merge_and_resume_match_single_pass():
+    events = stream()
+    whole = correlate(events)
+
+    # Okresy rozdzielone przerwą dłuższą niż okno - scalanie liczności jest dokładne
+    split = next(number for number, event in enumerate(events)
+                 if event['time'] >= START + timedelta(hours=20, minutes=15))
+    left, right = correlate(events[:split]), correlate(events[split:])
+    left.merge(right)
+    assert left.to_dict() == whole.to_dict()
+
+    # Kontynuacja od stanu zapisanego po pierwszym okresie
+    restored = EventCorrelator.from_dict(json.loads(json.dumps(correlate(events[:split]).to_dict())))
+    restored.resume()
+    restored.add_events(events)
+    assert pair_keys(restored) == pair_keys(whole)
+    assert restored.key_counts == whole.key_counts
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""Testy odczytu eksportów dzienników z plików (event_files): XML, CSV i podział na fragmenty"""
+
+from datetime import datetime, timedelta
+
+from event_files import CRITICAL, ERROR, INFORMATION, WARNING, EventFileReader, detect_encoding
+
+EVENT_XML = (
+    '<Event xmlns="http://schemas.microsoft.com/win/2004/08/events/event"><System>'
+    '<Provider Name="{source}"/><EventID>{event_id}</EventID><Level>{level}</Level>'
+    '<Task>0</Task><Keywords>{keywords}</Keywords>'
+    '<TimeCreated SystemTime="{time}.123456700Z"/><EventRecordID>{record}</EventRecordID>'
+    '<Channel>{log}</Channel><Computer>PC-01</Computer></System>'
+    '<EventData><Data Name="param1">{message}</Data></EventData></Event>\r\n'
+)
+
+START = datetime(2025, 3, 1, 8, 0, 0)
+
+
+def xml_events(count: int, log: str = 'System') -> str:
+    levels = [(4, '0x8000000000000000'), (2, '0x8000000000000000'), (3, '0x8000000000000000'),
+              (0, '0x8010000000000000')]
+    parts = []
+    for record in range(1, count + 1):
+        level, keywords = levels[record % len(levels)]
+        time = (START + timedelta(seconds=record)).strftime('%Y-%m-%dT%H:%M:%S')
+        parts.append(EVENT_XML.format(source='Disk', event_id=51 + record % 3, level=level,
+                                      keywords=keywords, time=time, record=record, log=log,
+                                      message='opis <{}>'.format(record).replace('<', '&lt;').replace('>', '&gt;')))
+    return '<Events>\r\n' + ''.join(parts) + '</Events>\r\n'
+
+
+def csv_rows(count: int) -> str:
+    lines = ['"Level","Date and Time","Source","Event ID","Task Category"']
+    names = ['Information', 'Error', 'Warning', 'Critical']
+    for record in range(1, count + 1):
+        time = (START + timedelta(seconds=record)).strftime('%Y-%m-%d %H:%M:%S')
+        # Opis bez nagłówka, z nową linią i cudzysłowem wewnątrz pola
+        lines.append('{},{},Service Control Manager,{},(0),"linia 1 ""{}""\nlinia 2"'.format(
+            names[record % len(names)], time, 7036, record))
+    return '\r\n'.join(lines) + '\r\n'
+
+
+def read(paths, **options):
+    reader = EventFileReader(**options)
+    logs = reader.read([str(path) for path in paths])
+    return reader, logs
+
+
+def small_shards(workers: int = 1) -> EventFileReader:
+    reader = EventFileReader(workers=workers)
+    reader.MIN_SHARD_SIZE = 4096
+    return reader
+
+
+def test_xml_export_is_converted_newest_first(tmp_path):
+    path = tmp_path / 'System.xml'
+    path.write_text(xml_events(8), encoding='utf-8')
+    reader, logs = read([path], workers=1)
+    assert not reader.errors
+    events = logs['System']
+    assert [event['record_number'] for event in events] == list(range(8, 0, -1))
+
+    newest = events[0]
+    assert newest['source'] == 'Disk' and newest['event_id'] == 51 + 8 % 3
+    assert newest['computer'] == 'PC-01'
+    assert newest['full_message'] == 'param1: opis <8>' and newest['inserts'] == ['opis <8>']
+    severities = {event['record_number']: event['severity'] for event in events}
+    assert [severities[record] for record in (4, 1, 2, 3)] == [INFORMATION, ERROR, WARNING, CRITICAL]
+
+
+def test_xml_shards_give_the_same_events(tmp_path):
+    path = tmp_path / 'export.xml'
+    path.write_text(xml_events(300, log='Application'), encoding='utf-8')
+    _, whole = read([path], workers=1)
+
+    reader = small_shards()
+    shards = reader.shards([str(path)])
+    assert len(shards) > 1
+    assert all(shard.start < shard.end for shard in shards)
+    assert reader.read([str(path)]) == whole
+    assert len(whole['Application']) == 300
+
+
+def test_csv_utf16_with_quoted_newlines_is_split_on_record_boundaries(tmp_path):
+    path = tmp_path / 'Application.csv'
+    path.write_text(csv_rows(200), encoding='utf-16')
+    assert detect_encoding(str(path)) == ('utf-16-le', 2)
+    _, whole = read([path], workers=1)
+    events = whole['Application']
+    assert len(events) == 200
+    assert events[0]['time'] == START + timedelta(seconds=200)
+    assert events[0]['full_message'] == 'linia 1 "200"\nlinia 2'
+    assert {event['severity'] for event in events} == {INFORMATION, ERROR, WARNING}
+
+    reader = small_shards()
+    assert len(reader.shards([str(path)])) > 1
+    assert reader.read([str(path)]) == whole
+
+
+def test_time_range_and_unsupported_files(tmp_path):
+    path = tmp_path / 'System.xml'
+    path.write_text(xml_events(10), encoding='utf-8')
+    evtx = tmp_path / 'System.evtx'
+    evtx.write_bytes(b'ElfFile\x00')
+
+    # Czas w XML jest w UTC, zdarzenia dostają czas lokalny
+    _, all_events = read([path], workers=1)
+    times = sorted(event['time'] for event in all_events['System'])
+    reader, logs = read([path, evtx], workers=1, start_time=times[3], end_time=times[6])
+    assert [event['time'] for event in reversed(logs['System'])] == times[3:7]
+    assert [error_path for error_path, _ in reader.errors] == [str(evtx)]
+    assert isinstance(reader.errors[0][1], ValueError)
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+"""Testy potoku asyncio (event_pipeline) na syntetycznych rekordach FakeRecordSource"""
+
+import asyncio
+import threading
+
+from event_pipeline import EventPipeline
+from event_reader import FakeRecordSource
+from report_summary import ReportSummary
+from run_stats import RunStats
+
+
+class _ReadState:
+    def __init__(self, log_name: str):
+        self.log_name = log_name
+        self.done = False
+
+
+class FakeAnalyzer:
+    """Analizator z interfejsem używanym przez EventPipeline, czytający FakeRecordSource"""
+
+    PROGRESS_INTERVAL = 1000
+    SINK_BATCH_SIZE = 100
+
+    def __init__(self, source: FakeRecordSource, logs=('System', 'Application')):
+        self.record_source = source
+        self.logs_to_check = list(logs)
+        self.event_sinks = []
+        self.stats = RunStats()
+        self.errors = []
+        self.open_handles = 0
+        self._lock = threading.Lock()
+
+    def _read_state(self, log_name: str) -> _ReadState:
+        return _ReadState(log_name)
+
+    def _new_summary(self, logs) -> ReportSummary:
+        return ReportSummary(hours_back=24, logs=logs)
+
+    def _open_event_log(self, log_name: str):
+        with self._lock:
+            self.open_handles += 1
+        return self.record_source.open(log_name)
+
+    def _close_event_log(self, hand):
+        with self._lock:
+            self.open_handles -= 1
+        self.record_source.close(hand)
+
+    def _read_record_batch(self, hand):
+        return self.record_source.read(hand)
+
+    def _convert_records(self, state, event_records, store: bool = True):
+        return [{'log_name': state.log_name, 'record_number': record.RecordNumber,
+                 'time': record.TimeGenerated, 'event_id': record.EventID}
+                for record in event_records]
+
+    def _notify(self, stage: str, **info):
+        pass
+
+    def _report_error(self, log_name: str, error: Exception):
+        self.errors.append((log_name, error))
+
+
+def test_batches_returns_all_records_newest_first():
+    source = FakeRecordSource(records=2000, record_size=4096)
+    analyzer = FakeAnalyzer(source)
+
+    async def collect():
+        numbers = {log_name: [] for log_name in analyzer.logs_to_check}
+        async for log_name, batch in EventPipeline(analyzer, collect=False, queue_size=2).batches():
+            numbers[log_name].extend(event['record_number'] for event in batch)
+        return numbers
+
+    numbers = asyncio.run(collect())
+    for log_name in analyzer.logs_to_check:
+        assert numbers[log_name] == list(range(2000, 0, -1))
+    assert analyzer.open_handles == 0
+    assert analyzer.errors == []
+
+
+def test_early_break_with_full_queues_does_not_hang():
+    # Wolny konsument przy małych kolejkach - wszystkie etapy czekają na miejsce (backpressure)
+    source = FakeRecordSource(records=50000, record_size=4096, latency=0.001)
+    analyzer = FakeAnalyzer(source)
+
+    async def consume():
+        batches = EventPipeline(analyzer, collect=False, queue_size=2).batches()
+        async for _ in batches:
+            await asyncio.sleep(0.5)
+            break
+        await batches.aclose()
+        return [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+
+    result = {}
+    thread = threading.Thread(target=lambda: result.update(pending=asyncio.run(consume())), daemon=True)
+    thread.start()
+    thread.join(15)
+    assert not thread.is_alive(), "potok nie zakończył się po przerwaniu iteracji"
+    assert result['pending'] == []
+    assert analyzer.open_handles == 0
+
+
+def test_early_break_without_aclose_does_not_hang():
+    # Generator zamykany dopiero przy zamykaniu pętli (asyncio.run anuluje zadania potoku)
+    source = FakeRecordSource(records=50000, record_size=4096, latency=0.001)
+    analyzer = FakeAnalyzer(source)
+
+    async def consume():
+        async for _ in EventPipeline(analyzer, collect=False, queue_size=2).batches():
+            await asyncio.sleep(0.5)
+            break
+
+    thread = threading.Thread(target=lambda: asyncio.run(consume()), daemon=True)
+    thread.start()
+    thread.join(15)
+    assert not thread.is_alive(), "asyncio.run nie zakończył się po przerwaniu iteracji"
+    assert analyzer.open_handles == 0
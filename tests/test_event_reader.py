@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+"""Testy odczytu z wyprzedzeniem (event_reader) na syntetycznych rekordach FakeRecordSource"""
+
+import threading
+import time
+import types
+
+import pytest
+
+import event_reader
+from event_reader import FakeRecordSource, ReadAheadReader, Win32RecordSource
+from run_profiler import RunProfiler
+
+
+def read_numbers(source: FakeRecordSource, read_ahead: int) -> list:
+    hand = source.open('System')
+    with ReadAheadReader(lambda: source.read(hand), read_ahead) as reader:
+        numbers = [record.RecordNumber for batch in reader for record in batch]
+    assert reader.metrics.records == len(numbers)
+    return numbers
+
+
+@pytest.mark.parametrize('read_ahead', [0, 1, 4])
+def test_records_are_read_newest_first_without_gaps(read_ahead):
+    source = FakeRecordSource(records=5000, record_size=4096)
+    assert read_numbers(source, read_ahead) == list(range(5000, 0, -1))
+
+
+def test_record_range_matches_read_records():
+    source = FakeRecordSource(records=300)
+    hand = source.open('System')
+    oldest, count = source.record_range(hand)
+    assert (oldest, oldest + count - 1) == (1, 300)
+    assert read_numbers(source, 1)[-1] == oldest
+
+
+def stub_win32evtlog(records: list, oldest: int) -> types.SimpleNamespace:
+    """Moduł o nazwach funkcji pywin32 (win32evtlog) zwracający podane rekordy"""
+    def read(hand, flags, offset, *buffer_size):
+        if buffer_size:
+            # Starsze pywin32 - bez argumentu rozmiaru bufora
+            raise TypeError("ReadEventLog() takes at most 3 arguments")
+        batch, hand['pending'] = hand['pending'][:2], hand['pending'][2:]
+        return batch
+
+    return types.SimpleNamespace(
+        EVENTLOG_BACKWARDS_READ=8, EVENTLOG_SEQUENTIAL_READ=1,
+        OpenEventLog=lambda server, log_name: {'log_name': log_name, 'pending': list(records), 'closed': False},
+        ReadEventLog=read,
+        GetOldestEventLogRecord=lambda hand: oldest,
+        GetNumberOfEventLogRecords=lambda hand: len(records),
+        CloseEventLog=lambda hand: hand.update(closed=True),
+    )
+
+
+def test_win32_source_uses_pywin32_functions(monkeypatch):
+    monkeypatch.setattr(event_reader, 'win32evtlog', stub_win32evtlog([105, 104, 103, 102, 101], oldest=101))
+    source = Win32RecordSource()
+    hand = source.open('System')
+    assert source.record_range(hand) == (101, 5)
+    batches = []
+    while True:
+        batch = source.read(hand)
+        if not batch:
+            break
+        batches.append(batch)
+    assert batches == [[105, 104], [103, 102], [101]]
+    assert not source._sized_reads
+    source.close(hand)
+    assert hand['closed']
+
+
+def test_read_ahead_overlaps_reading_with_conversion():
+    # Odczyt i konwersja partii trwają po 10 ms - z wyprzedzeniem nakładają się
+    def consume(read_ahead: int) -> float:
+        source = FakeRecordSource(records=30 * 16, record_size=4096, latency=0.01)
+        hand = source.open('System')
+        start = time.perf_counter()
+        with ReadAheadReader(lambda: source.read(hand), read_ahead) as reader:
+            for _ in reader:
+                time.sleep(0.01)
+        return time.perf_counter() - start
+
+    sequential = consume(0)
+    overlapped = consume(1)
+    assert overlapped < 0.8 * sequential, (overlapped, sequential)
+
+
+def test_early_close_waits_for_running_read():
+    source = FakeRecordSource(records=10000, record_size=4096, latency=0.02)
+    hand = source.open('System')
+    reading = threading.Event()
+
+    def read():
+        reading.set()
+        return source.read(hand)
+
+    reader = ReadAheadReader(read, read_ahead=2)
+    next(iter(reader))
+    reading.wait()
+    reader.close()
+    assert not reader._thread.is_alive()
+
+
+def test_read_errors_reach_the_consumer():
+    batches = iter([[1, 2], [3]])
+
+    def read():
+        try:
+            return next(batches)
+        except StopIteration:
+            raise OSError("dziennik niedostępny")
+
+    with ReadAheadReader(read, read_ahead=1) as reader:
+        received = []
+        with pytest.raises(OSError):
+            for batch in reader:
+                received.extend(batch)
+    assert received == [1, 2, 3]
+
+
+def test_profiler_reads_in_the_calling_thread():
+    class Analyzer:
+        parallel_render = True
+        read_ahead = 1
+
+        def add_progress_callback(self, callback):
+            self.callback = callback
+
+    analyzer = Analyzer()
+    profiler = RunProfiler()
+    try:
+        profiler.attach(analyzer)
+    finally:
+        profiler.stop()
+    assert analyzer.read_ahead == 0 and not analyzer.parallel_render
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""Testy odbiorców zdarzeń (add_event_sink) analizatora na rekordach FakeRecordSource"""
+
+from itertools import islice
+
+import pytest
+
+pytest.importorskip('win32evtlog')
+
+from event_reader import FakeRecordSource
+from windows_event_analyzer import WindowsEventAnalyzer
+
+
+class CollectingSink:
+    def __init__(self, fail_after: int = None):
+        self.fail_after = fail_after
+        self.records = []
+        self.writes = 0
+
+    def write(self, events):
+        self.writes += 1
+        if self.fail_after is not None and self.writes > self.fail_after:
+            raise OSError("brak miejsca na dysku")
+        self.records.extend(event['record_number'] for event in events)
+
+
+def make_analyzer(records: int, *sinks) -> WindowsEventAnalyzer:
+    analyzer = WindowsEventAnalyzer(hours_back=None, progress=None)
+    analyzer.record_source = FakeRecordSource(records=records)
+    analyzer.SINK_BATCH_SIZE = 100
+    for sink in sinks:
+        analyzer.add_event_sink(sink)
+    return analyzer
+
+
+def test_sink_receives_every_event_once():
+    sink = CollectingSink()
+    events = list(make_analyzer(1050, sink).iter_event_log('System'))
+    assert sink.records == [event['record_number'] for event in events] == list(range(1050, 0, -1))
+
+
+def test_sink_error_stops_reading():
+    sink = CollectingSink(fail_after=2)
+    analyzer = make_analyzer(1050, sink)
+    errors = []
+    analyzer.add_progress_callback(lambda stage, info: errors.append(info) if stage == 'error' else None)
+    with pytest.raises(OSError):
+        list(analyzer.iter_event_log('System'))
+    assert errors == []
+    assert sink.writes == 3 and len(sink.records) == 200
+
+
+def test_early_stop_flushes_passed_events():
+    sink = CollectingSink()
+    events = list(islice(make_analyzer(1050, sink).iter_event_log('System'), 250))
+    assert sink.records == [event['record_number'] for event in events]
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""Testy migawek zdarzeń (event_snapshot): zapis, odczyt i odtwarzanie zdarzeń z kolumn"""
+
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from event_fields import EventFieldStore
+from event_snapshot import read_snapshot, write_snapshot
+from message_store import MessageStore
+from report_summary import ReportSummary
+
+
+BASE_TIME = datetime(2025, 1, 5, 12, 0, 0)
+
+
+def make_analysis(count: int):
+    """Zdarzenia (od najnowszych) z magazynami treści i pól, jak po analizie"""
+    messages = MessageStore(use_zstd=False, block_size=4096)
+    fields = EventFieldStore()
+    events = []
+    for number in range(count):
+        service = f"Usługa {number % 7}"
+        message = f"{service} weszła w stan zatrzymania."
+        events.append({
+            'log_name': 'System' if number % 3 else 'Application',
+            'event_id': 7036,
+            'source': 'Service Control Manager',
+            'time': BASE_TIME - timedelta(seconds=number, microseconds=number % 2),
+            'severity': 4 if number % 5 else 2,
+            'severity_name': 'INFORMACJA' if number % 5 else 'BŁĄD',
+            'message': message[:30],
+            'message_ref': messages.add(message),
+            'category': None if number % 4 else 3,
+            'record_number': count - number,
+            'computer': 'HOST1',
+            'user_sid': None if number % 2 else 'S-1-5-18',
+            'field_row': fields.add('Service Control Manager', 7036, [service, 'zatrzymana']),
+        })
+    summary = ReportSummary(hours_back=24, logs=['System', 'Application'])
+    summary.add_events(events)
+    return events, messages, fields, summary
+
+
+@pytest.mark.parametrize('codec, memory_map', [('zlib', False), ('none', False), ('none', True)])
+def test_snapshot_roundtrip(tmp_path, codec, memory_map):
+    events, messages, fields, summary = make_analysis(500)
+    filename = str(tmp_path / 'analiza.weas')
+    size = write_snapshot(filename, events, messages, fields, summary, hours_back=24,
+                          logs=['System', 'Application'], newest_records={'System': 500}, codec=codec)
+    assert size == (tmp_path / 'analiza.weas').stat().st_size
+
+    snapshot = read_snapshot(filename, memory_map=memory_map, workers=2)
+    assert (snapshot.hours_back, snapshot.start_time, snapshot.end_time) == (24, None, None)
+    assert snapshot.logs == ['System', 'Application']
+    assert snapshot.newest_records == {'System': 500}
+
+    restored = snapshot.events
+    assert len(restored) == len(events)
+    assert list(restored) == events
+    assert list(reversed(restored)) == events[::-1]
+    assert restored[-1] == events[-1] and restored[10:20:3] == events[10:20:3]
+    with pytest.raises(IndexError):
+        restored[len(events)]
+
+    for event in (restored[0], restored[123]):
+        original = messages.get(event['message_ref'])
+        assert snapshot.messages.get(event['message_ref']) == original
+        assert snapshot.fields.get_fields(event['source'], event['event_id'], event['field_row']) == \
+            fields.get_fields(event['source'], event['event_id'], event['field_row'])
+    assert json.dumps(snapshot.summary.to_dict(), sort_keys=True) == json.dumps(summary.to_dict(), sort_keys=True)
+
+
+def test_rejects_other_files_and_codecs(tmp_path):
+    events, messages, fields, summary = make_analysis(10)
+    with pytest.raises(ValueError):
+        write_snapshot(str(tmp_path / 'a.weas'), events, messages, fields, summary, codec='lzma')
+
+    other = tmp_path / 'raport.txt'
+    other.write_bytes(b'RAPORT' + bytes(64))
+    with pytest.raises(ValueError):
+        read_snapshot(str(other))
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""Testy osi czasu zdarzeń (event_timeline) - przedziały, zapis serii i wykresy LTTB"""
+
+from datetime import datetime, timedelta
+
+from event_timeline import CHART_BUCKETS_PER_POINT, EventTimeline, chart_data, lttb
+
+
+BASE_TIME = datetime(2025, 1, 5, 12, 0, 0)
+
+
+def timeline_of(events) -> EventTimeline:
+    timeline = EventTimeline()
+    for seconds, event_id in events:
+        timeline.add(BASE_TIME + timedelta(seconds=seconds), 2, event_id)
+    return timeline
+
+
+def test_lttb_keeps_endpoints_and_spikes():
+    points = [(x, 0) for x in range(10000)]
+    points[5123] = (5123, 99)
+    sampled = lttb(points, 100)
+    assert len(sampled) == 100
+    assert sampled[0] == points[0] and sampled[-1] == points[-1]
+    assert (5123, 99) in sampled
+    assert lttb(points[:50], 100) == points[:50]
+
+
+def test_dense_sums_wider_buckets():
+    counts = {10: 1, 11: 2, 13: 5, 20: 7, 30: 9}
+    assert EventTimeline.dense(counts, 10, 20) == [1, 2, 0, 5, 0, 0, 0, 0, 0, 0, 7]
+    assert EventTimeline.dense(counts, 10, 20, factor=4) == [8, 0, 7]
+
+
+def test_chart_length_is_bounded_for_long_periods():
+    # Rok zdarzeń co godzinę - 105 tys. przedziałów pięciominutowych
+    timeline = timeline_of((hour * 3600, 7) for hour in range(365 * 24))
+    data = chart_data(timeline, [("Event ID", [("7", '#000', timeline.event_id_counts[7])])], 300)
+    assert data['length'] <= 300 * CHART_BUCKETS_PER_POINT
+    assert data['step'] % timeline.bucket_seconds == 0
+    series = data['charts'][0]['series'][0]
+    assert len(series['x']) == 300
+    assert max(series['y']) >= 1
+
+    short = timeline_of([(0, 7), (600, 7)])
+    data = chart_data(short, [("Event ID", [("7", '#000', short.event_id_counts[7])])], 300)
+    assert (data['step'], data['length']) == (short.bucket_seconds, 3)
+    assert data['charts'][0]['series'][0]['y'] == [1, 0, 1]
+
+
+def test_saved_event_id_series_are_limited():
+    timeline = timeline_of([(0, 7), (1, 7), (2, 51), (900, 10016)])
+    data = timeline.to_dict(event_ids=[7])
+    assert list(data['event_ids']) == ['7'] and data['dropped_event_ids'] == [51, 10016]
+    restored = EventTimeline.from_dict(data)
+    assert restored.severity_counts == timeline.severity_counts
+    assert restored.has_event_id_series(7) and not restored.has_event_id_series(51)
+
+    # Pominięta seria nie wraca po scaleniu z pełną osią ani po dodaniu zdarzeń
+    merged = timeline_of([(1800, 51), (1800, 7)])
+    merged.merge(restored)
+    merged.add(BASE_TIME, 2, 10016)
+    assert set(merged.event_id_counts) == {7}
+    assert sum(merged.event_id_counts[7].values()) == 3
+    assert merged.dropped_event_ids == {51, 10016}
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""Testy magazynu treści wiadomości (message_store) - ścieżka zlib"""
+
+import random
+
+from message_store import MessageStore
+
+
+def messages(count: int, seed: int = 5) -> list:
+    rnd = random.Random(seed)
+    return [f"Usługa {rnd.randint(1, 500)} weszła w stan {rnd.choice(['zatrzymania', 'uruchomienia'])}. "
+            f"Rekord {number} " + 'szczegóły ' * rnd.randint(0, 40) for number in range(count)]
+
+
+def test_roundtrip_on_zlib():
+    store = MessageStore(use_zstd=False)
+    assert store.codec == 'zlib'
+    texts = messages(2000) + ["Zażółć gęślą jaźń ☃", ""]
+    refs = [store.add(text) for text in texts]
+    # Część wpisów jest jeszcze w buforze, reszta w skompresowanych blokach
+    assert store.blocks and store._buffer
+    assert [store.get(ref) for ref in refs] == texts
+    assert store.get(None) is None
+    assert store.dictionary is not None
+    assert 0 < store.compressed_bytes < store.raw_bytes
+
+    store.flush()
+    assert not store._buffer
+    assert [store.get(ref) for ref in refs] == texts
+
+
+def test_duplicates_return_the_same_ref():
+    store = MessageStore(use_zstd=False)
+    first = store.add("Dysk \\Device\\Harddisk0 ma uszkodzony blok.")
+    other = store.add("Dysk \\Device\\Harddisk1 ma uszkodzony blok.")
+    again = store.add("Dysk \\Device\\Harddisk0 ma uszkodzony blok.")
+    assert first == again != other
+    assert len(store) == 2 and store.deduplicated == 1
+    assert store.raw_bytes == len("Dysk \\Device\\Harddisk0 ma uszkodzony blok.".encode('utf-8')) * 2
+
+
+def test_messages_across_block_boundaries():
+    store = MessageStore(use_zstd=False, block_size=64 * 1024, train_dictionary=False)
+    texts = ['a' * 40000, 'b' * 30000, 'c' * 200000, 'd' * 10, 'e' * 65535, 'f' * 2]
+    refs = [store.add(text) for text in texts]
+    # Blok zamykany jest po przekroczeniu rozmiaru - wiadomość nie jest dzielona
+    block_of = [store.entries[ref][0] for ref in refs]
+    assert block_of == [0, 0, 1, 2, 2, 3]
+    assert len(store.blocks) == 3
+    assert [store.get(ref) for ref in refs] == texts
+
+
+def test_block_cache_evicts_least_recently_used():
+    store = MessageStore(use_zstd=False, block_size=1024, train_dictionary=False, cache_blocks=2)
+    refs = [store.add(f"{number:04} " + 'x' * 1100) for number in range(4)]
+    store.flush()
+    assert len(store.blocks) == 4
+
+    decompressed = []
+    original = store._decompress
+
+    def counting(data):
+        decompressed.append(data)
+        return original(data)
+
+    store._decompress = counting
+    for ref in (refs[0], refs[1], refs[0], refs[2], refs[0], refs[1]):
+        assert store.get(ref).startswith(f"{refs.index(ref):04} ")
+    # Bloki 0 i 1 trafiają do pamięci podręcznej, 2 wypiera 1, a ponowny odczyt 1 go dekompresuje
+    assert len(decompressed) == 4
+    assert list(store._cache) == [0, 1]
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""Testy metryk Prometheus (metrics_exporter)"""
+
+import urllib.request
+
+import pytest
+
+from metrics_exporter import MetricsExporter, MetricsRegistry
+from report_summary import ReportSummary
+from run_stats import RunStats
+
+
+def test_registry_renders_text_format():
+    registry = MetricsRegistry(prefix='test')
+    registry.describe('events_total', 'counter', 'Zdarzenia')
+    registry.inc('events_total', 3, log='System')
+    registry.inc('events_total', 2, log='System')
+    registry.set('events_total', 1, log='Quote"d')
+    text = registry.render()
+    assert '# TYPE test_events_total counter' in text
+    assert 'test_events_total{log="System"} 5' in text
+    assert 'test_events_total{log="Quote\\"d"} 1' in text
+
+
+class FakeAnalyzer:
+    def __init__(self):
+        self.logs_to_check = ['System']
+        self.event_files = []
+        self.newest_records = {'System': 100}
+        self.stats = RunStats()
+        self.newest = 130
+        self.fingerprint_reads = 0
+
+    def add_progress_callback(self, callback):
+        self.callback = callback
+
+    def build_summary(self):
+        return ReportSummary()
+
+    def get_log_fingerprint(self, log_name):
+        self.fingerprint_reads += 1
+        return {'oldest': 1, 'newest': self.newest}
+
+
+def test_lag_is_taken_once_per_run_not_per_scrape():
+    pytest.importorskip('win32evtlog')
+    exporter = MetricsExporter(port=0)
+    analyzer = FakeAnalyzer()
+    exporter.attach(analyzer)
+    exporter.start()
+    try:
+        analyzer.callback('analysis_done', {})
+        analyzer.newest = 500
+        for _ in range(3):
+            body = urllib.request.urlopen(exporter.url, timeout=5).read().decode('utf-8')
+    finally:
+        exporter.stop()
+    assert 'windows_event_analyzer_log_lag_records{log="System"} 30' in body
+    assert analyzer.fingerprint_reads == 1
+
+
+def test_lag_counts_records_newer_than_the_processed_ones():
+    pytest.importorskip('win32evtlog')
+    from event_reader import FakeRecordSource
+    from windows_event_analyzer import WindowsEventAnalyzer
+
+    exporter = MetricsExporter(port=0)
+    source = FakeRecordSource(records=300)
+    analyzer = WindowsEventAnalyzer(hours_back=None, progress=None)
+    analyzer.logs_to_check = ['System']
+    analyzer.record_source = source
+    exporter.attach(analyzer)
+    analyzer.analyze_events()
+    assert analyzer.newest_records == {'System': 300}
+    assert 'windows_event_analyzer_log_lag_records{log="System"} 0' in exporter.registry.render()
+
+    # Dziennik urósł o 45 rekordów po zakończeniu przebiegu
+    source.records = 345
+    exporter.metrics.on_progress(analyzer, 'analysis_done', {})
+    assert 'windows_event_analyzer_log_lag_records{log="System"} 45' in exporter.registry.render()
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""Testy podsumowań raportu (report_summary) - scalanie i próbki rezerwuarowe grup"""
+
+from collections import Counter
+from datetime import datetime, timedelta
+
+from boot_sessions import BootTimeline
+from report_summary import EventGroup, ReportSummary
+
+
+BASE_TIME = datetime(2025, 1, 5, 12, 0, 0)
+
+
+def make_event(number: int, log_name: str = 'System', event_id: int = 7, severity: int = 2,
+               source: str = 'Disk') -> dict:
+    return {
+        'log_name': log_name, 'event_id': event_id, 'source': source,
+        'time': BASE_TIME - timedelta(seconds=number), 'severity': severity,
+        'severity_name': 'BŁĄD', 'message': f"zdarzenie {number}", 'message_ref': None,
+        'record_number': number, 'computer': 'HOST1',
+    }
+
+
+def summary_of(events, **options) -> ReportSummary:
+    summary = ReportSummary(hours_back=24, logs=['System'], **options)
+    summary.add_events(events)
+    return summary
+
+
+def test_merge_counts_match_single_pass():
+    events = [make_event(number, event_id=7 if number % 3 else 51) for number in range(1, 301)]
+    whole = summary_of(events)
+    merged = ReportSummary()
+    for part in (events[:100], events[100:250], events[250:]):
+        merged.merge(summary_of(part))
+    assert merged.total_events == whole.total_events == 300
+    assert merged.event_id_counts == whole.event_id_counts
+    assert {key: group.count for key, group in merged.groups.items()} == \
+        {key: group.count for key, group in whole.groups.items()}
+
+
+def test_merged_reservoir_is_uniform_across_partials():
+    # Część A zawiera 1/6 zdarzeń - w równomiernej próbce 3 zdarzeń żadne
+    # nie pochodzi z A z prawdopodobieństwem (5/6)^3 = 0.58
+    trials = 400
+    shares = Counter()
+    for trial in range(trials):
+        offset = trial * 1000
+        part_a = summary_of(make_event(offset + number) for number in range(1, 51))
+        part_b = summary_of(make_event(offset + number) for number in range(51, 301))
+        merged = ReportSummary()
+        merged.merge(part_a)
+        merged.merge(part_b)
+        samples = merged.groups[(7, 2)].samples
+        assert len(samples) == EventGroup.SAMPLE_SIZE
+        shares[sum(1 for _, sample in samples if sample['message'] in
+                   {f"zdarzenie {offset + number}" for number in range(1, 51)})] += 1
+    assert 0.50 * trials < shares[0] < 0.66 * trials, shares
+    assert shares[1] > 0.25 * trials, shares
+
+
+def test_sampling_is_reproducible():
+    events = [make_event(number) for number in range(1, 1001)]
+    first = [sample['message'] for _, sample in summary_of(events).groups[(7, 2)].samples]
+    second = [sample['message'] for _, sample in summary_of(events).groups[(7, 2)].samples]
+    assert first == second
+
+
+def test_stratified_samples_are_an_option():
+    events = [make_event(number, source='Disk' if number % 10 else f"Źródło {number}")
+              for number in range(1, 1001)]
+    plain = summary_of(events)
+    stratified = summary_of(events, stratify_samples=True)
+    assert not plain.stratify_samples and stratified.stratify_samples
+    sources = [sample['source'] for _, sample in stratified.groups[(7, 2)].samples]
+    assert len(sources) == len(set(sources)) == EventGroup.SAMPLE_SIZE
+
+    restored = ReportSummary.from_dict(stratified.to_dict())
+    assert restored.stratify_samples and restored.groups[(7, 2)].stratify
+    merged = ReportSummary()
+    merged.merge(stratified)
+    assert merged.stratify_samples
+    entry = merged.problem_groups(2)[0]
+    assert len({sample['source'] for sample in entry['samples']}) == EventGroup.SAMPLE_SIZE
+
+
+def sessions_of(computer: str, first_boot: datetime) -> ReportSummary:
+    timeline = BootTimeline()
+    for day in range(2):
+        boot = first_boot + timedelta(days=day)
+        timeline.add_event({'log_name': 'System', 'event_id': 6005, 'source': 'EventLog',
+                            'time': boot, 'severity': 4, 'message': '', 'computer': computer})
+    summary = ReportSummary()
+    summary.boot_sessions = timeline.sessions
+    return summary
+
+
+def test_merged_boot_sessions_are_renumbered_with_origin():
+    part_a = sessions_of('HOST1', BASE_TIME)
+    part_b = sessions_of('HOST2', BASE_TIME + timedelta(hours=1))
+    merged = ReportSummary()
+    merged.merge(part_a)
+    merged.merge(part_b)
+    assert [session.index for session in merged.boot_sessions] == [1, 2, 3, 4]
+    assert [session.origin for session in merged.boot_sessions] == ['HOST1', 'HOST2', 'HOST1', 'HOST2']
+    assert merged.session_origins() == ['HOST1', 'HOST2']
+    # Scalane podsumowania zachowują własną numerację
+    assert [session.index for session in part_b.boot_sessions] == [1, 2]
+
+    restored = ReportSummary.from_dict(merged.to_dict())
+    assert [session.origin for session in restored.boot_sessions] == ['HOST1', 'HOST2', 'HOST1', 'HOST2']
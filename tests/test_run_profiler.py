@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+"""Testy profilowania przebiegu analizy (run_profiler)"""
+
+import pstats
+import threading
+
+import pytest
+
+from run_profiler import RunProfiler
+
+
+def test_profiled_run_reads_in_the_calling_thread_and_writes_output(tmp_path):
+    pytest.importorskip('win32evtlog')
+    from event_reader import FakeRecordSource
+    from windows_event_analyzer import WindowsEventAnalyzer
+
+    class ThreadRecordingSource(FakeRecordSource):
+        def read(self, hand):
+            reading_threads.add(threading.get_ident())
+            return super().read(hand)
+
+    reading_threads = set()
+    analyzer = WindowsEventAnalyzer(hours_back=None, progress=None)
+    analyzer.logs_to_check = ['System']
+    analyzer.record_source = ThreadRecordingSource(records=2000)
+    assert analyzer.read_ahead > 0
+
+    profiler = RunProfiler(sample_interval=0.001)
+    try:
+        profiler.attach(analyzer)
+        assert analyzer.read_ahead == 0 and analyzer.parallel_render is False
+        with profiler.phase('ingestion'):
+            analyzer.analyze_events()
+        with profiler.phase('rendering'):
+            analyzer.save_report(str(tmp_path / 'raport'), format=['txt', 'html'])
+        files = profiler.write(str(tmp_path / 'profil'))
+    finally:
+        profiler.stop()
+
+    assert reading_threads == {threading.get_ident()}
+    assert [phase.name for phase in profiler.phases] == ['ingestion', 'analysis', 'rendering']
+    assert files == [str(tmp_path / name) for name in ('profil.prof', 'profil.alloc.txt', 'profil.collapsed.txt')]
+    assert pstats.Stats(files[0]).total_calls > 0
+    allocations = (tmp_path / 'profil.alloc.txt').read_text(encoding='utf-8')
+    assert 'Faza ingestion' in allocations and 'Faza rendering' in allocations
+    assert (tmp_path / 'raport.txt').exists() and (tmp_path / 'raport.html').exists()
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""Testy statystyk przebiegu (run_stats) i wywołań zwrotnych postępu analizatora"""
+
+import json
+import time
+
+import pytest
+
+from run_stats import ProgressCallbackError, RunStats
+
+
+def test_stage_times_accumulate():
+    stats = RunStats()
+    stats.add_time('read_batch', 0.25)
+    stats.add_time('read_batch', 0.5)
+    with stats.stage('render'):
+        time.sleep(0.01)
+    stats.count('events', 10)
+    stats.count('events', 5)
+    stats.record_log('System', 15, 0.75)
+    stats.finish()
+
+    data = json.loads(stats.to_json())
+    assert data['stages']['read_batch'] == {'calls': 2, 'total_seconds': 0.75, 'max_seconds': 0.5}
+    assert data['stages']['render']['calls'] == 1 and data['stages']['render']['total_seconds'] >= 0.01
+    # Etapy w kolejności STAGES, a nie dodania
+    assert list(data['stages']) == ['read_batch', 'render']
+    assert data['counters'] == {'events': 15}
+    assert data['events_per_second'] == 20.0
+    assert data['elapsed_seconds'] == round(stats.elapsed, 6)
+    assert 'read_batch' in stats.format_text()
+
+
+def run_analyzer(callback, records: int = 300):
+    pytest.importorskip('win32evtlog')
+    from event_reader import FakeRecordSource
+    from windows_event_analyzer import WindowsEventAnalyzer
+
+    analyzer = WindowsEventAnalyzer(hours_back=None, progress=callback)
+    analyzer.logs_to_check = ['System', 'Application']
+    analyzer.record_source = FakeRecordSource(records=records)
+    analyzer.PROGRESS_INTERVAL = 100
+    analyzer.analyze_events()
+    return analyzer
+
+
+def test_callbacks_receive_documented_info():
+    received = []
+    analyzer = run_analyzer(lambda stage, info: received.append((stage, dict(info))))
+    stages = [stage for stage, _ in received]
+    assert stages[0] == 'analysis_start' and stages[-1] == 'analysis_done'
+    assert [info['log_name'] for stage, info in received if stage == 'log_start'] == ['System', 'Application']
+
+    done = [info for stage, info in received if stage == 'log_done']
+    assert [(info['log_name'], info['events'], info['source']) for info in done] == [
+        ('System', 300, 'read'), ('Application', 300, 'read')]
+    assert all(info['seconds'] >= 0 for info in done)
+    assert received[-1][1]['stats'] is analyzer.stats
+    assert analyzer.stats.counters['events'] == 600
+
+
+def test_failing_callback_stops_the_analysis():
+    def failing(stage, info):
+        if stage == 'log_progress':
+            raise RuntimeError("błąd w wywołaniu zwrotnym")
+
+    # Błąd nie jest pomijany jak błąd odczytu (dziennik nie zostaje obcięty po cichu)
+    with pytest.raises(ProgressCallbackError) as error:
+        run_analyzer(failing)
+    assert isinstance(error.value.__cause__, RuntimeError)
+    assert 'log_progress' in str(error.value)
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""Testy detektorów zagrożeń dziennika Security (security_detectors)"""
+
+from datetime import datetime, timedelta
+
+from security_detectors import DistinctWindows, SecurityFinding, SecurityMonitor, SlidingWindows
+
+
+START = datetime(2025, 5, 6, 9, 0, 0)
+
+
+def event(seconds: float, event_id: int, **fields) -> dict:
+    return {'event_id': event_id, 'time': START + timedelta(seconds=seconds), 'fields': fields}
+
+
+def failed(seconds: float, account: str, ip: str = '10.0.0.7', workstation: str = None) -> dict:
+    return event(seconds, 4625, TargetUserName=account, IpAddress=ip, WorkstationName=workstation)
+
+
+def monitor(**options) -> SecurityMonitor:
+    return SecurityMonitor(lambda event, name: event['fields'].get(name), **options)
+
+
+def findings(detector: SecurityMonitor, finding_type: str) -> list:
+    return [finding for finding in detector.findings if finding.type == finding_type]
+
+
+def test_sliding_window_counts_only_recent_occurrences():
+    windows = SlidingWindows(timedelta(minutes=10))
+    for minute in range(5):
+        windows.add('ALICE', START + timedelta(minutes=minute))
+    assert windows.count('ALICE', START + timedelta(minutes=10)) == 5
+    assert windows.count('ALICE', START + timedelta(minutes=12, seconds=30)) == 2
+    assert windows.add('ALICE', START + timedelta(minutes=30)) == 1
+    assert windows.count('BOB', START) == 0
+
+
+def test_brute_force_inside_the_window_but_not_when_spread_out():
+    inside = monitor(brute_force_threshold=10, window=timedelta(minutes=10))
+    inside.process_all(failed(30 * number, 'alice') for number in range(10))
+    reported = findings(inside, SecurityFinding.BRUTE_FORCE)
+    assert {finding.key for finding in reported} == {'konto alice', 'adresu IP 10.0.0.7'}
+    assert all(finding.count == 10 for finding in reported)
+
+    # Te same 10 prób co 2 minuty - w żadnym 10-minutowym oknie nie ma ich 10
+    spread = monitor(brute_force_threshold=10, window=timedelta(minutes=10))
+    spread.process_all(failed(120 * number, 'alice') for number in range(10))
+    assert spread.findings == []
+
+
+def test_brute_force_reported_once_per_window():
+    detector = monitor(brute_force_threshold=3, window=timedelta(minutes=10))
+    detector.process_all(failed(10 * number, 'alice', ip=None) for number in range(20))
+    detector.process(failed(700, 'alice', ip=None))
+    assert [finding.time for finding in findings(detector, SecurityFinding.BRUTE_FORCE)] == [
+        START + timedelta(seconds=20), START + timedelta(seconds=700)]
+
+
+def test_successful_logon_after_brute_force():
+    detector = monitor(brute_force_threshold=5)
+    detector.process_all(failed(number, 'admin') for number in range(5))
+    detector.process(event(60, 4624, TargetUserName='Admin', IpAddress='10.0.0.7'))
+    success = findings(detector, SecurityFinding.BRUTE_FORCE_SUCCESS)
+    assert {finding.key for finding in success} == {'konto Admin', 'adres IP 10.0.0.7'}
+    assert all(finding.count == 5 for finding in success)
+
+    # Logowanie po wygaśnięciu okna nie jest powiązane z atakiem
+    late = monitor(brute_force_threshold=5)
+    late.process_all(failed(number, 'admin') for number in range(5))
+    late.process(event(3600, 4624, TargetUserName='admin', IpAddress='10.0.0.7'))
+    assert findings(late, SecurityFinding.BRUTE_FORCE_SUCCESS) == []
+
+
+def test_password_spray_counts_distinct_accounts():
+    detector = monitor(spray_threshold=5, brute_force_threshold=100)
+    # Wiele prób na te same 4 konta to jeszcze nie spraying
+    detector.process_all(failed(number, f"user{number % 4}", ip='10.0.0.9') for number in range(40))
+    assert findings(detector, SecurityFinding.PASSWORD_SPRAY) == []
+
+    detector.process(failed(41, 'USER0', ip='10.0.0.9', workstation='KALI'))
+    detector.process(failed(42, 'user4', ip='10.0.0.9'))
+    spray = findings(detector, SecurityFinding.PASSWORD_SPRAY)
+    assert [(finding.key, finding.count) for finding in spray] == [('adresu IP 10.0.0.9', 5)]
+
+
+def test_distinct_windows_evict_least_recently_used_keys():
+    windows = DistinctWindows(timedelta(minutes=10), max_keys=2)
+    windows.add('10.0.0.1', 'ALICE', START)
+    windows.add('10.0.0.2', 'BOB', START)
+    # Użycie 10.0.0.1 odświeża klucz - usunięty zostaje 10.0.0.2
+    windows.add('10.0.0.1', 'CAROL', START)
+    windows.add('10.0.0.3', 'DAVE', START)
+    assert len(windows) == 2 and windows.evicted == 1
+    assert sorted(windows.values('10.0.0.1')) == ['ALICE', 'CAROL']
+    assert windows.values('10.0.0.2') == []
+    # Usunięty klucz liczy wartości od nowa
+    assert windows.add('10.0.0.2', 'EVE', START) == 1
+
+
+def test_distinct_windows_limit_entries_per_key():
+    windows = DistinctWindows(timedelta(hours=1), max_per_key=3)
+    for number, account in enumerate(['A', 'B', 'C', 'D']):
+        distinct = windows.add('10.0.0.1', account, START + timedelta(seconds=number))
+    assert distinct == 3 and sorted(windows.values('10.0.0.1')) == ['B', 'C', 'D']
+
+
+def test_new_admin_logon_after_learning_period():
+    detector = monitor(known_admins=['Administrator'], learning_period=timedelta(hours=1))
+    detector.process_all([
+        event(0, 4672, SubjectUserName='backup', SubjectUserSid='S-1-5-21-5'),
+        event(7200, 4672, SubjectUserName='administrator', SubjectUserSid='S-1-5-21-500'),
+        event(7300, 4672, SubjectUserName='BACKUP', SubjectUserSid='S-1-5-21-5'),
+        event(7400, 4672, SubjectUserName='SYSTEM', SubjectUserSid='S-1-5-18'),
+        event(7500, 4672, SubjectUserName='WS1$', SubjectUserSid='S-1-5-21-9'),
+        event(7600, 4672, SubjectUserName='mallory', SubjectUserSid='S-1-5-21-666'),
+        event(7700, 4672, SubjectUserName='mallory', SubjectUserSid='S-1-5-21-666'),
+    ])
+    new_admins = findings(detector, SecurityFinding.NEW_ADMIN_LOGON)
+    assert [(finding.key, finding.time) for finding in new_admins] == [
+        ('konto mallory', START + timedelta(seconds=7600))]
+    restored = SecurityFinding.from_dict(new_admins[0].to_dict())
+    assert (restored.type, restored.key, restored.time) == (new_admins[0].type, 'konto mallory', new_admins[0].time)
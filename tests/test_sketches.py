@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""Testy szkiców probabilistycznych (sketches): ograniczenia błędu, scalanie i serializacja"""
+
+import json
+import os
+import random
+import subprocess
+import sys
+from collections import Counter
+
+import pytest
+
+from sketches import CountMinSketch, HyperLogLog, SpaceSaving, stable_hash64
+
+
+def zipf_stream(count: int, keys: int = 500, seed: int = 1) -> list:
+    rnd = random.Random(seed)
+    weights = [1.0 / (rank + 1) for rank in range(keys)]
+    return rnd.choices(range(keys), weights=weights, k=count)
+
+
+def roundtrip(sketch):
+    return type(sketch).from_dict(json.loads(json.dumps(sketch.to_dict())))
+
+
+def test_stable_hash_does_not_depend_on_the_process():
+    # Inne ziarno hash() w procesie potomnym nie może zmienić skrótu
+    code = "from sketches import stable_hash64; print(stable_hash64('System'))"
+    env = dict(os.environ, PYTHONHASHSEED='123', PYTHONPATH=os.path.dirname(os.path.dirname(__file__)))
+    output = subprocess.check_output([sys.executable, '-c', code], env=env)
+    assert int(output) == stable_hash64('System') == stable_hash64(b'System')
+    assert stable_hash64(7036) == stable_hash64('7036')
+
+
+def test_count_min_never_underestimates_and_respects_the_bound():
+    stream = zipf_stream(20000)
+    exact = Counter(stream)
+    sketch = CountMinSketch(epsilon=0.01, delta=0.01)
+    for key in stream:
+        sketch.add(key)
+    assert sketch.total == len(stream)
+    for key, count in exact.items():
+        assert count <= sketch.estimate(key) <= count + sketch.error_bound
+
+
+def test_count_min_merge_equals_single_pass():
+    stream = zipf_stream(5000)
+    whole, left, right = CountMinSketch(0.01), CountMinSketch(0.01), CountMinSketch(0.01)
+    for number, key in enumerate(stream):
+        whole.add(key)
+        (left if number % 2 else right).add(key)
+    left.merge(right)
+    assert left.total == whole.total
+    assert [list(row) for row in left.rows] == [list(row) for row in whole.rows]
+    assert [list(row) for row in roundtrip(left).rows] == [list(row) for row in whole.rows]
+
+    with pytest.raises(ValueError):
+        left.merge(CountMinSketch(0.1))
+
+
+def test_space_saving_keeps_frequent_keys_with_bounded_error():
+    stream = zipf_stream(20000)
+    exact = Counter(stream)
+    sketch = SpaceSaving(k=50)
+    for key in stream:
+        sketch.add(key)
+    assert sketch.total == len(stream)
+    for key, count in exact.items():
+        if count > len(stream) / sketch.k:
+            assert key in sketch
+    for key, estimate, error in sketch.top():
+        assert estimate - error <= exact[key] <= estimate
+    assert [key for key, _, _ in sketch.top(3)] == [0, 1, 2]
+
+
+def test_space_saving_merge_and_tuple_keys_roundtrip():
+    left, right = SpaceSaving(k=20), SpaceSaving(k=20)
+    for number, key in enumerate(zipf_stream(4000)):
+        (left if number % 2 else right).add(('System', key))
+    left.merge(right)
+    assert left.total == 4000
+    assert len(left.counters) <= left.k
+    assert left.top(1)[0][0] == ('System', 0)
+
+    restored = roundtrip(left)
+    assert restored.top() == left.top()
+    restored.add(('System', 0))
+    assert restored.top(1)[0][1] == left.top(1)[0][1] + 1
+
+
+def test_hyperloglog_count_merge_and_roundtrip():
+    left, right = HyperLogLog(precision=12), HyperLogLog(precision=12)
+    for value in range(6000):
+        left.add('host-%d' % value)
+    for value in range(4000, 10000):
+        right.add('host-%d' % value)
+    assert abs(left.count() - 6000) <= 6000 * 4 * left.relative_error
+
+    left.merge(right)
+    assert abs(left.count() - 10000) <= 10000 * 4 * left.relative_error
+    assert roundtrip(left).count() == left.count()
+
+    with pytest.raises(ValueError):
+        left.merge(HyperLogLog(precision=10))
+    with pytest.raises(ValueError):
+        HyperLogLog(precision=3)
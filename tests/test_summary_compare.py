@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+"""Testy porównania z okresem bazowym (summary_compare) - istotność zmian i wczytywanie podsumowań"""
+
+import json
+import math
+from datetime import datetime, timedelta
+
+from alert_dispatch import alerts_from_comparison
+from report_summary import ReportSummary
+from summary_cache import SummaryCache
+from summary_compare import SummaryComparison, load_summary
+
+
+BASE_TIME = datetime(2025, 1, 5, 12, 0, 0)
+
+
+def summary_of(counts: dict, hours_back: int = 24) -> ReportSummary:
+    """Podsumowanie z podaną liczbą wystąpień każdego Event ID"""
+    summary = ReportSummary(hours_back=hours_back, logs=['System'])
+    number = 0
+    for event_id, count in counts.items():
+        for _ in range(count):
+            number += 1
+            summary.add_event({
+                'log_name': 'System', 'event_id': event_id, 'source': f"Źródło{event_id}",
+                'time': BASE_TIME - timedelta(seconds=number), 'severity': 2,
+                'severity_name': 'BŁĄD', 'message': f"zdarzenie {number}", 'message_ref': None,
+                'record_number': number, 'computer': 'HOST1',
+            })
+    return summary
+
+
+def test_z_score_decides_significance_of_equal_ratios():
+    # Ten sam stosunek częstości (x3), ale tylko przy dużych licznościach zmiana jest istotna
+    comparison = SummaryComparison(summary_of({7: 20, 9: 2}), summary_of({7: 60, 9: 6}))
+
+    assert [change.event_id for change in comparison.rate_changes] == [7]
+    change = comparison.rate_changes[0]
+    # Równe okresy: oczekiwany udział okresu bieżącego 1/2, z = (60 - 40) / sqrt(80 / 4)
+    assert math.isclose(change.z_score, 20 / math.sqrt(20))
+    assert change.ratio == 3.0
+    assert change.to_dict()['baseline_per_hour'] == round(20 / 24, 3)
+
+
+def test_rates_are_normalized_by_period_length():
+    # Tydzień bazowy i doba bieżąca - ta sama liczność to siedmiokrotny wzrost częstości
+    comparison = SummaryComparison(summary_of({7: 40, 8: 280}, hours_back=168),
+                                   summary_of({7: 40, 8: 40}))
+
+    assert [change.event_id for change in comparison.rate_changes] == [7]
+    change = comparison.rate_changes[0]
+    assert math.isclose(change.ratio, 7.0)
+    share = 24 / 192
+    assert math.isclose(change.z_score, (40 - 80 * share) / math.sqrt(80 * share * (1 - share)))
+
+
+def test_ratio_and_min_count_thresholds():
+    comparison = SummaryComparison(summary_of({7: 100, 8: 1}), summary_of({7: 180, 8: 3}))
+
+    # x1.8 nie przekracza min_ratio mimo dużego z, a 4 wystąpienia są poniżej min_count
+    assert comparison.rate_changes == []
+    assert SummaryComparison(summary_of({8: 1}), summary_of({8: 3}), min_count=4,
+                             z_threshold=1.0).rate_changes[0].event_id == 8
+
+
+def test_increases_and_decreases_are_ordered_by_significance():
+    baseline = summary_of({7: 10, 10: 100, 12: 20, 13: 10})
+    current = summary_of({7: 40, 10: 30, 12: 100, 13: 40})
+    comparison = SummaryComparison(baseline, current)
+
+    # |z|: 12 -> 7.30, 10 -> 6.14, 7 i 13 -> 4.24 (remis rozstrzyga Event ID)
+    assert [change.event_id for change in comparison.rate_changes] == [12, 10, 7, 13]
+    assert [change.event_id for change in comparison.increases] == [12, 7, 13]
+    assert [change.event_id for change in comparison.decreases] == [10]
+    assert all(change.ratio < 1 for change in comparison.decreases)
+
+
+def test_new_and_gone_event_ids_ordered_by_count_then_key():
+    comparison = SummaryComparison(summary_of({7: 10, 20: 3}),
+                                   summary_of({7: 10, 4625: 5, 41: 5, 1001: 9}))
+
+    assert comparison.new_event_ids == [(1001, 9), (41, 5), (4625, 5)]
+    assert comparison.gone_event_ids == [(20, 3)]
+    assert ('Źródło1001', 9) in comparison.new_sources
+    assert comparison.new_templates[0] == (('Źródło1001', 1001), 9)
+
+
+def test_alerts_from_comparison_follow_comparison_order():
+    baseline = summary_of({7: 10, 12: 20})
+    current = summary_of({7: 40, 12: 100, 41: 5, 1001: 9})
+    alerts = alerts_from_comparison(SummaryComparison(baseline, current), limit=1)
+
+    assert [alert.key for alert in alerts] == ['anomaly:rate:12', 'anomaly:new_event_id:1001']
+    assert alerts[0].count == 100
+    assert alerts[1].severity == 'info'
+
+
+def test_load_summary_from_json_report(tmp_path):
+    summary = summary_of({7: 10, 41: 3})
+    # Postać raportu JSON (generate_json_report): bez osi czasu, z opisami i zaleceniami
+    report = summary.to_dict()
+    del report['timeline']
+    report['descriptions'] = {'7': 'opis', '41': 'opis'}
+    report['recommendations'] = []
+    path = tmp_path / 'raport.json'
+    path.write_text(json.dumps(report, ensure_ascii=False), encoding='utf-8')
+
+    loaded = load_summary(str(path))
+    assert loaded.total_events == 13
+    assert dict(loaded.event_id_counts) == {7: 10, 41: 3}
+    assert loaded.period_hours == 24.0
+    assert SummaryComparison(loaded, summary).rate_changes == []
+
+
+def test_load_summary_from_cache_entry(tmp_path):
+    summary = summary_of({7: 10, 41: 3})
+    cache = SummaryCache(str(tmp_path))
+    key = SummaryCache.make_key(log='System', hours_back=24)
+    cache.put(key, summary, {'oldest': 1, 'newest': 13}, BASE_TIME)
+
+    loaded = load_summary(cache._path(key))
+    assert loaded.total_events == 13
+    assert dict(loaded.source_counts) == {'Źródło7': 10, 'Źródło41': 3}
+    assert SummaryComparison(loaded, summary_of({7: 10, 41: 3, 6008: 2})).new_event_ids == [(6008, 2)]
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""Testy analizy rozproszonej (summary_coordinator) - zakres zadań i kolejka plików"""
+
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+from summary_coordinator import FileDropQueue, SummaryCoordinator, _heartbeat
+
+
+def test_tasks_carry_one_absolute_window(tmp_path):
+    paths = []
+    for number in range(3):
+        path = tmp_path / f"czesc{number}.xml"
+        path.write_text('x' * (number + 1))
+        paths.append(str(path))
+    coordinator = SummaryCoordinator(hours_back=6)
+    before = datetime.now().replace(microsecond=0)
+    tasks = coordinator.tasks(paths, shards=3)
+    assert len(tasks) == 3
+    assert len({(task['start_time'], task['end_time']) for task in tasks}) == 1
+    start = datetime.strptime(tasks[0]['start_time'], '%Y-%m-%d %H:%M:%S')
+    end = datetime.strptime(tasks[0]['end_time'], '%Y-%m-%d %H:%M:%S')
+    assert end - start == timedelta(hours=6)
+    assert before <= end <= datetime.now()
+
+    absolute = SummaryCoordinator(hours_back=6, start_time=datetime(2025, 1, 1), end_time=datetime(2025, 1, 2))
+    task = absolute.tasks(paths, shards=1)[0]
+    assert (task['start_time'], task['end_time']) == ('2025-01-01 00:00:00', '2025-01-02 00:00:00')
+    assert SummaryCoordinator(hours_back=None).tasks(paths, shards=1)[0]['start_time'] is None
+
+
+def test_heartbeat_keeps_running_task_claimed(tmp_path):
+    queue = FileDropQueue(str(tmp_path), claim_timeout=0.5)
+    task_id = queue.submit({'files': []})
+    assert queue.claim()['id'] == task_id
+    done = threading.Event()
+    heartbeat = threading.Thread(target=_heartbeat, args=(queue, task_id, done), daemon=True)
+    heartbeat.start()
+    try:
+        deadline = time.monotonic() + 1.5
+        while time.monotonic() < deadline:
+            assert queue.requeue_stale() == 0
+            time.sleep(0.05)
+    finally:
+        done.set()
+        heartbeat.join()
+    time.sleep(0.6)
+    assert queue.requeue_stale() == 1
+    assert queue.claim()['id'] == task_id
+
+
+def test_late_duplicate_result_is_ignored(tmp_path):
+    queue = FileDropQueue(str(tmp_path), claim_timeout=0)
+    task_id = queue.submit({'files': []})
+    queue.claim()
+    # Węzeł A nie odświeża przejęcia - zadanie wraca do kolejki i przejmuje je węzeł B
+    time.sleep(0.01)
+    assert queue.requeue_stale() == 1
+    queue.claim()
+    assert queue.complete(task_id, {'node': 'B'})
+    assert queue.collect([task_id], timeout=1, poll_interval=0.01) == {task_id: {'node': 'B'}}
+    assert not queue.complete(task_id, {'node': 'A'})
+    assert os.listdir(queue.results_dir) == []
+    assert queue.claim() is None
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""Testy indeksu czasowego (time_index) na liście zdarzeń i na kolumnach migawki"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from event_fields import EventFieldStore
+from event_snapshot import EventColumns, read_snapshot, write_snapshot
+from message_store import MessageStore
+from report_summary import ReportSummary
+from time_index import EventTimeIndex
+
+
+BASE_TIME = datetime(2025, 1, 5, 12, 0, 0)
+
+
+def make_events(count: int) -> list:
+    # Od najnowszych, po dwa zdarzenia w każdej sekundzie (jak self.events analizatora)
+    return [{
+        'log_name': 'System', 'event_id': 7, 'source': 'Disk', 'time': BASE_TIME - timedelta(seconds=number // 2),
+        'severity': 2, 'severity_name': 'BŁĄD', 'message': f"zdarzenie {number}", 'message_ref': None,
+        'category': None, 'record_number': count - number, 'computer': 'HOST1', 'user_sid': None,
+        'field_row': None,
+    } for number in range(count)]
+
+
+def numbers(events) -> list:
+    return [event['record_number'] for event in events]
+
+
+@pytest.mark.parametrize('start, end', [
+    (None, None),
+    (BASE_TIME - timedelta(seconds=30), BASE_TIME - timedelta(seconds=10)),
+    (BASE_TIME - timedelta(seconds=10), None),
+    (None, BASE_TIME - timedelta(seconds=49)),
+    (BASE_TIME + timedelta(seconds=1), None),
+    (BASE_TIME - timedelta(seconds=5), BASE_TIME - timedelta(seconds=10)),
+])
+def test_range_matches_linear_filter(start, end):
+    events = make_events(100)
+    expected = [event for event in events
+                if (start is None or event['time'] >= start) and (end is None or event['time'] <= end)]
+    descending = EventTimeIndex(events)
+    ascending = EventTimeIndex(events[::-1], descending=False)
+    for index in (descending, ascending):
+        assert numbers(index.range(start, end)) == numbers(expected)
+        assert numbers(index.range(start, end, newest_first=False)) == numbers(expected[::-1])
+        assert index.count(start, end) == len(expected)
+        assert (index.first_time, index.last_time) == (events[-1]['time'], events[0]['time'])
+
+
+def test_empty_index():
+    index = EventTimeIndex([])
+    assert index.range() == [] and index.count() == 0
+    assert index.first_time is None and index.last_time is None
+
+
+def test_snapshot_index_uses_time_column(tmp_path):
+    events = make_events(1000)
+    filename = str(tmp_path / 'analiza.weas')
+    write_snapshot(filename, events, MessageStore(), EventFieldStore(), ReportSummary(), codec='zlib')
+    columns = read_snapshot(filename).events
+    assert isinstance(columns, EventColumns)
+
+    created = []
+    original = columns._events
+
+    def counting(start, stop, step):
+        for event in original(start, stop, step):
+            created.append(event)
+            yield event
+
+    columns._events = counting
+    index = columns.time_index()
+    assert created == []
+    start, end = BASE_TIME - timedelta(seconds=100), BASE_TIME - timedelta(seconds=90)
+    selected = index.range(start, end)
+    assert numbers(selected) == numbers(EventTimeIndex(events).range(start, end))
+    assert len(created) == len(selected) == 22
+    assert index.count(start, end) == 22
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Indeks czasowy zdarzeń
+Wybór zakresu czasowego przez wyszukiwanie binarne zamiast przeglądania wszystkich zdarzeń
+"""
+
+from bisect import bisect_left, bisect_right
+from collections.abc import Sequence
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+
+class _Ascending(Sequence):
+    """Widok sekwencji uporządkowanej malejąco w kolejności rosnącej (bez kopiowania)"""
+
+    def __init__(self, values: Sequence):
+        self.values = values
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __getitem__(self, index):
+        return self.values[len(self.values) - 1 - index]
+
+
+class EventTimeIndex:
+    """
+    Indeks czasowy zdarzeń uporządkowanych według czasu
+
+    Wybór zakresu kosztuje O(log n + k): granice są wyszukiwane binarnie
+    w czasach zdarzeń, a wynikiem jest wycinek listy zdarzeń. Indeks nie
+    kopiuje zdarzeń, więc leniwe zdarzenia migawki (EventColumns) powstają
+    tylko dla wybranego zakresu.
+    """
+
+    def __init__(self, events: Sequence, descending: bool = True, times: Sequence = None,
+                 time_key: Callable[[datetime], Any] = None):
+        """
+        Args:
+            events: Zdarzenia uporządkowane według czasu
+            descending: Czy zdarzenia są uporządkowane od najnowszych (jak self.events analizatora)
+            times: Czasy zdarzeń w kolejności events (domyślnie pola 'time'), np. kolumna migawki
+            time_key: Zamienia granicę zakresu na wartość porównywalną z times
+        """
+        self.events = events
+        self.descending = descending
+        if times is None:
+            times = [event['time'] for event in events]
+        self.time_key = time_key
+        self.times = _Ascending(times) if descending else times
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    def _bounds(self, start: Optional[datetime], end: Optional[datetime]):
+        key = self.time_key
+        low = bisect_left(self.times, key(start) if key else start) if start is not None else 0
+        high = bisect_right(self.times, key(end) if key else end) if end is not None else len(self.times)
+        return low, max(low, high)
+
+    def range(self, start: datetime = None, end: datetime = None, newest_first: bool = True) -> List[Dict]:
+        """
+        Zwraca zdarzenia z zakresu [start, end] (obie granice włącznie)
+
+        Args:
+            start: Początek zakresu (None - od najstarszego zdarzenia)
+            end: Koniec zakresu (None - do najnowszego zdarzenia)
+            newest_first: Kolejność wyniku od najnowszych (domyślnie, jak self.events)
+        """
+        low, high = self._bounds(start, end)
+        if self.descending:
+            count = len(self.times)
+            selected = self.events[count - high:count - low]
+            return selected if newest_first else selected[::-1]
+        selected = self.events[low:high]
+        return selected[::-1] if newest_first else list(selected)
+
+    def count(self, start: datetime = None, end: datetime = None) -> int:
+        """Liczba zdarzeń w zakresie [start, end] w czasie O(log n)"""
+        low, high = self._bounds(start, end)
+        return high - low
+
+    @property
+    def first_time(self) -> Optional[datetime]:
+        if not self.times:
+            return None
+        return self.events[-1 if self.descending else 0]['time']
+
+    @property
+    def last_time(self) -> Optional[datetime]:
+        if not self.times:
+            return None
+        return self.events[0 if self.descending else -1]['time']
@@ -6,14 +6,55 @@ Analizator dziennika zdarzeń Windows 11
 Autor: Claude Code
 """
 
-import win32evtlog
 import win32evtlogutil
 import win32con
 import win32security
+import sys
 from datetime import datetime, timedelta
-from collections import defaultdict
-from typing import List, Dict, Tuple
+from operator import itemgetter
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Tuple, Optional, Union
+from html import escape as html_escape
+import csv
+import io
 import json
+import os
+import threading
+import time
+import argparse
+import asyncio
+import heapq
+from contextlib import nullcontext
+from itertools import islice
+
+from event_fields import EventFieldStore
+from message_store import MessageStore
+from security_detectors import SecurityMonitor
+from report_summary import ReportSummary, ApproximateSummary
+from summary_cache import SummaryCache
+from run_stats import RunStats, ProgressCallback, ProgressCallbackError, console_progress
+from run_profiler import RunProfiler
+from time_index import EventTimeIndex
+from summary_compare import SummaryComparison, load_summary
+from boot_sessions import BootSession, BootTimeline
+from arrow_export import ArrowEventWriter, export_summary_tables, EXPORT_FORMATS
+from event_correlation import EventCorrelator, format_key
+from event_files import EventFileReader
+from event_snapshot import EventColumns, read_snapshot, write_snapshot
+from event_pipeline import EventPipeline
+from event_reader import LOG_ERRORS, ReadAheadReader, Win32RecordSource
+from analyzer_plugins import AnalyzerPlugin, PluginDispatcher, BUILTIN_PLUGINS
+from event_timeline import chart_data, chart_scripts
+from summary_coordinator import (SummaryCoordinator, run_worker, save_partial_summary,
+                                 load_partial_summary, merge_summaries, describe_errors)
+from query_server import QueryServer
+from metrics_exporter import MetricsExporter
+from alert_dispatch import (AlertDispatcher, FileSink, SmtpSink, SyslogSink, WebhookSink,
+                            alerts_from_comparison, parse_address)
+
+
+# Klucz czasu zdarzenia (scalanie i sortowanie strumieni)
+EVENT_TIME = itemgetter('time')
 
 
 class EventSeverity:
@@ -381,123 +422,1189 @@ class SolutionDatabase:
         }
 
 
+class LogReadState:
+    """Stan odczytu jednego dziennika wstecz - zakres analizy i kolejność rekordów"""
+
+    def __init__(self, log_name: str, after_record: Optional[int], time_threshold: datetime,
+                 time_end: Optional[datetime]):
+        self.log_name = log_name
+        self.after_record = after_record
+        self.time_threshold = time_threshold
+        self.time_end = time_end
+        self.newest_seen = False
+        self.previous_time = None
+        # Osiągnięto początek zakresu - kolejne partie nie są potrzebne
+        self.done = False
+
+
 class WindowsEventAnalyzer:
     """Główna klasa analizatora dziennika zdarzeń Windows"""
 
-    def __init__(self, hours_back: int = 24):
+    # Maksymalna liczba zagrożeń bezpieczeństwa wypisywanych w raporcie
+    MAX_REPORTED_FINDINGS = 50
+
+    # Maksymalna liczba sesji uruchomieniowych w raporcie (najnowsze)
+    MAX_REPORTED_SESSIONS = 30
+
+    # Okno korelacji zdarzeń (maksymalny odstęp przyczyna -> skutek)
+    CORRELATION_WINDOW = timedelta(seconds=60)
+
+    # Liczba par i łańcuchów korelacji w raporcie
+    MAX_REPORTED_CORRELATIONS = 15
+
+    # Maksymalna liczba punktów serii na wykresach osi czasu raportu HTML
+    # (niezależnie od długości okresu - serie są redukowane algorytmem LTTB)
+    MAX_CHART_POINTS = 300
+
+    # Liczba najczęstszych Event ID na wykresie osi czasu
+    CHART_EVENT_IDS = 5
+
+    # Długość skrótu wiadomości trzymanego w zdarzeniu (pełna treść jest w self.messages)
+    MESSAGE_PREVIEW_LENGTH = 120
+
+    # Co ile odczytanych rekordów wywoływany jest postęp 'log_progress'
+    PROGRESS_INTERVAL = 1000
+
+    # Liczba zdarzeń przekazywanych jednorazowo do odbiorców (add_event_sink)
+    SINK_BATCH_SIZE = 8192
+
+    def __init__(self, hours_back: int = 24, cache: SummaryCache = None,
+                 approximate: bool = False, sketch_options: Dict = None,
+                 progress: Optional[ProgressCallback] = console_progress,
+                 start_time: datetime = None, end_time: datetime = None):
         """
         Inicjalizacja analizatora
 
         Args:
-            hours_back: Ile godzin wstecz analizować (domyślnie 24h)
+            hours_back: Ile godzin wstecz analizować (domyślnie 24h, None - bez ograniczenia,
+                        np. dla całych plików eksportu)
+            cache: Opcjonalna pamięć podręczna podsumowań - niezmienione dzienniki
+                   nie są ponownie czytane (ich zdarzenia nie trafiają do self.events),
+                   a z dzienników, które urosły, czytane są tylko nowe rekordy
+            approximate: Tryb przybliżony o stałym zużyciu pamięci dla bardzo dużych
+                         zakresów - zdarzenia nie są zapisywane w self.events, a raport
+                         powstaje ze szkiców (bez pamięci podręcznej i detektorów zagrożeń)
+            sketch_options: Parametry ApproximateSummary (top_k, epsilon, delta, hll_precision)
+            progress: Wywołanie zwrotne postępu callback(etap, informacje) - domyślnie
+                      komunikaty w konsoli, None wyłącza komunikaty
+            start_time: Bezwzględny początek zakresu analizy (zastępuje hours_back)
+            end_time: Bezwzględny koniec zakresu analizy (domyślnie bez ograniczenia)
         """
         self.hours_back = hours_back
+        self.start_time = start_time
+        self.end_time = end_time
+        self.cache = cache
+        self.approximate = approximate
+        self.sketch_options = sketch_options or {}
+        self.approximate_summary = None
+        # Próbki przykładowych zdarzeń grup z różnych źródeł zamiast równomiernych
+        self.stratify_samples = False
         self.logs_to_check = ['System', 'Application', 'Security']
         self.events = []
+        self.fields = EventFieldStore()
+        self.messages = MessageStore()
+        self.security_findings = []
+        self.boot_sessions = []
+        self.correlator = None
+        self.event_sinks = []
+        # Wtyczki analizujące zdarzenia w trakcie odczytu (add_plugin)
+        self.plugins = PluginDispatcher()
+        # Pliki eksportu dzienników (wevtutil XML, CSV) analizowane zamiast dzienników systemu
+        self.event_files = []
+        # Liczba procesów parsujących pliki eksportu (None - liczba rdzeni)
+        self.file_workers = None
+        # Źródło rekordów dzienników (np. FakeRecordSource w testach) i liczba partii
+        # czytanych z wyprzedzeniem w trakcie konwersji (0 - bez wątku odczytu)
+        self.record_source = Win32RecordSource()
+        self.read_ahead = 1
+        # Metryki odczytu z wyprzedzeniem każdego dziennika (ReadMetrics)
+        self.read_metrics = {}
+        self._summary = None
+        self._summary_size = 0
+        self.stats = RunStats()
+        # Numer najnowszego przetworzonego rekordu każdego dziennika
+        self.newest_records = {}
+        # Renderuj wiele formatów w osobnych wątkach (profilowanie wymaga jednego wątku).
+        # Renderowanie to czysty Python ograniczony przez GIL - wątki nakładają
+        # tylko zapis plików, nie przyspieszają samego renderowania
+        self.parallel_render = True
+        # Dzienniki, w których czas rekordów nie malał przy odczycie wstecz
+        self._unordered_logs = set()
+        self._time_index = None
+        self.progress_callbacks = [progress] if progress is not None else []
+
+    def add_progress_callback(self, callback: ProgressCallback):
+        """
+        Dodaje wywołanie zwrotne postępu
+
+        Etapy: analysis_start, log_start, log_progress, log_cached, log_delta,
+        log_done, ingestion_done, error, analysis_done, report_saved, snapshot_saved,
+        snapshot_loaded. Drugi argument to słownik z informacjami o etapie, m.in.:
+        - log_start: log_name
+        - log_done: log_name, events, seconds, source ('read', 'cache', 'delta' lub 'file')
+        - error: log_name, error
+        - analysis_done: stats (RunStats przebiegu)
+
+        Wyjątek zgłoszony przez wywołanie zwrotne nie jest traktowany jak błąd
+        odczytu dziennika - przerywa analizę jako ProgressCallbackError.
+        """
+        self.progress_callbacks.append(callback)
+
+    def add_event_sink(self, sink):
+        """
+        Dodaje odbiorcę zdarzeń zapisywanych strumieniowo w trakcie odczytu
+
+        Odbiorca musi mieć metodę write(events) przyjmującą partię zdarzeń
+        (np. arrow_export.ArrowEventWriter). Zdarzenia z pamięci podręcznej
+        podsumowań nie są odczytywane, więc nie trafiają do odbiorców.
+        """
+        if getattr(sink, 'include_messages', False) and getattr(sink, 'message_getter', True) is None:
+            sink.message_getter = self.get_message
+        self.event_sinks.append(sink)
+
+    def add_plugin(self, plugin: AnalyzerPlugin):
+        """
+        Dodaje wtyczkę analizującą zdarzenia (np. analyzer_plugins.DiskHealthPlugin)
+
+        Odczytane zdarzenia są przekazywane wszystkim wtyczkom w jednym
+        przebiegu, każdej tylko z zadeklarowanych Event ID i dzienników.
+        Po analizie wywoływane jest on_finish, a sekcje wtyczek trafiają do
+        raportów TXT i HTML. Zdarzenia z pamięci podręcznej podsumowań nie są
+        odczytywane, więc nie trafiają do wtyczek.
+        """
+        self.plugins.register(plugin)
 
-    def read_event_log(self, log_name: str) -> List[Dict]:
+    def run_plugins(self, events: List[Dict] = None):
+        """
+        Przekazuje wtyczkom zdarzenia już zapisane w analizatorze i kończy ich analizę
+
+        Przydatne po wczytaniu migawki (load_snapshot) lub po dodaniu wtyczek
+        do zakończonej analizy.
+
+        Args:
+            events: Zdarzenia do przekazania (domyślnie self.events)
+        """
+        self._dispatch_plugins(self.events if events is None else events)
+        with self.stats.stage('plugins'):
+            self.plugins.finish(self)
+
+    def _dispatch_plugins(self, events: List[Dict]):
+        with self.stats.stage('plugins'):
+            self.plugins.add_events(events)
+
+    def _tap_plugins(self, events):
+        """Przekazuje strumień zdarzeń wtyczkom partiami, zwracając te same zdarzenia"""
+        events = iter(events)
+        while True:
+            batch = list(islice(events, self.SINK_BATCH_SIZE))
+            if not batch:
+                return
+            self._dispatch_plugins(batch)
+            yield from batch
+
+    def _write_sinks(self, events: List[Dict]):
+        with self.stats.stage('export'):
+            for sink in self.event_sinks:
+                sink.write(events)
+
+    def _notify(self, stage: str, **info):
+        """Przekazuje postęp do wszystkich wywołań zwrotnych"""
+        for callback in self.progress_callbacks:
+            try:
+                callback(stage, info)
+            except Exception as e:
+                raise ProgressCallbackError(f"Wywołanie zwrotne postępu zgłosiło wyjątek "
+                                            f"na etapie {stage}: {e}") from e
+
+    def _report_error(self, log_name: str, error: Exception):
+        """Zlicza i zgłasza błąd, który nie przerywa analizy"""
+        self.stats.count('swallowed_exceptions')
+        self._notify('error', log_name=log_name, error=str(error))
+
+    def read_event_log(self, log_name: str, after_record: int = None) -> List[Dict]:
         """
         Odczytuje zdarzenia z określonego dziennika
 
         Args:
             log_name: Nazwa dziennika (System, Application, Security)
+            after_record: Czytaj tylko rekordy o numerze większym niż podany
 
         Returns:
             Lista zdarzeń jako słowniki
         """
-        events = []
-        try:
-            hand = win32evtlog.OpenEventLog(None, log_name)
-            flags = win32evtlog.EVENTLOG_BACKWARDS_READ | win32evtlog.EVENTLOG_SEQUENTIAL_READ
+        return list(self.iter_event_log(log_name, after_record))
+
+    def iter_event_log(self, log_name: str, after_record: int = None, store: bool = True):
+        """
+        Odczytuje zdarzenia z dziennika strumieniowo (od najnowszych)
 
-            # Oblicz czas od którego czytamy
-            time_threshold = datetime.now() - timedelta(hours=self.hours_back)
+        Args:
+            log_name: Nazwa dziennika (System, Application, Security)
+            after_record: Czytaj tylko rekordy o numerze większym niż podany
+            store: Zapisuj pełne treści i pola w self.messages / self.fields; przy False
+                   zdarzenie niesie je tylko w kluczach 'full_message' i 'inserts'
 
-            while True:
-                event_records = win32evtlog.ReadEventLog(hand, flags, 0)
-                if not event_records:
+        Yields:
+            Zdarzenia jako słowniki
+
+        Raises:
+            Exception: Błąd zapisu odbiorcy zdarzeń (add_event_sink) - w odróżnieniu
+                       od błędów odczytu dziennika przerywa analizę
+        """
+        records = self._read_log_records(log_name, after_record, store)
+        if not self.event_sinks:
+            yield from records
+            return
+
+        # Partia zdarzeń dla odbiorców strumieniowych (add_event_sink) - zapis poza
+        # obsługą błędów odczytu, więc błąd odbiorcy nie jest pomijany
+        sink_batch = []
+        try:
+            for record in records:
+                sink_batch.append(record)
+                if len(sink_batch) >= self.SINK_BATCH_SIZE:
+                    batch, sink_batch = sink_batch, []
+                    self._write_sinks(batch)
+                yield record
+        except GeneratorExit:
+            # Odczyt przerwany przez konsumenta - odbiorcy dostają przekazane zdarzenia
+            if sink_batch:
+                self._write_sinks(sink_batch)
+            raise
+        finally:
+            records.close()
+        if sink_batch:
+            self._write_sinks(sink_batch)
+
+    def _read_log_records(self, log_name: str, after_record: int = None, store: bool = True):
+        """Zdarzenia dziennika (iter_event_log bez odbiorców) - błąd odczytu kończy dziennik"""
+        hand = self._open_event_log(log_name)
+        if hand is None:
+            return
+
+        stats = self.stats
+        reader = None
+        try:
+            state = self._read_state(log_name, after_record)
+            converted = 0
+
+            # Kolejna partia jest czytana w tle, gdy bieżąca jest konwertowana
+            reader = ReadAheadReader(lambda: self._read_record_batch(hand), self.read_ahead,
+                                     on_stall=lambda seconds: stats.add_time('read_wait', seconds))
+            for event_records in reader:
+                if state.done:
                     break
 
-                for event in event_records:
-                    # Konwertuj czas zdarzenia
-                    try:
-                        event_time = datetime.strptime(str(event.TimeGenerated), '%Y-%m-%d %H:%M:%S')
-                    except:
-                        event_time = datetime.now()
-
-                    # Sprawdź czy zdarzenie jest w zakresie czasowym
-                    if event_time < time_threshold:
-                        win32evtlog.CloseEventLog(hand)
-                        return events
-
-                    # Mapuj typ zdarzenia na nasze poziomy ważności
-                    severity = EventSeverity.WIN_EVENT_TYPE_MAP.get(
-                        event.EventType,
-                        EventSeverity.INFORMATION
-                    )
-
-                    # Pobierz tekst zdarzenia
-                    try:
-                        event_message = win32evtlogutil.SafeFormatMessage(event, log_name)
-                    except:
-                        event_message = "Brak opisu zdarzenia"
-
-                    # Pobierz źródło zdarzenia
-                    source_name = str(event.SourceName) if event.SourceName else "Unknown"
-
-                    event_data = {
-                        'log_name': log_name,
-                        'event_id': event.EventID & 0xFFFF,  # Usuń górne bity
-                        'source': source_name,
-                        'time': event_time,
-                        'severity': severity,
-                        'severity_name': EventSeverity.NAMES[severity],
-                        'message': event_message[:500],  # Ogranicz długość
-                        'category': event.EventCategory
-                    }
-
-                    events.append(event_data)
-
-            win32evtlog.CloseEventLog(hand)
+                for event, event_time in self._accept_records(state, event_records):
+                    yield self._convert_record(event, log_name, event_time, store)
+                    converted += 1
+                    if converted % self.PROGRESS_INTERVAL == 0:
+                        self._notify('log_progress', log_name=log_name, events=converted)
 
+        except ProgressCallbackError:
+            raise
         except Exception as e:
-            print(f"Błąd podczas odczytu dziennika {log_name}: {str(e)}")
+            self._report_error(log_name, e)
+        finally:
+            if reader is not None:
+                reader.close()
+                self.read_metrics[log_name] = reader.metrics
+                stats.count('read_batches', reader.metrics.batches)
+            self._close_event_log(hand)
+
+    def _read_state(self, log_name: str, after_record: int = None) -> LogReadState:
+        """Stan odczytu dziennika dla bieżącego zakresu czasowego analizy"""
+        return LogReadState(log_name, after_record, *self.time_window())
+
+    def _open_event_log(self, log_name: str):
+        """Otwiera dziennik do odczytu (None i zgłoszony błąd, jeśli się nie da)"""
+        try:
+            with self.stats.stage('open'):
+                return self.record_source.open(log_name)
+        except Exception as e:
+            self._report_error(log_name, e)
+            return None
+
+    def _close_event_log(self, hand):
+        self.record_source.close(hand)
+
+    def _read_record_batch(self, hand) -> List:
+        """Odczytuje kolejną partię rekordów dziennika (od najnowszych)"""
+        start = time.perf_counter()
+        event_records = self.record_source.read(hand)
+        self.stats.add_time('read_batch', time.perf_counter() - start)
+        if event_records:
+            self.stats.count('records_read', len(event_records))
+        return event_records
+
+    def _accept_records(self, state: LogReadState, event_records: List):
+        """
+        Wybiera z partii rekordy z zakresu analizy
+
+        Odczyt jest zakończony (state.done), gdy pojawi się rekord starszy niż
+        początek zakresu lub już przeanalizowany (after_record).
+
+        Yields:
+            Krotki (rekord, czas zdarzenia)
+        """
+        log_name = state.log_name
+        for event in event_records:
+            # Pierwszy rekord odczytu wstecz jest najnowszym w dzienniku
+            if not state.newest_seen:
+                state.newest_seen = True
+                self.newest_records[log_name] = max(
+                    self.newest_records.get(log_name, 0), event.RecordNumber
+                )
+
+            # Rekordy starsze niż już przeanalizowane (odczyt przyrostowy)
+            if state.after_record is not None and event.RecordNumber <= state.after_record:
+                state.done = True
+                return
+
+            # Sprawdź czy zdarzenie jest w zakresie czasowym
+            event_time = self._record_time(event)
+            if event_time < state.time_threshold:
+                state.done = True
+                return
+
+            # Scalanie strumieni zakłada czas nierosnący w obrębie dziennika
+            if state.previous_time is not None and event_time > state.previous_time:
+                self._unordered_logs.add(log_name)
+            state.previous_time = event_time
+
+            # Rekordy nowsze niż koniec zakresu bezwzględnego
+            if state.time_end is not None and event_time > state.time_end:
+                continue
+
+            yield event, event_time
+
+    def _convert_records(self, state: LogReadState, event_records: List, store: bool = True) -> List[Dict]:
+        """Konwertuje partię rekordów z zakresu analizy na zdarzenia (etap potoku EventPipeline)"""
+        return [self._convert_record(event, state.log_name, event_time, store)
+                for event, event_time in self._accept_records(state, event_records)]
+
+    def read_event_files(self, paths: List[str] = None, store: bool = True) -> Dict[str, List[Dict]]:
+        """
+        Odczytuje zdarzenia z plików eksportu dzienników (wevtutil qe /f:xml, CSV)
+
+        Pliki są dzielone na fragmenty na granicach rekordów i parsowane
+        równolegle w puli procesów (self.file_workers). Zdarzenia mają tę samą
+        postać co z read_event_log; eksport CSV nie zawiera wstawek, więc
+        zdarzenia z niego nie mają nazwanych pól.
+
+        Args:
+            paths: Ścieżki plików (domyślnie self.event_files)
+            store: Zapisuj pełne treści i pola w self.messages / self.fields; przy False
+                   zdarzenie niesie je tylko w kluczach 'full_message' i 'inserts'
+
+        Returns:
+            Słownik nazwa dziennika -> zdarzenia od najnowszych
+        """
+        time_threshold, time_end = self.time_window()
+        reader = EventFileReader(workers=self.file_workers, preview_length=self.MESSAGE_PREVIEW_LENGTH,
+                                 start_time=time_threshold, end_time=time_end)
+        with self.stats.stage('read_files'):
+            logs = reader.read(self.event_files if paths is None else paths)
+        for path, error in reader.errors:
+            self._report_error(path, error)
+        self.stats.count('file_shards', reader.shard_count)
+
+        for log_name, events in logs.items():
+            if store:
+                with self.stats.stage('build_record'):
+                    for event in events:
+                        # Pełna treść w skompresowanym magazynie, wstawki jako nazwane pola
+                        event['message_ref'] = self.messages.add(event.pop('full_message'))
+                        event['field_row'] = self.fields.add(event['source'], event['event_id'],
+                                                             event.pop('inserts'))
+            self.newest_records[log_name] = max(
+                [self.newest_records.get(log_name, 0)] + [event['record_number'] or 0 for event in events]
+            )
+            if self.event_sinks:
+                for start in range(0, len(events), self.SINK_BATCH_SIZE):
+                    self._write_sinks(events[start:start + self.SINK_BATCH_SIZE])
+        return logs
+
+    def _read_files_as_logs(self, store: bool = True) -> Dict[str, List[Dict]]:
+        """
+        Odczytuje self.event_files jako analizowane dzienniki
+
+        Analizowane są dzienniki zawarte w plikach (w kolejności logs_to_check,
+        pozostałe alfabetycznie). Bez zakresu czasu (hours_back=None) okresem
+        analizy staje się okres zdarzeń w plikach.
+        """
+        file_logs = self.read_event_files(store=store)
+        order = {log_name: index for index, log_name in enumerate(self.logs_to_check)}
+        self.logs_to_check = sorted(file_logs, key=lambda log_name: (order.get(log_name, len(order)), log_name))
+
+        non_empty = [events for events in file_logs.values() if events]
+        if self.hours_back is None and self.start_time is None and non_empty:
+            self.start_time = min(events[-1]['time'] for events in non_empty)
+            self.end_time = max(events[0]['time'] for events in non_empty)
+        return file_logs
+
+    def time_window(self) -> Tuple[datetime, Optional[datetime]]:
+        """
+        Zwraca zakres czasowy analizy
+
+        Returns:
+            Krotka (początek, koniec) - koniec jest None dla okna względnego
+        """
+        if self.start_time is not None:
+            return self.start_time, self.end_time
+        if self.hours_back is None:
+            return datetime.min, None
+        return datetime.now() - timedelta(hours=self.hours_back), None
+
+    def _new_summary(self, logs: List[str]) -> ReportSummary:
+        """Tworzy puste podsumowanie z zakresem czasowym analizatora"""
+        return ReportSummary(hours_back=self.hours_back, logs=logs,
+                             start_time=self.start_time, end_time=self.end_time,
+                             stratify_samples=self.stratify_samples)
+
+    def _record_time(self, event) -> datetime:
+        """Konwertuje czas rekordu dziennika Windows"""
+        try:
+            return datetime.strptime(str(event.TimeGenerated), '%Y-%m-%d %H:%M:%S')
+        except:
+            self.stats.count('timestamp_fallbacks')
+            return datetime.now()
+
+    def _convert_record(self, event, log_name: str, event_time: datetime, store: bool = True) -> Dict:
+        """
+        Konwertuje rekord dziennika Windows na zdarzenie (słownik)
 
-        return events
+        Args:
+            event: Rekord zwrócony przez win32evtlog.ReadEventLog
+            log_name: Nazwa dziennika
+            event_time: Czas zdarzenia (z _record_time)
+            store: Zapisuj pełną treść i pola w magazynach analizatora
+
+        Returns:
+            Zdarzenie jako słownik
+        """
+        # Pobierz tekst zdarzenia
+        start = time.perf_counter()
+        try:
+            event_message = win32evtlogutil.SafeFormatMessage(event, log_name)
+        except:
+            self.stats.count('format_failures')
+            event_message = "Brak opisu zdarzenia"
+        formatted = time.perf_counter()
+
+        # Mapuj typ zdarzenia na nasze poziomy ważności
+        severity = EventSeverity.WIN_EVENT_TYPE_MAP.get(
+            event.EventType,
+            EventSeverity.INFORMATION
+        )
+
+        # Pobierz źródło zdarzenia
+        source_name = sys.intern(str(event.SourceName)) if event.SourceName else "Unknown"
+        event_id = event.EventID & 0xFFFF  # Usuń górne bity
+
+        event_data = {
+            'log_name': log_name,
+            'event_id': event_id,
+            'source': source_name,
+            'time': event_time,
+            'severity': severity,
+            'severity_name': EventSeverity.NAMES[severity],
+            'message': event_message[:self.MESSAGE_PREVIEW_LENGTH],  # Skrót
+            'message_ref': None,
+            'category': event.EventCategory,
+            'record_number': event.RecordNumber,
+            'computer': sys.intern(str(event.ComputerName)) if event.ComputerName else None,
+            'user_sid': self._sid_to_string(event.Sid),
+            'field_row': None
+        }
+
+        if store:
+            # Pełna treść w skompresowanym magazynie, wstawki jako nazwane pola
+            event_data['message_ref'] = self.messages.add(event_message)
+            event_data['field_row'] = self.fields.add(source_name, event_id, event.StringInserts)
+        else:
+            event_data['full_message'] = event_message
+            event_data['inserts'] = event.StringInserts
+
+        self.stats.add_time('format_message', formatted - start)
+        self.stats.add_time('build_record', time.perf_counter() - formatted)
+        return event_data
+
+    def get_log_fingerprint(self, log_name: str) -> Optional[Dict]:
+        """
+        Zwraca odcisk dziennika - numery najstarszego i najnowszego rekordu
+
+        Returns:
+            Słownik {'oldest': ..., 'newest': ...} lub None jeśli nie można go odczytać
+        """
+        try:
+            hand = self.record_source.open(log_name)
+            try:
+                oldest, count = self.record_source.record_range(hand)
+            finally:
+                self.record_source.close(hand)
+        except LOG_ERRORS:
+            self.stats.count('fingerprint_failures')
+            return None
+        return {'oldest': oldest, 'newest': oldest + count - 1}
+
+    def _cache_key(self, log_name: str) -> str:
+        """Klucz pamięci podręcznej dla dziennika i zakresu czasowego"""
+        parts = {'log': log_name, 'hours_back': self.hours_back}
+        if self.start_time is not None:
+            parts['start'] = self.start_time
+            parts['end'] = self.end_time
+        if self.stratify_samples:
+            parts['stratify_samples'] = True
+        return SummaryCache.make_key(**parts)
+
+    def _read_event_log_cached(self, log_name: str) -> Tuple[List[Dict], Optional[Tuple]]:
+        """
+        Odczytuje dziennik z użyciem pamięci podręcznej
+
+        Returns:
+            Krotka (nowe zdarzenia, (klucz, odcisk, wpis z pamięci podręcznej lub None))
+            - drugi element jest None, jeśli dziennika nie można buforować
+        """
+        fingerprint = self.get_log_fingerprint(log_name)
+        if fingerprint is None:
+            return self.read_event_log(log_name), None
+
+        key = self._cache_key(log_name)
+        entry = self.cache.get(key)
+        if entry is not None and not self._cache_in_window(entry):
+            # Okno względne przesunęło się za najstarsze zliczone zdarzenie -
+            # liczników nie da się pomniejszyć, więc dziennik jest czytany od nowa
+            entry = None
+
+        if entry is not None and entry.fingerprint == fingerprint:
+            self.newest_records[log_name] = fingerprint['newest']
+            self._notify('log_cached', log_name=log_name, cached_events=entry.summary.total_events)
+            return [], (key, fingerprint, entry)
+
+        # Dziennik urósł (i nie został wyczyszczony) - czytaj tylko nowe rekordy
+        if (entry is not None
+                and fingerprint['oldest'] >= entry.fingerprint['oldest']
+                and fingerprint['newest'] > entry.fingerprint['newest']):
+            self._notify('log_delta', log_name=log_name, cached_events=entry.summary.total_events)
+            return self.read_event_log(log_name, after_record=entry.fingerprint['newest']), \
+                (key, fingerprint, entry)
+
+        return self.read_event_log(log_name), (key, fingerprint, None)
+
+    def _cache_in_window(self, entry) -> bool:
+        """Sprawdza, czy buforowane podsumowanie nie zawiera zdarzeń sprzed początku okna"""
+        oldest = entry.summary.oldest_event_time()
+        return oldest is None or oldest >= self.time_window()[0]
+
+    def _update_cache(self, cached_logs: Dict[str, Tuple]) -> ReportSummary:
+        """
+        Łączy podsumowania z pamięci podręcznej z nowymi zdarzeniami i zapisuje je
+
+        Returns:
+            Podsumowanie wszystkich analizowanych dzienników
+        """
+        log_summaries = {}
+        for log_name, (key, fingerprint, entry) in cached_logs.items():
+            if entry is not None:
+                log_summaries[log_name] = entry.summary
+            else:
+                log_summaries[log_name] = self._new_summary([log_name])
+
+        summary = self._new_summary(self.logs_to_check)
+        for event in self.events:
+            log_summary = log_summaries.get(event['log_name'])
+            (log_summary or summary).add_event(event)
+
+        if 'Security' in log_summaries:
+            log_summaries['Security'].security_findings.extend(self.security_findings)
+        else:
+            summary.security_findings.extend(self.security_findings)
+        if 'System' in log_summaries:
+            log_summaries['System'].boot_sessions = list(self.boot_sessions)
+            log_summaries['System'].correlations = self.correlator
+        else:
+            summary.boot_sessions = list(self.boot_sessions)
+            summary.correlations = self.correlator
+        self._resolve_sample_messages(summary)
+
+        now = datetime.now()
+        for log_name, (key, fingerprint, entry) in cached_logs.items():
+            log_summary = log_summaries[log_name]
+            self._resolve_sample_messages(log_summary)
+            # Czas okna pozostaje czasem pełnego przeliczenia, aby przesunięcie
+            # początku okna względnego nie kumulowało się przy kolejnych odczytach
+            self.cache.put(key, log_summary, fingerprint, entry.window_end if entry else now)
+            summary.merge(log_summary)
+
+        return summary
+
+    def _resolve_sample_messages(self, summary: ReportSummary):
+        """Dekompresuje pełne treści wiadomości dla próbek pokazywanych w raporcie"""
+        for sample in summary.samples():
+            if sample.get('full_message') is None:
+                sample['full_message'] = self.get_message(sample)
+
+    @staticmethod
+    def _sid_to_string(sid) -> Optional[str]:
+        """Konwertuje SID zdarzenia do postaci tekstowej (S-1-5-...)"""
+        if sid is None:
+            return None
+        try:
+            return sys.intern(win32security.ConvertSidToStringSid(sid))
+        except Exception:
+            return None
+
+    def get_message(self, event: Dict) -> str:
+        """
+        Zwraca pełną treść wiadomości zdarzenia
+
+        Args:
+            event: Zdarzenie jako słownik
+
+        Returns:
+            Pełna treść (dekompresowana na żądanie) lub skrót, jeśli jej brak
+        """
+        message = self.messages.get(event.get('message_ref'))
+        return message if message is not None else event['message']
+
+    def get_event_fields(self, event: Dict) -> Dict[str, str]:
+        """
+        Zwraca nazwane pola zdarzenia (np. TargetUserName, IpAddress dla 4625)
+
+        Args:
+            event: Zdarzenie jako słownik
+
+        Returns:
+            Słownik nazwa pola -> wartość
+        """
+        return self.fields.get_fields(event['source'], event['event_id'], event.get('field_row'))
+
+    def get_event_field(self, event: Dict, name: str) -> Optional[str]:
+        """Zwraca wartość pojedynczego pola zdarzenia"""
+        return self.fields.get_value(event['source'], event['event_id'], event.get('field_row'), name)
+
+    def group_by_fields(self, event_id: int, field_names: List[str],
+                        where: Dict[str, str] = None) -> Dict[Tuple[str, ...], int]:
+        """
+        Grupuje zdarzenia według wartości pól
+
+        Przykład: group_by_fields(4625, ['TargetUserName', 'IpAddress'])
+
+        Returns:
+            Słownik krotka wartości -> liczba zdarzeń (malejąco)
+        """
+        return self.fields.group_by(event_id, field_names, where=where)
 
     def analyze_events(self):
         """Analizuje wszystkie skonfigurowane dzienniki"""
-        print(f"Analizuję dzienniki zdarzeń z ostatnich {self.hours_back} godzin...\n")
+        self._notify('analysis_start', hours_back=self.hours_back, logs=list(self.logs_to_check),
+                     start_time=self.start_time, end_time=self.end_time)
+
+        if self.approximate:
+            self._analyze_events_approximate()
+            self._finish_analysis()
+            return
+
+        cached_logs = {}
+        streams = [self.events] if self.events else []
+        file_logs = None
+        if self.event_files:
+            # Pliki są parsowane razem (jedna pula procesów) - czas dzielony na dzienniki proporcjonalnie
+            start = time.perf_counter()
+            file_logs = self._read_files_as_logs()
+            file_seconds = time.perf_counter() - start
+            file_events = sum(len(events) for events in file_logs.values()) or 1
+
+        for log_name in self.logs_to_check:
+            self._notify('log_start', log_name=log_name)
+            start = time.perf_counter()
+            source = 'read'
+            if file_logs is not None:
+                log_events = file_logs[log_name]
+                source = 'file'
+                start -= file_seconds * len(log_events) / file_events
+            elif self.cache is not None:
+                log_events, cache_info = self._read_event_log_cached(log_name)
+                if cache_info is not None:
+                    cached_logs[log_name] = cache_info
+                    key, fingerprint, entry = cache_info
+                    if entry is not None:
+                        source = 'cache' if entry.fingerprint == fingerprint else 'delta'
+            else:
+                log_events = self.read_event_log(log_name)
+            if self.plugins:
+                self._dispatch_plugins(log_events)
+            streams.append(log_events)
+            self._log_done(log_name, len(log_events), time.perf_counter() - start, source)
+
+        # Scal uporządkowane czasowo strumienie dzienników (od najnowszych)
+        with self.stats.stage('merge'):
+            self.events = self._merge_streams(streams)
+        self._notify('ingestion_done', events=len(self.events))
+        self._summary = None
+
+        system_entry = cached_logs.get('System', (None, None, None))[2]
+        self._run_detectors(system_entry.summary if system_entry else None)
+
+        if cached_logs:
+            with self.stats.stage('aggregate'):
+                self._summary = self._update_cache(cached_logs)
+            self._summary_size = len(self.events)
+
+        self._finish_analysis()
+
+    def _run_detectors(self, system_summary: ReportSummary = None):
+        """
+        Wykrywa zagrożenia, sesje uruchomieniowe i korelacje w odczytanych zdarzeniach
+
+        Args:
+            system_summary: Podsumowanie dziennika System z pamięci podręcznej - jego
+                            sesje i liczności korelacji są kontynuowane nowymi zdarzeniami
+        """
+        if 'Security' in self.logs_to_check:
+            self.detect_security_threats()
+
+        if 'System' in self.logs_to_check:
+            # Sesje z pamięci podręcznej są kontynuowane nowymi zdarzeniami
+            self.detect_boot_sessions(system_summary.boot_sessions if system_summary else ())
+            # Liczności korelacji są przechowywane razem z podsumowaniem dziennika System
+            self.correlate_events(system_summary.correlations if system_summary else None)
+        else:
+            self.correlate_events()
+
+    async def analyze_events_async(self, queue_size: int = 4):
+        """
+        Analizuje dzienniki potokiem asyncio (EventPipeline) - odpowiednik analyze_events
+
+        Dzienniki są czytane równolegle, konwersja rekordów, agregacja
+        i odbiorcy zdarzeń (add_event_sink) działają w osobnych wątkach
+        połączonych ograniczonymi kolejkami, a pętla zdarzeń pozostaje wolna
+        dla innych zadań usługi. Pamięć podręczna, tryb przybliżony i pliki
+        eksportu mają własny przebieg odczytu - wtedy analyze_events jest
+        wykonywane w wątku.
+
+        Przykład:
+            analyzer = WindowsEventAnalyzer(hours_back=24, progress=None)
+            await analyzer.analyze_events_async()
+            report = analyzer.generate_report()
+
+        Args:
+            queue_size: Pojemność kolejek potoku w partiach rekordów
+        """
+        loop = asyncio.get_running_loop()
+        if self.cache is not None or self.approximate or self.event_files:
+            await loop.run_in_executor(None, self.analyze_events)
+            return
+
+        self._notify('analysis_start', hours_back=self.hours_back, logs=list(self.logs_to_check),
+                     start_time=self.start_time, end_time=self.end_time)
+        previous_events = self.events
+        pipeline = EventPipeline(self, queue_size=queue_size)
+        if self.plugins:
+            pipeline.add_thread_consumer(lambda log_name, events: self._dispatch_plugins(events))
+        log_events = await pipeline.run()
+        for log_name in self.logs_to_check:
+            self._log_done(log_name, len(log_events[log_name]), pipeline.seconds.get(log_name, 0.0))
 
+        with self.stats.stage('merge'):
+            self.events = self._merge_streams([previous_events] + [log_events[name] for name in self.logs_to_check])
+        self._notify('ingestion_done', events=len(self.events))
+        self._summary = None
+
+        # Detektory przeglądają wszystkie zdarzenia - w wątku, bez blokowania pętli
+        await loop.run_in_executor(None, self._run_detectors)
+
+        if not previous_events:
+            # Podsumowania dzienników powstały w trakcie odczytu - bez ponownego przebiegu
+            summary = pipeline.summary()
+            with self.stats.stage('aggregate'):
+                self._complete_summary(summary)
+            self._summary = summary
+            self._summary_size = len(self.events)
+
+        self._finish_analysis()
+
+    async def aiter_events(self, store: bool = True, queue_size: int = 4):
+        """
+        Odczytuje dzienniki potokiem asyncio jako partie zdarzeń
+
+        Przykład:
+            async for log_name, events in analyzer.aiter_events():
+                await service.publish(log_name, events)
+
+        Args:
+            store: Zapisuj pełne treści i pola w magazynach analizatora
+            queue_size: Pojemność kolejek potoku - wolne pobieranie wstrzymuje odczyt
+
+        Yields:
+            Krotki (nazwa dziennika, zdarzenia od najnowszych) - dzienniki naprzemiennie
+        """
+        pipeline = EventPipeline(self, store=store, collect=False, queue_size=queue_size)
+        batches = pipeline.batches()
+        try:
+            async for batch in batches:
+                yield batch
+        finally:
+            # Przerwana iteracja od razu zatrzymuje potok (bez czekania na odśmiecanie generatora)
+            await batches.aclose()
+
+    def _merge_streams(self, streams: List[List[Dict]]) -> List[Dict]:
+        """
+        Scala listy zdarzeń uporządkowane malejąco według czasu (k-way merge, O(n log k))
+
+        Listy z dzienników, w których czas rekordów nie był monotoniczny,
+        są wcześniej sortowane osobno.
+        """
+        streams = [stream for stream in streams if stream]
+        for stream in streams:
+            if stream[0]['log_name'] in self._unordered_logs:
+                stream.sort(key=EVENT_TIME, reverse=True)
+        if len(streams) == 1:
+            return list(streams[0])
+        return list(heapq.merge(*streams, key=EVENT_TIME, reverse=True))
+
+    def iter_events(self, store: bool = True):
+        """
+        Odczytuje wszystkie dzienniki jako jeden strumień od najnowszych zdarzeń
+
+        Dzienniki są czytane w całości przy pobraniu pierwszego zdarzenia i scalane
+        jak w analyze_events (_merge_streams), więc dziennik o niemonotonicznym
+        czasie rekordów nie psuje kolejności. Zdarzenia nie trafiają do self.events.
+        Przetwarzanie w trakcie odczytu zapewnia aiter_events.
+
+        Args:
+            store: Zapisuj pełne treści i pola w magazynach analizatora
+
+        Yields:
+            Zdarzenia uporządkowane malejąco według czasu
+        """
+        streams = [list(self.iter_event_log(log_name, store=store)) for log_name in self.logs_to_check]
+        yield from self._merge_streams(streams)
+
+    def _log_done(self, log_name: str, events: int, seconds: float, source: str = 'read'):
+        """Zapisuje statystyki odczytanego dziennika i zgłasza postęp"""
+        self.stats.count('events', events)
+        self.stats.record_log(log_name, events, seconds, source)
+        self._notify('log_done', log_name=log_name, events=events, seconds=seconds, source=source)
+
+    def _finish_analysis(self):
+        """Kończy analizę wtyczek i uzupełnia statystyki przebiegu"""
+        if self.plugins:
+            with self.stats.stage('plugins'):
+                self.plugins.finish(self)
+        self.stats.count('message_store_raw_bytes', self.messages.raw_bytes)
+        self.stats.count('message_store_compressed_bytes', self.messages.compressed_bytes)
+        self.stats.count('security_findings', len(self.security_findings))
+        self.stats.count('boot_sessions', len(self.boot_sessions))
+        self.stats.finish()
+        self._notify('analysis_done', stats=self.stats)
+
+    def _analyze_events_approximate(self):
+        """
+        Analizuje dzienniki strumieniowo do szkiców o stałym rozmiarze
+
+        Detektory zagrożeń wymagają zdarzeń uporządkowanych w czasie i pól
+        z magazynu, a pamięć podręczna dokładnych podsumowań nie przyjmuje
+        szkiców, więc w tym trybie oba mechanizmy są pomijane. Pliki eksportu
+        są parsowane w całości przed zliczeniem, więc dla nich pamięć nie jest stała.
+        """
+        file_logs = self._read_files_as_logs(store=False) if self.event_files else None
+        approximate_summary = ApproximateSummary(
+            hours_back=self.hours_back,
+            logs=self.logs_to_check,
+            tracked_event_ids=SolutionDatabase.SOLUTIONS,
+            start_time=self.start_time,
+            end_time=self.end_time,
+            stratify_samples=self.stratify_samples,
+            **self.sketch_options
+        )
         for log_name in self.logs_to_check:
-            print(f"Czytam dziennik: {log_name}...")
-            log_events = self.read_event_log(log_name)
-            self.events.extend(log_events)
-            print(f"  Znaleziono {len(log_events)} zdarzeń\n")
+            self._notify('log_start', log_name=log_name)
+            start = time.perf_counter()
+            before = approximate_summary.total_events
+            if file_logs is not None:
+                log_events = file_logs.pop(log_name)
+            else:
+                log_events = self.iter_event_log(log_name, store=False)
+            if self.plugins:
+                log_events = self._tap_plugins(log_events)
+            approximate_summary.add_events(log_events)
+            self._log_done(log_name, approximate_summary.total_events - before, time.perf_counter() - start)
+        self._notify('ingestion_done', events=approximate_summary.total_events)
+
+        self.approximate_summary = approximate_summary
+        with self.stats.stage('aggregate'):
+            self._summary = approximate_summary.to_report_summary()
+        self._summary_size = len(self.events)
+
+    def detect_security_threats(self, **monitor_options) -> List:
+        """
+        Uruchamia detektory zagrożeń na zdarzeniach dziennika Security
+
+        Args:
+            **monitor_options: Parametry SecurityMonitor (window, brute_force_threshold, ...)
+
+        Returns:
+            Lista wykrytych zagrożeń (SecurityFinding)
+        """
+        monitor = SecurityMonitor(self.get_event_field, **monitor_options)
+        previous_findings = {id(finding) for finding in self.security_findings}
+        with self.stats.stage('detect'):
+            # self.events są uporządkowane od najnowszych - odwrócenie zamiast sortowania
+            security_events = (e for e in reversed(self.events) if e['log_name'] == 'Security')
+            self.security_findings = monitor.process_all(security_events)
+        if self._summary is not None:
+            # Wyniki poprzedniego przebiegu są zastępowane, zagrożenia z pamięci podręcznej pozostają
+            self._summary.security_findings = [
+                finding for finding in self._summary.security_findings if id(finding) not in previous_findings
+            ] + self.security_findings
+        return self.security_findings
+
+    def detect_boot_sessions(self, previous_sessions: List[BootSession] = ()) -> List[BootSession]:
+        """
+        Dzieli zdarzenia na sesje uruchomieniowe (od uruchomienia do wyłączenia)
+
+        Args:
+            previous_sessions: Sesje, od których oś czasu jest kontynuowana
+                               (np. z pamięci podręcznej podsumowania dziennika System)
+
+        Returns:
+            Lista sesji (BootSession) od najstarszej
+        """
+        with self.stats.stage('detect'):
+            timeline = BootTimeline(self.get_event_field, previous_sessions)
+            timeline.add_events(reversed(self.events))
+            self.boot_sessions = timeline.sessions
+        if self._summary is not None:
+            self._summary.boot_sessions = list(self.boot_sessions)
+        return self.boot_sessions
+
+    def correlate_events(self, previous: EventCorrelator = None, **correlator_options) -> EventCorrelator:
+        """
+        Liczy współwystępowanie par zdarzeń ze wszystkich dzienników w przesuwnym oknie
+
+        Args:
+            previous: Stan korelatora, od którego liczenie jest kontynuowane
+                      (zdarzenia nie nowsze niż jego ostatnie zdarzenie są pomijane)
+            correlator_options: Parametry EventCorrelator (window, max_severity, cross_log_only)
+
+        Returns:
+            Korelator z licznościami par - pary przyczyna -> skutek zwraca pairs()
+        """
+        correlator_options.setdefault('window', self.CORRELATION_WINDOW)
+        if previous is not None and previous.window == correlator_options['window']:
+            correlator = previous
+            correlator.resume()
+        else:
+            correlator = EventCorrelator(**correlator_options)
+        with self.stats.stage('correlate'):
+            correlator.add_events(reversed(self.events))
+        self.correlator = correlator
+        if self._summary is not None:
+            self._summary.correlations = correlator
+        return correlator
+
+    def build_summary(self) -> ReportSummary:
+        """
+        Buduje podsumowanie zdarzeń wspólne dla wszystkich formatów raportu
+
+        Podsumowanie jest zapamiętywane do czasu zmiany listy zdarzeń,
+        więc kolejne raporty nie przeliczają statystyk od nowa.
+
+        Returns:
+            Podsumowanie analizy
+        """
+        if self._summary is not None and self._summary_size == len(self.events):
+            return self._summary
+
+        with self.stats.stage('aggregate'):
+            summary = self._new_summary(self.logs_to_check)
+            summary.add_events(self.events)
+            self._complete_summary(summary)
+
+        self._summary = summary
+        self._summary_size = len(self.events)
+        return summary
+
+    def _complete_summary(self, summary: ReportSummary):
+        """Dołącza do podsumowania wyniki detektorów i pełne treści próbek"""
+        summary.security_findings = list(self.security_findings)
+        summary.boot_sessions = list(self.boot_sessions)
+        summary.correlations = self.correlator
+
+        # Pełne treści dekompresowane są tylko dla próbek pokazywanych w raporcie
+        self._resolve_sample_messages(summary)
+
+    def time_index(self) -> EventTimeIndex:
+        """
+        Indeks czasowy self.events (budowany ponownie tylko po zmianie listy zdarzeń)
+
+        Indeks jest związany z obiektem listy - przypisanie nowej listy do
+        self.events (także tej samej długości) lub dopisanie zdarzeń go unieważnia.
+        """
+        index = self._time_index
+        if index is None or index.events is not self.events or len(index) != len(self.events):
+            if isinstance(self.events, EventColumns):
+                self._time_index = self.events.time_index()
+            else:
+                self._time_index = EventTimeIndex(self.events)
+        return self._time_index
+
+    def events_between(self, start: datetime = None, end: datetime = None) -> List[Dict]:
+        """
+        Zwraca zdarzenia z zakresu [start, end] wyszukiwaniem binarnym - O(log n + k)
+
+        Zdarzenia z dzienników obsłużonych z pamięci podręcznej nie są dostępne.
+
+        Returns:
+            Zdarzenia od najnowszych
+        """
+        return self.time_index().range(start, end)
+
+    def summary_for_range(self, start: datetime = None, end: datetime = None) -> ReportSummary:
+        """
+        Buduje podsumowanie dla podzakresu czasowego (np. do raportu z incydentu)
+
+        Przykład:
+            summary = analyzer.summary_for_range(datetime(2025, 1, 5, 2), datetime(2025, 1, 5, 4))
+            analyzer.save_report('incydent.html', format='html', summary=summary)
+        """
+        summary = ReportSummary(hours_back=self.hours_back, logs=self.logs_to_check,
+                                start_time=start or self.time_window()[0], end_time=end,
+                                stratify_samples=self.stratify_samples)
+        events = self.events_between(start, end)
+        summary.add_events(events)
+        summary.security_findings = [
+            finding for finding in self.security_findings
+            if (start is None or finding.time >= start) and (end is None or finding.time <= end)
+        ]
+        if 'System' in self.logs_to_check:
+            timeline = BootTimeline(self.get_event_field)
+            timeline.add_events(reversed(events))
+            summary.boot_sessions = timeline.sessions
+        if self.correlator is not None:
+            summary.correlations = EventCorrelator(self.correlator.window, self.correlator.max_severity,
+                                                   self.correlator.cross_log_only)
+            summary.correlations.add_events(reversed(events))
+        self._resolve_sample_messages(summary)
+        return summary
+
+    def compare_ranges(self, baseline_start: datetime, baseline_end: datetime,
+                       current_start: datetime = None, current_end: datetime = None,
+                       **options) -> SummaryComparison:
+        """
+        Porównuje dwa podzakresy jednej analizy - dzienniki są czytane raz
+
+        Obie granice zakresów są włączne, więc zakresy sąsiadujące powinny
+        się rozłączać (np. koniec bazowego tuż przed początkiem bieżącego).
+
+        Przykład:
+            analyzer = WindowsEventAnalyzer(hours_back=336)
+            analyzer.analyze_events()
+            split = datetime.now() - timedelta(days=7)
+            comparison = analyzer.compare_ranges(None, split - timedelta(microseconds=1), split)
+            print(comparison.format_text())
 
-        # Sortuj zdarzenia według ważności i czasu
-        self.events.sort(key=lambda x: (x['severity'], x['time']), reverse=True)
+        Args:
+            options: Progi istotności przekazywane do SummaryComparison
+        """
+        return SummaryComparison(self.summary_for_range(baseline_start, baseline_end),
+                                 self.summary_for_range(current_start, current_end), **options)
+
+    def compare_with(self, baseline: ReportSummary, summary: ReportSummary = None,
+                     **options) -> SummaryComparison:
+        """
+        Porównuje analizę z podsumowaniem bazowym (np. z innego hosta lub wcześniejszego raportu JSON)
+
+        Args:
+            baseline: Podsumowanie bazowe (np. summary_compare.load_summary('raport.json'))
+            summary: Podsumowanie bieżące (domyślnie build_summary())
+            options: Progi istotności przekazywane do SummaryComparison
+        """
+        return SummaryComparison(baseline, summary or self.build_summary(), **options)
+
+    def _build_recommendations(self, summary: ReportSummary) -> List[str]:
+        """Zwraca listę rekomendacji wynikających z podsumowania"""
+        recommendations = []
+        event_id_counts = summary.event_id_counts
+
+        critical_count = summary.severity_counts.get(EventSeverity.CRITICAL, 0)
+        error_count = summary.severity_counts.get(EventSeverity.ERROR, 0)
+
+        if critical_count > 0:
+            recommendations.append(
+                f"PILNE: Wykryto {critical_count} zdarzeń krytycznych! "
+                "Należy natychmiast przejrzeć i rozwiązać te problemy."
+            )
+
+        if error_count > 10:
+            recommendations.append(
+                f"Wysoka liczba błędów ({error_count}). "
+                "Zalecane jest przeprowadzenie konserwacji systemu."
+            )
+
+        if 6008 in event_id_counts:
+            recommendations.append(
+                "Wykryto nieoczekiwane wyłączenia systemu. "
+                "Sprawdź stabilność zasilania i temperatury komponentów."
+            )
+
+        if 7 in event_id_counts or 51 in event_id_counts:
+            recommendations.append(
+                "UWAGA: Wykryto problemy z dyskiem! "
+                "NATYCHMIAST wykonaj backup danych i sprawdź stan dysku!"
+            )
 
-    def generate_report(self) -> str:
+        if 4625 in event_id_counts and event_id_counts[4625] > 5:
+            recommendations.append(
+                f"Wykryto {event_id_counts[4625]} nieudanych prób logowania. "
+                "Sprawdź logi bezpieczeństwa pod kątem potencjalnych prób włamania."
+            )
+
+        if summary.security_findings:
+            recommendations.append(
+                f"ALARM: Detektory wykryły {len(summary.security_findings)} podejrzanych wzorców logowania "
+                "(brute force / password spraying / nowe konta administratorów). "
+                "Zweryfikuj wskazane konta i adresy IP, rozważ ich zablokowanie."
+            )
+
+        return recommendations
+
+    @staticmethod
+    def _other_samples(group: Dict) -> List[Dict]:
+        """Próbki rezerwuarowe grupy problemów o treści innej niż pokazana próbka główna"""
+        shown = {group['sample']['message']}
+        samples = []
+        for sample in group['samples']:
+            if sample['message'] not in shown:
+                shown.add(sample['message'])
+                samples.append(sample)
+        return samples
+
+    @staticmethod
+    def _sample_preview(sample: Dict) -> str:
+        """Skrót treści próbki w jednym wierszu"""
+        return ' '.join(sample['message'].split())
+
+    def generate_report(self, summary: ReportSummary = None) -> str:
         """
         Generuje szczegółowy raport z analizy
 
+        Args:
+            summary: Gotowe podsumowanie (jeśli None, budowane z self.events)
+
         Returns:
             Sformatowany raport tekstowy
         """
-        if not self.events:
+        if summary is None:
+            summary = self.build_summary()
+        if not summary.total_events:
             return "Brak zdarzeń do analizy."
 
         # Statystyki
-        total_events = len(self.events)
-        severity_counts = defaultdict(int)
-        event_id_counts = defaultdict(int)
-        source_counts = defaultdict(int)
-
-        for event in self.events:
-            severity_counts[event['severity']] += 1
-            event_id_counts[event['event_id']] += 1
-            source_counts[event['source']] += 1
+        total_events = summary.total_events
+        severity_counts = summary.severity_counts
 
         # Generuj raport
         report_lines = []
@@ -505,8 +1612,8 @@ class WindowsEventAnalyzer:
         report_lines.append("RAPORT ANALIZY DZIENNIKA ZDARZEŃ WINDOWS 11")
         report_lines.append("=" * 80)
         report_lines.append(f"Data wygenerowania: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        report_lines.append(f"Okres analizy: Ostatnie {self.hours_back} godzin")
-        report_lines.append(f"Analizowane dzienniki: {', '.join(self.logs_to_check)}")
+        report_lines.append(f"Okres analizy: {summary.period_description()}")
+        report_lines.append(f"Analizowane dzienniki: {', '.join(summary.logs)}")
         report_lines.append("")
 
         # Podsumowanie statystyk
@@ -514,6 +1621,17 @@ class WindowsEventAnalyzer:
         report_lines.append("PODSUMOWANIE STATYSTYK")
         report_lines.append("-" * 80)
         report_lines.append(f"Łączna liczba zdarzeń: {total_events}")
+        if summary.approximate:
+            bounds = summary.error_bounds
+            distinct = summary.distinct_counts
+            report_lines.append(
+                f"Tryb przybliżony: liczności Event ID zawyżone co najwyżej o {bounds['event_id_count']}, "
+                f"grup o {bounds['group_count']}"
+            )
+            report_lines.append(
+                f"Różne źródła: ~{distinct['sources']}, konta: ~{distinct['accounts']}, "
+                f"komputery: ~{distinct['computers']} (błąd ok. {bounds['distinct_relative_error_pct']}%)"
+            )
         report_lines.append("")
         report_lines.append("Podział według ważności:")
         for severity in sorted(severity_counts.keys()):
@@ -527,37 +1645,33 @@ class WindowsEventAnalyzer:
         report_lines.append("-" * 80)
         report_lines.append("TOP 10 NAJCZĘSTSZYCH ZDARZEŃ (Event ID)")
         report_lines.append("-" * 80)
-        top_event_ids = sorted(event_id_counts.items(), key=lambda x: x[1], reverse=True)[:10]
-        for event_id, count in top_event_ids:
+        for event_id, count in summary.top_event_ids(10):
             solution_info = SolutionDatabase.get_solution(event_id)
             report_lines.append(f"Event ID {event_id:5} : {count:4} wystąpień - {solution_info['description']}")
         report_lines.append("")
 
         # Szczegółowa analiza zdarzeń krytycznych i błędów
-        critical_and_errors = [e for e in self.events if e['severity'] <= EventSeverity.ERROR]
+        critical_and_errors = summary.problem_groups(EventSeverity.ERROR)
 
         if critical_and_errors:
+            problem_count = sum(group['count'] for group in critical_and_errors)
             report_lines.append("-" * 80)
-            report_lines.append(f"SZCZEGÓŁOWA ANALIZA - ZDARZENIA KRYTYCZNE I BŁĘDY ({len(critical_and_errors)})")
+            report_lines.append(f"SZCZEGÓŁOWA ANALIZA - ZDARZENIA KRYTYCZNE I BŁĘDY ({problem_count})")
             report_lines.append("-" * 80)
             report_lines.append("")
 
-            # Grupuj według Event ID
-            grouped_events = defaultdict(list)
-            for event in critical_and_errors:
-                grouped_events[event['event_id']].append(event)
-
-            for event_id, event_list in sorted(grouped_events.items(), key=lambda x: len(x[1]), reverse=True):
+            for group in critical_and_errors:
+                event_id = group['event_id']
                 solution_info = SolutionDatabase.get_solution(event_id)
-                first_event = event_list[0]
+                first_event = group['sample']
 
                 report_lines.append("=" * 80)
                 report_lines.append(f"Event ID: {event_id}")
                 report_lines.append(f"Ważność: {first_event['severity_name']}")
-                report_lines.append(f"Liczba wystąpień: {len(event_list)}")
+                report_lines.append(f"Liczba wystąpień: {group['count']}")
                 report_lines.append(f"Źródło: {first_event['source']}")
                 report_lines.append(f"Dziennik: {first_event['log_name']}")
-                report_lines.append(f"Ostatnie wystąpienie: {event_list[0]['time'].strftime('%Y-%m-%d %H:%M:%S')}")
+                report_lines.append(f"Ostatnie wystąpienie: {group['last_seen'].strftime('%Y-%m-%d %H:%M:%S')}")
                 report_lines.append("")
                 report_lines.append(f"Opis problemu:")
                 report_lines.append(f"  {solution_info['description']}")
@@ -567,64 +1681,109 @@ class WindowsEventAnalyzer:
                     report_lines.append(f"  {i}. {solution}")
                 report_lines.append("")
                 report_lines.append(f"Przykładowa wiadomość zdarzenia:")
-                report_lines.append(f"  {first_event['message'][:300]}...")
+                for message_line in (first_event.get('full_message') or first_event['message']).splitlines():
+                    report_lines.append(f"  {message_line}")
+                report_lines.append("")
+                other_samples = self._other_samples(group)
+                if other_samples:
+                    report_lines.append(f"Inne przykłady (losowa próbka z {group['count']} wystąpień):")
+                    for sample in other_samples:
+                        report_lines.append(f"  {sample['time'].strftime('%Y-%m-%d %H:%M:%S')} "
+                                            f"[{sample['source']}] {self._sample_preview(sample)}")
+                    report_lines.append("")
+
+        # Ostrzeżenia
+        warning_groups = summary.counts_for_severity(EventSeverity.WARNING)
+        if warning_groups:
+            report_lines.append("-" * 80)
+            report_lines.append(f"PODSUMOWANIE OSTRZEŻEŃ ({sum(warning_groups.values())})")
+            report_lines.append("-" * 80)
+
+            for event_id, count in sorted(warning_groups.items(), key=lambda x: (-x[1], x[0]))[:15]:
+                solution_info = SolutionDatabase.get_solution(event_id)
+                report_lines.append(f"  Event ID {event_id:5} ({count:3}x) : {solution_info['description']}")
+            report_lines.append("")
+
+        # Zagrożenia bezpieczeństwa
+        security_findings = summary.security_findings
+        if security_findings:
+            report_lines.append("-" * 80)
+            report_lines.append(f"WYKRYTE ZAGROŻENIA BEZPIECZEŃSTWA ({len(security_findings)})")
+            report_lines.append("-" * 80)
+            for finding in security_findings[:self.MAX_REPORTED_FINDINGS]:
+                report_lines.append(f"  [{finding.time.strftime('%Y-%m-%d %H:%M:%S')}] {finding.name}")
+                report_lines.append(f"      {finding.description}")
+            if len(security_findings) > self.MAX_REPORTED_FINDINGS:
+                report_lines.append(f"  ... oraz {len(security_findings) - self.MAX_REPORTED_FINDINGS} kolejnych")
+            report_lines.append("")
+
+        # Sesje uruchomieniowe - indeks i szczegóły każdej sesji
+        boot_sessions = summary.boot_sessions[-self.MAX_REPORTED_SESSIONS:]
+        if boot_sessions:
+            # Sesje z wielu komputerów (scalone podsumowania) - z nazwą komputera
+            show_origin = len(summary.session_origins()) > 1
+            report_lines.append("-" * 80)
+            report_lines.append(f"SESJE URUCHOMIENIOWE ({len(summary.boot_sessions)})")
+            report_lines.append("-" * 80)
+            report_lines.append(f"  {'#':>4}  {'Uruchomienie':19}  {'Koniec':19}  {'Czas trwania':>13}  "
+                                f"{'Zakończenie':24}  {'Błędy':>6}" + ("  Komputer" if show_origin else ""))
+            for session in reversed(boot_sessions):
+                boot = session.boot_time.strftime('%Y-%m-%d %H:%M:%S') if session.boot_time else "przed okresem"
+                end = session.end.strftime('%Y-%m-%d %H:%M:%S') if session.end else "-"
+                origin = f"  {session.origin or '-'}" if show_origin else ""
+                report_lines.append(f"  {session.index:>4}  {boot:19}  {end:19}  {session.duration_text:>13}  "
+                                    f"{session.status_name:24}  {session.error_total:>6}{origin}")
+            if len(summary.boot_sessions) > len(boot_sessions):
+                report_lines.append(f"  ... oraz {len(summary.boot_sessions) - len(boot_sessions)} wcześniejszych")
+            report_lines.append("")
+
+            for session in reversed(boot_sessions):
+                origin = f" ({session.origin or '-'})" if show_origin else ""
+                report_lines.append(f"Sesja #{session.index}{origin}: {session.status_name}, "
+                                    f"{session.total_events} zdarzeń, {session.error_total} błędów")
+                if session.shutdown_initiator:
+                    shutdown_type = f" ({session.shutdown_type})" if session.shutdown_type else ""
+                    report_lines.append(f"  Wyłączenie zainicjował: {session.shutdown_initiator}{shutdown_type}")
+                if session.shutdown_reason:
+                    report_lines.append(f"  Powód: {session.shutdown_reason}")
+                if session.bugcheck:
+                    report_lines.append(f"  Błąd krytyczny: {session.bugcheck}")
+                for event_id, count in session.top_errors(5):
+                    solution_info = SolutionDatabase.get_solution(event_id)
+                    report_lines.append(f"  Event ID {event_id:5} ({count:3}x) : {solution_info['description']}")
                 report_lines.append("")
 
-        # Ostrzeżenia
-        warnings = [e for e in self.events if e['severity'] == EventSeverity.WARNING]
-        if warnings:
+        # Korelacje między zdarzeniami (przyczyna -> skutek)
+        correlations = summary.correlations
+        pairs = correlations.pairs(limit=self.MAX_REPORTED_CORRELATIONS) if correlations else []
+        if pairs:
+            window_seconds = correlations.window.total_seconds()
             report_lines.append("-" * 80)
-            report_lines.append(f"PODSUMOWANIE OSTRZEŻEŃ ({len(warnings)})")
+            report_lines.append(f"KORELACJE ZDARZEŃ - PRAWDOPODOBNE PRZYCZYNY I SKUTKI (okno {window_seconds:.0f} s)")
             report_lines.append("-" * 80)
-
-            warning_groups = defaultdict(int)
-            for event in warnings:
-                warning_groups[event['event_id']] += 1
-
-            for event_id, count in sorted(warning_groups.items(), key=lambda x: x[1], reverse=True)[:15]:
-                solution_info = SolutionDatabase.get_solution(event_id)
-                report_lines.append(f"  Event ID {event_id:5} ({count:3}x) : {solution_info['description']}")
+            for pair in pairs:
+                report_lines.append(f"  {pair.describe()}")
+                report_lines.append(f"      {SolutionDatabase.get_solution(pair.cause[1])['description']} -> "
+                                    f"{SolutionDatabase.get_solution(pair.effect[1])['description']}")
+            chains = correlations.chains(limit=5)
+            if chains:
+                report_lines.append("")
+                report_lines.append("Łańcuchy zdarzeń:")
+                for chain in chains:
+                    keys = [chain[0].cause] + [pair.effect for pair in chain]
+                    report_lines.append(f"  {' -> '.join(format_key(key) for key in keys)}")
             report_lines.append("")
 
+        # Sekcje wtyczek (tylko w raporcie z bieżącej analizy)
+        if self.plugins and summary is self._summary:
+            report_lines.extend(self.plugins.render_txt())
+
         # Rekomendacje końcowe
         report_lines.append("-" * 80)
         report_lines.append("REKOMENDACJE KOŃCOWE")
         report_lines.append("-" * 80)
 
-        recommendations = []
-
-        critical_count = severity_counts.get(EventSeverity.CRITICAL, 0)
-        error_count = severity_counts.get(EventSeverity.ERROR, 0)
-
-        if critical_count > 0:
-            recommendations.append(
-                f"[!] PILNE: Wykryto {critical_count} zdarzeń krytycznych! "
-                "Należy natychmiast przejrzeć i rozwiązać te problemy."
-            )
-
-        if error_count > 10:
-            recommendations.append(
-                f"[!] Wysoka liczba błędów ({error_count}). "
-                "Zalecane jest przeprowadzenie konserwacji systemu."
-            )
-
-        if 6008 in event_id_counts:
-            recommendations.append(
-                "[!] Wykryto nieoczekiwane wyłączenia systemu. "
-                "Sprawdź stabilność zasilania i temperatury komponentów."
-            )
-
-        if 7 in event_id_counts or 51 in event_id_counts:
-            recommendations.append(
-                "[!] UWAGA: Wykryto problemy z dyskiem! "
-                "NATYCHMIAST wykonaj backup danych i sprawdź stan dysku!"
-            )
-
-        if 4625 in event_id_counts and event_id_counts[4625] > 5:
-            recommendations.append(
-                f"[!] Wykryto {event_id_counts[4625]} nieudanych prób logowania. "
-                "Sprawdź logi bezpieczeństwa pod kątem potencjalnych prób włamania."
-            )
+        recommendations = [f"[!] {rec}" for rec in self._build_recommendations(summary)]
 
         if not recommendations:
             recommendations.append(
@@ -650,26 +1809,24 @@ class WindowsEventAnalyzer:
 
         return "\n".join(report_lines)
 
-    def generate_html_report(self) -> str:
+    def generate_html_report(self, summary: ReportSummary = None) -> str:
         """
         Generuje szczegółowy raport w formacie HTML
 
+        Args:
+            summary: Gotowe podsumowanie (jeśli None, budowane z self.events)
+
         Returns:
             Sformatowany raport HTML
         """
-        if not self.events:
+        if summary is None:
+            summary = self.build_summary()
+        if not summary.total_events:
             return "<html><body><h1>Brak zdarzeń do analizy.</h1></body></html>"
 
         # Statystyki
-        total_events = len(self.events)
-        severity_counts = defaultdict(int)
-        event_id_counts = defaultdict(int)
-        source_counts = defaultdict(int)
-
-        for event in self.events:
-            severity_counts[event['severity']] += 1
-            event_id_counts[event['event_id']] += 1
-            source_counts[event['source']] += 1
+        total_events = summary.total_events
+        severity_counts = summary.severity_counts
 
         # Kolory dla poziomów ważności
         severity_colors = {
@@ -988,6 +2145,50 @@ class WindowsEventAnalyzer:
             margin-top: 30px;
         }
 
+        .timeline-chart {
+            margin-bottom: 30px;
+        }
+
+        .timeline-chart h3 {
+            margin-bottom: 10px;
+        }
+
+        .chart-svg {
+            width: 100%;
+            height: auto;
+            display: block;
+        }
+
+        .chart-axis {
+            font-size: 11px;
+            fill: #6c757d;
+        }
+
+        .chart-tip {
+            min-height: 1.4em;
+            font-size: 0.85em;
+            color: #495057;
+        }
+
+        .chart-legend span {
+            display: inline-block;
+            margin-right: 18px;
+            cursor: pointer;
+            font-size: 0.9em;
+        }
+
+        .chart-legend span.hidden {
+            opacity: 0.4;
+        }
+
+        .chart-legend i {
+            display: inline-block;
+            width: 12px;
+            height: 12px;
+            margin-right: 6px;
+            border-radius: 2px;
+        }
+
         .badge {
             display: inline-block;
             padding: 4px 10px;
@@ -1015,8 +2216,8 @@ class WindowsEventAnalyzer:
 
         html.append(f"""
                 <p>Data wygenerowania: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>
-                <p>Okres analizy: Ostatnie {self.hours_back} godzin</p>
-                <p>Analizowane dzienniki: {', '.join(self.logs_to_check)}</p>
+                <p>Okres analizy: {summary.period_description()}</p>
+                <p>Analizowane dzienniki: {', '.join(summary.logs)}</p>
             </div>
         </div>
 
@@ -1046,6 +2247,17 @@ class WindowsEventAnalyzer:
         html.append("""
                 </div>""")
 
+        if summary.approximate:
+            bounds = summary.error_bounds
+            distinct = summary.distinct_counts
+            html.append(f"""
+                <p style="margin-bottom: 20px; color: #666;">
+                    Tryb przybliżony: liczności Event ID zawyżone co najwyżej o {bounds['event_id_count']},
+                    grup o {bounds['group_count']}. Różne źródła: ~{distinct['sources']:,},
+                    konta: ~{distinct['accounts']:,}, komputery: ~{distinct['computers']:,}
+                    (błąd ok. {bounds['distinct_relative_error_pct']}%).
+                </p>""")
+
         # Podział według ważności
         html.append("""
                 <div class="severity-breakdown">
@@ -1072,6 +2284,34 @@ class WindowsEventAnalyzer:
                 </div>
             </div>""")
 
+        # Oś czasu - serie zredukowane do MAX_CHART_POINTS punktów, rysowane w przeglądarce
+        timeline = summary.timeline
+        chart_palette = ('#667eea', '#dc3545', '#fd7e14', '#28a745', '#17a2b8', '#6f42c1', '#e83e8c')
+        # W trybie przybliżonym oś czasu nie ma serii Event ID - wykres jest pomijany
+        chart_event_ids = [event_id for event_id, _ in summary.top_event_ids(self.CHART_EVENT_IDS)
+                           if event_id in timeline.event_id_counts]
+        charts = chart_data(timeline, [
+            ("Zdarzenia według ważności",
+             [(EventSeverity.NAMES[severity], severity_colors[severity], counts)
+              for severity, counts in sorted(timeline.severity_counts.items())]),
+            (f"Top {self.CHART_EVENT_IDS} Event ID",
+             [(f"Event ID {event_id}", chart_palette[index % len(chart_palette)], timeline.event_id_counts[event_id])
+              for index, event_id in enumerate(chart_event_ids)]),
+        ], self.MAX_CHART_POINTS)
+        if charts is not None:
+            # Szerokość przedziału wykresu rośnie z długością okresu
+            step_minutes = charts['step'] // 60
+            step = f"{step_minutes // 60} h" if step_minutes % 60 == 0 else f"{step_minutes} min"
+            html.append(f"""
+            <div class="section">
+                <h2 class="section-title">📈 Oś Czasu (przedziały {step})</h2>""")
+            for index, chart in enumerate(charts['charts']):
+                html.append(f"""
+                <div class="timeline-chart" data-chart="{index}"><h3>{chart['title']}</h3></div>""")
+            html.append("""
+                <noscript>Wykresy wymagają włączonego JavaScript.</noscript>
+            </div>""")
+
         # Top 10 Event ID
         html.append("""
             <div class="section">
@@ -1086,8 +2326,7 @@ class WindowsEventAnalyzer:
                     </thead>
                     <tbody>""")
 
-        top_event_ids = sorted(event_id_counts.items(), key=lambda x: x[1], reverse=True)[:10]
-        for event_id, count in top_event_ids:
+        for event_id, count in summary.top_event_ids(10):
             solution_info = SolutionDatabase.get_solution(event_id)
             html.append(f"""
                         <tr>
@@ -1102,21 +2341,18 @@ class WindowsEventAnalyzer:
             </div>""")
 
         # Szczegółowa analiza błędów krytycznych
-        critical_and_errors = [e for e in self.events if e['severity'] <= EventSeverity.ERROR]
+        critical_and_errors = summary.problem_groups(EventSeverity.ERROR)
 
         if critical_and_errors:
+            problem_count = sum(group['count'] for group in critical_and_errors)
             html.append(f"""
             <div class="section">
-                <h2 class="section-title">🚨 Szczegółowa Analiza - Zdarzenia Krytyczne i Błędy ({len(critical_and_errors)})</h2>""")
-
-            # Grupuj według Event ID
-            grouped_events = defaultdict(list)
-            for event in critical_and_errors:
-                grouped_events[event['event_id']].append(event)
+                <h2 class="section-title">🚨 Szczegółowa Analiza - Zdarzenia Krytyczne i Błędy ({problem_count})</h2>""")
 
-            for event_id, event_list in sorted(grouped_events.items(), key=lambda x: len(x[1]), reverse=True):
+            for group in critical_and_errors:
+                event_id = group['event_id']
                 solution_info = SolutionDatabase.get_solution(event_id)
-                first_event = event_list[0]
+                first_event = group['sample']
 
                 severity_class = 'critical' if first_event['severity'] == EventSeverity.CRITICAL else 'error'
                 severity_color = severity_colors[first_event['severity']]
@@ -1133,7 +2369,7 @@ class WindowsEventAnalyzer:
                     <div class="event-info">
                         <div class="info-item">
                             <div class="info-label">Liczba wystąpień</div>
-                            <div class="info-value">{len(event_list)}</div>
+                            <div class="info-value">{group['count']}</div>
                         </div>
                         <div class="info-item">
                             <div class="info-label">Źródło</div>
@@ -1145,7 +2381,7 @@ class WindowsEventAnalyzer:
                         </div>
                         <div class="info-item">
                             <div class="info-label">Ostatnie wystąpienie</div>
-                            <div class="info-value">{event_list[0]['time'].strftime('%Y-%m-%d %H:%M:%S')}</div>
+                            <div class="info-value">{group['last_seen'].strftime('%Y-%m-%d %H:%M:%S')}</div>
                         </div>
                     </div>
 
@@ -1169,20 +2405,36 @@ class WindowsEventAnalyzer:
                         <summary style="cursor: pointer; color: #667eea; font-weight: bold;">
                             Przykładowa wiadomość zdarzenia
                         </summary>
-                        <div style="margin-top: 10px; padding: 10px; background: #f8f9fa; border-radius: 5px; font-family: monospace; font-size: 0.9em;">
-                            {first_event['message'][:500]}...
+                        <div style="margin-top: 10px; padding: 10px; background: #f8f9fa; border-radius: 5px; font-family: monospace; font-size: 0.9em; white-space: pre-wrap;">
+                            {html_escape(first_event.get('full_message') or first_event['message'])}
                         </div>
-                    </details>
-                </div>""")
+                    </details>""")
+
+                other_samples = self._other_samples(group)
+                if other_samples:
+                    html.append(f"""
+                    <details style="margin-top: 10px;">
+                        <summary style="cursor: pointer; color: #667eea; font-weight: bold;">
+                            Inne przykłady (losowa próbka z {group['count']} wystąpień)
+                        </summary>
+                        <ul style="margin-top: 10px; font-family: monospace; font-size: 0.9em;">""")
+                    for sample in other_samples:
+                        html.append(f"<li>{sample['time'].strftime('%Y-%m-%d %H:%M:%S')} "
+                                    f"[{html_escape(sample['source'])}] {html_escape(self._sample_preview(sample))}</li>")
+                    html.append("""
+                        </ul>
+                    </details>""")
+
+                html.append("</div>")
 
             html.append("</div>")
 
         # Ostrzeżenia
-        warnings = [e for e in self.events if e['severity'] == EventSeverity.WARNING]
-        if warnings:
+        warning_groups = summary.counts_for_severity(EventSeverity.WARNING)
+        if warning_groups:
             html.append(f"""
             <div class="section">
-                <h2 class="section-title">⚠️ Podsumowanie Ostrzeżeń ({len(warnings)})</h2>
+                <h2 class="section-title">⚠️ Podsumowanie Ostrzeżeń ({sum(warning_groups.values())})</h2>
                 <table class="event-table">
                     <thead>
                         <tr>
@@ -1193,11 +2445,7 @@ class WindowsEventAnalyzer:
                     </thead>
                     <tbody>""")
 
-            warning_groups = defaultdict(int)
-            for event in warnings:
-                warning_groups[event['event_id']] += 1
-
-            for event_id, count in sorted(warning_groups.items(), key=lambda x: x[1], reverse=True)[:15]:
+            for event_id, count in sorted(warning_groups.items(), key=lambda x: (-x[1], x[0]))[:15]:
                 solution_info = SolutionDatabase.get_solution(event_id)
                 html.append(f"""
                         <tr>
@@ -1211,40 +2459,190 @@ class WindowsEventAnalyzer:
                 </table>
             </div>""")
 
-        # Rekomendacje końcowe
-        recommendations = []
-        critical_count = severity_counts.get(EventSeverity.CRITICAL, 0)
-        error_count = severity_counts.get(EventSeverity.ERROR, 0)
+        # Zagrożenia bezpieczeństwa
+        security_findings = summary.security_findings
+        if security_findings:
+            html.append(f"""
+            <div class="section">
+                <h2 class="section-title">🛡️ Wykryte Zagrożenia Bezpieczeństwa ({len(security_findings)})</h2>
+                <table class="event-table">
+                    <thead>
+                        <tr>
+                            <th>Czas</th>
+                            <th>Zagrożenie</th>
+                            <th>Szczegóły</th>
+                        </tr>
+                    </thead>
+                    <tbody>""")
 
-        if critical_count > 0:
-            recommendations.append(
-                f"PILNE: Wykryto {critical_count} zdarzeń krytycznych! "
-                "Należy natychmiast przejrzeć i rozwiązać te problemy."
-            )
+            for finding in security_findings[:self.MAX_REPORTED_FINDINGS]:
+                html.append(f"""
+                        <tr>
+                            <td>{finding.time.strftime('%Y-%m-%d %H:%M:%S')}</td>
+                            <td><strong>{finding.name}</strong></td>
+                            <td>{finding.description}</td>
+                        </tr>""")
 
-        if error_count > 10:
-            recommendations.append(
-                f"Wysoka liczba błędów ({error_count}). "
-                "Zalecane jest przeprowadzenie konserwacji systemu."
-            )
+            html.append("""
+                    </tbody>
+                </table>
+            </div>""")
 
-        if 6008 in event_id_counts:
-            recommendations.append(
-                "Wykryto nieoczekiwane wyłączenia systemu. "
-                "Sprawdź stabilność zasilania i temperatury komponentów."
-            )
+        # Sesje uruchomieniowe - indeks z odnośnikami do kart sesji
+        boot_sessions = summary.boot_sessions[-self.MAX_REPORTED_SESSIONS:]
+        if boot_sessions:
+            session_colors = {
+                BootSession.CLEAN: '#28a745',
+                BootSession.UNEXPECTED: '#fd7e14',
+                BootSession.BSOD: '#dc3545',
+                BootSession.ONGOING: '#667eea',
+                BootSession.UNKNOWN: '#6c757d',
+            }
+            session_classes = {BootSession.BSOD: 'critical', BootSession.UNEXPECTED: 'error'}
+            show_origin = len(summary.session_origins()) > 1
+            origin_header = "<th>Komputer</th>" if show_origin else ""
 
-        if 7 in event_id_counts or 51 in event_id_counts:
-            recommendations.append(
-                "UWAGA: Wykryto problemy z dyskiem! "
-                "NATYCHMIAST wykonaj backup danych i sprawdź stan dysku!"
-            )
+            html.append(f"""
+            <div class="section">
+                <h2 class="section-title">🔄 Sesje Uruchomieniowe ({len(summary.boot_sessions)})</h2>
+                <table class="event-table">
+                    <thead>
+                        <tr>
+                            <th>Sesja</th>
+                            <th>Uruchomienie</th>
+                            <th>Koniec</th>
+                            <th>Czas trwania</th>
+                            <th>Zakończenie</th>
+                            <th>Błędy</th>{origin_header}
+                        </tr>
+                    </thead>
+                    <tbody>""")
 
-        if 4625 in event_id_counts and event_id_counts[4625] > 5:
-            recommendations.append(
-                f"Wykryto {event_id_counts[4625]} nieudanych prób logowania. "
-                "Sprawdź logi bezpieczeństwa pod kątem potencjalnych prób włamania."
-            )
+            for session in reversed(boot_sessions):
+                boot = session.boot_time.strftime('%Y-%m-%d %H:%M:%S') if session.boot_time else "przed okresem"
+                end = session.end.strftime('%Y-%m-%d %H:%M:%S') if session.end else "-"
+                origin_cell = f"<td>{html_escape(session.origin or '-')}</td>" if show_origin else ""
+                html.append(f"""
+                        <tr>
+                            <td><a href="#sesja-{session.index}"><strong>#{session.index}</strong></a></td>
+                            <td>{boot}</td>
+                            <td>{end}</td>
+                            <td>{session.duration_text}</td>
+                            <td><span class="badge" style="background-color: {session_colors[session.status]}; color: white;">{session.status_name}</span></td>
+                            <td>{session.error_total}</td>{origin_cell}
+                        </tr>""")
+
+            html.append("""
+                    </tbody>
+                </table>""")
+
+            for session in reversed(boot_sessions):
+                details = []
+                if session.shutdown_initiator:
+                    shutdown_type = f" ({html_escape(session.shutdown_type)})" if session.shutdown_type else ""
+                    details.append(f"Wyłączenie zainicjował: {html_escape(session.shutdown_initiator)}{shutdown_type}")
+                if session.shutdown_reason:
+                    details.append(f"Powód: {html_escape(session.shutdown_reason)}")
+                if session.bugcheck:
+                    details.append(f"Błąd krytyczny: {html_escape(session.bugcheck)}")
+                details_html = "<br>".join(details)
+                origin_title = f" ({html_escape(session.origin or '-')})" if show_origin else ""
+
+                html.append(f"""
+                <div class="event-card {session_classes.get(session.status, '')}" id="sesja-{session.index}">
+                    <div class="event-header">
+                        <div class="event-id">Sesja #{session.index}{origin_title}</div>
+                        <div class="event-badge" style="background-color: {session_colors[session.status]};">
+                            {session.status_name}
+                        </div>
+                    </div>
+
+                    <div class="event-info">
+                        <div class="info-item">
+                            <div class="info-label">Czas trwania</div>
+                            <div class="info-value">{session.duration_text}</div>
+                        </div>
+                        <div class="info-item">
+                            <div class="info-label">Zdarzenia</div>
+                            <div class="info-value">{session.total_events:,}</div>
+                        </div>
+                        <div class="info-item">
+                            <div class="info-label">Błędy i zdarzenia krytyczne</div>
+                            <div class="info-value">{session.error_total:,}</div>
+                        </div>
+                    </div>""")
+                if details_html:
+                    html.append(f"""
+                    <div class="problem-description">{details_html}</div>""")
+                if session.error_counts:
+                    html.append("""
+                    <ul>""")
+                    for event_id, count in session.top_errors(5):
+                        solution_info = SolutionDatabase.get_solution(event_id)
+                        html.append(f"<li><strong>Event ID {event_id}</strong> ({count}x) - {solution_info['description']}</li>")
+                    html.append("""
+                    </ul>""")
+                html.append("""
+                </div>""")
+
+            html.append("""
+            </div>""")
+
+        # Korelacje między zdarzeniami (przyczyna -> skutek)
+        correlations = summary.correlations
+        pairs = correlations.pairs(limit=self.MAX_REPORTED_CORRELATIONS) if correlations else []
+        if pairs:
+            html.append(f"""
+            <div class="section">
+                <h2 class="section-title">🔗 Korelacje Zdarzeń (okno {correlations.window.total_seconds():.0f} s)</h2>
+                <table class="event-table">
+                    <thead>
+                        <tr>
+                            <th>Przyczyna</th>
+                            <th>Skutek</th>
+                            <th>Wystąpienia</th>
+                            <th>Pewność</th>
+                            <th>Lift</th>
+                            <th>Średnie opóźnienie</th>
+                        </tr>
+                    </thead>
+                    <tbody>""")
+
+            for pair in pairs:
+                html.append(f"""
+                        <tr>
+                            <td><strong>{html_escape(format_key(pair.cause))}</strong><br>{SolutionDatabase.get_solution(pair.cause[1])['description']}</td>
+                            <td><strong>{html_escape(format_key(pair.effect))}</strong><br>{SolutionDatabase.get_solution(pair.effect[1])['description']}</td>
+                            <td>{pair.support}</td>
+                            <td>{pair.confidence * 100:.0f}%</td>
+                            <td>{pair.lift:.1f}</td>
+                            <td>{pair.mean_delay:.1f} s</td>
+                        </tr>""")
+
+            html.append("""
+                    </tbody>
+                </table>""")
+
+            chains = correlations.chains(limit=5)
+            if chains:
+                html.append("""
+                <h3 style="margin-top: 20px;">Łańcuchy zdarzeń</h3>
+                <ul>""")
+                for chain in chains:
+                    keys = [chain[0].cause] + [pair.effect for pair in chain]
+                    html.append(f"<li>{html_escape(' → '.join(format_key(key) for key in keys))}</li>")
+                html.append("""
+                </ul>""")
+
+            html.append("""
+            </div>""")
+
+        # Sekcje wtyczek (tylko w raporcie z bieżącej analizy)
+        if self.plugins and summary is self._summary:
+            html.append(self.plugins.render_html())
+
+        # Rekomendacje końcowe
+        recommendations = self._build_recommendations(summary)
 
         rec_class = "success" if not recommendations else ""
         html.append(f"""
@@ -1276,56 +2674,369 @@ class WindowsEventAnalyzer:
             <p>Raport wygenerowany przez <strong>Windows Event Analyzer</strong></p>
             <p>© 2025 Claude Code - Analizator Dziennika Zdarzeń Windows 11</p>
         </div>
-    </div>
+    </div>""")
+        if charts is not None:
+            html.append(chart_scripts(charts))
+        html.append("""
 </body>
 </html>""")
 
         return "\n".join(html)
 
-    def save_report(self, filename: str = None, format: str = 'txt'):
+    def generate_json_report(self, summary: ReportSummary = None) -> str:
+        """
+        Generuje raport w formacie JSON (do przetwarzania automatycznego)
+
+        Args:
+            summary: Gotowe podsumowanie (jeśli None, budowane z self.events)
+
+        Returns:
+            Raport jako tekst JSON
+        """
+        if summary is None:
+            summary = self.build_summary()
+
+        report = summary.to_dict()
+        # Oś czasu (tysiące przedziałów) służy wykresom HTML - raport JSON pozostaje zwięzły
+        del report['timeline']
+        report['descriptions'] = {
+            str(event_id): SolutionDatabase.get_solution(event_id)['description']
+            for event_id in summary.event_id_counts
+        }
+        report['recommendations'] = self._build_recommendations(summary)
+        if summary.correlations is not None:
+            report['correlations'] = [pair.to_dict() for pair in summary.correlations.pairs()]
+        return json.dumps(report, ensure_ascii=False, indent=2)
+
+    def generate_csv_report(self, summary: ReportSummary = None) -> str:
+        """
+        Generuje raport CSV - jeden wiersz na grupę (Event ID, ważność)
+
+        Args:
+            summary: Gotowe podsumowanie (jeśli None, budowane z self.events)
+
+        Returns:
+            Raport jako tekst CSV
+        """
+        if summary is None:
+            summary = self.build_summary()
+
+        output = io.StringIO()
+        writer = csv.writer(output)
+        writer.writerow(['event_id', 'severity', 'count', 'source', 'log_name',
+                         'first_seen', 'last_seen', 'description'])
+        for group in sorted(summary.groups.values(), key=lambda g: (g.severity, -g.count)):
+            sample = group.sample or {}
+            writer.writerow([
+                group.event_id,
+                EventSeverity.NAMES[group.severity],
+                group.count,
+                sample.get('source', ''),
+                sample.get('log_name', ''),
+                group.first_seen.strftime('%Y-%m-%d %H:%M:%S'),
+                group.last_seen.strftime('%Y-%m-%d %H:%M:%S'),
+                SolutionDatabase.get_solution(group.event_id)['description'],
+            ])
+        return output.getvalue()
+
+    # Obsługiwane formaty raportów: format -> (metoda generująca, rozszerzenie pliku)
+    REPORT_FORMATS = {
+        'txt': ('generate_report', 'txt'),
+        'html': ('generate_html_report', 'html'),
+        'json': ('generate_json_report', 'json'),
+        'csv': ('generate_csv_report', 'csv'),
+    }
+
+    @staticmethod
+    def _write_atomic(filename: str, content: str):
+        """Zapisuje plik atomowo (plik tymczasowy w tym samym katalogu + podmiana)"""
+        temp_path = f"{filename}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(temp_path, 'x', encoding='utf-8', newline='') as f:
+                f.write(content)
+            os.replace(temp_path, filename)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def _render_and_write(self, report_format: str, filename: str, summary: ReportSummary) -> str:
+        """Renderuje jeden format z gotowego podsumowania i zapisuje go do pliku"""
+        method_name, _ = self.REPORT_FORMATS[report_format]
+        with self.stats.stage('render'):
+            report = getattr(self, method_name)(summary)
+        with self.stats.stage('write'):
+            self._write_atomic(filename, report)
+        self.stats.count('report_bytes', len(report.encode('utf-8')))
+        return filename
+
+    def save_report(self, filename: str = None, format: Union[str, List[str]] = 'txt',
+                    with_stats: bool = False, summary: ReportSummary = None):
         """
         Zapisuje raport do pliku
 
         Args:
-            filename: Nazwa pliku (jeśli None, generuje automatycznie)
-            format: Format raportu - 'txt' lub 'html' (domyślnie 'txt')
+            filename: Nazwa pliku (jeśli None, generuje automatycznie). Dla listy
+                      formatów rozszerzenie jest zastępowane rozszerzeniem formatu.
+            format: Format raportu - 'txt', 'html', 'json', 'csv' lub lista formatów
+                    (domyślnie 'txt'). Wiele formatów jest renderowanych z jednego
+                    wspólnego podsumowania w osobnych wątkach - renderowanie jest
+                    ograniczone przez GIL, więc wątki nakładają jedynie zapis plików;
+                    zysk daje głównie wspólne podsumowanie liczone raz.
+            with_stats: Zapisz obok raportu statystyki przebiegu ({nazwa}.stats.json)
+            summary: Gotowe podsumowanie (np. z summary_for_range); domyślnie build_summary()
+
+        Returns:
+            Nazwa zapisanego pliku (lub lista nazw dla listy formatów),
+            None w przypadku błędu
+
+        Raises:
+            ValueError: Nieznany format raportu
         """
-        if filename is None:
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            extension = 'html' if format == 'html' else 'txt'
-            filename = f"event_log_report_{timestamp}.{extension}"
+        formats = [format] if isinstance(format, str) else list(format)
+        unknown = [f for f in formats if f not in self.REPORT_FORMATS]
+        if unknown:
+            raise ValueError(f"Nieznany format raportu: {', '.join(map(str, unknown))} "
+                             f"(dostępne: {', '.join(self.REPORT_FORMATS)})")
 
-        # Wybierz odpowiedni generator
-        if format == 'html':
-            report = self.generate_html_report()
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        if filename is None:
+            base_name = f"event_log_report_{timestamp}"
         else:
-            report = self.generate_report()
+            base_name = os.path.splitext(filename)[0]
+
+        filenames = {}
+        for report_format in formats:
+            if filename is not None and len(formats) == 1:
+                filenames[report_format] = filename
+            else:
+                filenames[report_format] = f"{base_name}.{self.REPORT_FORMATS[report_format][1]}"
+
+        # Wspólne podsumowanie dla wszystkich formatów
+        if summary is None:
+            summary = self.build_summary()
 
         try:
-            with open(filename, 'w', encoding='utf-8') as f:
-                f.write(report)
-            print(f"\nRaport zapisany do pliku: {filename}")
+            if self.parallel_render and len(filenames) > 1:
+                with ThreadPoolExecutor(max_workers=len(filenames)) as executor:
+                    futures = [
+                        executor.submit(self._render_and_write, report_format, report_filename, summary)
+                        for report_format, report_filename in filenames.items()
+                    ]
+                    saved = [future.result() for future in futures]
+            else:
+                saved = [
+                    self._render_and_write(report_format, report_filename, summary)
+                    for report_format, report_filename in filenames.items()
+                ]
+            if with_stats:
+                self._write_atomic(f"{base_name}.stats.json", self.stats.to_json())
+        except Exception as e:
+            print(f"Błąd podczas zapisu raportu: {str(e)}")
+            return None
+
+        for report_format, report_filename in filenames.items():
+            self._notify('report_saved', format=report_format, filename=report_filename)
+            print(f"\nRaport zapisany do pliku: {report_filename}")
 
             # Jeśli HTML, pokaż informację o otwieraniu w przeglądarce
-            if format == 'html':
+            if report_format == 'html':
                 print(f"Otwórz plik w przeglądarce aby zobaczyć raport.")
-                import os
-                abs_path = os.path.abspath(filename)
+                abs_path = os.path.abspath(report_filename)
                 print(f"Pełna ścieżka: {abs_path}")
 
-            return filename
-        except Exception as e:
-            print(f"Błąd podczas zapisu raportu: {str(e)}")
-            return None
+        if isinstance(format, str):
+            return saved[0]
+        return saved
+
+    def save_snapshot(self, filename: str, codec: str = None) -> str:
+        """
+        Zapisuje przeanalizowane zdarzenia do migawki (event_snapshot)
+
+        Migawka zawiera kolumny zdarzeń, magazyny treści i pól oraz gotowe
+        podsumowanie, więc po wczytaniu (load_snapshot) raporty powstają
+        bez ponownego odczytu dzienników i bez przeliczania statystyk.
+
+        Args:
+            filename: Nazwa pliku migawki (np. analiza.weas)
+            codec: Kompresja bloków: 'zstd', 'zlib' lub 'none' (None - zstd, jeśli dostępny)
+
+        Returns:
+            Nazwa zapisanego pliku
+        """
+        summary = self.build_summary()
+        with self.stats.stage('snapshot'):
+            size = write_snapshot(filename, self.events, self.messages, self.fields, summary,
+                                  hours_back=self.hours_back, start_time=self.start_time,
+                                  end_time=self.end_time, logs=self.logs_to_check,
+                                  newest_records=self.newest_records, codec=codec)
+        self.stats.count('snapshot_bytes', size)
+        self._notify('snapshot_saved', filename=filename, events=len(self.events), bytes=size)
+        return filename
+
+    @classmethod
+    def load_snapshot(cls, filename: str, memory_map: bool = False,
+                      progress: Optional[ProgressCallback] = console_progress) -> 'WindowsEventAnalyzer':
+        """
+        Tworzy analizator z migawki zapisanej przez save_snapshot
+
+        Zdarzenia są odtwarzane z kolumn dopiero przy dostępie, a podsumowanie
+        z migawki jest od razu gotowe dla generate_report i generate_html_report.
+        Zakres podrzędny (summary_for_range) i ponowne wykrywanie zagrożeń
+        działają na wczytanych zdarzeniach jak po analyze_events.
+
+        Przykład:
+            analyzer = WindowsEventAnalyzer.load_snapshot('analiza.weas', memory_map=True)
+            analyzer.save_report('raport.html', format='html')
+
+        Args:
+            filename: Nazwa pliku migawki
+            memory_map: Odwzoruj plik w pamięci zamiast go czytać (read_snapshot)
+            progress: Wywołanie zwrotne postępu (jak w konstruktorze)
+
+        Returns:
+            Analizator z wczytanymi zdarzeniami
+        """
+        stats = RunStats()
+        with stats.stage('snapshot'):
+            snapshot = read_snapshot(filename, memory_map=memory_map)
+        analyzer = cls(hours_back=snapshot.hours_back, progress=progress,
+                       start_time=snapshot.start_time, end_time=snapshot.end_time)
+        analyzer.stats = stats
+        analyzer.logs_to_check = snapshot.logs
+        analyzer.newest_records = snapshot.newest_records
+        analyzer.events = snapshot.events
+        analyzer.messages = snapshot.messages
+        analyzer.fields = snapshot.fields
+        summary = snapshot.summary
+        analyzer.security_findings = list(summary.security_findings)
+        analyzer.boot_sessions = list(summary.boot_sessions)
+        analyzer.correlator = summary.correlations
+        analyzer._summary = summary
+        analyzer._summary_size = len(snapshot.events)
+        stats.count('events', len(snapshot.events))
+        stats.finish()
+        analyzer._notify('snapshot_loaded', filename=filename, events=len(snapshot.events))
+        return analyzer
+
+
+def parse_datetime(text: str) -> datetime:
+    """Parsuje datę w formacie RRRR-MM-DD [GG:MM[:SS]]"""
+    text = text.strip()
+    for date_format in ('%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M', '%Y-%m-%d'):
+        try:
+            return datetime.strptime(text, date_format)
+        except ValueError:
+            continue
+    raise ValueError(f"Nieprawidłowa data: {text}")
 
 
-def main():
+def main(argv: List[str] = None):
     """Główna funkcja programu"""
+    parser = argparse.ArgumentParser(description="Analizator dziennika zdarzeń Windows 11")
+    parser.add_argument('--profile', action='store_true',
+                        help="Profiluj odczyt, analizę i renderowanie (cProfile, tracemalloc, flamegraph); "
+                             "dzienniki są wtedy czytane bez wyprzedzenia (read_ahead=0), a formaty "
+                             "raportu renderowane po kolei (parallel_render=False)")
+    parser.add_argument('--start', type=parse_datetime,
+                        help="Początek zakresu analizy, np. \"2025-01-05 02:00\"")
+    parser.add_argument('--end', type=parse_datetime,
+                        help="Koniec zakresu analizy (domyślnie teraz, wymaga --start)")
+    parser.add_argument('--compare', metavar='PLIK',
+                        help="Porównaj z raportem JSON (np. z poprzedniego tygodnia lub innego komputera)")
+    parser.add_argument('--compare-previous', action='store_true',
+                        help="Porównaj z poprzednim okresem tej samej długości (jeden odczyt dzienników)")
+    parser.add_argument('--export', metavar='KATALOG',
+                        help="Eksportuj zdarzenia i tabele podsumowania do katalogu "
+                             "(partycje host/data, wymaga pakietu pyarrow)")
+    parser.add_argument('--export-format', choices=list(EXPORT_FORMATS), default='parquet',
+                        help="Format eksportu: parquet (domyślnie) lub arrow (Arrow IPC)")
+    parser.add_argument('--input', nargs='+', metavar='PLIK',
+                        help="Analizuj pliki eksportu zamiast dzienników systemu "
+                             "(wevtutil qe /f:xml, CSV z Podglądu zdarzeń lub Export-Csv)")
+    parser.add_argument('--workers', type=int, metavar='N',
+                        help="Liczba procesów parsujących pliki eksportu (domyślnie liczba rdzeni)")
+    parser.add_argument('--save-snapshot', metavar='PLIK',
+                        help="Zapisz przeanalizowane zdarzenia do migawki (szybkie ponowne wczytanie)")
+    parser.add_argument('--snapshot', metavar='PLIK',
+                        help="Wczytaj zdarzenia z migawki zamiast analizować dzienniki")
+    parser.add_argument('--plugin', action='append', choices=list(BUILTIN_PLUGINS), default=[],
+                        help="Dodaj sekcję wbudowanej wtyczki do raportu (można podać wielokrotnie)")
+    parser.add_argument('--save-summary', metavar='PLIK',
+                        help="Zapisz częściowe podsumowanie do scalenia z innymi (--merge)")
+    parser.add_argument('--merge', nargs='+', metavar='PLIK',
+                        help="Scal częściowe podsumowania (--save-summary, raporty JSON) w jeden raport "
+                             "bez analizy dzienników")
+    parser.add_argument('--shards', type=int, metavar='N',
+                        help="Podziel pliki --input na N części analizowanych w osobnych procesach")
+    parser.add_argument('--drop-dir', metavar='KATALOG',
+                        help="Rozdziel części plików --input między węzły (--worker) przez katalog współdzielony")
+    parser.add_argument('--worker', metavar='KATALOG',
+                        help="Działaj jako węzeł analizy rozproszonej - wykonuj zadania z katalogu")
+    parser.add_argument('--drop-timeout', type=float, metavar='SEKUNDY',
+                        help="Maksymalny czas oczekiwania na wyniki węzłów (--drop-dir)")
+    parser.add_argument('--serve', type=int, metavar='PORT',
+                        help="Uruchom lokalny serwer zapytań HTTP/JSON zamiast raportu w konsoli")
+    parser.add_argument('--serve-refresh', type=float, metavar='SEKUNDY',
+                        help="Co ile sekund serwer zapytań ponawia odczyt dzienników")
+    parser.add_argument('--metrics-port', type=int, metavar='PORT',
+                        help="Publikuj metryki Prometheus (/metrics) kolejnych odczytów serwera zapytań")
+    parser.add_argument('--stratify-samples', action='store_true',
+                        help="Przykładowe zdarzenia grup z różnych źródeł zamiast losowych")
+    parser.add_argument('--alert-webhook', metavar='URL',
+                        help="Wysyłaj powiadomienia o alertach żądaniem POST (JSON) na podany adres")
+    parser.add_argument('--alert-file', metavar='PLIK',
+                        help="Dopisuj powiadomienia o alertach do pliku JSON Lines")
+    parser.add_argument('--alert-syslog', metavar='HOST[:PORT]',
+                        help="Wysyłaj powiadomienia o alertach do serwera syslog (RFC 5424)")
+    parser.add_argument('--alert-syslog-tcp', action='store_true',
+                        help="Syslog przez TCP zamiast UDP")
+    parser.add_argument('--alert-smtp', metavar='HOST[:PORT]',
+                        help="Wysyłaj powiadomienia o alertach e-mailem przez serwer SMTP (wymaga --alert-email)")
+    parser.add_argument('--alert-email', action='append', default=[], metavar='ADRES',
+                        help="Adresat powiadomień e-mail (można podać wielokrotnie)")
+    args = parser.parse_args(argv)
+    coordinated = bool(args.merge or args.shards or args.drop_dir)
+    if args.worker:
+        print(f"Węzeł analizy rozproszonej - katalog zadań: {args.worker} (Ctrl+C kończy)")
+        run_worker(args.worker, on_task=lambda task, result: print(
+            f"Zadanie {task['id']}: {len(task['files'])} plików - "
+            f"{'błąd: ' + result['error'] if 'error' in result else 'gotowe'}"))
+        return
+    if args.merge and args.input:
+        parser.error("--merge nie łączy się z --input")
+    if (args.shards or args.drop_dir) and not args.input:
+        parser.error("--shards i --drop-dir wymagają --input")
+    if coordinated and (args.snapshot or args.save_snapshot or args.export or args.plugin
+                        or args.compare_previous):
+        parser.error("--merge, --shards i --drop-dir nie łączą się z migawkami, --export, --plugin "
+                     "ani --compare-previous")
+    if args.serve is not None and (coordinated or args.export or args.compare or args.compare_previous
+                                   or args.save_snapshot or args.save_summary or args.profile):
+        parser.error("--serve nie łączy się z analizą rozproszoną, --export, porównaniami, "
+                     "zapisem migawki lub podsumowania ani --profile")
+    if args.serve_refresh and args.serve is None:
+        parser.error("--serve-refresh wymaga --serve")
+    if args.metrics_port is not None and (args.serve is None or args.snapshot):
+        parser.error("--metrics-port wymaga --serve (bez --snapshot)")
+    if bool(args.alert_smtp) != bool(args.alert_email):
+        parser.error("--alert-smtp i --alert-email wymagają się nawzajem")
+    if args.alert_syslog_tcp and not args.alert_syslog:
+        parser.error("--alert-syslog-tcp wymaga --alert-syslog")
+    if coordinated and (args.alert_webhook or args.alert_file or args.alert_syslog or args.alert_smtp):
+        parser.error("Powiadomienia o alertach nie łączą się z --merge, --shards ani --drop-dir")
+    if args.snapshot and (args.input or args.start or args.export or args.compare_previous):
+        parser.error("--snapshot nie łączy się z --input, --start, --export ani --compare-previous")
+    if args.end and not args.start:
+        parser.error("--end wymaga --start")
+    if args.input and args.compare_previous and not args.start:
+        parser.error("--compare-previous z --input wymaga --start")
+    if args.compare and args.compare_previous:
+        parser.error("--compare i --compare-previous wykluczają się")
+
     # Ustaw kodowanie konsoli dla Windows
-    import sys
     if sys.platform == 'win32':
         try:
-            import os
             os.system('chcp 65001 >nul 2>&1')
             sys.stdout.reconfigure(encoding='utf-8')
         except:
@@ -1342,9 +3053,24 @@ def main():
     print("2. Ostatnie 48 godzin")
     print("3. Ostatnie 7 dni")
     print("4. Własny zakres")
+    print("5. Zakres dat (od - do)")
     print()
 
-    choice = input("Wybór (1-4) [1]: ").strip() or "1"
+    start_time = end_time = None
+    if args.start:
+        # Zakres podany w linii poleceń - bez pytania o wybór
+        choice = "cli"
+    elif args.snapshot:
+        # Zakres analizy zapisany w migawce
+        choice = "snapshot"
+    elif args.merge:
+        # Zakres analizy zapisany w częściowych podsumowaniach
+        choice = "merge"
+    elif args.input:
+        # Pliki eksportu bez zakresu - wszystkie zawarte w nich zdarzenia
+        choice = "files"
+    else:
+        choice = input("Wybór (1-5) [1]: ").strip() or "1"
 
     hours_map = {
         "1": 24,
@@ -1352,8 +3078,23 @@ def main():
         "3": 168,  # 7 dni
     }
 
+    hours_back = 24
     if choice in hours_map:
         hours_back = hours_map[choice]
+    elif choice == "cli":
+        start_time, end_time = args.start, args.end
+    elif choice == "files":
+        hours_back = None
+    elif choice in ("snapshot", "merge"):
+        pass
+    elif choice == "5":
+        try:
+            start_time = parse_datetime(input("Początek (RRRR-MM-DD GG:MM): "))
+            end_text = input("Koniec (RRRR-MM-DD GG:MM) [teraz]: ").strip()
+            end_time = parse_datetime(end_text) if end_text else None
+        except ValueError:
+            print("Nieprawidłowa data, używam domyślnych 24 godzin.")
+            start_time = end_time = None
     elif choice == "4":
         try:
             hours_back = int(input("Podaj liczbę godzin wstecz: "))
@@ -1365,19 +3106,244 @@ def main():
         hours_back = 24
 
     print()
-    print(f"Rozpoczynam analizę ostatnich {hours_back} godzin...")
-    print("To może potrwać kilka minut w zależności od liczby zdarzeń...")
+    if args.input:
+        print(f"Pliki eksportu: {', '.join(args.input)}")
+    if args.snapshot:
+        print(f"Wczytuję migawkę {args.snapshot}...")
+    elif args.merge:
+        print(f"Scalam {len(args.merge)} częściowych podsumowań...")
+    elif start_time is not None:
+        end_text = end_time.strftime('%Y-%m-%d %H:%M:%S') if end_time else "teraz"
+        print(f"Rozpoczynam analizę okresu {start_time.strftime('%Y-%m-%d %H:%M:%S')} - {end_text}...")
+    elif hours_back is None:
+        print("Rozpoczynam analizę wszystkich zdarzeń z plików...")
+    else:
+        print(f"Rozpoczynam analizę ostatnich {hours_back} godzin...")
+    if not args.snapshot and not args.merge:
+        print("To może potrwać kilka minut w zależności od liczby zdarzeń...")
     print()
 
-    # Utwórz analizator i przeprowadź analizę
-    analyzer = WindowsEventAnalyzer(hours_back=hours_back)
-    analyzer.analyze_events()
+    # Utwórz analizator i przeprowadź analizę (z pamięcią podręczną podsumowań,
+    # aby ponowne uruchomienie na niezmienionych dziennikach było natychmiastowe)
+    try:
+        cache = SummaryCache()
+    except OSError:
+        cache = None
+    if args.input or coordinated:
+        # Pamięć podręczna dotyczy dzienników systemu, nie plików
+        cache = None
+
+    # Porównanie z poprzednim okresem: jeden odczyt okna o podwójnej długości,
+    # podzielonego potem na okres bazowy i bieżący
+    current_range = None
+    if args.compare_previous:
+        cache = None
+        if start_time is not None:
+            length = (end_time or datetime.now()) - start_time
+            current_range = (start_time, end_time)
+            start_time = start_time - length
+        else:
+            current_range = (datetime.now() - timedelta(hours=hours_back), None)
+            hours_back *= 2
+
+    if args.snapshot:
+        try:
+            analyzer = WindowsEventAnalyzer.load_snapshot(args.snapshot)
+        except (OSError, ValueError, KeyError, ImportError) as e:
+            print(f"Nie można wczytać migawki {args.snapshot}: {e}")
+            return
+    else:
+        analyzer = WindowsEventAnalyzer(hours_back=hours_back, cache=cache,
+                                        start_time=start_time, end_time=end_time)
+    if args.input:
+        analyzer.event_files = list(args.input)
+        analyzer.file_workers = args.workers
+    analyzer.stratify_samples = args.stratify_samples
+
+    for name in args.plugin:
+        analyzer.add_plugin(BUILTIN_PLUGINS[name]())
+    if args.plugin:
+        # Wtyczki analizują tylko odczytane zdarzenia - bez pamięci podręcznej
+        analyzer.cache = None
+
+    dispatcher = None
+    alert_sinks = []
+    try:
+        if args.alert_file:
+            alert_sinks.append(FileSink(args.alert_file))
+        if args.alert_webhook:
+            alert_sinks.append(WebhookSink(args.alert_webhook))
+        if args.alert_syslog:
+            syslog_host, syslog_port = parse_address(args.alert_syslog, 514)
+            alert_sinks.append(SyslogSink(syslog_host, syslog_port,
+                                          protocol='tcp' if args.alert_syslog_tcp else 'udp'))
+        if args.alert_smtp:
+            smtp_host, smtp_port = parse_address(args.alert_smtp, 25)
+            alert_sinks.append(SmtpSink(smtp_host, args.alert_email, port=smtp_port))
+    except ValueError as e:
+        parser.error(f"Nieprawidłowy adres odbiorcy powiadomień: {e}")
+    if alert_sinks:
+        dispatcher = AlertDispatcher(alert_sinks)
+        if args.snapshot:
+            # Zdarzenia migawki nie są odczytywane ponownie - reguły sprawdzane są od razu
+            dispatcher.scan(analyzer)
+        else:
+            # Reguły sprawdzają tylko odczytane zdarzenia - bez pamięci podręcznej
+            analyzer.cache = None
+            dispatcher.attach(analyzer)
+
+    if args.serve is not None:
+        def make_analyzer():
+            # Każdy odczyt serwera zapytań analizuje nowy analizator o tej samej konfiguracji
+            fresh = WindowsEventAnalyzer(hours_back=hours_back, start_time=start_time, end_time=end_time,
+                                         progress=None)
+            fresh.event_files = list(args.input or ())
+            fresh.file_workers = args.workers
+            fresh.stratify_samples = args.stratify_samples
+            for name in args.plugin:
+                fresh.add_plugin(BUILTIN_PLUGINS[name]())
+            if dispatcher is not None:
+                # Zdarzenia odczytane ponownie przy odświeżeniu są pomijane (deduplikacja)
+                dispatcher.attach(fresh)
+            if metrics is not None:
+                metrics.attach(fresh)
+            return fresh
+
+        metrics = None
+        if args.metrics_port is not None:
+            metrics = MetricsExporter(port=args.metrics_port)
+            try:
+                metrics.start()
+            except OSError as e:
+                print(f"Nie można uruchomić eksportu metryk na porcie {args.metrics_port}: {e}")
+                return
+            print(f"Metryki Prometheus: {metrics.url}")
+
+        if args.snapshot:
+            # Migawka jest stałym zbiorem zdarzeń - bez ponownego odczytu
+            if args.plugin:
+                analyzer.run_plugins()
+            server = QueryServer(analyzer=analyzer, port=args.serve)
+        else:
+            server = QueryServer(factory=make_analyzer, port=args.serve, refresh_interval=args.serve_refresh)
+        print(f"Serwer zapytań: {server.url} (/summary, /top, /histogram, /events, /report) - Ctrl+C kończy")
+        if dispatcher is not None:
+            dispatcher.start()
+        try:
+            asyncio.run(server.serve_forever())
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if dispatcher is not None:
+                dispatcher.close()
+            if metrics is not None:
+                metrics.stop()
+        return
+
+    profiler = None
+    if args.profile:
+        # Pamięć podręczna pominęłaby odczyt, który chcemy zmierzyć
+        analyzer.cache = None
+        profiler = RunProfiler()
+        profiler.attach(analyzer)
+
+    exporter = None
+    if args.export:
+        try:
+            exporter = ArrowEventWriter(os.path.join(args.export, 'events'), format=args.export_format,
+                                        partition_by=('host', 'date'))
+        except ImportError as e:
+            print(f"Eksport niedostępny: {e}")
+        else:
+            # Eksport obejmuje tylko odczytane zdarzenia - bez pamięci podręcznej
+            analyzer.cache = None
+            analyzer.add_event_sink(exporter)
+
+    summary = None
+    if coordinated:
+        # Analiza w częściach (map) i scalenie częściowych podsumowań (reduce)
+        coordinator = SummaryCoordinator(hours_back=hours_back, start_time=start_time, end_time=end_time,
+                                         workers=args.workers, stratify_samples=args.stratify_samples)
+        with profiler.phase('ingestion') if profiler else nullcontext():
+            try:
+                if args.merge:
+                    summary = merge_summaries(load_partial_summary(filename) for filename in args.merge)
+                elif args.drop_dir:
+                    print(f"Zadania w katalogu {args.drop_dir} - uruchom węzły: "
+                          f"windows_event_analyzer.py --worker {args.drop_dir}")
+                    summary = coordinator.run_distributed(
+                        args.input, args.drop_dir, args.shards or len(args.input), timeout=args.drop_timeout,
+                        on_result=lambda task_id, result: print(f"Wynik zadania {task_id} z węzła "
+                                                                f"{result.get('host', '?')}"))
+                else:
+                    summary = coordinator.run_local(args.input, args.shards)
+            except (OSError, ValueError, KeyError, TimeoutError) as e:
+                print(f"Nie można scalić podsumowań: {e}")
+                return
+        for error in describe_errors(coordinator.errors):
+            print(f"Pominięto część {error}")
+        print()
+    elif not args.snapshot:
+        with profiler.phase('ingestion') if profiler else nullcontext():
+            analyzer.analyze_events()
+    elif args.plugin:
+        analyzer.run_plugins()
+
+    if exporter is not None:
+        exporter.close()
+        summary_files = export_summary_tables(analyzer.build_summary(), args.export, args.export_format)
+        print(f"Wyeksportowano {exporter.rows_written} zdarzeń do {len(exporter.files)} plików "
+              f"i {len(summary_files)} tabel podsumowania w katalogu: {args.export}")
+        print()
+
+    comparison = None
+    if current_range is not None:
+        current_start, current_end = current_range
+        summary = analyzer.summary_for_range(current_start, current_end)
+        baseline = analyzer.summary_for_range(None, current_start - timedelta(microseconds=1))
+        comparison = analyzer.compare_with(baseline, summary)
+    elif args.compare:
+        try:
+            comparison = analyzer.compare_with(load_summary(args.compare), summary)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Nie można wczytać raportu bazowego {args.compare}: {e}")
+
+    if dispatcher is not None:
+        if comparison is not None:
+            dispatcher.submit_all(alerts_from_comparison(comparison))
+        dispatcher.close()
+        stats = dispatcher.stats
+        print(f"Powiadomienia o alertach: {stats['sent']} wysłanych w {stats['batches']} partiach "
+              f"({stats['hits']} trafień, {stats['duplicates']} duplikatów pominiętych)")
+        for sink_name, error in dispatcher.errors:
+            print(f"Błąd wysyłki powiadomień ({sink_name}): {error}")
+        if stats['dropped']:
+            print(f"Niewysłane powiadomienia: {stats['dropped']}")
+        print()
+
+    if args.save_summary:
+        try:
+            save_partial_summary(args.save_summary, summary or analyzer.build_summary(),
+                                 args.input or args.merge or analyzer.logs_to_check)
+            print(f"Częściowe podsumowanie zapisane do pliku: {args.save_summary}")
+        except OSError as e:
+            print(f"Nie można zapisać podsumowania {args.save_summary}: {e}")
+
+    if args.save_snapshot:
+        try:
+            analyzer.save_snapshot(args.save_snapshot)
+        except (OSError, ValueError, ImportError) as e:
+            print(f"Nie można zapisać migawki {args.save_snapshot}: {e}")
 
     # Wyświetl raport tekstowy w konsoli
-    report = analyzer.generate_report()
+    with profiler.phase('rendering') if profiler else nullcontext():
+        report = analyzer.generate_report(summary)
     print(report)
+    if comparison is not None:
+        print(comparison.format_text())
 
     # Zapytaj czy zapisać raport
+    saved = None
     print()
     save_choice = input("Czy zapisać raport do pliku? (t/n) [t]: ").strip().lower() or "t"
 
@@ -1387,19 +3353,41 @@ def main():
         print("1. TXT - Format tekstowy (domyślnie)")
         print("2. HTML - Format HTML z graficzną prezentacją")
         print("3. Oba formaty")
+        print("4. Wszystkie formaty (TXT, HTML, JSON, CSV)")
         print()
 
-        format_choice = input("Wybór (1-3) [1]: ").strip() or "1"
+        format_choice = input("Wybór (1-4) [1]: ").strip() or "1"
 
         if format_choice == "2":
-            analyzer.save_report(format='html')
+            report_format = 'html'
         elif format_choice == "3":
-            print("\nZapisuję raport w formacie TXT...")
-            analyzer.save_report(format='txt')
-            print("\nZapisuję raport w formacie HTML...")
-            analyzer.save_report(format='html')
+            print("\nZapisuję raport w formatach TXT i HTML...")
+            report_format = ['txt', 'html']
+        elif format_choice == "4":
+            print("\nZapisuję raport we wszystkich formatach...")
+            report_format = list(WindowsEventAnalyzer.REPORT_FORMATS)
         else:
-            analyzer.save_report(format='txt')
+            report_format = 'txt'
+
+        with profiler.phase('saving') if profiler else nullcontext():
+            saved = analyzer.save_report(format=report_format, summary=summary)
+
+        if saved and comparison is not None:
+            first_saved = saved if isinstance(saved, str) else saved[0]
+            comparison_file = f"{os.path.splitext(first_saved)[0]}.compare.json"
+            analyzer._write_atomic(comparison_file, comparison.to_json())
+            print(f"Porównanie zapisane do pliku: {comparison_file}")
+
+    if profiler:
+        # Pliki profilu obok raportu (lub z własnym znacznikiem czasu, gdy raport nie został zapisany)
+        if saved:
+            first_saved = saved if isinstance(saved, str) else saved[0]
+            prefix = os.path.splitext(first_saved)[0]
+        else:
+            prefix = f"event_log_profile_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        print()
+        for profile_file in profiler.write(prefix):
+            print(f"Profil zapisany do pliku: {profile_file}")
 
     print()
     print("Analiza zakończona!")